@@ -1,16 +1,106 @@
 """Public functions for the stormwater monitoring datasheet extraction API."""
 
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 
 from typeguard import typechecked
 
 from stormwater_monitoring_datasheet_extraction.api import internal
-from stormwater_monitoring_datasheet_extraction.lib.constants import DocStrings
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    VALIDATION_WORKERS,
+    DocStrings,
+    ValidationProfile,
+)
 
 
 @typechecked
-def run_etl(input_dir: Path, output_dir: Path) -> Path:  # noqa: D103
-    return internal.run_etl(input_dir=input_dir, output_dir=output_dir)
+def run_etl(  # noqa: D103
+    input_dir: Path,
+    output_dir: Path,
+    validation_profile: ValidationProfile = ValidationProfile.FULL,
+    validation_workers: int = VALIDATION_WORKERS,
+    reference_time: datetime | None = None,
+    failure_cases_path: Path | None = None,
+    extractor: str | None = None,
+    from_documents: bool = False,
+    incremental: bool = False,
+) -> Path:
+    return internal.run_etl(
+        input_dir=input_dir,
+        output_dir=output_dir,
+        validation_profile=validation_profile,
+        validation_workers=validation_workers,
+        reference_time=reference_time,
+        failure_cases_path=failure_cases_path,
+        extractor=extractor,
+        from_documents=from_documents,
+        incremental=incremental,
+    )
 
 
 run_etl.__doc__ = DocStrings.RUN_ETL.api_docstring
+
+
+@typechecked
+def stream_etl(  # noqa: D103
+    input_dir: Path,
+    output_dir: Path,
+    validation_profile: ValidationProfile = ValidationProfile.FULL,
+    validation_workers: int = VALIDATION_WORKERS,
+    reference_time: datetime | None = None,
+    failure_cases_path: Path | None = None,
+    extractor: str | None = None,
+    incremental: bool = False,
+) -> Path:
+    return internal.stream_etl(
+        input_dir=input_dir,
+        output_dir=output_dir,
+        validation_profile=validation_profile,
+        validation_workers=validation_workers,
+        reference_time=reference_time,
+        failure_cases_path=failure_cases_path,
+        extractor=extractor,
+        incremental=incremental,
+    )
+
+
+stream_etl.__doc__ = DocStrings.STREAM_ETL.api_docstring
+
+
+@typechecked
+def watch_etl(  # noqa: D103
+    input_dir: Path,
+    output_dir: Path,
+    validation_profile: ValidationProfile = ValidationProfile.FULL,
+    validation_workers: int = VALIDATION_WORKERS,
+    reference_time: datetime | None = None,
+    failure_cases_path: Path | None = None,
+    extractor: str | None = None,
+    stop: threading.Event | None = None,
+) -> list[Path]:
+    return internal.watch_etl(
+        input_dir=input_dir,
+        output_dir=output_dir,
+        validation_profile=validation_profile,
+        validation_workers=validation_workers,
+        reference_time=reference_time,
+        failure_cases_path=failure_cases_path,
+        extractor=extractor,
+        stop=stop,
+    )
+
+
+watch_etl.__doc__ = DocStrings.WATCH_ETL.api_docstring
+
+
+@contextmanager
+@typechecked
+def profile(path: Path) -> Iterator[None]:  # noqa: D103
+    with internal.profile(path=path):
+        yield
+
+
+profile.__doc__ = DocStrings.PROFILE.api_docstring
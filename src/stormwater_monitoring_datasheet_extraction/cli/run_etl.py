@@ -5,13 +5,25 @@ __doc__ = """
     :nested: full
 """
 
+from contextlib import nullcontext
+from datetime import datetime
 from pathlib import Path
 
 import click
 from typeguard import typechecked
 
-from stormwater_monitoring_datasheet_extraction.api.public import run_etl
-from stormwater_monitoring_datasheet_extraction.lib.constants import DocStrings
+from stormwater_monitoring_datasheet_extraction.api.public import (
+    profile,
+    run_etl,
+    stream_etl,
+    watch_etl,
+)
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    REPORT_FILE_STEM,
+    VALIDATION_WORKERS,
+    DocStrings,
+    ValidationProfile,
+)
 
 
 @click.command(help=DocStrings.RUN_ETL.cli_docstring)
@@ -28,8 +40,131 @@ from stormwater_monitoring_datasheet_extraction.lib.constants import DocStrings
     default="",
     help=DocStrings.RUN_ETL.args["output_dir"],
 )
+@click.option(
+    "--validation_profile",
+    type=click.Choice([profile.value for profile in ValidationProfile]),
+    required=False,
+    default=ValidationProfile.FULL.value,
+    help=DocStrings.RUN_ETL.args["validation_profile"],
+)
+@click.option(
+    "--validation_workers",
+    type=click.IntRange(min=1),
+    required=False,
+    default=VALIDATION_WORKERS,
+    help=DocStrings.RUN_ETL.args["validation_workers"],
+)
+@click.option(
+    "--reference_time",
+    type=click.DateTime(),
+    required=False,
+    default=None,
+    help=DocStrings.RUN_ETL.args["reference_time"],
+)
+@click.option(
+    "--failure_cases_path",
+    type=str,
+    required=False,
+    default="",
+    help=DocStrings.RUN_ETL.args["failure_cases_path"],
+)
+@click.option(
+    "--profile",
+    "profile_path",
+    type=str,
+    required=False,
+    default="",
+    help=DocStrings.PROFILE.args["path"] + " If empty path, the run isn't profiled.",
+)
+@click.option(
+    "--extractor",
+    type=str,
+    required=False,
+    default="",
+    help=DocStrings.RUN_ETL.args["extractor"],
+)
+@click.option(
+    "--from_documents",
+    is_flag=True,
+    default=False,
+    help=DocStrings.RUN_ETL.args["from_documents"],
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help=DocStrings.RUN_ETL.args["incremental"],
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help=DocStrings.STREAM_ETL.opening,
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    default=False,
+    help=DocStrings.WATCH_ETL.opening,
+)
 @typechecked
-def main(input_dir: str, output_dir: str) -> None:  # noqa: D103
-    final_output_path = run_etl(input_dir=Path(input_dir), output_dir=Path(output_dir))
+def main(  # noqa: D103
+    input_dir: str,
+    output_dir: str,
+    validation_profile: str,
+    validation_workers: int,
+    reference_time: datetime | None,
+    failure_cases_path: str,
+    profile_path: str,
+    extractor: str,
+    from_documents: bool,
+    incremental: bool,
+    stream: bool,
+    watch: bool,
+) -> None:
+    if from_documents and (stream or watch):
+        raise click.UsageError("--stream and --watch can't be used with --from_documents.")
+    if stream and watch:
+        raise click.UsageError("--stream can't be used with --watch.")
+
+    with profile(path=Path(profile_path)) if profile_path else nullcontext():
+        if watch:
+            output_paths = watch_etl(
+                input_dir=Path(input_dir),
+                output_dir=Path(output_dir),
+                validation_profile=ValidationProfile(validation_profile),
+                validation_workers=validation_workers,
+                reference_time=reference_time,
+                failure_cases_path=Path(failure_cases_path) if failure_cases_path else None,
+                extractor=extractor if extractor else None,
+            )
+            click.echo(f"Stopped watching. Loaded {len(output_paths)} batches.")
+            return
+
+        if stream:
+            final_output_path = stream_etl(
+                input_dir=Path(input_dir),
+                output_dir=Path(output_dir),
+                validation_profile=ValidationProfile(validation_profile),
+                validation_workers=validation_workers,
+                reference_time=reference_time,
+                failure_cases_path=Path(failure_cases_path) if failure_cases_path else None,
+                extractor=extractor if extractor else None,
+                incremental=incremental,
+            )
+        else:
+            final_output_path = run_etl(
+                input_dir=Path(input_dir),
+                output_dir=Path(output_dir),
+                validation_profile=ValidationProfile(validation_profile),
+                validation_workers=validation_workers,
+                reference_time=reference_time,
+                failure_cases_path=Path(failure_cases_path) if failure_cases_path else None,
+                extractor=extractor if extractor else None,
+                from_documents=from_documents,
+                incremental=incremental,
+            )
     click.echo(f"ETL process completed. Final output saved to: {final_output_path}")
+    report_path = final_output_path.with_name(f"{REPORT_FILE_STEM}.json")
+    click.echo(f"Run report saved to: {report_path}")
     # TODO: See `bfb_delivery` for how to return path and test CLI.
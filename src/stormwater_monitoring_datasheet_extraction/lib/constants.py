@@ -3,7 +3,7 @@
 from enum import IntEnum, StrEnum
 from typing import Any, Final
 
-from comb_utils import DocString
+from comb_utils import DocString, ErrorDocString
 
 
 class CharLimits:
@@ -58,33 +58,58 @@ class Columns:
     DESCRIPTION: Final[str] = "description"
 
     # Other
+    BOUND: Final[str] = "bound"
+    CHECK: Final[str] = "check"
     COLOR: Final[str] = "color"
+    COLUMN: Final[str] = "column"
     CREEK_SITE_ID: Final[str] = "creek_site_id"
     CREEK_TYPE: Final[str] = "creek_type"
     DATA_TYPE: Final[str] = "data_type"
+    DRY: Final[str] = "dry"
+    EXTRACTION_SECONDS: Final[str] = "extraction_seconds"
+    FAILURE_CASE: Final[str] = "failure_case"
     FORM_TYPE: Final[str] = "form_type"
     FORM_VERSION: Final[str] = "form_version"
     FORMAT: Final[str] = "format"
     FORMS: Final[str] = "forms"
     HABITAT: Final[str] = "habitat"
     INCLUSIVE: Final[str] = "inclusive"
+    INDEX: Final[str] = "index"
     INVESTIGATORS: Final[str] = "investigators"
     LOWER: Final[str] = "lower"
     METADATA: Final[str] = "metadata"
     MIGRATE: Final[str] = "migrate"
+    N_FAILURE_CASES: Final[str] = "n_failure_cases"
     OBSERVATIONS: Final[str] = "observations"
     ODOR: Final[str] = "odor"
     OPTIONS: Final[str] = "options"
     OUTFALL_TYPE: Final[str] = "outfall_type"
+    QUALITATIVE: Final[str] = "qualitative"
     REAR: Final[str] = "rear"
     REFERENCE_VALUE: Final[str] = "reference_value"
+    RUN_ID: Final[str] = "run_id"
+    SAMPLE: Final[str] = "sample"
+    SCHEMA: Final[str] = "schema"
     SITE: Final[str] = "site"
     SPAWN: Final[str] = "spawn"
+    STATUS: Final[str] = "status"
+    THRESHOLD_EXCEEDANCES: Final[str] = "threshold_exceedances"
     THRESHOLDS: Final[str] = "thresholds"
     UNITS: Final[str] = "units"
     UPPER: Final[str] = "upper"
     VALUE: Final[str] = "value"
+    VERIFICATION_EDITS: Final[str] = "verification_edits"
+    VISITED: Final[str] = "visited"
     VISUAL: Final[str] = "visual"
+    WET: Final[str] = "wet"
+
+
+class Compression(StrEnum):
+    """Options for output compression."""
+
+    GZIP = "gzip"
+    NONE = "none"
+    ZSTD = "zstd"
 
 
 class CreekType(StrEnum):
@@ -110,12 +135,130 @@ class DocStrings:
             "output_dir": (
                 "Path to the output directory where processed data will be saved."
                 " If empty path, defaults to a dated directory in the current working"
-                " directory."
+                " directory. Each run's output is committed atomically to its own run"
+                " directory within it."
+            ),
+            "extractor": (
+                "Name of the extractor backend to extract images with, as registered in"
+                " the `stormwater_monitoring_datasheet_extraction.extractors` entry point"
+                " group, e.g. `fake` to replay the example extraction. If empty, nothing"
+                " is extracted."
+            ),
+            "from_documents": (
+                "Ingest pre-extracted JSON extraction documents (`.json` or `.json.gz`)"
+                " from the input directory, e.g. manual transcriptions or third-party OCR"
+                " output, instead of extracting images."
+            ),
+            "incremental": (
+                "Process only images that are new or changed since they were last loaded"
+                " to the output directory, per its ledger (`ledger.sqlite`), and record"
+                " them in the ledger once loaded. Use the same output directory every run."
+            ),
+            "failure_cases_path": (
+                "Path to write a gzip-compressed CSV of all schema validation failure"
+                " cases to, if validation fails. If empty path, the detail is not"
+                " written, and only a bounded summary is reported."
+            ),
+            "validation_profile": (
+                "How strictly to enforce stage schemas. `full` lazily collects every"
+                " failure case, `fast` fails on the first error and skips expensive"
+                " dataframe checks, and `off` skips schema validation for trusted"
+                " reprocessing."
+            ),
+            "validation_workers": (
+                "The number of threads to validate each stage's tables, and chunks of large"
+                " tables, in at once. 1 validates serially. Validation finds the same"
+                " failure cases either way."
+            ),
+            "reference_time": (
+                "The time to check dates and times against, e.g. that none are in the"
+                " future, frozen for the whole run. Pass the original run's time to"
+                " reproduce it when reprocessing. If None, the time the run starts."
+            ),
+        },
+        raises=[
+            ErrorDocString(
+                error_type="SchemaValidationError",
+                docstring=(
+                    "If data fail stage schema validation. Summarizes failure cases per"
+                    " schema, check, and column."
+                ),
+            )
+        ],
+        returns=[
+            "Path to the saved cleaned data file. The run report is saved beside it, as"
+            " `run_report.json`, with each form's timing and outcome."
+        ],
+    )
+
+    STREAM_ETL: Final[DocString] = DocString(
+        opening="""Extracts, verifies, cleans, and loads datasheet images, streaming forms
+    through precleaning and verification as they're extracted.
+
+    Like `run_etl`, but verification can start on the first form while later forms are
+    still being extracted. Bounded queues between the stages hold back extraction when
+    precleaning or verification fall behind, so memory stays bounded. Cleaning, with its
+    cross-form checks, and loading run once all forms are verified.
+""",
+        args={
+            arg: docstring
+            for arg, docstring in RUN_ETL.args.items()
+            if arg != "from_documents"
+        },
+        raises=RUN_ETL.raises,
+        returns=RUN_ETL.returns,
+    )
+
+    WATCH_ETL: Final[DocString] = DocString(
+        opening="""Watches the input directory, and extracts, verifies, cleans, and loads new
+    datasheet images as they arrive.
+
+    Runs until stopped, e.g. with Ctrl+C. Once an image's upload settles, it's extracted and
+    precleaned with others in a micro-batch, and the batch is queued for verification,
+    cleaning, and loading to its own run directory. The extractor and site and creek type
+    maps stay loaded between batches. Images already loaded to the output directory, per its
+    ledger (`ledger.sqlite`), are skipped, including across restarts. A batch that fails
+    schema validation is logged and skipped, and the rest keep going.
+""",
+        args={
+            "input_dir": "Path to the input directory to watch for datasheet images.",
+            "output_dir": RUN_ETL.args["output_dir"],
+            "extractor": RUN_ETL.args["extractor"],
+            "failure_cases_path": RUN_ETL.args["failure_cases_path"],
+            "validation_profile": RUN_ETL.args["validation_profile"],
+            "validation_workers": RUN_ETL.args["validation_workers"],
+            "reference_time": (
+                "The time to check dates and times against, e.g. that none are in the"
+                " future. If None, the time each micro-batch starts verification."
+            ),
+            "stop": (
+                "An event to set to stop watching, once queued batches are loaded. If None,"
+                " watches until interrupted."
             ),
         },
-        # TODO: Create custom errors module.
         raises=[],
-        returns=["Path to the saved cleaned data file."],
+        returns=[
+            "Paths to the saved cleaned data files, one per loaded micro-batch, each with"
+            " its micro-batch's run report beside it, as `run_report.json`."
+        ],
+    )
+
+    PROFILE: Final[DocString] = DocString(
+        opening="""Profiles the ETL runs within the context, by stage.
+
+    Runs them under cProfile, and samples every thread's stack meanwhile. Writes a
+    `.pstats` file, and a `.collapsed` file of stack samples for flamegraphs, with a section
+    per stage: extraction, precleaning, verification, cleaning, restructuring, and loading.
+    Logs each stage's wall time.
+""",
+        args={
+            "path": (
+                "Path to write the profiles to, less their suffixes, e.g. `profiles/batch`"
+                " writes `profiles/batch.pstats` and `profiles/batch.collapsed`."
+            ),
+        },
+        raises=[],
+        returns=[],
     )
 
 
@@ -135,12 +278,29 @@ class FlowComparedToExpected(StrEnum):
     HIGHER = "Higher"
 
 
+class FormStatus(StrEnum):
+    """A form's outcome in a run, per the run report."""
+
+    FAILED = "failed"
+    LOADED = "loaded"
+    SKIPPED = "skipped"
+
+
 class FormType(StrEnum):
     """Options for the form type field."""
 
     FIELD_DATASHEET_FOSS = "field_datasheet_FOSS"
 
 
+class ImageType(StrEnum):
+    """Options for datasheet image file types."""
+
+    HEIC = "heic"
+    JPEG = "jpeg"
+    PDF = "pdf"
+    PNG = "png"
+
+
 class OutfallType(StrEnum):
     """Options for the outfall type field."""
 
@@ -177,6 +337,17 @@ class Units(StrEnum):
     PPT = "ppt"
 
 
+class ValidationProfile(StrEnum):
+    """Options for how strictly to enforce stage schemas."""
+
+    #: Fail on the first error, and skip expensive dataframe checks.
+    FAST = "fast"
+    #: Lazily collect every failure case before raising.
+    FULL = "full"
+    #: Skip schema validation, e.g. for reprocessing already-verified archives.
+    OFF = "off"
+
+
 class Weather(StrEnum):
     """Options for the weather field."""
 
@@ -193,10 +364,69 @@ class Weather(StrEnum):
 
 # TODO: Make custom date and time classes with __str__ and __repr__
 # to handle errors better?
-DATE_FORMAT: Final[str] = "YYYY-MM-DD"
-TIME_FORMAT: Final[str] = "HH:MM"
+# strftime formats, i.e. "YYYY-MM-DD" and "HH:MM".
+DATE_FORMAT: Final[str] = "%Y-%m-%d"
+TIME_FORMAT: Final[str] = "%H:%M"
 
 N_FAILURE_CASES: Final[int] = 5
+# Seconds between stack samples, when profiling. See `profiling.profile`.
+PROFILE_SAMPLE_SECONDS: Final[float] = 0.005
+# Threads validating a stage's tables, and chunks of large tables, at once. Serial by
+# default. See `schema.validation.validation_workers`.
+VALIDATION_WORKERS: Final[int] = 1
+# Rows per chunk of a large table, when validating in parallel. Cut on form boundaries.
+VALIDATION_CHUNK_SIZE: Final[int] = 250_000
+# Rows per batch, when validating a table from Parquet. Bounds memory.
+PARQUET_BATCH_SIZE: Final[int] = 100_000
+
+# Image discovery.
+IMAGE_EXTENSIONS: Final[dict[str, ImageType]] = {
+    ".heic": ImageType.HEIC,
+    ".heif": ImageType.HEIC,
+    ".jpeg": ImageType.JPEG,
+    ".jpg": ImageType.JPEG,
+    ".pdf": ImageType.PDF,
+    ".png": ImageType.PNG,
+}
+# Smaller files are assumed to be thumbnails, not datasheet scans.
+MIN_IMAGE_BYTES: Final[int] = 32 * 1024
+# Max number of discovered images waiting to be extracted.
+IMAGE_QUEUE_SIZE: Final[int] = 64
+# Max pixels to decode a datasheet page to, bounding peak memory per image.
+MAX_IMAGE_PIXELS: Final[int] = 4_000_000
+# Max pixels to decode an image at before downscaling it. JPEGs decode at reduced
+# resolution below this. Larger images of other formats are rejected rather than decoded.
+MAX_DECODE_PIXELS: Final[int] = 24_000_000
+# Number of field crops per recognition batch.
+RECOGNITION_BATCH_SIZE: Final[int] = 64
+# Number of images per extractor batch.
+EXTRACTION_BATCH_SIZE: Final[int] = 16
+# Max seconds a field crop waits for its recognition batch to fill.
+RECOGNITION_MAX_LATENCY_SECONDS: Final[float] = 0.5
+
+# Streaming.
+# Max number of extracted forms, or precleaned chunks, waiting for the next stage.
+STREAM_QUEUE_SIZE: Final[int] = 64
+# Max number of forms each streaming stage takes from its queue per call.
+STREAM_CHUNK_SIZE: Final[int] = 16
+
+# Watch mode.
+# Seconds an image's size and modification time must hold still before it's extracted, so
+# uploads in progress aren't.
+WATCH_DEBOUNCE_SECONDS: Final[float] = 5.0
+# Seconds between rescans of the input directory, when file system events are unavailable.
+WATCH_POLL_SECONDS: Final[float] = 2.0
+# Max number of images per micro-batch.
+WATCH_BATCH_SIZE: Final[int] = EXTRACTION_BATCH_SIZE
+# Max number of precleaned micro-batches waiting for verification.
+WATCH_QUEUE_SIZE: Final[int] = 4
+
+# Output.
+OUTPUT_FILE_STEM: Final[str] = "extraction"
+REPORT_FILE_STEM: Final[str] = "run_report"
+# Compression levels: gzip 1-9, zstd 1-22. Favor speed; outputs are rewritten often.
+GZIP_COMPRESSION_LEVEL: Final[int] = 6
+ZSTD_COMPRESSION_LEVEL: Final[int] = 3
 
 # TODO: Version data definitions by form type and version.
 FIELD_DATA_DEFINITION: Final[dict[str, Any]] = {
@@ -322,14 +552,15 @@ FIELD_DATA_DEFINITION: Final[dict[str, Any]] = {
             #     ),
             # ],
         },
-        # TODO: To check observations threshholds, need a site-type map:
-        # creek or outfall, and if creek:
-        # habitat, spawn, rear, or migrate.
+        # NOTE: Field `lower` and `upper` bounds are absolute limits, enforced by the
+        # schema. `thresholds` are normal ranges by site type (outfall or creek, and if
+        # creek, habitat, spawn, rear, or migrate), warned on. See `schema.definition`.
         Columns.OBSERVATIONS: {
             Columns.AIR_TEMP: {Columns.UNITS: Units.CELSIUS},
             Columns.ARRIVAL_TIME: {Columns.FORMAT: TIME_FORMAT},
             Columns.DO_MG_PER_L: {
                 Columns.UNITS: Units.MG_PER_L,
+                Columns.LOWER: {Columns.VALUE: 0, Columns.INCLUSIVE: True},
                 Columns.THRESHOLDS: {
                     OutfallType.OUTFALL: {
                         Columns.LOWER: {Columns.VALUE: 6, Columns.INCLUSIVE: True}
@@ -345,6 +576,8 @@ FIELD_DATA_DEFINITION: Final[dict[str, Any]] = {
             },
             Columns.PH: {
                 Columns.UNITS: Units.PH,
+                Columns.LOWER: {Columns.VALUE: 0, Columns.INCLUSIVE: True},
+                Columns.UPPER: {Columns.VALUE: 14, Columns.INCLUSIVE: True},
                 Columns.THRESHOLDS: {
                     OutfallType.OUTFALL: {
                         Columns.LOWER: {Columns.VALUE: 5, Columns.INCLUSIVE: True},
@@ -356,9 +589,13 @@ FIELD_DATA_DEFINITION: Final[dict[str, Any]] = {
                     },
                 },
             },
-            Columns.SALINITY_PPT: {Columns.UNITS: Units.PPT},
+            Columns.SALINITY_PPT: {
+                Columns.UNITS: Units.PPT,
+                Columns.LOWER: {Columns.VALUE: 0, Columns.INCLUSIVE: True},
+            },
             Columns.SPS_MICRO_S_PER_CM: {
                 Columns.UNITS: Units.MICRO_S_PER_CM,
+                Columns.LOWER: {Columns.VALUE: 0, Columns.INCLUSIVE: True},
                 Columns.THRESHOLDS: {
                     OutfallType.OUTFALL: {
                         Columns.UPPER: {Columns.VALUE: 500, Columns.INCLUSIVE: True}
@@ -1,16 +1,16 @@
 """Database read utilities and queries."""
 
-import pandera.pandas as pa
 import pandera.typing as pt
 
 from stormwater_monitoring_datasheet_extraction.lib import schema
 from stormwater_monitoring_datasheet_extraction.lib.db import tables
+from stormwater_monitoring_datasheet_extraction.lib.schema import compiled
 
 
 # NOTE: At some point, these will return tables from a database that we don't manage.
 # So, we'll continue to use the pandera schema here.
 # TODO: Implement this.
-@pa.check_types(with_pydantic=True, lazy=True)
+@compiled.check_types(lazy=True)
 def get_site_type_map() -> pt.DataFrame[schema.Site]:
     """Reads in the site type map."""
     site_type_map = tables.SITES
@@ -19,7 +19,7 @@ def get_site_type_map() -> pt.DataFrame[schema.Site]:
 
 
 # TODO: Implement this.
-@pa.check_types(with_pydantic=True, lazy=True)
+@compiled.check_types(lazy=True)
 def get_creek_type_map() -> pt.DataFrame[schema.Creek]:
     """Reads in the creek type map."""
     creek_type_map = tables.CREEKS
@@ -0,0 +1 @@
+"""Extraction documents: ingesting, flattening, and restructuring."""
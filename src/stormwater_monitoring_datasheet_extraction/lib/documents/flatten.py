@@ -0,0 +1,225 @@
+"""Flatten nested extraction documents into the relational `*Extracted` tables.
+
+Forms are appended column by column into per-table lists in a single traversal, and each
+table, index included, is built once at the end, rather than building a frame per form
+and concatenating.
+
+Rows stay in document order, which `restructure` relies on to rebuild each form's lists, so
+the composite keys' MultiIndexes aren't lexsorted. Downstream, tables are grouped and
+joined, not looked up by key. To look up rows by key, e.g. `.loc[(form_id, site_id)]`,
+sort the table first, or pandas scans past the lexsort depth.
+"""
+
+from collections.abc import Iterable, Mapping
+from typing import Any, Final, NamedTuple
+
+import numpy as np
+import pandas as pd
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    QualitativeSiteObservationTypes,
+)
+
+# NOTE: Outfall and creek types are extracted with each observation, but they describe the
+# site, not the visit, so they are not flattened here. See `Site` and `Creek`.
+_FORM_COLUMNS: Final[tuple[str, ...]] = (
+    Columns.FORM_TYPE,
+    Columns.FORM_VERSION,
+    Columns.DATE,
+    Columns.CITY,
+    Columns.TIDE_HEIGHT,
+    Columns.TIDE_TIME,
+    Columns.PAST_24HR_RAINFALL,
+    Columns.WEATHER,
+    Columns.NOTES,
+)
+_INVESTIGATOR_COLUMNS: Final[tuple[str, ...]] = (Columns.START_TIME, Columns.END_TIME)
+_SITE_VISIT_COLUMNS: Final[tuple[str, ...]] = (Columns.ARRIVAL_TIME,)
+_QUANTITATIVE_COLUMNS: Final[tuple[str, ...]] = (
+    Columns.BACTERIA_BOTTLE_NO,
+    Columns.FLOW,
+    Columns.FLOW_COMPARED_TO_EXPECTED,
+    Columns.AIR_TEMP,
+    Columns.WATER_TEMP,
+    Columns.DO_MG_PER_L,
+    Columns.SPS_MICRO_S_PER_CM,
+    Columns.SALINITY_PPT,
+    Columns.PH,
+)
+_QUANTITATIVE_COLUMN_SET: Final[frozenset[str]] = frozenset(_QUANTITATIVE_COLUMNS)
+_QUALITATIVE_COLUMNS: Final[tuple[str, ...]] = (Columns.RANK, Columns.DESCRIPTION)
+_QUALITATIVE_TYPES: Final[tuple[str, ...]] = tuple(
+    observation_type.value for observation_type in QualitativeSiteObservationTypes
+)
+
+_FORM_INDEX: Final[tuple[str, ...]] = (Columns.FORM_ID,)
+_INVESTIGATOR_INDEX: Final[tuple[str, ...]] = (Columns.FORM_ID, Columns.INVESTIGATOR)
+_SITE_INDEX: Final[tuple[str, ...]] = (Columns.FORM_ID, Columns.SITE_ID)
+_QUALITATIVE_INDEX: Final[tuple[str, ...]] = (
+    Columns.FORM_ID,
+    Columns.SITE_ID,
+    Columns.OBSERVATION_TYPE,
+)
+
+
+class ExtractedTables(NamedTuple):
+    """The raw extraction, split into the relational `*Extracted` tables."""
+
+    #: The form metadata. See `schema.FormExtracted`.
+    form_metadata: pd.DataFrame
+    #: The investigators. See `schema.FormInvestigatorExtracted`.
+    investigators: pd.DataFrame
+    #: The site visits. See `schema.SiteVisitExtracted`.
+    site_visits: pd.DataFrame
+    #: The quantitative observations. See `schema.QuantitativeObservationsExtracted`.
+    quantitative_observations: pd.DataFrame
+    #: The qualitative observations. See `schema.QualitativeObservationsExtracted`.
+    qualitative_observations: pd.DataFrame
+
+
+class _TableBuilder:
+    """Accumulates a table's index levels and columns as lists."""
+
+    def __init__(self, index_names: tuple[str, ...], columns: tuple[str, ...]) -> None:
+        self.index_names = index_names
+        self.columns = columns
+        self.data: dict[str, list] = {name: [] for name in (*index_names, *columns)}
+        # Bound once, since appending is the hot loop.
+        self._index_appends = [self.data[name].append for name in index_names]
+        self._column_appends = [(column, self.data[column].append) for column in columns]
+
+    def append(self, index: tuple, record: Mapping[str, Any]) -> None:
+        """Append a row: its index values, and its columns from `record`, if present."""
+        for append, value in zip(self._index_appends, index, strict=True):
+            append(value)
+        get = record.get
+        for column, append in self._column_appends:
+            append(get(column))
+
+    def build(self) -> pd.DataFrame:
+        """Build the table, once."""
+        index_arrays = [pd.Index(self.data[name], dtype=object) for name in self.index_names]
+        index = (
+            pd.MultiIndex.from_arrays(index_arrays, names=self.index_names)
+            if len(index_arrays) > 1
+            else index_arrays[0].rename(self.index_names[0])
+        )
+
+        return pd.DataFrame(
+            {column: _to_array(values=self.data[column]) for column in self.columns},
+            index=index,
+        )
+
+
+class ExtractedTablesBuilder:
+    """Flattens extraction documents into the `*Extracted` tables, one form at a time.
+
+    Add forms with `add_form` or `add_forms`, e.g. as they are extracted or parsed, then
+    `build` the tables once.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty tables."""
+        self._forms = _TableBuilder(index_names=_FORM_INDEX, columns=_FORM_COLUMNS)
+        self._investigators = _TableBuilder(
+            index_names=_INVESTIGATOR_INDEX, columns=_INVESTIGATOR_COLUMNS
+        )
+        self._site_visits = _TableBuilder(
+            index_names=_SITE_INDEX, columns=_SITE_VISIT_COLUMNS
+        )
+        self._quantitative_observations = _TableBuilder(
+            index_names=_SITE_INDEX, columns=_QUANTITATIVE_COLUMNS
+        )
+        self._qualitative_observations = _TableBuilder(
+            index_names=_QUALITATIVE_INDEX, columns=_QUALITATIVE_COLUMNS
+        )
+        #: The number of forms added.
+        self.n_forms = 0
+
+    def add_form(self, form_id: str, form: Mapping[str, Any]) -> None:
+        """Flatten a form into the tables.
+
+        Args:
+            form_id: The form ID.
+            form: The form's extraction document, as in
+                `FIELD_DATA_DEFINITION["example_extraction_document"][FORMS][form_id]`.
+        """
+        self._forms.append(index=(form_id,), record=form)
+
+        for investigator, times in (form.get(Columns.INVESTIGATORS) or {}).items():
+            self._investigators.append(index=(form_id, investigator), record=times or {})
+
+        for observation in form.get(Columns.OBSERVATIONS) or []:
+            site_index = (form_id, observation.get(Columns.SITE_ID))
+            self._site_visits.append(index=site_index, record=observation)
+
+            # Dry outfalls have no observations.
+            if not _QUANTITATIVE_COLUMN_SET.isdisjoint(observation):
+                self._quantitative_observations.append(index=site_index, record=observation)
+
+            for observation_type in _QUALITATIVE_TYPES:
+                if observation_type in observation:
+                    self._qualitative_observations.append(
+                        index=(*site_index, observation_type),
+                        record=observation[observation_type] or {},
+                    )
+
+        self.n_forms += 1
+
+    def add_forms(
+        self, forms: Mapping[str, Mapping[str, Any]] | Iterable[tuple[str, Mapping[str, Any]]]
+    ) -> None:
+        """Flatten forms into the tables.
+
+        Args:
+            forms: The forms' extraction documents by form ID, as a mapping, or an iterable
+                of (form ID, document) pairs, e.g. streamed from a parser.
+        """
+        form_items = forms.items() if isinstance(forms, Mapping) else forms
+        for form_id, form in form_items:
+            self.add_form(form_id=form_id, form=form)
+
+    def build(self) -> ExtractedTables:
+        """Build the tables from the forms added so far.
+
+        Returns:
+            The `*Extracted` tables.
+        """
+        return ExtractedTables(
+            form_metadata=self._forms.build(),
+            investigators=self._investigators.build(),
+            site_visits=self._site_visits.build(),
+            quantitative_observations=self._quantitative_observations.build(),
+            qualitative_observations=self._qualitative_observations.build(),
+        )
+
+
+@typechecked
+def flatten_forms(
+    forms: Mapping[str, Mapping[str, Any]] | Iterable[tuple[str, Mapping[str, Any]]],
+) -> ExtractedTables:
+    """Flatten extraction documents into the `*Extracted` tables.
+
+    Args:
+        forms: The forms' extraction documents by form ID, as in
+            `FIELD_DATA_DEFINITION["example_extraction_document"][FORMS]`, or an iterable of
+            (form ID, document) pairs.
+
+    Returns:
+        The `*Extracted` tables.
+    """
+    builder = ExtractedTablesBuilder()
+    builder.add_forms(forms=forms)
+
+    return builder.build()
+
+
+def _to_array(values: list) -> np.ndarray:
+    """Convert a column's values to an array, inferring numeric dtypes.
+
+    Raw extracted values are kept as is: numeric columns with any non-numeric value, e.g.
+    OCR text, stay object columns, for precleaning to handle.
+    """
+    return pd.Series(values, dtype=None if values else object).to_numpy()
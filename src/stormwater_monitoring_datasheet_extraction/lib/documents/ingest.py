@@ -0,0 +1,95 @@
+"""Ingest pre-extracted JSON extraction documents, bypassing computer vision.
+
+Extraction documents are JSON, as in `FIELD_DATA_DEFINITION["example_extraction_document"]`:
+a `metadata` block and `forms` keyed by form ID, e.g. manual transcriptions or third-party
+OCR output. Documents may be gzip-compressed (`.json.gz`).
+
+If `ijson` is installed (the `ingest` extra), documents are parsed incrementally, one form
+at a time, so memory stays bounded by the flattened tables rather than the parsed
+documents. Otherwise, each document is parsed whole with the standard library.
+"""
+
+import gzip
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any, Final
+
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.documents.flatten import (
+    ExtractedTables,
+    ExtractedTablesBuilder,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+    logger.debug("`ijson` not installed. Extraction documents will be parsed whole.")
+
+_DOCUMENT_SUFFIXES: Final[tuple[str, ...]] = (".json", ".json.gz")
+
+
+@typechecked
+def find_documents(input_dir: Path) -> list[Path]:
+    """Find the extraction documents in the input directory.
+
+    Args:
+        input_dir: The directory to search, not recursively.
+
+    Returns:
+        The paths of JSON documents (`.json` or `.json.gz`), sorted by name.
+    """
+    return sorted(
+        path
+        for path in input_dir.iterdir()
+        if path.is_file()
+        and not path.name.startswith(".")
+        and path.name.lower().endswith(_DOCUMENT_SUFFIXES)
+    )
+
+
+@typechecked
+def iter_forms(paths: Iterable[Path]) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Stream the forms of extraction documents.
+
+    Args:
+        paths: The extraction document paths.
+
+    Yields:
+        Each form's ID and extraction document, in document order.
+    """
+    for path in paths:
+        logger.debug(f"Ingesting {path} ...")
+        with _open_document(path=path) as document_file:
+            if ijson is not None:
+                yield from ijson.kvitems(document_file, Columns.FORMS, use_float=True)
+            else:
+                yield from json.load(document_file).get(Columns.FORMS, {}).items()
+
+
+@typechecked
+def ingest_documents(paths: Iterable[Path]) -> ExtractedTables:
+    """Flatten extraction documents into the `*Extracted` tables.
+
+    Args:
+        paths: The extraction document paths.
+
+    Returns:
+        The `*Extracted` tables.
+    """
+    builder = ExtractedTablesBuilder()
+    builder.add_forms(forms=iter_forms(paths=paths))
+    logger.info(f"Ingested {builder.n_forms} forms.")
+
+    return builder.build()
+
+
+def _open_document(path: Path) -> IO[bytes]:
+    """Open a document as binary, decompressing if gzipped."""
+    return gzip.open(path, "rb") if path.name.lower().endswith(".gz") else open(path, "rb")
@@ -0,0 +1,262 @@
+"""Restructure relational tables into nested extraction documents: the inverse of `flatten`.
+
+Each child table is matched to its parent rows with vectorized index lookups, sorted by
+form once, and each form's rows are sliced out by offsets found with `searchsorted`, rather
+than filtering every child table for every form. Qualitative observations are pivoted back
+into each observation's `color`, `odor`, and `visual` sub-documents.
+"""
+
+import logging
+from collections.abc import Sequence
+from copy import deepcopy
+from typing import Any, Final
+
+import numpy as np
+import pandas as pd
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    QualitativeSiteObservationTypes,
+)
+
+logger = logging.getLogger(__name__)
+
+_QUALITATIVE_TYPES: Final[tuple[str, ...]] = tuple(
+    observation_type.value for observation_type in QualitativeSiteObservationTypes
+)
+# Marks a site visit with no matching child row.
+_NO_ROW: Final[int] = -1
+
+
+class _FormSlices:
+    """A child table's row order sorted by form, and each form's offsets into it."""
+
+    def __init__(self, row_form_ids: pd.Index, form_ids: pd.Index) -> None:
+        form_codes = form_ids.get_indexer(row_form_ids)
+        n_orphans = int((form_codes == _NO_ROW).sum())
+        if n_orphans:
+            logger.warning(f"Skipping {n_orphans} rows with no matching form.")
+
+        # Stable, so each form's rows keep their order, e.g. the order of site visits.
+        self.order = np.argsort(form_codes, kind="stable")
+        sorted_form_codes = form_codes[self.order]
+        all_form_codes = np.arange(len(form_ids))
+        # Orphans sort first, with code -1, so no form's slice includes them.
+        self.starts = np.searchsorted(sorted_form_codes, all_form_codes, side="left")
+        self.ends = np.searchsorted(sorted_form_codes, all_form_codes, side="right")
+
+
+@typechecked
+def restructure_tables(
+    form_metadata: pd.DataFrame,
+    investigators: pd.DataFrame,
+    site_visits: pd.DataFrame,
+    quantitative_observations: pd.DataFrame,
+    qualitative_observations: pd.DataFrame,
+    site_type_map: pd.DataFrame,
+    creek_type_map: pd.DataFrame,
+) -> dict[str, Any]:
+    """Restructure the relational tables into an extraction document.
+
+    Nulls are omitted, as are child rows with no parent, e.g. observations of an unvisited
+    site. Sites missing from the site type map get no outfall or creek type.
+
+    Args:
+        form_metadata: The form metadata. See `schema.FormCleaned`.
+        investigators: The investigators. See `schema.FormInvestigatorCleaned`.
+        site_visits: The site visits. See `schema.SiteVisitCleaned`.
+        quantitative_observations: The quantitative observations. See
+            `schema.QuantitativeObservationsCleaned`.
+        qualitative_observations: The qualitative observations. See
+            `schema.QualitativeObservationsCleaned`.
+        site_type_map: The outfall type of each site. See `schema.Site`.
+        creek_type_map: The creek type of each creek. See `schema.Creek`.
+
+    Returns:
+        The extraction document, shaped like
+        `FIELD_DATA_DEFINITION["example_extraction_document"]`: the data definition's
+        `metadata` block, and `forms` keyed by form ID, in form metadata order.
+    """
+    form_ids = form_metadata.index.get_level_values(Columns.FORM_ID)
+    form_rows = _to_rows(table=form_metadata)
+
+    investigator_slices = _FormSlices(
+        row_form_ids=investigators.index.get_level_values(Columns.FORM_ID),
+        form_ids=form_ids,
+    )
+    investigator_names = _sorted_level(
+        table=investigators, name=Columns.INVESTIGATOR, order=investigator_slices.order
+    )
+    investigator_rows = _to_rows(table=investigators, order=investigator_slices.order)
+
+    observation_slices = _FormSlices(
+        row_form_ids=site_visits.index.get_level_values(Columns.FORM_ID), form_ids=form_ids
+    )
+    observation_rows = _get_observation_rows(
+        site_visits=site_visits,
+        quantitative_observations=quantitative_observations,
+        qualitative_observations=qualitative_observations,
+        site_type_map=site_type_map,
+        creek_type_map=creek_type_map,
+        order=observation_slices.order,
+    )
+
+    forms = {}
+    for form_code, form_id in enumerate(form_ids.tolist()):
+        form = form_rows[form_code]
+
+        start = investigator_slices.starts[form_code]
+        end = investigator_slices.ends[form_code]
+        if start < end:
+            form[Columns.INVESTIGATORS] = dict(
+                zip(investigator_names[start:end], investigator_rows[start:end], strict=True)
+            )
+
+        start = observation_slices.starts[form_code]
+        end = observation_slices.ends[form_code]
+        if start < end:
+            form[Columns.OBSERVATIONS] = observation_rows[start:end]
+
+        forms[form_id] = form
+
+    return {
+        Columns.METADATA: deepcopy(constants.FIELD_DATA_DEFINITION[Columns.METADATA]),
+        Columns.FORMS: forms,
+    }
+
+
+def _get_observation_rows(
+    site_visits: pd.DataFrame,
+    quantitative_observations: pd.DataFrame,
+    qualitative_observations: pd.DataFrame,
+    site_type_map: pd.DataFrame,
+    creek_type_map: pd.DataFrame,
+    order: np.ndarray,
+) -> list[dict[str, Any]]:
+    """Assemble each site visit's observation document, in `order`."""
+    visit_keys = _get_visit_keys(table=site_visits)
+    site_ids = _sorted_level(table=site_visits, name=Columns.SITE_ID, order=order)
+    outfall_types, creek_types = _get_site_types(
+        site_ids=site_ids, site_type_map=site_type_map, creek_type_map=creek_type_map
+    )
+
+    quantitative_positions = _get_visit_keys(table=quantitative_observations).get_indexer(
+        visit_keys
+    )[order]
+    quantitative_rows = _to_rows(table=quantitative_observations)
+
+    observation_types = (
+        qualitative_observations.index.get_level_values(Columns.OBSERVATION_TYPE)
+        .astype(object)
+        .to_numpy()
+    )
+    qualitative_rows = _to_rows(table=qualitative_observations)
+    qualitative_positions = {}
+    for observation_type in _QUALITATIVE_TYPES:
+        type_positions = np.flatnonzero(observation_types == observation_type)
+        type_keys = _get_visit_keys(table=qualitative_observations.iloc[type_positions])
+        visit_positions = type_keys.get_indexer(visit_keys)[order]
+        # Appending _NO_ROW maps unmatched visits, at position -1, to _NO_ROW.
+        qualitative_positions[observation_type] = np.append(type_positions, _NO_ROW)[
+            visit_positions
+        ].tolist()
+
+    observation_rows = []
+    for row_number, (site_id, visit_row, quantitative_position) in enumerate(
+        zip(
+            site_ids,
+            _to_rows(table=site_visits, order=order),
+            quantitative_positions.tolist(),
+            strict=True,
+        )
+    ):
+        observation = {Columns.SITE_ID: site_id}
+        if outfall_types[row_number] is not None:
+            observation[Columns.OUTFALL_TYPE] = outfall_types[row_number]
+        if creek_types[row_number] is not None:
+            observation[Columns.CREEK_TYPE] = creek_types[row_number]
+        observation.update(visit_row)
+        if quantitative_position != _NO_ROW:
+            observation.update(quantitative_rows[quantitative_position])
+        for observation_type, positions in qualitative_positions.items():
+            if positions[row_number] != _NO_ROW:
+                observation[observation_type] = qualitative_rows[positions[row_number]]
+        observation_rows.append(observation)
+
+    return observation_rows
+
+
+def _get_visit_keys(table: pd.DataFrame) -> pd.MultiIndex:
+    """Key each row by form, site, and occurrence of the site on the form.
+
+    The occurrence keeps keys unique, so a site visited twice on a form, e.g. in raw
+    extractions, matches its child rows in order.
+    """
+    form_ids = table.index.get_level_values(Columns.FORM_ID).astype(object)
+    site_ids = table.index.get_level_values(Columns.SITE_ID).astype(object)
+    occurrences = (
+        pd.DataFrame({Columns.FORM_ID: form_ids, Columns.SITE_ID: site_ids})
+        .groupby([Columns.FORM_ID, Columns.SITE_ID], sort=False, dropna=False)
+        .cumcount()
+        .to_numpy()
+    )
+
+    return pd.MultiIndex.from_arrays([form_ids, site_ids, occurrences])
+
+
+def _get_site_types(
+    site_ids: Sequence[Any], site_type_map: pd.DataFrame, creek_type_map: pd.DataFrame
+) -> tuple[list[Any], list[Any]]:
+    """Look up the outfall and creek type of each site, or None if unknown."""
+    site_positions = site_type_map.index.get_indexer(pd.Index(site_ids, dtype=object))
+    outfall_types = _take(
+        values=site_type_map[Columns.OUTFALL_TYPE].astype(object).to_numpy(),
+        positions=site_positions,
+    )
+    creek_site_ids = _take(
+        values=site_type_map[Columns.CREEK_SITE_ID].astype(object).to_numpy(),
+        positions=site_positions,
+    )
+    creek_types = _take(
+        values=creek_type_map[Columns.CREEK_TYPE].astype(object).to_numpy(),
+        positions=creek_type_map.index.get_indexer(pd.Index(creek_site_ids, dtype=object)),
+    )
+
+    return outfall_types, creek_types
+
+
+def _take(values: np.ndarray, positions: np.ndarray) -> list[Any]:
+    """Take values at positions, with None at missing positions and for nulls."""
+    taken = np.append(values, None)[positions]
+
+    return [None if _is_null(value) else value for value in taken.tolist()]
+
+
+def _sorted_level(table: pd.DataFrame, name: str, order: np.ndarray) -> list[Any]:
+    """Get an index level's values, in `order`."""
+    return table.index.get_level_values(name).astype(object).to_numpy()[order].tolist()
+
+
+def _to_rows(table: pd.DataFrame, order: np.ndarray | None = None) -> list[dict[str, Any]]:
+    """Convert a table's columns to a record per row, omitting nulls, in `order`."""
+    columns = table.columns.tolist()
+    n_rows = len(table) if order is None else len(order)
+    if not columns:
+        return [{} for _ in range(n_rows)]
+
+    column_values = []
+    for column in columns:
+        values = table[column].astype(object).to_numpy()
+        column_values.append((values if order is None else values[order]).tolist())
+
+    return [
+        {column: value for column, value in zip(columns, row) if not _is_null(value)}
+        for row in zip(*column_values)
+    ]
+
+
+def _is_null(value: Any) -> bool:
+    """Whether a scalar is null: None, NaN, `pd.NA`, or `pd.NaT`."""
+    return value is None or value is pd.NA or value is pd.NaT or value != value
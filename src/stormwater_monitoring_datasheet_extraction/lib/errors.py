@@ -0,0 +1,31 @@
+"""Custom errors."""
+
+from pathlib import Path
+
+import pandas as pd
+
+
+class SchemaValidationError(ValueError):
+    """Raised when data fail stage schema validation.
+
+    Carries a bounded summary of the failure cases instead of pandera's full report.
+
+    Attributes:
+        summary: Failure case counts and samples per schema, check, and column.
+            See `schema.utils.summarize_schema_errors`.
+        detail_path: Path to the compressed file of all failure cases, if written.
+    """
+
+    def __init__(
+        self, message: str, summary: pd.DataFrame, detail_path: Path | None = None
+    ) -> None:
+        """Initialize the error.
+
+        Args:
+            message: The compact error message.
+            summary: Failure case counts and samples per schema, check, and column.
+            detail_path: Path to the compressed file of all failure cases, if written.
+        """
+        super().__init__(message)
+        self.summary = summary
+        self.detail_path = detail_path
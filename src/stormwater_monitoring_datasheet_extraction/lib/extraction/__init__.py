@@ -0,0 +1 @@
+"""Image discovery, loading, and data extraction."""
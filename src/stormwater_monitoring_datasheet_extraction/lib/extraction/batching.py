@@ -0,0 +1,242 @@
+"""Batched recognition of field crops across forms.
+
+Recognizers are much faster per crop on a batch than on single crops, so crops from many
+images and field types are queued and recognized in fixed-size batches. A batch is also
+recognized once its oldest crop has waited `max_latency_seconds`, so a slow trickle of
+images isn't held up waiting for a full batch. Each submit checks the wait, and so does
+`poll`, for callers to call between submits, e.g. while waiting on the next image.
+
+Recognized text is scattered back to its form and field, and assembled into extraction
+documents shaped like `FIELD_DATA_DEFINITION["example_extraction_document"][FORMS]`.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Callable, Mapping, Sequence
+from types import TracebackType
+from typing import Any, NamedTuple, Protocol
+
+import numpy as np
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.extraction.templates import FieldKey
+
+logger = logging.getLogger(__name__)
+
+
+class Recognizer(Protocol):
+    """Recognizes the text in field crops."""
+
+    def recognize(self, crops: Sequence[np.ndarray], fields: Sequence[FieldKey]) -> list[str]:
+        """Recognize a batch of field crops.
+
+        Args:
+            crops: The field crops.
+            fields: The field of each crop, e.g. to constrain the vocabulary.
+
+        Returns:
+            The text of each crop, in order. Empty if the field is blank.
+        """
+        ...  # pragma: no cover
+
+
+class StubRecognizer:
+    """A deterministic recognizer for tests: "reads" each crop's mean pixel value."""
+
+    def __init__(self) -> None:
+        """Initialize the recognizer."""
+        #: The size of each batch recognized, in order.
+        self.batch_sizes: list[int] = []
+
+    def recognize(self, crops: Sequence[np.ndarray], fields: Sequence[FieldKey]) -> list[str]:
+        """Recognize each crop as its mean pixel value, rounded.
+
+        Args:
+            crops: The field crops.
+            fields: The field of each crop. Unused.
+
+        Returns:
+            The mean pixel value of each crop, as text.
+        """
+        self.batch_sizes.append(len(crops))
+        return [str(round(float(crop.mean()))) if crop.size else "" for crop in crops]
+
+
+class Slot(NamedTuple):
+    """Where a recognized field goes: a field of a form."""
+
+    #: The form ID.
+    form_id: str
+    #: The field on the form.
+    field_key: FieldKey
+
+
+class RecognitionScheduler:
+    """Batches field crops across forms for recognition.
+
+    Submit each form's crops as its image is loaded, `poll` while waiting on images, then
+    `flush` (or exit the context) and get the extraction documents. Not thread-safe.
+    """
+
+    @typechecked
+    def __init__(
+        self,
+        recognizer: Recognizer,
+        batch_size: int = constants.RECOGNITION_BATCH_SIZE,
+        max_latency_seconds: float = constants.RECOGNITION_MAX_LATENCY_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            recognizer: The recognizer to run batches through.
+            batch_size: The number of crops per batch.
+            max_latency_seconds: The longest a crop waits for its batch to fill before the
+                partial batch is recognized.
+            clock: The clock to time latency with.
+        """
+        self.recognizer = recognizer
+        self.batch_size = batch_size
+        self.max_latency_seconds = max_latency_seconds
+        self._clock = clock
+        self._pending_slots: list[Slot] = []
+        self._pending_crops: list[np.ndarray] = []
+        # When each pending crop was submitted, by the clock.
+        self._pending_times: list[float] = []
+        self._texts: dict[str, dict[FieldKey, str]] = defaultdict(dict)
+
+    def __enter__(self) -> "RecognitionScheduler":
+        """Enter the context.
+
+        Returns:
+            The scheduler.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Recognize any pending crops, unless exiting on an error."""
+        if exc_type is None:
+            self.flush()
+
+    @typechecked
+    def submit(self, form_id: str, crops: Mapping[FieldKey, np.ndarray]) -> None:
+        """Queue a form's field crops for recognition.
+
+        Crops are copied, so they can be views into a reused buffer, e.g. from
+        `ImageLoader.load_regions`. Recognizes each batch as it fills, and any partial batch
+        that has waited too long.
+
+        Args:
+            form_id: The form ID.
+            crops: The form's field crops, by field.
+        """
+        submitted_at = self._clock()
+        for field_key, crop in crops.items():
+            self._pending_slots.append(Slot(form_id=form_id, field_key=field_key))
+            self._pending_crops.append(np.array(crop, copy=True))
+            self._pending_times.append(submitted_at)
+            if len(self._pending_crops) >= self.batch_size:
+                self._recognize_batch()
+
+        self.poll()
+
+    def poll(self) -> bool:
+        """Recognize the pending crops if the oldest has waited `max_latency_seconds`.
+
+        Returns:
+            Whether any crops were recognized.
+        """
+        if (
+            not self._pending_times
+            or self._clock() - self._pending_times[0] < self.max_latency_seconds
+        ):
+            return False
+
+        self.flush()
+
+        return True
+
+    def flush(self) -> None:
+        """Recognize all pending crops."""
+        while self._pending_crops:
+            self._recognize_batch()
+
+    def pop_forms(self) -> dict[str, dict[str, Any]]:
+        """Get the extraction documents of all recognized forms, and forget them.
+
+        Call `flush` first to include pending crops.
+
+        Returns:
+            Extraction documents by form ID, as in
+            `FIELD_DATA_DEFINITION["example_extraction_document"][FORMS]`, with
+            recognized text as values. Blank fields and table rows are omitted.
+        """
+        forms = {
+            form_id: _to_form_document(texts=texts) for form_id, texts in self._texts.items()
+        }
+        self._texts.clear()
+
+        return forms
+
+    def _recognize_batch(self) -> None:
+        """Recognize the next batch of pending crops and scatter the text to its slots."""
+        slots = self._pending_slots[: self.batch_size]
+        crops = self._pending_crops[: self.batch_size]
+        del self._pending_slots[: self.batch_size]
+        del self._pending_crops[: self.batch_size]
+        del self._pending_times[: self.batch_size]
+
+        texts = self.recognizer.recognize(crops, [slot.field_key for slot in slots])
+        if len(texts) != len(crops):
+            raise ValueError(
+                f"Recognizer returned {len(texts)} results for a batch of {len(crops)} crops."
+            )
+        logger.debug(f"Recognized a batch of {len(crops)} field crops.")
+
+        for slot, text in zip(slots, texts, strict=True):
+            self._texts[slot.form_id][slot.field_key] = text
+
+
+def _to_form_document(texts: Mapping[FieldKey, str]) -> dict[str, Any]:
+    """Assemble a form's recognized fields into an extraction document."""
+    form: dict[str, Any] = {}
+    rows: dict[str, dict[int, dict[str, Any]]] = {
+        Columns.INVESTIGATORS: defaultdict(dict),
+        Columns.OBSERVATIONS: defaultdict(dict),
+    }
+    for field_key, text in sorted(texts.items()):
+        text = text.strip()
+        if not text:
+            continue
+        if field_key.table == Columns.FORMS:
+            form[field_key.field[0]] = text
+        else:
+            row = rows[field_key.table][field_key.row]
+            for name in field_key.field[:-1]:
+                row = row.setdefault(name, {})
+            row[field_key.field[-1]] = text
+
+    investigators = {}
+    for investigator_row in rows[Columns.INVESTIGATORS].values():
+        name = investigator_row.pop(Columns.INVESTIGATOR, None)
+        if name is None:
+            # TODO: Alert the user to times with no investigator name.
+            logger.warning(f"Skipping investigator times with no name: {investigator_row}")
+            continue
+        investigators[name] = investigator_row
+    if investigators:
+        form[Columns.INVESTIGATORS] = investigators
+
+    observations = list(rows[Columns.OBSERVATIONS].values())
+    if observations:
+        form[Columns.OBSERVATIONS] = observations
+
+    return form
@@ -0,0 +1,246 @@
+"""Datasheet image discovery.
+
+Walks the input directory lazily, one directory listing at a time, so that extraction can
+start before a large or slow (e.g., network share) directory has been fully listed.
+"""
+
+import logging
+import os
+import queue
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Final, NamedTuple
+
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import ImageType
+
+logger = logging.getLogger(__name__)
+
+# Enough to read any of the magic numbers below.
+_HEAD_BYTES: Final[int] = 16
+# Enough to find a trailer past typical padding.
+_TAIL_BYTES: Final[int] = 4096
+_HEIC_BRANDS: Final[frozenset[bytes]] = frozenset(
+    {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1"}
+)
+# Files still being written (e.g., mid-upload) are missing their trailers.
+# HEIC has no trailer to check.
+_TRAILERS: Final[dict[ImageType, bytes]] = {
+    ImageType.JPEG: b"\xff\xd9",
+    ImageType.PDF: b"%%EOF",
+    ImageType.PNG: b"IEND",
+}
+_POLL_SECONDS: Final[float] = 0.1
+
+
+class DiscoveredImage(NamedTuple):
+    """A datasheet image found in the input directory."""
+
+    #: The form ID: the image path relative to the input directory, e.g. "IMG_9527.jpg".
+    form_id: str
+    #: The image path.
+    path: Path
+    #: The image type, per its magic number.
+    image_type: ImageType
+    #: The file size in bytes.
+    size: int
+
+
+@typechecked
+def iter_images(
+    input_dir: Path,
+    recursive: bool = True,
+    min_bytes: int = constants.MIN_IMAGE_BYTES,
+) -> Iterator[DiscoveredImage]:
+    """Lazily discover datasheet images in the input directory.
+
+    Walks with `os.scandir`, filtering on file name and `stat` before reading anything,
+    then on the first and last few bytes of each file. Skips hidden files and directories,
+    unknown extensions, thumbnails (files smaller than `min_bytes`), files whose magic number
+    doesn't match an image type, and partially written files.
+
+    Entries are sorted by name within each directory, and subdirectories are walked
+    depth-first in that order, so the order (and thus `form_id` assignment) is
+    deterministic, without having to list the whole tree before yielding.
+
+    Args:
+        input_dir: The directory to search.
+        recursive: Whether to search subdirectories.
+        min_bytes: The minimum file size in bytes. Smaller files are skipped.
+
+    Yields:
+        Each discovered image, in deterministic order.
+    """
+    for entry in iter_image_files(input_dir=input_dir, recursive=recursive):
+        image = get_image(entry=entry, input_dir=input_dir, min_bytes=min_bytes)
+        if image is not None:
+            yield image
+
+
+@typechecked
+def iter_image_files(input_dir: Path, recursive: bool = True) -> Iterator[os.DirEntry]:
+    """Lazily list the files with image extensions in the input directory, unread.
+
+    Skips hidden files and directories. Entries' `stat` results are cached, so listing
+    is cheap enough to repeat, e.g. to watch the directory. See `iter_images` for order.
+
+    Args:
+        input_dir: The directory to search.
+        recursive: Whether to search subdirectories.
+
+    Yields:
+        Each file's directory entry, in deterministic order.
+    """
+    dirs_to_scan = [input_dir]
+    while dirs_to_scan:
+        dir_path = dirs_to_scan.pop()
+        with os.scandir(dir_path) as dir_entries:
+            entries = sorted(
+                (entry for entry in dir_entries if not entry.name.startswith(".")),
+                key=lambda entry: entry.name,
+            )
+
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(Path(entry.path))
+            elif os.path.splitext(entry.name)[1].lower() in constants.IMAGE_EXTENSIONS:
+                yield entry
+
+        if recursive:
+            # Reversed so the stack pops them in name order.
+            dirs_to_scan.extend(reversed(subdirs))
+
+
+@typechecked
+def prefetch_images(
+    input_dir: Path,
+    maxsize: int = constants.IMAGE_QUEUE_SIZE,
+    recursive: bool = True,
+    min_bytes: int = constants.MIN_IMAGE_BYTES,
+) -> Iterator[DiscoveredImage]:
+    """Discover images in a background thread, feeding a bounded queue.
+
+    Lets extraction consume images while discovery is still listing and reading headers,
+    which matters on slow network shares. The queue bounds how far discovery runs ahead.
+
+    Args:
+        input_dir: The directory to search.
+        maxsize: The maximum number of discovered images waiting to be consumed.
+        recursive: Whether to search subdirectories.
+        min_bytes: The minimum file size in bytes. Smaller files are skipped.
+
+    Yields:
+        Each discovered image, in the same order as `iter_images`.
+
+    Raises:
+        Exception: Any error raised by discovery, reraised in the consuming thread.
+    """
+    image_queue: queue.Queue[DiscoveredImage | BaseException | None] = queue.Queue(
+        maxsize=maxsize
+    )
+    stop = threading.Event()
+
+    def _put(item: DiscoveredImage | BaseException | None) -> bool:
+        while not stop.is_set():
+            try:
+                image_queue.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for image in iter_images(
+                input_dir=input_dir, recursive=recursive, min_bytes=min_bytes
+            ):
+                if not _put(image):
+                    return
+        except BaseException as e:
+            _put(e)
+            return
+        _put(None)
+
+    producer = threading.Thread(target=_produce, name="image_discovery", daemon=True)
+    producer.start()
+    try:
+        while (item := image_queue.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+@typechecked
+def get_image(
+    entry: os.DirEntry, input_dir: Path, min_bytes: int = constants.MIN_IMAGE_BYTES
+) -> DiscoveredImage | None:
+    """Get the image for a directory entry, if it is a complete datasheet image.
+
+    Reads only the first and last few bytes of the file. See `iter_images` for what's
+    skipped.
+
+    Args:
+        entry: The file's directory entry, e.g. from `iter_image_files`.
+        input_dir: The directory the form ID is relative to.
+        min_bytes: The minimum file size in bytes. Smaller files are skipped.
+
+    Returns:
+        The image, or None if the file isn't a complete datasheet image.
+    """
+    image_type = constants.IMAGE_EXTENSIONS.get(os.path.splitext(entry.name)[1].lower())
+    if image_type is None:
+        return None
+
+    try:
+        # E.g., deleted or renamed since listed.
+        if not entry.is_file():
+            return None
+        size = entry.stat().st_size
+        if size < max(min_bytes, 1):
+            logger.debug(f"Skipping {entry.path}: {size} bytes is too small.")
+            return None
+
+        with open(entry.path, "rb") as image_file:
+            head = image_file.read(_HEAD_BYTES)
+            image_file.seek(max(size - _TAIL_BYTES, 0))
+            tail = image_file.read(_TAIL_BYTES)
+    except OSError as e:
+        logger.warning(f"Skipping {entry.path}: {e}")
+        return None
+
+    sniffed_type = _sniff_image_type(head=head)
+    if sniffed_type is None:
+        logger.warning(f"Skipping {entry.path}: Not a recognized image file.")
+        return None
+    if sniffed_type in _TRAILERS and _TRAILERS[sniffed_type] not in tail:
+        logger.warning(f"Skipping {entry.path}: File is incomplete.")
+        return None
+
+    return DiscoveredImage(
+        form_id=Path(entry.path).relative_to(input_dir).as_posix(),
+        path=Path(entry.path),
+        image_type=sniffed_type,
+        size=size,
+    )
+
+
+def _sniff_image_type(head: bytes) -> ImageType | None:
+    """Get the image type from the file's magic number."""
+    image_type = None
+    if head.startswith(b"\xff\xd8\xff"):
+        image_type = ImageType.JPEG
+    elif head.startswith(b"\x89PNG\r\n\x1a\n"):
+        image_type = ImageType.PNG
+    elif head.startswith(b"%PDF-"):
+        image_type = ImageType.PDF
+    elif head[4:8] == b"ftyp" and head[8:12] in _HEIC_BRANDS:
+        image_type = ImageType.HEIC
+
+    return image_type
@@ -0,0 +1,176 @@
+"""Extractor backends: the engines that read datasheet images into extraction documents.
+
+Extractors are registered as entry points in the `EXTRACTOR_ENTRY_POINT_GROUP` group, e.g.,
+in the backend package's `setup.cfg`:
+
+.. code-block:: ini
+
+    [options.entry_points]
+    stormwater_monitoring_datasheet_extraction.extractors =
+        my_engine = my_package.my_module:MyExtractor
+
+Loading a computer vision model can take longer than extracting a handful of images, so
+each worker process keeps one warm instance of each extractor it uses, across images,
+directories, and `run_etl` calls. See `get_extractor`.
+"""
+
+import atexit
+import logging
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from copy import deepcopy
+from importlib import metadata
+from typing import Any, Final
+
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.extraction.discovery import (
+    DiscoveredImage,
+)
+
+logger = logging.getLogger(__name__)
+
+EXTRACTOR_ENTRY_POINT_GROUP: Final[str] = (
+    "stormwater_monitoring_datasheet_extraction.extractors"
+)
+
+_EXTRACTORS: Final[dict[str, "Extractor"]] = {}
+_EXTRACTORS_LOCK: Final[threading.Lock] = threading.Lock()
+
+
+class Extractor(ABC):
+    """An extractor backend.
+
+    Lifecycle: `load` once, e.g. to load model weights, then `extract_batch` any number of
+    times, then `close` to release resources. Use `get_extractor` rather than instantiating
+    directly, to reuse the process's warm instance.
+    """
+
+    def load(self) -> None:  # noqa: B027
+        """Load resources, e.g. model weights. Called once, before any extraction."""
+
+    @abstractmethod
+    def extract_batch(self, images: Sequence[DiscoveredImage]) -> dict[str, dict[str, Any]]:
+        """Extract a batch of datasheet images.
+
+        Args:
+            images: The images to extract.
+
+        Returns:
+            Extraction documents by form ID, as in
+            `FIELD_DATA_DEFINITION["example_extraction_document"][FORMS]`.
+        """
+
+    def close(self) -> None:  # noqa: B027
+        """Release resources. Called once, after all extraction."""
+
+
+class FakeExtractor(Extractor):
+    """Replays the example extraction document, for offline tests and benchmarks.
+
+    Images named like an example form get that form. Other images get one of the example
+    forms, chosen deterministically by form ID.
+    """
+
+    def load(self) -> None:
+        """Load the example forms."""
+        self._forms = constants.FIELD_DATA_DEFINITION["example_extraction_document"][
+            Columns.FORMS
+        ]
+        self._form_ids = sorted(self._forms)
+
+    def extract_batch(self, images: Sequence[DiscoveredImage]) -> dict[str, dict[str, Any]]:
+        """Replay an example form for each image.
+
+        Args:
+            images: The images to "extract."
+
+        Returns:
+            Copies of example extraction documents by form ID.
+        """
+        extracted_forms = {}
+        for image in images:
+            example_form_id = (
+                image.form_id
+                if image.form_id in self._forms
+                else self._form_ids[zlib.crc32(image.form_id.encode()) % len(self._form_ids)]
+            )
+            extracted_forms[image.form_id] = deepcopy(self._forms[example_form_id])
+
+        return extracted_forms
+
+
+# Always available, even if the package's entry points aren't installed, e.g. in development.
+_BUILTIN_EXTRACTORS: Final[dict[str, type[Extractor]]] = {"fake": FakeExtractor}
+
+
+@typechecked
+def get_extractor(name: str) -> Extractor:
+    """Get the process's warm instance of an extractor, loading it on first use.
+
+    Args:
+        name: The extractor's entry point name, e.g. "fake".
+
+    Returns:
+        The loaded extractor.
+
+    Raises:
+        ValueError: If no extractor is registered under the name.
+    """
+    with _EXTRACTORS_LOCK:
+        if name not in _EXTRACTORS:
+            extractor = _get_extractor_class(name=name)()
+            logger.info(f"Loading {name} extractor ...")
+            extractor.load()
+            _EXTRACTORS[name] = extractor
+
+    return _EXTRACTORS[name]
+
+
+@typechecked
+def get_extractor_names() -> list[str]:
+    """Get the names of all registered extractors.
+
+    Returns:
+        The extractor names, sorted.
+    """
+    entry_point_names = {
+        entry_point.name
+        for entry_point in metadata.entry_points(group=EXTRACTOR_ENTRY_POINT_GROUP)
+    }
+
+    return sorted(entry_point_names | set(_BUILTIN_EXTRACTORS))
+
+
+@atexit.register
+def close_extractors() -> None:
+    """Close and forget all warm extractors. Called at process exit."""
+    with _EXTRACTORS_LOCK:
+        while _EXTRACTORS:
+            name, extractor = _EXTRACTORS.popitem()
+            logger.debug(f"Closing {name} extractor.")
+            extractor.close()
+
+
+def _get_extractor_class(name: str) -> type[Extractor]:
+    """Get an extractor class from its entry point, or the built-ins."""
+    entry_points = metadata.entry_points(group=EXTRACTOR_ENTRY_POINT_GROUP, name=name)
+    if entry_points:
+        extractor_class = next(iter(entry_points)).load()
+    elif name in _BUILTIN_EXTRACTORS:
+        extractor_class = _BUILTIN_EXTRACTORS[name]
+    else:
+        raise ValueError(
+            f"No extractor named {name}. Registered extractors: {get_extractor_names()}"
+        )
+
+    if not (isinstance(extractor_class, type) and issubclass(extractor_class, Extractor)):
+        raise ValueError(
+            f"Extractor {name} is not an `Extractor` subclass: {extractor_class}"
+        )
+
+    return extractor_class
@@ -0,0 +1,228 @@
+"""Datasheet image loading with bounded memory.
+
+Phone photos of datasheets can be 12-48 MP. Rather than decoding each at full resolution,
+images are read through a memory map, decoded at reduced resolution where the codec allows
+(JPEG DCT scaling via `Image.draft`), and cropped to the regions of interest at only the
+resolution needed to read them.
+
+Only JPEGs decode at reduced resolution. PNG and HEIC images decode whole frames at full
+resolution before they can be downscaled or cropped, so their peak memory is bounded only
+by rejecting images over `max_decode_pixels` up front, before decoding.
+"""
+
+import logging
+import math
+import mmap
+from collections.abc import Hashable, Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Final, NamedTuple, TypeVar
+
+import numpy as np
+from PIL import Image, ImageOps
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+
+_EXIF_ORIENTATION: Final[int] = 0x0112
+# Orientations rotated by 90 or 270 degrees.
+_TRANSPOSED_ORIENTATIONS: Final[frozenset[int]] = frozenset({5, 6, 7, 8})
+
+try:
+    from pillow_heif import register_heif_opener
+except ImportError:  # pragma: no cover
+    logger.debug("`pillow_heif` not installed. HEIC images can't be loaded.")
+else:
+    register_heif_opener()
+
+
+class BoundingBox(NamedTuple):
+    """A region of a datasheet page, as fractions of the page width and height."""
+
+    #: The left edge, from 0 to 1.
+    left: float
+    #: The top edge, from 0 to 1.
+    top: float
+    #: The right edge, from 0 to 1.
+    right: float
+    #: The bottom edge, from 0 to 1.
+    bottom: float
+
+
+class ImageLoader:
+    """Loads datasheet images with bounded memory.
+
+    Keep one loader per worker and reuse it across images: `load_regions` writes crops into
+    a buffer owned by the loader, which grows to the largest set of crops loaded and is
+    then reused rather than reallocated. Not thread-safe.
+    """
+
+    @typechecked
+    def __init__(
+        self,
+        max_pixels: int = constants.MAX_IMAGE_PIXELS,
+        mode: str = "L",
+        max_decode_pixels: int = constants.MAX_DECODE_PIXELS,
+    ) -> None:
+        """Initialize the loader.
+
+        Args:
+            max_pixels: The maximum number of pixels to load a page at.
+            mode: The PIL image mode to load images in. Defaults to grayscale.
+            max_decode_pixels: The maximum number of pixels to decode an image at, before
+                downscaling it to `max_pixels`. JPEGs decode at reduced resolution, so only
+                huge ones exceed it. Bounds peak memory per image.
+        """
+        self.max_pixels = max_pixels
+        self.max_decode_pixels = max_decode_pixels
+        self.mode = mode
+        self._buffer = np.empty(0, dtype=np.uint8)
+
+    @typechecked
+    def load_page(self, path: Path, max_pixels: int | None = None) -> Image.Image:
+        """Load a whole page, downscaled to at most `max_pixels`.
+
+        E.g., for display in the verification prompt.
+
+        Args:
+            path: The image path.
+            max_pixels: The maximum number of pixels to load. Defaults to the loader's.
+
+        Returns:
+            The page image, upright per its EXIF orientation.
+
+        Raises:
+            ValueError: If the image would decode to more than `max_decode_pixels`.
+        """
+        max_pixels = self.max_pixels if max_pixels is None else max_pixels
+        with _open_mapped(path=path) as image:
+            page = self._decode(image=image, max_pixels=max_pixels)
+
+        return page
+
+    @typechecked
+    def load_regions(
+        self,
+        path: Path,
+        regions: Mapping[K, BoundingBox],
+        page_width: int,
+    ) -> dict[K, np.ndarray]:
+        """Load regions of a page, each at a fixed resolution.
+
+        Decodes the page at the lowest resolution the codec allows that is at least
+        `page_width` wide (up to the loader's `max_pixels`), then crops each region.
+
+        Args:
+            path: The image path.
+            regions: The regions to crop, by name, e.g. a form template's field keys.
+            page_width: The width in pixels to scale the page to before cropping, i.e. the
+                resolution needed to read the regions.
+
+        Returns:
+            The crops, by region name, as arrays of shape (height, width[, bands]).
+            The arrays are views into the loader's buffer, valid until the next call.
+            Copy them to keep them.
+
+        Raises:
+            ValueError: If the image would decode to more than `max_decode_pixels`.
+        """
+        with _open_mapped(path=path) as image:
+            upright_size = _get_upright_size(image=image)
+            scale = min(page_width / upright_size[0], 1)
+            max_pixels = min(
+                self.max_pixels, math.ceil(upright_size[0] * upright_size[1] * scale**2)
+            )
+            page = self._decode(image=image, max_pixels=max_pixels)
+
+        crops = {
+            name: page.crop(_to_pixels(box=box, size=page.size))
+            for name, box in regions.items()
+        }
+        n_bytes = sum(_get_n_bytes(image=crop) for crop in crops.values())
+        if self._buffer.size < n_bytes:
+            self._buffer = np.empty(n_bytes, dtype=np.uint8)
+
+        arrays: dict[K, np.ndarray] = {}
+        offset = 0
+        for name, crop in crops.items():
+            crop_array = np.asarray(crop)
+            array = self._buffer[offset : offset + crop_array.nbytes].reshape(
+                crop_array.shape
+            )
+            np.copyto(array, crop_array)
+            arrays[name] = array
+            offset += crop_array.nbytes
+
+        return arrays
+
+    def _decode(self, image: Image.Image, max_pixels: int) -> Image.Image:
+        """Decode an opened image to at most `max_pixels`, upright."""
+        width, height = image.size
+        scale = min(math.sqrt(max_pixels / (width * height)), 1)
+        target_size = (max(round(width * scale), 1), max(round(height * scale), 1))
+
+        # Only JPEG supports drafting: it decodes at the smallest DCT scale (1/2, 1/4, 1/8)
+        # that is at least the target size. Other formats decode at full size, so reject
+        # those too large before decoding.
+        image.draft(self.mode, target_size)
+        if image.width * image.height > self.max_decode_pixels:
+            raise ValueError(
+                f"Can't decode a {image.width}x{image.height} {image.format} image: over"
+                f" {self.max_decode_pixels} pixels. Only JPEGs decode at reduced resolution."
+            )
+        page = image.convert(self.mode) if image.mode != self.mode else image
+        if page.size != target_size:
+            page = page.resize(target_size, reducing_gap=2.0)
+        page = ImageOps.exif_transpose(page) if _has_orientation(image=image) else page
+        # Detach from the mapped file, which is closed with the opened image.
+        page = page.copy() if page is image else page
+        page.load()
+
+        return page
+
+
+@contextmanager
+def _open_mapped(path: Path) -> Iterator[Image.Image]:
+    """Open an image lazily through a read-only memory map."""
+    if path.suffix.lower() == ".pdf":
+        # TODO: Rasterize PDF scans, e.g. with `pypdfium2`.
+        raise ValueError(f"Can't load {path}: PDF datasheets are not yet supported.")
+
+    with open(path, "rb") as image_file, mmap.mmap(
+        image_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped, Image.open(mapped) as image:
+        yield image
+
+
+def _has_orientation(image: Image.Image) -> bool:
+    """Whether the image has a non-default EXIF orientation."""
+    return image.getexif().get(_EXIF_ORIENTATION, 1) != 1
+
+
+def _get_upright_size(image: Image.Image) -> tuple[int, int]:
+    """Get the image size once rotated upright per its EXIF orientation."""
+    width, height = image.size
+    if image.getexif().get(_EXIF_ORIENTATION, 1) in _TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+
+    return width, height
+
+
+def _to_pixels(box: BoundingBox, size: tuple[int, int]) -> tuple[int, int, int, int]:
+    """Convert a fractional bounding box to pixel coordinates."""
+    width, height = size
+    return (
+        math.floor(box.left * width),
+        math.floor(box.top * height),
+        math.ceil(box.right * width),
+        math.ceil(box.bottom * height),
+    )
+
+
+def _get_n_bytes(image: Image.Image) -> int:
+    """Get the number of bytes in the image's pixel array."""
+    return image.width * image.height * len(image.getbands())
@@ -0,0 +1,220 @@
+"""Form templates: where each field sits on a known datasheet layout.
+
+A form type and version (e.g., `FormType.FIELD_DATASHEET_FOSS`, "4.4-1-29-2025") identify a
+fixed paper layout, so each field of `FIELD_DATA_DEFINITION[FORMS]` can be read from a small
+crop of the page rather than recognizing the whole page and assigning text to fields.
+
+Templates are JSON files in `form_templates/`, one per form type and version, named
+`<form_type>_<form_version>.json`. Each gives, as fractions of the upright page:
+
+- `fields`: The bounding box `[left, top, right, bottom]` of each metadata field.
+- `investigators` and `observations`: The `[top, bottom]` of each table row and the
+  `[left, right]` of each table column, nested like the data definition. Each cell is the
+  intersection of its row and column.
+
+Templates are loaded and checked against the data definition once per process.
+"""
+
+import json
+import logging
+from collections.abc import Mapping
+from functools import cache
+from importlib import resources
+from typing import Any, Final, NamedTuple
+
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns, FormType
+from stormwater_monitoring_datasheet_extraction.lib.extraction.images import BoundingBox
+
+logger = logging.getLogger(__name__)
+
+# TODO: Calibrate the field_datasheet_FOSS 4.4-1-29-2025 boxes against scans of the blank
+# form. They are approximate.
+_TEMPLATES_DIR: Final[str] = "form_templates"
+_FIELDS: Final[str] = "fields"
+_ROWS: Final[str] = "rows"
+_COLUMNS: Final[str] = "columns"
+_PAGE_WIDTH: Final[str] = "page_width"
+# Tables of the form, in the data definition and in templates.
+_TABLES: Final[tuple[str, ...]] = (Columns.INVESTIGATORS, Columns.OBSERVATIONS)
+
+
+class FieldKey(NamedTuple):
+    """Identifies a field on a form: a metadata field, or a table cell."""
+
+    #: The table: `Columns.FORMS` for metadata fields, else `Columns.INVESTIGATORS` or
+    #: `Columns.OBSERVATIONS`.
+    table: str
+    #: The table row, from the top. Always 0 for metadata fields.
+    row: int
+    #: The path to the field in the data definition, e.g. `("pH",)`, `("color", "rank")`.
+    field: tuple[str, ...]
+
+
+class FormTemplate(NamedTuple):
+    """The layout of a form type and version."""
+
+    #: The form type.
+    form_type: FormType
+    #: The form version, e.g. "4.4-1-29-2025".
+    form_version: str
+    #: The width in pixels to scale the page to before cropping fields, to read them.
+    page_width: int
+    #: The bounding box of every field on the form.
+    regions: Mapping[FieldKey, BoundingBox]
+
+
+@typechecked
+def get_template(form_type: FormType | str, form_version: str) -> FormTemplate:
+    """Get the template of a form type and version.
+
+    Args:
+        form_type: The form type.
+        form_version: The form version, e.g. "4.4-1-29-2025".
+
+    Returns:
+        The form template.
+
+    Raises:
+        ValueError: If there is no template for the form type and version.
+    """
+    templates = get_templates()
+    key = (FormType(form_type), form_version)
+    if key not in templates:
+        raise ValueError(
+            f"No template for form type {form_type} version {form_version}. "
+            f"Known templates: {sorted(templates)}"
+        )
+
+    return templates[key]
+
+
+@cache
+def get_templates() -> dict[tuple[FormType, str], FormTemplate]:
+    """Load all form templates, once per process.
+
+    Returns:
+        Form templates by form type and version.
+
+    Raises:
+        ValueError: If a template is invalid, e.g., misses a field of the data definition.
+    """
+    templates = {}
+    template_files = sorted(
+        (
+            template_file
+            for template_file in resources.files(__package__)
+            .joinpath(_TEMPLATES_DIR)
+            .iterdir()
+            if template_file.name.endswith(".json")
+        ),
+        key=lambda template_file: template_file.name,
+    )
+    for template_file in template_files:
+        template = parse_template(template_doc=json.loads(template_file.read_text()))
+        key = (template.form_type, template.form_version)
+        if key in templates:
+            raise ValueError(f"Duplicate template for {key} in {template_file.name}.")
+        templates[key] = template
+        logger.debug(f"Loaded {len(template.regions)} field regions for {key}.")
+
+    return templates
+
+
+@typechecked
+def parse_template(template_doc: dict[str, Any]) -> FormTemplate:
+    """Parse a template document, checking it covers every field of the data definition.
+
+    Args:
+        template_doc: The template document, as loaded from JSON.
+
+    Returns:
+        The form template.
+
+    Raises:
+        ValueError: If the template misses or adds fields, or a box is out of bounds.
+    """
+    form_definition = constants.FIELD_DATA_DEFINITION[Columns.FORMS][Columns.FORM_ID]
+    regions: dict[FieldKey, BoundingBox] = {}
+
+    metadata_fields = {
+        field for field in form_definition if field not in (Columns.FORM_TYPE, *_TABLES)
+    }
+    _check_fields(
+        expected=metadata_fields,
+        actual=set(template_doc[_FIELDS]),
+        table=Columns.FORMS,
+    )
+    for field, box in template_doc[_FIELDS].items():
+        regions[FieldKey(table=Columns.FORMS, row=0, field=(field,))] = _to_box(box=box)
+
+    for table in _TABLES:
+        rows = template_doc[table][_ROWS]
+        columns = dict(_flatten_columns(columns=template_doc[table][_COLUMNS]))
+        _check_fields(
+            expected=set(_get_table_fields(table=table, form_definition=form_definition)),
+            actual=set(columns),
+            table=table,
+        )
+        for row, (top, bottom) in enumerate(rows):
+            for field, (left, right) in columns.items():
+                regions[FieldKey(table=table, row=row, field=field)] = _to_box(
+                    box=[left, top, right, bottom]
+                )
+
+    return FormTemplate(
+        form_type=FormType(template_doc[Columns.FORM_TYPE]),
+        form_version=template_doc[Columns.FORM_VERSION],
+        page_width=template_doc[_PAGE_WIDTH],
+        regions=regions,
+    )
+
+
+def _get_table_fields(table: str, form_definition: dict[str, Any]) -> list[tuple[str, ...]]:
+    """Get the field paths of a table in the data definition."""
+    if table == Columns.INVESTIGATORS:
+        # Investigators are keyed by name, with their times nested.
+        (investigator_definition,) = form_definition[table].values()
+        fields = [(Columns.INVESTIGATOR,)] + [(field,) for field in investigator_definition]
+    else:
+        (row_definition,) = form_definition[table]
+        fields = [field for field, _ in _flatten_columns(columns=row_definition)]
+
+    return fields
+
+
+def _flatten_columns(
+    columns: dict[str, Any], prefix: tuple[str, ...] = ()
+) -> list[tuple[tuple[str, ...], Any]]:
+    """Flatten nested columns into (path, leaf) pairs."""
+    flat_columns = []
+    for name, column in columns.items():
+        if isinstance(column, dict):
+            flat_columns.extend(_flatten_columns(columns=column, prefix=(*prefix, name)))
+        else:
+            flat_columns.append(((*prefix, name), column))
+
+    return flat_columns
+
+
+def _check_fields(expected: set, actual: set, table: str) -> None:
+    """Check that a template's fields match the data definition's."""
+    if expected != actual:
+        raise ValueError(
+            f"Template {table} fields don't match the data definition. "
+            f"Missing: {sorted(expected - actual)}. Unexpected: {sorted(actual - expected)}."
+        )
+
+
+def _to_box(box: list[float]) -> BoundingBox:
+    """Convert a template box to a `BoundingBox`, checking it is within the page."""
+    bounding_box = BoundingBox(*box)
+    if not (
+        0 <= bounding_box.left < bounding_box.right <= 1
+        and 0 <= bounding_box.top < bounding_box.bottom <= 1
+    ):
+        raise ValueError(f"Invalid template box: {box}")
+
+    return bounding_box
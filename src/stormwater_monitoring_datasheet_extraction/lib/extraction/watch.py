@@ -0,0 +1,218 @@
+"""Watch the input directory for new datasheet images, for continuous ingestion.
+
+Field teams upload sheets throughout the day. `FolderWatcher` gets micro-batches of new
+images as their uploads settle:
+
+- If `watchdog` is installed (the `watch` extra), file system events (e.g., inotify on
+  Linux) gate rescans, so an idle directory isn't rescanned. Otherwise, it falls back to
+  rescanning every poll interval.
+- A rescan only lists and stats files, with `discovery.iter_image_files`. A file is read, to
+  check its type and trailer with `discovery.get_image`, only once its size and
+  modification time have held still for the debounce interval, so uploads in progress are
+  left alone. Files deleted or renamed mid-scan, e.g. by sync clients, are skipped, and
+  picked up by a later scan if they reappear.
+- Each version of a file is handled once: if it changes later, it's handled again.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import TracebackType
+from typing import Any, NamedTuple
+
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.extraction import discovery
+from stormwater_monitoring_datasheet_extraction.lib.extraction.discovery import (
+    DiscoveredImage,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover
+    Observer = None
+    logger.debug("`watchdog` not installed. Watch mode will poll the input directory.")
+
+
+class _FileVersion(NamedTuple):
+    """A file's size and modification time, and when they were first seen."""
+
+    #: The file size in bytes.
+    size: int
+    #: The modification time in nanoseconds.
+    mtime_ns: int
+    #: When the size and modification time were first seen, in seconds since the epoch.
+    since: float
+
+
+class _ChangeHandler:
+    """Sets an event on any file system event, for `watchdog` observers."""
+
+    def __init__(self, changed: threading.Event) -> None:
+        self._changed = changed
+
+    def dispatch(self, event: Any) -> None:
+        """Flag the change."""
+        self._changed.set()
+
+
+class FolderWatcher:
+    """Gets micro-batches of new images in the input directory as their uploads settle.
+
+    Use as a context manager, to stop observing file system events on exit.
+    """
+
+    @typechecked
+    def __init__(
+        self,
+        input_dir: Path,
+        debounce_seconds: float = constants.WATCH_DEBOUNCE_SECONDS,
+        poll_seconds: float = constants.WATCH_POLL_SECONDS,
+        batch_size: int = constants.WATCH_BATCH_SIZE,
+        min_bytes: int = constants.MIN_IMAGE_BYTES,
+        use_events: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the watcher, and start observing file system events, if available.
+
+        Args:
+            input_dir: The directory to watch.
+            debounce_seconds: Seconds a file's size and modification time must hold still
+                before it's read. Files already in the directory when first scanned count
+                from their modification time, so they aren't held up.
+            poll_seconds: Seconds between rescans. With file system events, rescans are
+                skipped while nothing changes and no upload is settling.
+            batch_size: The max number of images per micro-batch.
+            min_bytes: The minimum file size in bytes. Smaller files are skipped.
+            use_events: Whether to use file system events, if `watchdog` is installed.
+            clock: Gets the current time, in seconds since the epoch.
+        """
+        self.input_dir = input_dir
+        self._debounce_seconds = debounce_seconds
+        self._poll_seconds = poll_seconds
+        self._batch_size = batch_size
+        self._min_bytes = min_bytes
+        self._clock = clock
+
+        # Set by file system events, and initially, to scan what's already there.
+        self._changed = threading.Event()
+        self._changed.set()
+        self._first_scan = True
+        # Files not yet handled, by path.
+        self._pending: dict[str, _FileVersion] = {}
+        # The size and modification time each file was handled at, by path.
+        self._handled: dict[str, tuple[int, int]] = {}
+        # Settled images beyond the batch size, for the next batches.
+        self._ready: list[DiscoveredImage] = []
+
+        self._observer = None
+        if use_events and Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(
+                _ChangeHandler(changed=self._changed), str(input_dir), recursive=True
+            )
+            self._observer.start()
+        else:
+            logger.info(f"Polling {input_dir} every {poll_seconds} seconds.")
+
+    def __enter__(self) -> "FolderWatcher":
+        """Enter the context.
+
+        Returns:
+            The watcher.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop observing file system events."""
+        self.close()
+
+    def close(self) -> None:
+        """Stop observing file system events."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    @typechecked
+    def next_batch(self, stop: threading.Event) -> list[DiscoveredImage]:
+        """Wait for the next micro-batch of settled new images.
+
+        Args:
+            stop: An event to set to stop waiting.
+
+        Returns:
+            Up to `batch_size` images, in discovery order. Empty only if stopped.
+        """
+        while not self._ready and not stop.is_set():
+            if self._observer is None or self._changed.is_set() or self._pending:
+                self._changed.clear()
+                self._ready = self._scan()
+            if not self._ready:
+                stop.wait(timeout=self._poll_seconds)
+
+        if stop.is_set():
+            return []
+
+        batch = self._ready[: self._batch_size]
+        self._ready = self._ready[self._batch_size :]
+
+        return batch
+
+    def _scan(self) -> list[DiscoveredImage]:
+        """Rescan the input directory, and get the images that have settled since."""
+        now = self._clock()
+        settled = []
+        paths = set()
+        for entry in discovery.iter_image_files(input_dir=self.input_dir):
+            try:
+                stat = entry.stat()
+            except OSError as e:
+                # E.g., deleted or renamed since listed.
+                logger.debug(f"Skipping {entry.path} this scan: {e}")
+                continue
+            paths.add(entry.path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._handled.get(entry.path) == signature:
+                continue
+
+            version = self._pending.get(entry.path)
+            if version is None or (version.size, version.mtime_ns) != signature:
+                version = _FileVersion(
+                    size=stat.st_size,
+                    mtime_ns=stat.st_mtime_ns,
+                    since=min(stat.st_mtime, now) if self._first_scan else now,
+                )
+                self._pending[entry.path] = version
+            if now - version.since < self._debounce_seconds:
+                continue
+
+            del self._pending[entry.path]
+            # Handled even if not an image, so it isn't read again until it changes.
+            self._handled[entry.path] = signature
+            image = discovery.get_image(
+                entry=entry, input_dir=self.input_dir, min_bytes=self._min_bytes
+            )
+            if image is not None:
+                settled.append(image)
+
+        # Forget deleted files, so they're handled again if uploaded again.
+        for path in (self._pending.keys() | self._handled.keys()) - paths:
+            self._pending.pop(path, None)
+            self._handled.pop(path, None)
+        self._first_scan = False
+
+        if settled:
+            logger.info(f"Found {len(settled)} new images in {self.input_dir}.")
+
+        return settled
@@ -1,23 +1,62 @@
 """Top-level module for stormwater monitoring datasheet ETL."""
 
+import contextvars
 import logging
+import queue
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Final, cast
 
 import pandas as pd
-import pandera.pandas as pa
 import pandera.typing as pt
 from typeguard import typechecked
 
-from stormwater_monitoring_datasheet_extraction.lib import constants, schema
+from stormwater_monitoring_datasheet_extraction.lib import constants, profiling, schema
 from stormwater_monitoring_datasheet_extraction.lib.db import read
+from stormwater_monitoring_datasheet_extraction.lib.documents.flatten import (
+    ExtractedTablesBuilder,
+)
+from stormwater_monitoring_datasheet_extraction.lib.documents.ingest import (
+    find_documents,
+    ingest_documents,
+)
+from stormwater_monitoring_datasheet_extraction.lib.documents.restructure import (
+    restructure_tables,
+)
+from stormwater_monitoring_datasheet_extraction.lib.errors import SchemaValidationError
+from stormwater_monitoring_datasheet_extraction.lib.extraction import discovery, extractors
+from stormwater_monitoring_datasheet_extraction.lib.extraction.watch import FolderWatcher
+from stormwater_monitoring_datasheet_extraction.lib.output import (
+    ledger,
+    report,
+    serialize,
+    write,
+)
+from stormwater_monitoring_datasheet_extraction.lib.schema import definition
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation, versions
 from stormwater_monitoring_datasheet_extraction.lib.schema.checks.relational import (
+    flag_thresholds,
+    get_coverage,
+    validate_coverage,
     validate_site_creek_map,
 )
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Site and creek type maps held for the run, e.g. warm across watch mode's micro-batches.
+_SITE_CREEK_MAPS: Final[ContextVar[tuple[pd.DataFrame, pd.DataFrame] | None]] = ContextVar(
+    "site_creek_maps", default=None
+)
+# Seconds between checks for a stop while waiting on the verification queue.
+_QUEUE_POLL_SECONDS: Final[float] = 0.1
+
 # TODO: At risk of overcomplication, we could create a class to hold the entire schema.
 # We could define its relational constraints internally, and have methods to
 # validate an entire extraction at once. Basically make an object-oriented RDB.
@@ -27,26 +66,164 @@ logger = logging.getLogger(__name__)
 
 
 @typechecked
-def run_etl(input_dir: Path, output_dir: Path) -> Path:  # noqa: D103
-    logger.info("Starting ETL process...")
+def run_etl(  # noqa: D103
+    input_dir: Path,
+    output_dir: Path,
+    validation_profile: constants.ValidationProfile = constants.ValidationProfile.FULL,
+    validation_workers: int = constants.VALIDATION_WORKERS,
+    reference_time: datetime | None = None,
+    failure_cases_path: Path | None = None,
+    extractor: str | None = None,
+    from_documents: bool = False,
+    incremental: bool = False,
+) -> Path:
+    logger.info(f"Starting ETL process with {validation_profile} validation...")
+
+    with validation.validation_profile(
+        profile=validation_profile
+    ), validation.validation_workers(
+        max_workers=validation_workers
+    ), validation.reference_time(
+        timestamp=reference_time
+    ), schema_utils.failure_cases_detail(
+        path=failure_cases_path
+    ), ledger.incremental(
+        path=output_dir / ledger.LEDGER_NAME if incremental else None
+    ), report.reporting(
+        output_dir=write.get_output_dir(output_dir=output_dir)
+    ):
+        final_output_path = _run_etl(
+            input_dir=input_dir,
+            output_dir=output_dir,
+            extractor=extractor,
+            from_documents=from_documents,
+        )
+
+    return final_output_path
+
+
+run_etl.__doc__ = constants.DocStrings.RUN_ETL.api_docstring
+
 
+@typechecked
+def watch_etl(  # noqa: D103
+    input_dir: Path,
+    output_dir: Path,
+    validation_profile: constants.ValidationProfile = constants.ValidationProfile.FULL,
+    validation_workers: int = constants.VALIDATION_WORKERS,
+    reference_time: datetime | None = None,
+    failure_cases_path: Path | None = None,
+    extractor: str | None = None,
+    stop: threading.Event | None = None,
+) -> list[Path]:
+    logger.info(f"Watching {input_dir} with {validation_profile} validation...")
+    stop = threading.Event() if stop is None else stop
+    if extractor is None:
+        logger.warning("No extractor selected. Nothing will be extracted.")
+    else:
+        # Loaded once, up front. `extract` reuses the process's warm instance.
+        extractors.get_extractor(extractor)
+
+    # Images are extracted and precleaned in this thread, while earlier batches are
+    # verified and loaded in another. The bounded queue holds back extraction if
+    # verification falls behind. Each batch's run report is carried along with it.
+    verification_queue: queue.Queue[
+        tuple[tuple[pd.DataFrame, ...], report.RunReport] | None
+    ] = queue.Queue(maxsize=constants.WATCH_QUEUE_SIZE)
+    output_paths: list[Path] = []
+    verifier_errors: list[BaseException] = []
+    with validation.validation_profile(
+        profile=validation_profile
+    ), validation.validation_workers(
+        max_workers=validation_workers
+    ), schema_utils.failure_cases_detail(
+        path=failure_cases_path
+    ), ledger.incremental(
+        path=output_dir / ledger.LEDGER_NAME
+    ), warm_site_creek_maps(), FolderWatcher(
+        input_dir=input_dir
+    ) as watcher:
+        # The verifier runs in a copy of this context, to see the settings above.
+        verifier = threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(
+                _verify_batches,
+                verification_queue,
+                output_dir,
+                reference_time,
+                output_paths,
+                verifier_errors,
+                stop,
+            ),
+            name="verification",
+            daemon=True,
+        )
+        verifier.start()
+        try:
+            while not stop.is_set():
+                images = watcher.next_batch(stop=stop)
+                if not images:
+                    continue
+                try:
+                    with report.reporting(
+                        output_dir=write.get_output_dir(output_dir=output_dir)
+                    ) as batch_report:
+                        precleaned_tables = _extract_batch(
+                            input_dir=input_dir, images=images, extractor=extractor
+                        )
+                except SchemaValidationError:
+                    logger.error(f"Skipping a batch of {len(images)} images. See above.")
+                    continue
+                _put(
+                    item_queue=verification_queue,
+                    item=(precleaned_tables, batch_report),
+                    consumer=verifier,
+                )
+        except KeyboardInterrupt:
+            logger.info("Stopping watch ...")
+        finally:
+            # Loads the batches already queued before stopping.
+            _put(item_queue=verification_queue, item=None, consumer=verifier)
+            verifier.join()
+
+    if verifier_errors:
+        raise verifier_errors[0]
+
+    return output_paths
+
+
+watch_etl.__doc__ = constants.DocStrings.WATCH_ETL.api_docstring
+
+
+@schema_utils.schema_error_handler
+@typechecked
+def _run_etl(
+    input_dir: Path, output_dir: Path, extractor: str | None, from_documents: bool
+) -> Path:
+    """Run the ETL stages under the active validation profile."""
     # TODO, NOTE: This is an estimated outline, not a hard requirement.
     # We may need to adjust the steps based on the actual implementation details.
+    raw_tables = (
+        ingest(input_dir=input_dir)
+        if from_documents
+        else extract(input_dir=input_dir, extractor=extractor)
+    )
+    precleaned_tables = _preclean_tables(raw_tables=raw_tables)
+
+    return _verify_and_load(precleaned_tables=precleaned_tables, output_dir=output_dir)
+
+
+def _preclean_tables(raw_tables: tuple[pd.DataFrame, ...]) -> tuple[pd.DataFrame, ...]:
+    """Preclean the raw tables, in `extract`'s order."""
     (
         raw_form_metadata,
         raw_investigators,
         raw_site_visits,
         raw_quantitative_observations,
         raw_qualitative_observations,
-    ) = extract(input_dir=input_dir)
+    ) = raw_tables
 
-    (
-        precleaned_form_metadata,
-        precleaned_investigators,
-        precleaned_site_visits,
-        precleaned_quantitative_observations,
-        precleaned_qualitative_observations,
-    ) = preclean(
+    return preclean(
         raw_form_metadata=raw_form_metadata,
         raw_investigators=raw_investigators,
         raw_site_visits=raw_site_visits,
@@ -54,6 +231,17 @@ def run_etl(input_dir: Path, output_dir: Path) -> Path:  # noqa: D103
         raw_qualitative_observations=raw_qualitative_observations,
     )
 
+
+def _verify_and_load(precleaned_tables: tuple[pd.DataFrame, ...], output_dir: Path) -> Path:
+    """Verify, clean, restructure, and load the precleaned tables, in `preclean`'s order."""
+    (
+        precleaned_form_metadata,
+        precleaned_investigators,
+        precleaned_site_visits,
+        precleaned_quantitative_observations,
+        precleaned_qualitative_observations,
+    ) = precleaned_tables
+
     (
         verified_form_metadata,
         verified_investigators,
@@ -103,13 +291,14 @@ def run_etl(input_dir: Path, output_dir: Path) -> Path:  # noqa: D103
     return final_output_path
 
 
-run_etl.__doc__ = constants.DocStrings.RUN_ETL.api_docstring
-
-
 # TODO: Implement this.
-@pa.check_types(with_pydantic=True, lazy=True)
+@profiling.stage
+@report.stage
+@validation.check_types
 def extract(
     input_dir: Path,
+    extractor: str | None = None,
+    images: list[discovery.DiscoveredImage] | None = None,
 ) -> tuple[
     pt.DataFrame[schema.FormExtracted],
     pt.DataFrame[schema.FormInvestigatorExtracted],
@@ -123,37 +312,96 @@ def extract(
 
     Args:
         input_dir: Path to the directory containing the datasheet images.
+        extractor: The name of the extractor backend to use. The process's warm instance is
+            reused. If None, nothing is extracted.
+        images: The images to extract, e.g. a watch mode micro-batch. If None, all images
+            discovered in the input directory.
 
     Returns:
         Raw extraction split into normalized relational tables, with no enforcement.
     """
     logger.info(f"Extracting data from images in {input_dir} ...")
 
-    # TODO: When implementing, you can just make a pandas.DataFrame. No need to cast.
-    # It will cast and validate on return.
-    raw_form_metadata = cast("pt.DataFrame[schema.FormExtracted]", pd.DataFrame())
-    raw_investigators = cast("pt.DataFrame[schema.FormInvestigatorExtracted]", pd.DataFrame())
-    raw_site_visits = cast("pt.DataFrame[schema.SiteVisitExtracted]", pd.DataFrame())
-    raw_quantitative_observations = cast(
-        "pt.DataFrame[schema.QuantitativeObservationsExtracted]", pd.DataFrame()
-    )
-    raw_qualitative_observations = cast(
-        "pt.DataFrame[schema.QualitativeObservationsExtracted]", pd.DataFrame()
+    # Forms are flattened as each batch is extracted, and the tables are built once.
+    builder = ExtractedTablesBuilder()
+    if extractor is None:
+        logger.warning("No extractor selected. Nothing will be extracted.")
+    else:
+        _extract_images(
+            # Images are discovered in the background while earlier images are extracted.
+            images=(
+                discovery.prefetch_images(input_dir=input_dir) if images is None else images
+            ),
+            extractor=extractors.get_extractor(extractor),
+            builder=builder,
+        )
+    logger.info(f"Extracted {builder.n_forms} forms.")
+
+    raw_tables = builder.build()
+
+    return (
+        cast("pt.DataFrame[schema.FormExtracted]", raw_tables.form_metadata),
+        cast("pt.DataFrame[schema.FormInvestigatorExtracted]", raw_tables.investigators),
+        cast("pt.DataFrame[schema.SiteVisitExtracted]", raw_tables.site_visits),
+        cast(
+            "pt.DataFrame[schema.QuantitativeObservationsExtracted]",
+            raw_tables.quantitative_observations,
+        ),
+        cast(
+            "pt.DataFrame[schema.QualitativeObservationsExtracted]",
+            raw_tables.qualitative_observations,
+        ),
     )
-    # TODO: Use data definition as source of truth rather than schema.
-    ...
+
+
+@profiling.stage
+@report.stage
+@validation.check_types
+def ingest(
+    input_dir: Path,
+) -> tuple[
+    pt.DataFrame[schema.FormExtracted],
+    pt.DataFrame[schema.FormInvestigatorExtracted],
+    pt.DataFrame[schema.SiteVisitExtracted],
+    pt.DataFrame[schema.QuantitativeObservationsExtracted],
+    pt.DataFrame[schema.QualitativeObservationsExtracted],
+]:
+    """Ingests pre-extracted JSON extraction documents from the input directory.
+
+    Bypasses computer vision, e.g. for manual transcriptions or third-party OCR output.
+
+    Args:
+        input_dir: Path to the directory containing the extraction documents.
+
+    Returns:
+        Raw extraction split into normalized relational tables, with no enforcement.
+    """
+    logger.info(f"Ingesting extraction documents in {input_dir} ...")
+
+    raw_tables = ingest_documents(paths=find_documents(input_dir=input_dir))
+    active_report = report.get_report()
+    if active_report is not None:
+        active_report.add_forms(form_ids=raw_tables.form_metadata.index)
 
     return (
-        raw_form_metadata,
-        raw_investigators,
-        raw_site_visits,
-        raw_quantitative_observations,
-        raw_qualitative_observations,
+        cast("pt.DataFrame[schema.FormExtracted]", raw_tables.form_metadata),
+        cast("pt.DataFrame[schema.FormInvestigatorExtracted]", raw_tables.investigators),
+        cast("pt.DataFrame[schema.SiteVisitExtracted]", raw_tables.site_visits),
+        cast(
+            "pt.DataFrame[schema.QuantitativeObservationsExtracted]",
+            raw_tables.quantitative_observations,
+        ),
+        cast(
+            "pt.DataFrame[schema.QualitativeObservationsExtracted]",
+            raw_tables.qualitative_observations,
+        ),
     )
 
 
 # TODO: Implement this.
-@pa.check_types(with_pydantic=True, lazy=True)
+@profiling.stage
+@report.stage
+@validation.check_types
 def preclean(
     raw_form_metadata: pt.DataFrame[schema.FormExtracted],
     raw_investigators: pt.DataFrame[schema.FormInvestigatorExtracted],
@@ -184,26 +432,35 @@ def preclean(
     logger.info("Precleaning raw extraction data...")
 
     # TODO: Light cleaning before user verification.
-    # E.g., strip whitespace, try to cast/format, check range, but warn don't fail.
+    # E.g., try to cast/format, check range, but warn don't fail.
     # Much of this might be done by creating a custom class for each field
     # that cleans and warns on construction,
     # define __str__/__repr__/__int__ etc. as needed,
     # and use the class as a type in the schema to coerce the data.
-    # Use data definition as source of truth rather than schema.
     # TODO: When implementing, you can just make a pandas.DataFrame. No need to cast.
     # It will cast and validate on return.
-    precleaned_form_metadata = cast("pt.DataFrame[schema.FormPrecleaned]", raw_form_metadata)
+    # Text is stripped, and options matched to the data definition's, per form version.
+    # The form type and version themselves are normalized by the base definition.
+    form_versions = definition.normalize(df=raw_form_metadata)
+    precleaned_form_metadata = cast(
+        "pt.DataFrame[schema.FormPrecleaned]",
+        versions.normalize(df=raw_form_metadata, form_metadata=form_versions),
+    )
     precleaned_investigators = cast(
-        "pt.DataFrame[schema.FormInvestigatorPrecleaned]", raw_investigators
+        "pt.DataFrame[schema.FormInvestigatorPrecleaned]",
+        versions.normalize(df=raw_investigators, form_metadata=form_versions),
+    )
+    precleaned_site_visits = cast(
+        "pt.DataFrame[schema.SiteVisitPrecleaned]",
+        versions.normalize(df=raw_site_visits, form_metadata=form_versions),
     )
-    precleaned_site_visits = cast("pt.DataFrame[schema.SiteVisitPrecleaned]", raw_site_visits)
     precleaned_quantitative_observations = cast(
         "pt.DataFrame[schema.QuantitativeObservationsPrecleaned]",
-        raw_quantitative_observations,
+        versions.normalize(df=raw_quantitative_observations, form_metadata=form_versions),
     )
     precleaned_qualitative_observations = cast(
         "pt.DataFrame[schema.QualitativeObservationsPrecleaned]",
-        raw_qualitative_observations,
+        versions.normalize(df=raw_qualitative_observations, form_metadata=form_versions),
     )
     ...
 
@@ -217,7 +474,9 @@ def preclean(
 
 
 # TODO: Implement this.
-@pa.check_types(with_pydantic=True, lazy=True)
+@profiling.stage
+@report.stage
+@validation.check_types
 def verify(
     precleaned_form_metadata: pt.DataFrame[schema.FormPrecleaned],
     precleaned_investigators: pt.DataFrame[schema.FormInvestigatorPrecleaned],
@@ -255,6 +514,8 @@ def verify(
     """
     logger.info("Verifying precleaned data with user...")
 
+    # TODO: Show each image for comparison, downscaled with `images.ImageLoader.load_page`.
+
     site_type_map, creek_type_map = _get_site_creek_maps()
 
     # TODO: When implementing, you can just make a pandas.DataFrame. No need to cast.
@@ -287,6 +548,19 @@ def verify(
     # Warn and offer to re-enter if out of expected range but within valid range.
     # Use data definition as source of truth rather than schema.
 
+    active_report = report.get_report()
+    if active_report is not None:
+        for precleaned, verified in (
+            (precleaned_form_metadata, verified_form_metadata),
+            (precleaned_investigators, verified_investigators),
+            (precleaned_site_visits, verified_site_visits),
+            (precleaned_quantitative_observations, verified_quantitative_observations),
+            (precleaned_qualitative_observations, verified_qualitative_observations),
+        ):
+            active_report.add_edits(
+                counts=report.count_edits(before=precleaned, after=verified)
+            )
+
     return (
         verified_form_metadata,
         verified_investigators,
@@ -299,7 +573,9 @@ def verify(
 
 
 # TODO: Implement this.
-@pa.check_types(with_pydantic=True, lazy=True)
+@profiling.stage
+@report.stage
+@validation.check_types
 def clean(
     verified_form_metadata: pt.DataFrame[schema.FormVerified],
     verified_investigators: pt.DataFrame[schema.FormInvestigatorVerified],
@@ -357,19 +633,28 @@ def clean(
     # TODO: Inferred/courtesy imputations? (nulls/empties, don't overstep)
 
     # TODO: Validations schema can't accomplish:
-    # - Referential integrity.
+    # - Referential integrity, beyond the observations' coverage of site visits.
     # - Ideally, we would verify that site arrival times are within
     #   the investigator's start and end times, but we can't 100% do that
     #   because forms don't assign observations to investigators.
     # - FormInvestigator start/end datetimes < now.
     # - SiteMetadata arrival datetime < now.
-    # - No dry outfalls in observations tables.
     # - Validate/warn against thresholds and limits, by outfall type.
 
+    # No observations of unvisited sites, and no qualitative observations of dry outfalls.
+    validate_coverage(
+        coverage=get_coverage(
+            site_visits=cleaned_site_visits,
+            quantitative_observations=cleaned_quantitative_observations,
+            qualitative_observations=cleaned_qualitative_observations,
+        )
+    )
+
     _validate_thresholds(
         observations=cleaned_quantitative_observations,
         site_type_map=cleaned_site_type_map,
         creek_type_map=cleaned_creek_type_map,
+        form_metadata=cleaned_form_metadata,
     )
 
     # TODO: If still invalid, alert to the problem, and re-call `verify()`.
@@ -386,8 +671,9 @@ def clean(
     )
 
 
-# TODO: Implement this.
-@pa.check_types(with_pydantic=True, lazy=True)
+@profiling.stage
+@report.stage
+@validation.check_types
 def restructure_extraction(
     cleaned_form_metadata: pt.DataFrame[schema.FormCleaned],
     cleaned_investigators: pt.DataFrame[schema.FormInvestigatorCleaned],
@@ -409,17 +695,28 @@ def restructure_extraction(
         cleaned_creek_type_map: The cleaned creek type map.
 
     Returns:
-        Cleaned relational tables restructured into JSON schema.
+        Cleaned relational tables restructured into JSON schema, shaped like
+        `FIELD_DATA_DEFINITION["example_extraction_document"]`, with each observation's
+        outfall and creek types from the type maps.
     """
     logger.info("Restructuring cleaned data into JSON schema...")
 
-    restructured_json: dict[str, Any] = {}
+    restructured_json = restructure_tables(
+        form_metadata=cleaned_form_metadata,
+        investigators=cleaned_investigators,
+        site_visits=cleaned_site_visits,
+        quantitative_observations=cleaned_quantitative_observations,
+        qualitative_observations=cleaned_qualitative_observations,
+        site_type_map=cleaned_site_type_map,
+        creek_type_map=cleaned_creek_type_map,
+    )
 
-    ...
     return restructured_json
 
 
 # TODO: Implement this.
+@profiling.stage
+@report.stage
 @typechecked
 def load(restructured_json: dict[str, Any], output_dir: Path) -> Path:
     """Load the cleaned data into the output directory.
@@ -427,6 +724,11 @@ def load(restructured_json: dict[str, Any], output_dir: Path) -> Path:
     Saves the cleaned data to the specified output directory in a structured format.
     If the output directory does not exist, it will be created.
 
+    Each run's artifacts are committed together, atomically, to a new run directory under
+    the output directory, so readers and concurrent runs never see partial output. See
+    `write.ArtifactSet`. The active run report, if any, is saved with them. See
+    `report.reporting`.
+
     Args:
         restructured_json: The restructured JSON schema.
         output_dir: The directory where the cleaned data will be saved.
@@ -435,16 +737,97 @@ def load(restructured_json: dict[str, Any], output_dir: Path) -> Path:
     Returns:
         Path to the saved cleaned data file.
     """
+    output_dir = write.get_output_dir(output_dir=output_dir)
     logger.info(f"Loading cleaned data to {output_dir} ...")
 
-    final_output_path = Path()
-
-    ...
+    active_report = report.get_report()
+    with write.ArtifactSet(
+        output_dir=output_dir, run_id=None if active_report is None else active_report.run_id
+    ) as artifacts:
+        final_output_path = artifacts.write_bytes(
+            name=f"{constants.OUTPUT_FILE_STEM}{serialize.get_suffix()}",
+            data=serialize.serialize(document=restructured_json),
+        )
+        if active_report is not None:
+            active_report.set_status(
+                form_ids=restructured_json.get(constants.Columns.FORMS, {}),
+                status=constants.FormStatus.LOADED,
+            )
+            active_report.save(artifacts=artifacts)
+
+    # Recorded only once committed, so a crashed run's forms are processed again.
+    active_ledger = ledger.get_ledger()
+    if active_ledger is not None:
+        active_ledger.record(
+            form_ids=restructured_json.get(constants.Columns.FORMS, {}),
+            output_path=final_output_path,
+        )
 
     return final_output_path
 
 
-@pa.check_types(with_pydantic=True, lazy=True)
+@contextmanager
+@typechecked
+def warm_site_creek_maps() -> Iterator[None]:
+    """Get the site and creek type maps once, and reuse them within the context.
+
+    E.g., so stages called per batch or per form don't each reread and revalidate them.
+
+    Yields:
+        None.
+    """
+    token = _SITE_CREEK_MAPS.set(_get_site_creek_maps())
+    try:
+        yield
+    finally:
+        _SITE_CREEK_MAPS.reset(token)
+
+
+@typechecked
+def iter_extracted_forms(
+    images: Iterable[discovery.DiscoveredImage], extractor: extractors.Extractor
+) -> Iterator[dict[str, dict[str, Any]]]:
+    """Extract images in batches, skipping images already loaded, per the active ledger.
+
+    Args:
+        images: The images to extract.
+        extractor: The extractor backend.
+
+    Yields:
+        Each batch's extracted forms, by form ID, as soon as the batch is extracted.
+    """
+    # TODO: Add a template extractor backend: Use one `images.ImageLoader` for all images,
+    # and load only the form's field regions, per `templates.get_template`, with
+    # `load_regions`, rather than the full-resolution image. Then submit the field crops to
+    # a `batching.RecognitionScheduler`, to recognize crops across images in batches.
+    active_ledger = ledger.get_ledger()
+    skipped: list[str] = []
+    batch: list[discovery.DiscoveredImage] = []
+    for image in images:
+        try:
+            is_loaded = active_ledger is not None and active_ledger.is_loaded(image=image)
+        except OSError as e:
+            # E.g., deleted or renamed since discovered. If it reappears, it's new.
+            logger.warning(f"Skipping {image.path}: {e}")
+            continue
+        if is_loaded:
+            skipped.append(image.form_id)
+            continue
+        logger.debug(f"Extracting {image.form_id} from {image.path} ...")
+        batch.append(image)
+        if len(batch) >= constants.EXTRACTION_BATCH_SIZE:
+            yield _extract_forms(images=batch, extractor=extractor)
+            batch = []
+    if batch:
+        yield _extract_forms(images=batch, extractor=extractor)
+    if skipped:
+        logger.info(f"Skipped {len(skipped)} images already loaded, per the ledger.")
+        active_report = report.get_report()
+        if active_report is not None:
+            active_report.set_status(form_ids=skipped, status=constants.FormStatus.SKIPPED)
+
+
+@validation.check_types
 def _get_site_creek_maps() -> tuple[pt.DataFrame[schema.Site], pt.DataFrame[schema.Creek]]:
     """Get the site and creek type maps.
 
@@ -453,6 +836,10 @@ def _get_site_creek_maps() -> tuple[pt.DataFrame[schema.Site], pt.DataFrame[sche
             - A DataFrame mapping site IDs to their outfall types.
             - A DataFrame mapping creek site IDs to their creek types.
     """
+    warm_maps = _SITE_CREEK_MAPS.get()
+    if warm_maps is not None:
+        return warm_maps
+
     # NOTE: At some point, these will return tables from a database that we don't manage.
     # So, we will continue to need to validate at runtime.
     site_type_map = read.get_site_type_map()
@@ -462,24 +849,136 @@ def _get_site_creek_maps() -> tuple[pt.DataFrame[schema.Site], pt.DataFrame[sche
     return site_type_map, creek_type_map
 
 
-@pa.check_types(with_pydantic=True, lazy=True)
+@validation.check_types
 def _validate_thresholds(
     observations: pt.DataFrame[schema.QuantitativeObservationsCleaned],
     site_type_map: pt.DataFrame[schema.Site],
     creek_type_map: pt.DataFrame[schema.Creek],
+    form_metadata: pt.DataFrame[schema.FormCleaned],
 ) -> None:
-    """Validate observations against thresholds by site type.
+    """Validate observations against thresholds by site type, per form version.
+
+    Logs a warning for each field with observations outside its normal thresholds.
 
     Args:
         observations: The cleaned quantitative observations.
         site_type_map: A DataFrame mapping site IDs to their outfall types.
         creek_type_map: A DataFrame mapping creek site IDs to their creek types.
+        form_metadata: The cleaned metadata, for the forms' versions.
     """
-    # TODO: Differentiate between normal thresholds and absolute limits.
-    # Warn for outside normal thresholds, and error for invalid values.
-    # Codify in data definition. Check in schema itself when possible, and here as needed.
-    # TODO: Add records to site_type_map to determine thresholds.
-    # creek or outfall, and if creek:
-    # habitat, spawn, rear, or migrate.
+    # NOTE: Absolute limits are enforced by the schema. Normal thresholds are warned on.
     validate_site_creek_map(site_type_map=site_type_map, creek_type_map=creek_type_map)
-    ...
+    partitions = versions.partition(df=observations, form_metadata=form_metadata)
+    flags = pd.concat(
+        [
+            flag_thresholds(
+                observations=observations.iloc[positions],
+                site_type_map=site_type_map,
+                creek_type_map=creek_type_map,
+                thresholds=versions.get_definition(*key).thresholds,
+            )
+            for key, positions in partitions.items()
+        ]
+        or [
+            flag_thresholds(
+                observations=observations,
+                site_type_map=site_type_map,
+                creek_type_map=creek_type_map,
+            )
+        ]
+    )
+    active_report = report.get_report()
+    if active_report is not None:
+        active_report.add_exceedances(
+            counts=flags.sum(axis=1).groupby(level=constants.Columns.FORM_ID).sum()
+        )
+    n_flagged = flags.sum()
+    for column, n_observations in n_flagged[n_flagged > 0].items():
+        logger.warning(
+            f"{n_observations} {column} observations are outside the normal thresholds for "
+            "their site types."
+        )
+
+
+@schema_utils.schema_error_handler
+@typechecked
+def _extract_batch(
+    input_dir: Path, images: list[discovery.DiscoveredImage], extractor: str | None
+) -> tuple[pd.DataFrame, ...]:
+    """Extract and preclean a micro-batch of images."""
+    raw_tables = extract(input_dir=input_dir, extractor=extractor, images=images)
+
+    return _preclean_tables(raw_tables=raw_tables)
+
+
+def _verify_batches(
+    verification_queue: queue.Queue,
+    output_dir: Path,
+    reference_time: datetime | None,
+    output_paths: list[Path],
+    errors: list[BaseException],
+    stop: threading.Event,
+) -> None:
+    """Verify and load queued micro-batches, until the queue's end."""
+    try:
+        while (item := verification_queue.get()) is not None:
+            precleaned_tables, batch_report = item
+            try:
+                # Each batch is checked against its own frozen time, unless one is given.
+                with validation.reference_time(timestamp=reference_time), report.reporting(
+                    output_dir=write.get_output_dir(output_dir=output_dir),
+                    run_report=batch_report,
+                ):
+                    output_paths.append(
+                        _load_batch(
+                            precleaned_tables=precleaned_tables, output_dir=output_dir
+                        )
+                    )
+            except SchemaValidationError:
+                logger.error("Skipping a precleaned batch. See above.")
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+
+
+@schema_utils.schema_error_handler
+@typechecked
+def _load_batch(precleaned_tables: tuple[pd.DataFrame, ...], output_dir: Path) -> Path:
+    """Verify, clean, restructure, and load a precleaned micro-batch."""
+    return _verify_and_load(precleaned_tables=precleaned_tables, output_dir=output_dir)
+
+
+def _put(item_queue: queue.Queue, item: Any, consumer: threading.Thread) -> None:
+    """Put an item on a bounded queue, waiting for room while its consumer is alive."""
+    while consumer.is_alive():
+        try:
+            item_queue.put(item, timeout=_QUEUE_POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+
+
+def _extract_forms(
+    images: list[discovery.DiscoveredImage], extractor: extractors.Extractor
+) -> dict[str, dict[str, Any]]:
+    """Extract a batch of images, timing it for the active run report."""
+    start = time.perf_counter()
+    forms = extractor.extract_batch(images)
+    active_report = report.get_report()
+    if active_report is not None:
+        active_report.add_extraction(
+            form_ids=[image.form_id for image in images],
+            seconds=time.perf_counter() - start,
+        )
+
+    return forms
+
+
+def _extract_images(
+    images: Iterable[discovery.DiscoveredImage],
+    extractor: extractors.Extractor,
+    builder: ExtractedTablesBuilder,
+) -> None:
+    """Extract the images, in batches, into the builder."""
+    for forms in iter_extracted_forms(images=images, extractor=extractor):
+        builder.add_forms(forms=forms)
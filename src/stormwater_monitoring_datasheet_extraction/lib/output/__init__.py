@@ -0,0 +1 @@
+"""Output: serializing and writing the cleaned extraction."""
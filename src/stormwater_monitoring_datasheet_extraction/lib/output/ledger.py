@@ -0,0 +1,225 @@
+"""Incremental runs: a ledger of the forms already loaded, to skip them on later runs.
+
+Datasheet images accumulate in the same intake directory all season. With a ledger, each
+run extracts, verifies, cleans, and loads only new or changed images, so it costs time in
+proportion to the new sheets rather than the whole directory.
+
+The ledger is a SQLite database of each loaded form's ID (its image path), size,
+modification time, content hash, and the output file it was loaded to. An image whose size
+and modification time match the ledger is skipped without reading it. Otherwise, its
+content is hashed, so a touched but unchanged image is skipped too.
+
+Forms are recorded only once their output is committed, so a crashed run's forms are
+processed again by the next run. The ledger maps each form to its latest output file, which
+together make up the output set. See `Ledger.get_outputs`.
+
+Like the validation profile, the active ledger is held in a context variable, set once per
+run with `incremental`.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Final, NamedTuple
+
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.extraction.discovery import (
+    DiscoveredImage,
+)
+
+logger = logging.getLogger(__name__)
+
+LEDGER_NAME: Final[str] = "ledger.sqlite"
+
+_LEDGER: Final[ContextVar["Ledger | None"]] = ContextVar("ledger", default=None)
+# Seconds to wait on another run's write lock.
+_LOCK_TIMEOUT_SECONDS: Final[float] = 30.0
+_CREATE_TABLE: Final[str] = """
+CREATE TABLE IF NOT EXISTS forms (
+    form_id TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    loaded_at TEXT NOT NULL
+)
+"""
+_UPSERT: Final[str] = """
+INSERT INTO forms (form_id, size, mtime_ns, content_hash, output_path, loaded_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (form_id) DO UPDATE SET
+    size = excluded.size,
+    mtime_ns = excluded.mtime_ns,
+    content_hash = excluded.content_hash,
+    output_path = excluded.output_path,
+    loaded_at = excluded.loaded_at
+"""
+
+
+class Fingerprint(NamedTuple):
+    """Identifies the content of an image, cheaply where possible."""
+
+    #: The file size in bytes.
+    size: int
+    #: The modification time in nanoseconds.
+    mtime_ns: int
+    #: The SHA-256 of the content.
+    content_hash: str
+
+
+class Ledger:
+    """The forms already loaded to an output directory.
+
+    Thread-safe, e.g. for watch mode, which checks images in one thread and records them
+    in another.
+    """
+
+    @typechecked
+    def __init__(self, path: Path) -> None:
+        """Open the ledger, creating it if needed.
+
+        Args:
+            path: The ledger's SQLite database.
+        """
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, timeout=_LOCK_TIMEOUT_SECONDS, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        with self._connection:
+            self._connection.execute(_CREATE_TABLE)
+        # Loaded once: one small row per form, checked for every image.
+        self._loaded: dict[str, Fingerprint] = {
+            form_id: Fingerprint(size=size, mtime_ns=mtime_ns, content_hash=content_hash)
+            for form_id, size, mtime_ns, content_hash in self._connection.execute(
+                "SELECT form_id, size, mtime_ns, content_hash FROM forms"
+            )
+        }
+        # New or changed images seen this run, to record once loaded.
+        self._pending: dict[str, Fingerprint] = {}
+
+    def close(self) -> None:
+        """Close the ledger."""
+        with self._lock:
+            self._connection.close()
+
+    @typechecked
+    def is_loaded(self, image: DiscoveredImage) -> bool:
+        """Check whether an image was already loaded, unchanged.
+
+        If not, its fingerprint is kept, to `record` once loaded.
+
+        Args:
+            image: The discovered image.
+
+        Returns:
+            Whether the image's form was loaded, with the same content.
+
+        Raises:
+            OSError: If the image can't be read, e.g. deleted since discovered.
+        """
+        stat = image.path.stat()
+        with self._lock:
+            loaded = self._loaded.get(image.form_id)
+        if (
+            loaded is not None
+            and loaded.size == stat.st_size
+            and loaded.mtime_ns == stat.st_mtime_ns
+        ):
+            return True
+
+        with open(image.path, "rb") as image_file:
+            content_hash = hashlib.file_digest(image_file, "sha256").hexdigest()
+        fingerprint = Fingerprint(
+            size=stat.st_size, mtime_ns=stat.st_mtime_ns, content_hash=content_hash
+        )
+        if loaded is not None and loaded.content_hash == content_hash:
+            # Touched, but unchanged.
+            return True
+
+        with self._lock:
+            self._pending[image.form_id] = fingerprint
+        return False
+
+    @typechecked
+    def record(self, form_ids: Iterable[str], output_path: Path) -> int:
+        """Record forms as loaded, in one transaction.
+
+        Only forms checked with `is_loaded` this run are recorded, e.g. not ingested
+        extraction documents.
+
+        Args:
+            form_ids: The IDs of the forms loaded.
+            output_path: The output file they were loaded to.
+
+        Returns:
+            The number of forms recorded.
+        """
+        loaded_at = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            rows = [
+                (form_id, *self._pending[form_id], str(output_path.resolve()), loaded_at)
+                for form_id in form_ids
+                if form_id in self._pending
+            ]
+            with self._connection:
+                self._connection.executemany(_UPSERT, rows)
+            for form_id, *_ in rows:
+                self._loaded[form_id] = self._pending.pop(form_id)
+        logger.info(f"Recorded {len(rows)} loaded forms in {self.path}")
+
+        return len(rows)
+
+    @typechecked
+    def get_outputs(self) -> dict[str, Path]:
+        """Get the output set: the latest output file of each loaded form.
+
+        Returns:
+            Output files by form ID.
+        """
+        with self._lock:
+            return {
+                form_id: Path(output_path)
+                for form_id, output_path in self._connection.execute(
+                    "SELECT form_id, output_path FROM forms ORDER BY form_id"
+                )
+            }
+
+
+@contextmanager
+@typechecked
+def incremental(path: Path | None) -> Iterator[Ledger | None]:
+    """Set the ledger for incremental runs within the context.
+
+    Args:
+        path: The ledger's SQLite database. If None, runs aren't incremental.
+
+    Yields:
+        The open ledger, or None.
+    """
+    ledger = None if path is None else Ledger(path=path)
+    token = _LEDGER.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _LEDGER.reset(token)
+        if ledger is not None:
+            ledger.close()
+
+
+@typechecked
+def get_ledger() -> Ledger | None:
+    """Get the active ledger.
+
+    Returns:
+        The ledger set by the innermost `incremental` context, else None.
+    """
+    return _LEDGER.get()
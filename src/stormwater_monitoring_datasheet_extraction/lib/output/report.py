@@ -0,0 +1,477 @@
+"""Run reports: each form's timing and outcome, and the run's, for ops.
+
+`reporting` collects a report over a run, and `load` saves it with the run's other
+artifacts, as `run_report.json` and, if `pyarrow` is installed (the `parquet` extra),
+`run_report.parquet`. So, slow or problematic sheets can be spotted, and throughput tracked
+across runs, without parsing logs. If the run fails, the report is committed alone to its
+own run directory, with the run's unfinished forms failed.
+
+Per form, the report holds:
+
+- `extraction_seconds`: The form's share of its extraction batch's wall time.
+- `<stage>_warnings`: The stage's warnings on the form, i.e., its threshold exceedances,
+  warned on in `clean`.
+- `<stage>_errors`: The failure cases of the form's rows raised by the stage.
+- `verification_edits`: The cells `verify` changed, and the rows it added or removed.
+- `threshold_exceedances`: The observations outside their normal thresholds.
+- `status`: Whether the form was loaded, skipped as already loaded, or failed.
+
+The run's summary aggregates the same, with each stage's wall time, warnings logged, and
+failure cases raised, whether or not of a form's rows, and the run's throughput. Stages are
+marked with `stage`. `load`, saving the report, isn't among them.
+
+Like the ledger, the active report is held in a context variable, set once per run, or per
+watch mode micro-batch.
+"""
+
+import io
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, Final, TypeVar, cast
+
+import pandas as pd
+from pandera.errors import SchemaError, SchemaErrors
+from pydantic import ValidationError
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns, FormStatus
+from stormwater_monitoring_datasheet_extraction.lib.errors import SchemaValidationError
+from stormwater_monitoring_datasheet_extraction.lib.output import serialize, write
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
+    logger.debug("`pyarrow` not installed. Run reports will be saved as JSON only.")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_REPORT: Final[ContextVar["RunReport | None"]] = ContextVar("run_report", default=None)
+# The stage each context is in, to attribute warnings to.
+_STAGE: Final[ContextVar[str | None]] = ContextVar("report_stage", default=None)
+# Where warnings logged outside any stage are attributed.
+_NO_STAGE: Final[str] = "run"
+_WARNINGS: Final[str] = "warnings"
+_ERRORS: Final[str] = "errors"
+_SECONDS: Final[str] = "seconds"
+# Marks null cells, so nulls compare equal to each other, and unequal to anything else.
+_NULL: Final[object] = object()
+# Numbers duplicate rows of a table, to compare it row by row.
+_ROW: Final[str] = "_row"
+
+
+class RunReport:
+    """A run's per-form timing and outcome, and the run's aggregates.
+
+    Thread-safe, e.g. for extraction and validation in worker threads.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty report, and start the run's clock."""
+        #: The run ID, naming the run's directory.
+        self.run_id = write.new_run_id()
+        #: When the run started.
+        self.started = datetime.now()
+        #: The saved JSON report's path, once committed.
+        self.path: Path | None = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        # Each form's counts and seconds, by column, by form ID, in order seen.
+        self._forms: dict[str, Counter[str]] = {}
+        self._statuses: dict[str, FormStatus] = {}
+        # Each stage's seconds, warnings, and errors, by stage, in order seen.
+        self._stages: defaultdict[str, Counter[str]] = defaultdict(Counter)
+
+    @typechecked
+    def add_forms(self, form_ids: Iterable[str]) -> None:
+        """Add forms to the report, e.g. as they're extracted.
+
+        Only forms added are reported per form. Others' warnings and errors are
+        reported in the stage aggregates only.
+
+        Args:
+            form_ids: The forms' IDs.
+        """
+        with self._lock:
+            for form_id in form_ids:
+                self._forms.setdefault(form_id, Counter())
+
+    @typechecked
+    def add_extraction(self, form_ids: list[str], seconds: float) -> None:
+        """Add an extraction batch's forms, splitting its time evenly among them.
+
+        Args:
+            form_ids: The batch's form IDs.
+            seconds: The batch's wall time.
+        """
+        self.add_forms(form_ids=form_ids)
+        with self._lock:
+            for form_id in form_ids:
+                self._forms[form_id][Columns.EXTRACTION_SECONDS] += seconds / len(form_ids)
+
+    @typechecked
+    def add_edits(self, counts: pd.Series) -> None:
+        """Add verification edits.
+
+        Args:
+            counts: Each form's number of edits, by form ID, e.g. from `count_edits`.
+        """
+        self._add_counts(column=Columns.VERIFICATION_EDITS, counts=counts)
+
+    @typechecked
+    def add_exceedances(self, counts: pd.Series) -> None:
+        """Add threshold exceedances, as warnings of the current stage.
+
+        Args:
+            counts: Each form's number of observations outside their normal thresholds,
+                by form ID.
+        """
+        stage_name = _get_stage()
+        with self._lock:
+            # Reported per form even if the stage has logged no warnings itself.
+            self._stages.setdefault(stage_name, Counter())
+        self._add_counts(column=Columns.THRESHOLD_EXCEEDANCES, counts=counts)
+        self._add_counts(column=f"{stage_name}_{_WARNINGS}", counts=counts)
+
+    @typechecked
+    def add_failure(self, stage_name: str, error: BaseException) -> None:
+        """Add a stage's failure: its failure cases, per form where of a form's rows.
+
+        Args:
+            stage_name: The failed stage.
+            error: The error raised. Errors other than schema errors count as one.
+        """
+        n_errors = 1
+        if isinstance(error, SchemaValidationError):
+            n_errors = max(int(error.summary[Columns.N_FAILURE_CASES].sum()), 1)
+        elif isinstance(error, SchemaError | SchemaErrors | ValidationError):
+            summary = schema_utils.summarize_schema_errors(error=error)
+            n_errors = max(int(summary[Columns.N_FAILURE_CASES].sum()), 1)
+            self._add_counts(
+                column=f"{stage_name}_{_ERRORS}",
+                counts=schema_utils.count_failure_cases_by_form(error=error),
+            )
+        with self._lock:
+            self._stages[stage_name][_ERRORS] += n_errors
+
+    def has_failed(self) -> bool:
+        """Whether any stage has failed.
+
+        Returns:
+            Whether a failure was added.
+        """
+        with self._lock:
+            return any(counts[_ERRORS] for counts in self._stages.values())
+
+    def add_seconds(self, stage_name: str, seconds: float) -> None:
+        """Add wall time to a stage.
+
+        Args:
+            stage_name: The stage.
+            seconds: The wall time.
+        """
+        with self._lock:
+            self._stages[stage_name][_SECONDS] += seconds
+
+    def add_warning(self, stage_name: str) -> None:
+        """Add a warning logged in a stage.
+
+        Args:
+            stage_name: The stage.
+        """
+        with self._lock:
+            self._stages[stage_name][_WARNINGS] += 1
+
+    @typechecked
+    def set_status(self, form_ids: Iterable[str], status: FormStatus) -> None:
+        """Set forms' outcomes, adding them if need be.
+
+        Args:
+            form_ids: The forms' IDs.
+            status: The outcome.
+        """
+        form_ids = list(form_ids)
+        self.add_forms(form_ids=form_ids)
+        with self._lock:
+            for form_id in form_ids:
+                self._statuses[form_id] = status
+
+    def get_forms(self) -> pd.DataFrame:
+        """Get each form's timing and outcome.
+
+        Returns:
+            One row per form, indexed by form ID, with the run ID, extraction time, each
+            stage's warnings and errors, verification edits, threshold exceedances, and
+            status. Forms with no status yet are failed.
+        """
+        with self._lock:
+            forms = pd.DataFrame.from_dict(
+                {form_id: dict(counts) for form_id, counts in self._forms.items()},
+                orient="index",
+            )
+            statuses = pd.Series(self._statuses, dtype=object)
+            stage_names = list(self._stages)
+
+        count_columns = [
+            f"{stage_name}_{kind}"
+            for stage_name in stage_names
+            for kind in (_WARNINGS, _ERRORS)
+        ] + [Columns.VERIFICATION_EDITS, Columns.THRESHOLD_EXCEEDANCES]
+        forms = forms.reindex(
+            index=pd.Index(list(self._forms), dtype=object, name=Columns.FORM_ID),
+            columns=[Columns.EXTRACTION_SECONDS, *count_columns],
+        )
+        forms[count_columns] = forms[count_columns].fillna(0).astype(int)
+        forms.insert(0, Columns.RUN_ID, self.run_id)
+        forms[Columns.STATUS] = (
+            statuses.reindex(forms.index).fillna(FormStatus.FAILED).astype(str)
+        )
+
+        return forms
+
+    def get_summary(self) -> dict[str, Any]:
+        """Get the run's aggregates.
+
+        Returns:
+            The run ID, start time, wall time, validation profile, forms by status,
+            throughput in loaded forms per second, extraction time, each stage's wall time,
+            warnings logged, and failure cases raised, and the total verification edits
+            and threshold exceedances.
+        """
+        forms = self.get_forms()
+        wall_seconds = time.perf_counter() - self._start
+        with self._lock:
+            stages = {
+                stage_name: {kind: counts[kind] for kind in (_SECONDS, _WARNINGS, _ERRORS)}
+                for stage_name, counts in self._stages.items()
+            }
+        n_forms_by_status = {
+            str(status): int((forms[Columns.STATUS] == status).sum()) for status in FormStatus
+        }
+        extraction_seconds = forms[Columns.EXTRACTION_SECONDS].dropna()
+
+        return {
+            Columns.RUN_ID: self.run_id,
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_seconds": wall_seconds,
+            "validation_profile": str(validation.get_validation_profile()),
+            "n_forms": len(forms),
+            "n_forms_by_status": n_forms_by_status,
+            "loaded_forms_per_second": n_forms_by_status[FormStatus.LOADED] / wall_seconds,
+            Columns.EXTRACTION_SECONDS: {
+                "total": extraction_seconds.sum(),
+                "mean": extraction_seconds.mean() if len(extraction_seconds) else None,
+                "max": extraction_seconds.max() if len(extraction_seconds) else None,
+            },
+            "stages": stages,
+            Columns.VERIFICATION_EDITS: int(forms[Columns.VERIFICATION_EDITS].sum()),
+            Columns.THRESHOLD_EXCEEDANCES: int(forms[Columns.THRESHOLD_EXCEEDANCES].sum()),
+        }
+
+    @typechecked
+    def save(self, artifacts: write.ArtifactSet) -> Path:
+        """Save the report as artifacts of a run.
+
+        Args:
+            artifacts: The run's artifacts.
+
+        Returns:
+            The JSON report's path, once committed.
+        """
+        forms = self.get_forms()
+        document = {
+            "summary": self.get_summary(),
+            Columns.FORMS: forms.reset_index()
+            .astype(object)
+            .where(forms.reset_index().notna(), None)
+            .to_dict(orient="records"),
+        }
+        self.path = artifacts.write_bytes(
+            name=f"{constants.REPORT_FILE_STEM}.json",
+            data=serialize.serialize(document=document, pretty=True),
+        )
+        if pyarrow is not None:
+            parquet_buffer = io.BytesIO()
+            forms.to_parquet(parquet_buffer)
+            artifacts.write_bytes(
+                name=f"{constants.REPORT_FILE_STEM}.parquet", data=parquet_buffer.getvalue()
+            )
+
+        return self.path
+
+    @typechecked
+    def commit(self, output_dir: Path) -> Path:
+        """Commit the report alone to its own run directory, e.g. when the run failed.
+
+        Args:
+            output_dir: The root directory to commit the run's directory to.
+
+        Returns:
+            The JSON report's path.
+        """
+        with write.ArtifactSet(output_dir=output_dir, run_id=self.run_id) as artifacts:
+            path = self.save(artifacts=artifacts)
+        logger.info(f"Saved the run report to {path}.")
+
+        return path
+
+    def _add_counts(self, column: str, counts: pd.Series) -> None:
+        """Add counts to the forms added, by form ID."""
+        with self._lock:
+            for form_id, count in counts.items():
+                if form_id in self._forms and count:
+                    self._forms[form_id][column] += int(count)
+
+
+class _WarningCounter(logging.Handler):
+    """Counts the package's warnings toward the active report's current stage."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.WARNING)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Count a warning, if reporting. Errors are counted as stage failures instead."""
+        run_report = _REPORT.get()
+        if run_report is not None and record.levelno < logging.ERROR:
+            run_report.add_warning(stage_name=_get_stage())
+
+
+logging.getLogger(__name__.split(".")[0]).addHandler(_WarningCounter())
+
+
+@typechecked
+def get_report() -> RunReport | None:
+    """Get the active run report.
+
+    Returns:
+        The report set by `reporting`, or None if not reporting.
+    """
+    return _REPORT.get()
+
+
+@contextmanager
+@typechecked
+def reporting(output_dir: Path, run_report: RunReport | None = None) -> Iterator[RunReport]:
+    """Collect a run report within the context.
+
+    `load` saves it with the run's other artifacts. If the run fails, it's committed alone.
+
+    Args:
+        output_dir: The root directory to commit the report to, if the run fails.
+        run_report: The report to collect into, e.g. a watch mode micro-batch's, carried
+            from extraction to verification. If None, a new report.
+
+    Yields:
+        The report.
+    """
+    run_report = RunReport() if run_report is None else run_report
+    token = _REPORT.set(run_report)
+    try:
+        yield run_report
+    except Exception as e:
+        if run_report.path is None or not run_report.path.exists():
+            if not run_report.has_failed():
+                # Failed outside the stages, e.g. flattening a stream's forms.
+                run_report.add_failure(stage_name=_NO_STAGE, error=e)
+            run_report.commit(output_dir=output_dir)
+        raise
+    finally:
+        _REPORT.reset(token)
+
+
+def stage(fx: F) -> F:
+    """Mark a pipeline stage, named for the function, to report its time and failures.
+
+    Outside `reporting`, calls the function with no overhead to speak of.
+
+    Args:
+        fx: The stage function.
+
+    Returns:
+        The decorated function.
+    """
+    stage_name = fx.__name__
+
+    @wraps(fx)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        run_report = _REPORT.get()
+        if run_report is None:
+            return fx(*args, **kwargs)
+
+        token = _STAGE.set(stage_name)
+        start = time.perf_counter()
+        try:
+            return fx(*args, **kwargs)
+        except Exception as e:
+            run_report.add_failure(stage_name=stage_name, error=e)
+            raise
+        finally:
+            run_report.add_seconds(stage_name=stage_name, seconds=time.perf_counter() - start)
+            _STAGE.reset(token)
+
+    return cast("F", wrapper)
+
+
+@typechecked
+def count_edits(before: pd.DataFrame, after: pd.DataFrame) -> pd.Series:
+    """Count each form's edits between two versions of a table, e.g. precleaned and verified.
+
+    Args:
+        before: The table before editing, indexed by form ID, among other levels.
+        after: The table after editing.
+
+    Returns:
+        Each form's number of changed cells, and added or removed rows, by form ID, for
+        forms with edits.
+    """
+    if before is after or before.equals(after):
+        return pd.Series(dtype=int, index=pd.Index([], name=Columns.FORM_ID))
+
+    # Duplicate rows are compared in order.
+    number_rows = not (before.index.is_unique and after.index.is_unique)
+    before = _get_comparable(df=before, number_rows=number_rows)
+    after = _get_comparable(df=after, number_rows=number_rows)
+    index = before.index.union(after.index, sort=False)
+    columns = before.columns.union(after.columns, sort=False)
+    before_cells = before.reindex(index=index, columns=columns, fill_value=_NULL)
+    after_cells = after.reindex(index=index, columns=columns, fill_value=_NULL)
+
+    edits = pd.Series(
+        (before_cells.to_numpy() != after_cells.to_numpy()).sum(axis=1), index=index
+    )
+    is_added_or_removed = index.isin(before.index) != index.isin(after.index)
+    edits[is_added_or_removed] = 1
+    edits = edits.groupby(level=Columns.FORM_ID, sort=False).sum()
+
+    return edits[edits > 0]
+
+
+def _get_comparable(df: pd.DataFrame, number_rows: bool) -> pd.DataFrame:
+    """Get a table as objects, with nulls marked, and its rows numbered within each key."""
+    df = df.astype(object)
+    df = df.where(df.notna(), _NULL)
+    if number_rows:
+        row_numbers = df.groupby(
+            level=list(range(df.index.nlevels)), dropna=False, sort=False
+        ).cumcount()
+        df = df.set_index(pd.Index(row_numbers.to_numpy(), name=_ROW), append=True)
+
+    return df
+
+
+def _get_stage() -> str:
+    """Get the stage the current context is in, if any."""
+    return _STAGE.get() or _NO_STAGE
@@ -0,0 +1,155 @@
+"""Serialize extraction documents to JSON bytes, optionally compressed.
+
+Restructured documents hold enums, NumPy scalars, and pandas nulls. If `orjson` is
+installed (the `json` extra), it serializes enums and NumPy natively, many times faster than
+the standard library, and only pandas nulls and the like go through the `default` hook.
+Otherwise, the standard library is used with the same hook. It would write NaN and
+infinities as bare `NaN` and `Infinity`, which aren't JSON, so they're first replaced with
+nulls, as `orjson` writes them, for the same output.
+
+zstd compression requires `zstandard` (the `zstd` extra). gzip is always available.
+"""
+
+import gzip
+import json
+import logging
+import math
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Final
+
+import numpy as np
+import pandas as pd
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import Compression
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+    logger.debug("`orjson` not installed. Documents will be serialized with `json`.")
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+    logger.debug("`zstandard` not installed. Documents can't be zstd-compressed.")
+
+_SUFFIXES: Final[dict[Compression, str]] = {
+    Compression.GZIP: ".json.gz",
+    Compression.NONE: ".json",
+    Compression.ZSTD: ".json.zst",
+}
+_INDENT: Final[int] = 2
+
+
+@typechecked
+def serialize(document: Any, pretty: bool = False) -> bytes:
+    """Serialize a document to UTF-8 JSON.
+
+    Args:
+        document: The document, e.g. from `restructure_tables`.
+        pretty: Indent, for people to read. Otherwise, compact, with no whitespace.
+
+    Returns:
+        The JSON.
+
+    Raises:
+        TypeError: If the document holds a value that can't be serialized.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(document, default=_default, option=option)
+
+    return json.dumps(
+        _replace_non_finite(value=document),
+        default=lambda value: _replace_non_finite(value=_default(value)),
+        allow_nan=False,
+        ensure_ascii=False,
+        indent=_INDENT if pretty else None,
+        separators=(",", ": ") if pretty else (",", ":"),
+    ).encode()
+
+
+@typechecked
+def compress(data: bytes, compression: Compression | str = Compression.NONE) -> bytes:
+    """Compress serialized data.
+
+    Args:
+        data: The data to compress.
+        compression: The compression.
+
+    Returns:
+        The compressed data, or the data if no compression.
+
+    Raises:
+        ValueError: If zstd compression is requested but `zstandard` isn't installed.
+    """
+    compression = Compression(compression)
+    if compression == Compression.GZIP:
+        # mtime=0 keeps output reproducible.
+        data = gzip.compress(data, compresslevel=constants.GZIP_COMPRESSION_LEVEL, mtime=0)
+    elif compression == Compression.ZSTD:
+        if zstandard is None:
+            raise ValueError(
+                "zstd compression requires `zstandard`. Install the `zstd` extra, or use"
+                f" {Compression.GZIP} compression."
+            )
+        data = zstandard.ZstdCompressor(level=constants.ZSTD_COMPRESSION_LEVEL).compress(data)
+
+    return data
+
+
+@typechecked
+def get_suffix(compression: Compression | str = Compression.NONE) -> str:
+    """Get the file suffix of a serialized document.
+
+    Args:
+        compression: The compression.
+
+    Returns:
+        The suffix, e.g. ".json.gz".
+    """
+    return _SUFFIXES[Compression(compression)]
+
+
+def _default(value: Any) -> Any:
+    """Convert a value the JSON backend can't serialize natively."""
+    # Checked roughly from most to least common in restructured documents.
+    if isinstance(value, Enum):
+        converted = value.value
+    elif isinstance(value, np.generic):
+        converted = value.item()
+    elif isinstance(value, np.ndarray):
+        converted = value.tolist()
+    elif isinstance(value, datetime | date | time):
+        converted = None if pd.isna(value) else value.isoformat()
+    elif isinstance(value, type):
+        # E.g., data types in the data definition's metadata.
+        converted = value.__name__
+    elif pd.api.types.is_scalar(value) and pd.isna(value):
+        converted = None
+    else:
+        raise TypeError(f"Can't serialize {type(value).__name__}: {value!r}")
+
+    return converted
+
+
+def _replace_non_finite(value: Any) -> Any:
+    """Replace NaN and infinite floats, e.g. NumPy's, with None, in nested containers."""
+    if isinstance(value, float):
+        converted = value if math.isfinite(value) else None
+    elif isinstance(value, dict):
+        converted = {key: _replace_non_finite(value=item) for key, item in value.items()}
+    elif isinstance(value, list | tuple):
+        converted = [_replace_non_finite(value=item) for item in value]
+    else:
+        converted = value
+
+    return converted
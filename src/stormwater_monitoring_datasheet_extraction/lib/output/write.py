@@ -0,0 +1,253 @@
+"""Crash-safe output writes.
+
+Readers must never see a half-written file, or a mix of artifacts from different runs:
+
+- `atomic_write` streams a single file to a temporary file beside it, fsyncs it, and
+  atomically renames it into place.
+- `ArtifactSet` writes a run's artifacts, e.g. the JSON document and the run report, into a
+  hidden staging directory, then commits them together by writing a manifest and atomically
+  renaming the staging directory to the run's directory. Each run gets its own directory,
+  named by a unique run ID, so concurrent runs under the same root can't clobber each other.
+
+A run directory without a manifest, or a leftover staging directory, is from a crashed run
+and can be deleted.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import secrets
+import shutil
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Final
+
+from typeguard import typechecked
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME: Final[str] = "manifest.json"
+_STAGING_PREFIX: Final[str] = ".staging-"
+_HASH_CHUNK_BYTES: Final[int] = 1024 * 1024
+
+
+@contextmanager
+@typechecked
+def atomic_write(path: Path) -> Iterator[IO[bytes]]:
+    """Write a file atomically: readers see the old file or the whole new file.
+
+    Args:
+        path: The file to write.
+
+    Yields:
+        A binary file to write to. It's renamed to `path` on exit, unless exiting on an
+        error, in which case it's deleted and `path` is untouched.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, temp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    temp_path = Path(temp_name)
+    try:
+        with os.fdopen(file_descriptor, "wb") as temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    _fsync_dir(path=path.parent)
+
+
+@typechecked
+def get_output_dir(output_dir: Path) -> Path:
+    """Get the root directory to commit runs to.
+
+    Args:
+        output_dir: The output directory. If empty path, defaults to a dated directory in the
+            current working directory.
+
+    Returns:
+        The output directory.
+    """
+    if output_dir == Path():
+        output_dir = Path.cwd() / date.today().isoformat()
+
+    return output_dir
+
+
+@typechecked
+def new_run_id() -> str:
+    """Get a new run ID: a sortable timestamp, unique across concurrent runs.
+
+    Returns:
+        The run ID, e.g. "20250417T144100-3f9a2c1e".
+    """
+    return f"{datetime.now():%Y%m%dT%H%M%S}-{secrets.token_hex(4)}"
+
+
+class ArtifactSet:
+    """A run's output artifacts, committed together under `<output_dir>/<run_id>/`.
+
+    Use as a context manager: write artifacts with `open` or `write_bytes`, and they are
+    committed on exit, or discarded if exiting on an error.
+    """
+
+    @typechecked
+    def __init__(self, output_dir: Path, run_id: str | None = None) -> None:
+        """Initialize the set, and its staging directory.
+
+        Args:
+            output_dir: The root directory to commit the run's directory to.
+            run_id: The run ID, naming the run's directory. If None, a new one.
+
+        Raises:
+            FileExistsError: If the run's directory already exists.
+        """
+        self.run_id = run_id or new_run_id()
+        #: The run's directory, once committed.
+        self.run_dir = output_dir / self.run_id
+        if self.run_dir.exists():
+            raise FileExistsError(f"Run directory already exists: {self.run_dir}")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._staging_dir = Path(
+            tempfile.mkdtemp(dir=output_dir, prefix=f"{_STAGING_PREFIX}{self.run_id}-")
+        )
+        self._names: list[str] = []
+        self._committed = False
+
+    def __enter__(self) -> "ArtifactSet":
+        """Enter the context.
+
+        Returns:
+            The artifact set.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Commit the artifacts, or discard them if exiting on an error."""
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    @contextmanager
+    @typechecked
+    def open(self, name: str) -> Iterator[IO[bytes]]:
+        """Stream an artifact to the staging directory.
+
+        Args:
+            name: The artifact's file name.
+
+        Yields:
+            A binary file to write the artifact to.
+        """
+        staging_path = self._add(name=name)
+        with open(staging_path, "wb") as artifact_file:
+            yield artifact_file
+            artifact_file.flush()
+            os.fsync(artifact_file.fileno())
+
+    @typechecked
+    def write_bytes(self, name: str, data: bytes) -> Path:
+        """Write an artifact.
+
+        Args:
+            name: The artifact's file name.
+            data: The artifact's contents.
+
+        Returns:
+            The artifact's path, once committed.
+        """
+        with self.open(name=name) as artifact_file:
+            artifact_file.write(data)
+
+        return self.run_dir / name
+
+    def commit(self) -> Path:
+        """Write the manifest, and atomically move the artifacts to the run's directory.
+
+        Returns:
+            The run's directory.
+        """
+        if self._committed:
+            return self.run_dir
+
+        manifest = {
+            "run_id": self.run_id,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "artifacts": {name: self._describe(name=name) for name in self._names},
+        }
+        with atomic_write(path=self._staging_dir / MANIFEST_NAME) as manifest_file:
+            manifest_file.write(json.dumps(manifest, indent=2).encode())
+
+        os.rename(self._staging_dir, self.run_dir)
+        _fsync_dir(path=self.run_dir.parent)
+        self._committed = True
+        logger.info(f"Committed {len(self._names)} artifacts to {self.run_dir}")
+
+        return self.run_dir
+
+    def discard(self) -> None:
+        """Delete the staged artifacts, if not committed."""
+        if not self._committed:
+            shutil.rmtree(self._staging_dir, ignore_errors=True)
+
+    def _add(self, name: str) -> Path:
+        """Register an artifact name, and get its staging path."""
+        if name == MANIFEST_NAME or name in self._names or Path(name).name != name:
+            raise ValueError(f"Invalid or duplicate artifact name: {name}")
+        self._names.append(name)
+
+        return self._staging_dir / name
+
+    def _describe(self, name: str) -> dict[str, int | str]:
+        """Get an artifact's size and SHA-256, for the manifest."""
+        path = self._staging_dir / name
+        digest = hashlib.sha256()
+        with open(path, "rb") as artifact_file:
+            while chunk := artifact_file.read(_HASH_CHUNK_BYTES):
+                digest.update(chunk)
+
+        return {"bytes": path.stat().st_size, "sha256": digest.hexdigest()}
+
+
+@typechecked
+def read_manifest(run_dir: Path) -> dict[str, Any]:
+    """Read a committed run's manifest.
+
+    Args:
+        run_dir: The run's directory.
+
+    Returns:
+        The manifest: the run ID, creation time, and each artifact's size and SHA-256.
+
+    Raises:
+        FileNotFoundError: If the run was never committed.
+    """
+    return json.loads((run_dir / MANIFEST_NAME).read_bytes())
+
+
+def _fsync_dir(path: Path) -> None:
+    """Fsync a directory, persisting renames in it. A no-op where unsupported."""
+    try:
+        file_descriptor = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover
+        return
+    try:
+        os.fsync(file_descriptor)
+    except OSError:  # pragma: no cover
+        pass
+    finally:
+        os.close(file_descriptor)
@@ -0,0 +1,168 @@
+"""Profiling ETL runs, by stage.
+
+`profile` runs the pipeline under cProfile, writing `<path>.pstats`, e.g. for `pstats` or
+`snakeviz`. Meanwhile, it samples every thread's stack, writing `<path>.collapsed`: a line
+per distinct stack, with its number of samples, as flamegraph tools (e.g. `flamegraph.pl`,
+speedscope) read them.
+
+Each sampled stack is rooted at the stages the thread is in, per `stage`, so the flamegraph
+has a section per stage: extraction, precleaning, verification, cleaning, restructuring,
+and loading. A stage's section includes the pandera checks of its tables, under pandera's
+frames. Threads in no stage, e.g. validation workers, are rooted at their thread names.
+Each stage's wall time is logged.
+
+cProfile traces only the thread it's enabled in. Work in other threads shows in the
+collapsed stacks only.
+"""
+
+import cProfile
+import logging
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from types import FrameType
+from typing import Any, Final, TypeVar, cast
+
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Each profiled thread's stages, innermost last, by thread ID.
+_STAGES: Final[dict[int, list[str]]] = {}
+# Each stage's wall time, while profiling.
+_STAGE_SECONDS: Final[defaultdict[str, float]] = defaultdict(float)
+_LOCK: Final[threading.Lock] = threading.Lock()
+# Set while profiling.
+_PROFILING: Final[threading.Event] = threading.Event()
+
+
+class _Sampler(threading.Thread):
+    """Samples every other thread's stack, at an interval, until stopped."""
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        #: Seconds between samples.
+        self.interval = interval
+        #: Each collapsed stack's number of samples.
+        self.stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        """Sample until stopped."""
+        while not self._stop_event.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                with _LOCK:
+                    stages = list(_STAGES.get(thread_id, []))
+                roots = stages or [f"thread {thread_names.get(thread_id, thread_id)}"]
+                self.stacks[";".join(roots + _get_stack(frame=frame))] += 1
+
+    def stop(self) -> None:
+        """Stop sampling, once the current sample is taken."""
+        self._stop_event.set()
+        self.join()
+
+
+@contextmanager
+@typechecked
+def profile(path: Path, interval: float = constants.PROFILE_SAMPLE_SECONDS) -> Iterator[None]:
+    """Profile the pipeline run within the context, by stage.
+
+    Writes `<path>.pstats` and `<path>.collapsed`, even if the run fails.
+
+    Args:
+        path: The path of the output files, less their suffixes. Parent directories are
+            created.
+        interval: Seconds between stack samples.
+
+    Yields:
+        None.
+
+    Raises:
+        ValueError: If already profiling.
+    """
+    if _PROFILING.is_set():
+        raise ValueError("Already profiling. Profiles can't be nested.")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _PROFILING.set()
+    _STAGE_SECONDS.clear()
+    profiler = cProfile.Profile()
+    sampler = _Sampler(interval=interval)
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        _PROFILING.clear()
+
+        pstats_path = path.parent / f"{path.name}.pstats"
+        profiler.dump_stats(pstats_path)
+        collapsed_path = path.parent / f"{path.name}.collapsed"
+        collapsed_path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in sampler.stacks.items())
+        )
+        for stage_name, seconds in _STAGE_SECONDS.items():
+            logger.info(f"Profiled {stage_name}: {seconds:.2f}s.")
+        logger.info(f"Wrote profiles to {pstats_path} and {collapsed_path}.")
+
+
+def stage(fx: F) -> F:
+    """Mark a pipeline stage, to section profiles by, named for the function.
+
+    Outside `profile`, calls the function with no overhead to speak of.
+
+    Args:
+        fx: The stage function.
+
+    Returns:
+        The decorated function.
+    """
+    stage_name = fx.__name__
+
+    @wraps(fx)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _PROFILING.is_set():
+            return fx(*args, **kwargs)
+
+        thread_id = threading.get_ident()
+        with _LOCK:
+            _STAGES.setdefault(thread_id, []).append(stage_name)
+        start = time.perf_counter()
+        try:
+            return fx(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            with _LOCK:
+                _STAGE_SECONDS[stage_name] += seconds
+                stages = _STAGES[thread_id]
+                stages.pop()
+                if not stages:
+                    del _STAGES[thread_id]
+
+    return cast("F", wrapper)
+
+
+def _get_stack(frame: FrameType | None) -> list[str]:
+    """Get a frame's stack, outermost first, as `module.function` names."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", code.co_filename)
+        stack.append(f"{module}.{code.co_qualname}".replace(";", ":"))
+        frame = frame.f_back
+
+    return stack[::-1]
@@ -2,9 +2,13 @@
 
 from typing import cast
 
+import numpy as np
 import pandas as pd
 from pandera.typing import Series
 
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation
+from stormwater_monitoring_datasheet_extraction.lib.schema.checks import field_checks
+
 
 def datetime_lt_now(
     df: pd.DataFrame,
@@ -13,7 +17,9 @@ def datetime_lt_now(
     date_format: str,
     time_format: str,
 ) -> Series[bool]:
-    """Checks if each date:time is before now.
+    """Checks if each date:time is before the run's reference time.
+
+    Compares nanoseconds since the epoch, rather than parsing concatenated strings.
 
     Arguments:
         df: The DataFrame containing the date and time columns.
@@ -23,17 +29,17 @@ def datetime_lt_now(
         time_format: The format string for parsing the time.
 
     Returns:
-        A boolean Series indicating whether each date:time is on or before now.
+        A boolean Series indicating whether each date:time is before the reference time.
     """
-    dt_df = df[[date_col, time_col]].copy()
-    dt_df["date_time_series"] = pd.to_datetime(
-        dt_df[date_col] + " " + dt_df[time_col],
-        format=f"{date_format} {time_format}",
-        errors="coerce",
+    dates = field_checks.to_epochs(series=df[date_col], format=date_format)
+    times = field_checks.to_time_offsets(series=df[time_col], format=time_format)
+    is_parsed = (dates != field_checks.NAT) & (times != field_checks.NAT)
+
+    is_valid = pd.Series(
+        is_parsed
+        & (np.where(is_parsed, dates + times, 0) < validation.get_reference_time().value),
+        index=df.index,
     )
-    now = pd.Timestamp.now()
-
-    is_valid = dt_df["date_time_series"] < now
     is_valid = cast("Series[bool]", is_valid)
 
     return is_valid
@@ -1,10 +1,16 @@
 """Schema field checks."""
 
-from typing import cast
+from typing import Final, cast
 
+import numpy as np
 import pandas as pd
 from pandera.typing import Series
 
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation
+
+# The epoch of times parsed without dates.
+_TIME_EPOCH: Final[pd.Timestamp] = pd.Timestamp("1900-01-01")
+
 # TODO: An alternative approach would be to create custom classes for the field types,
 # handle validation in the class constructor, and then coerce the field to the class.
 # This may allow us to generate better error messages, and may be more flexible
@@ -27,10 +33,13 @@ def is_valid_date(series: Series, date_format: str) -> Series[bool]:
     return is_valid
 
 
-def date_le_today(series: Series) -> Series[bool]:
-    """Every date is on or before today."""
-    parsed = pd.to_datetime(series, errors="coerce")
-    is_valid = (parsed.notna()) & (parsed <= pd.Timestamp.today())
+def date_le_today(series: Series, date_format: str) -> Series[bool]:
+    """Every date is on or before the run's reference time."""
+    epochs = to_epochs(series=series, format=date_format)
+    is_valid = pd.Series(
+        (epochs != NAT) & (epochs <= validation.get_reference_time().value),
+        index=series.index,
+    )
     is_valid = cast("Series[bool]", is_valid)
     return is_valid
 
@@ -41,3 +50,37 @@ def is_valid_time(series: Series, format: str) -> Series[bool]:
     is_valid = parsed.notna()
     is_valid = cast("Series[bool]", is_valid)
     return is_valid
+
+
+#: The epoch value of unparsed dates and times.
+NAT: Final[int] = np.iinfo(np.int64).min
+
+
+def to_epochs(series: Series, format: str) -> np.ndarray:
+    """Parse dates, or datetimes, to nanoseconds since the epoch.
+
+    Args:
+        series: The dates.
+        format: The format to parse with.
+
+    Returns:
+        The epoch values, `NAT` where unparsed.
+    """
+    parsed = pd.to_datetime(series, format=format, errors="coerce")
+
+    return parsed.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def to_time_offsets(series: Series, format: str) -> np.ndarray:
+    """Parse times of day to nanoseconds since midnight.
+
+    Args:
+        series: The times.
+        format: The format to parse with.
+
+    Returns:
+        The offsets, `NAT` where unparsed.
+    """
+    epochs = to_epochs(series=series, format=format)
+
+    return np.where(epochs == NAT, NAT, epochs - _TIME_EPOCH.value)
@@ -1,12 +1,16 @@
 """Checks across the whole schema, between tables, e.g. referential integrity."""
 
-import pandera.pandas as pa
+import numpy as np
+import pandas as pd
 import pandera.typing as pt
+from typeguard import typechecked
 
 from stormwater_monitoring_datasheet_extraction.lib import constants, schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.schema import compiled, definition
 
 
-@pa.check_types(with_pydantic=True, lazy=True)
+@compiled.check_types(lazy=True)
 def validate_site_creek_map(
     site_type_map: pt.DataFrame[schema.Site],
     creek_type_map: pt.DataFrame[schema.Creek],
@@ -47,3 +51,155 @@ def validate_site_creek_map(
                 f"{invalid_creek_sites.index.tolist()}"
             )
         raise ValueError("; ".join(error_messages))
+
+
+@typechecked
+def flag_thresholds(
+    observations: pd.DataFrame,
+    site_type_map: pd.DataFrame,
+    creek_type_map: pd.DataFrame,
+    thresholds: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Flag observations outside the normal thresholds for their sites' types.
+
+    Observations of unknown sites, and null values, aren't flagged.
+
+    Args:
+        observations: The quantitative observations.
+        site_type_map: A DataFrame mapping site IDs to their outfall types.
+        creek_type_map: A DataFrame mapping creek site IDs to their creek types.
+        thresholds: The thresholds, per `definition.compile_thresholds`, e.g. of a form
+            version. If None, `definition.get_thresholds()`.
+
+    Returns:
+        Whether each observation is outside each thresholded field's thresholds, indexed
+        like the observations, with a column per thresholded field.
+    """
+    if thresholds is None:
+        thresholds = definition.get_thresholds()
+    site_ids = observations.index.get_level_values(Columns.SITE_ID)
+    site_types = site_type_map.reindex(site_ids)
+    outfall_types = site_types[Columns.OUTFALL_TYPE].astype(object).to_numpy()
+    creek_types = (
+        creek_type_map[Columns.CREEK_TYPE]
+        .reindex(site_types[Columns.CREEK_SITE_ID])
+        .astype(object)
+        .to_numpy()
+    )
+
+    flags = {
+        column: np.zeros(len(observations), dtype=bool)
+        for column in thresholds[Columns.COLUMN].unique()
+    }
+    for threshold in thresholds.itertuples(index=False):
+        applies = outfall_types == threshold.outfall_type
+        if not pd.isna(threshold.creek_type):
+            applies &= creek_types == threshold.creek_type
+        values = observations[threshold.column].to_numpy(dtype=float)
+        bound = (
+            observations[threshold.reference_value].to_numpy(dtype=float)
+            if isinstance(threshold.reference_value, str)
+            else threshold.value
+        )
+        if threshold.bound == Columns.LOWER:
+            outside = values < bound if threshold.inclusive else values <= bound
+        else:
+            outside = values > bound if threshold.inclusive else values >= bound
+        flags[threshold.column] |= applies & outside
+
+    return pd.DataFrame(flags, index=observations.index)
+
+
+@typechecked
+def get_coverage(
+    site_visits: pd.DataFrame,
+    quantitative_observations: pd.DataFrame,
+    qualitative_observations: pd.DataFrame,
+) -> pd.DataFrame:
+    """Get each form's coverage of its sites, across the site visit and observation tables.
+
+    In one pass: the `(form_id, site_id)` keys of all three tables are factorized together
+    into int64 codes, and each status is the set of codes found in a table.
+
+    Args:
+        site_visits: The site visits.
+        quantitative_observations: The quantitative observations.
+        qualitative_observations: The qualitative observations.
+
+    Returns:
+        The coverage matrix, indexed by `form_id` and `site_id`, a row per site in any of the
+        tables, grouped by form, with boolean columns:
+
+        - `visited`: In the site visits.
+        - `wet`: In the quantitative observations.
+        - `dry`: Visited, but not in the quantitative observations.
+        - `qualitative`: In the qualitative observations.
+    """
+    tables = (site_visits, quantitative_observations, qualitative_observations)
+    form_codes, form_ids = pd.factorize(
+        np.concatenate(
+            [table.index.get_level_values(Columns.FORM_ID).astype(object) for table in tables]
+        ),
+        use_na_sentinel=False,
+    )
+    site_codes, site_ids = pd.factorize(
+        np.concatenate(
+            [table.index.get_level_values(Columns.SITE_ID).astype(object) for table in tables]
+        ),
+        use_na_sentinel=False,
+    )
+    n_sites = max(len(site_ids), 1)
+    row_keys = form_codes.astype(np.int64) * n_sites + site_codes
+
+    keys, key_codes = np.unique(row_keys, return_inverse=True)
+    statuses = np.zeros((len(tables), len(keys)), dtype=bool)
+    table_ends = np.cumsum([len(table) for table in tables])
+    for status, table_key_codes in zip(
+        statuses, np.split(key_codes, table_ends[:-1]), strict=True
+    ):
+        status[table_key_codes] = True
+    visited, wet, qualitative = statuses
+
+    return pd.DataFrame(
+        {
+            Columns.VISITED: visited,
+            Columns.WET: wet,
+            Columns.DRY: visited & ~wet,
+            Columns.QUALITATIVE: qualitative,
+        },
+        index=pd.MultiIndex.from_arrays(
+            [form_ids.take(keys // n_sites), site_ids.take(keys % n_sites)],
+            names=[Columns.FORM_ID, Columns.SITE_ID],
+        ),
+    )
+
+
+@typechecked
+def validate_coverage(coverage: pd.DataFrame) -> None:
+    """Validate the observation tables against the site visits, by coverage.
+
+    Checks that quantitative observations are of visited sites, and that qualitative
+    observations are of wet outfalls, i.e. none are of dry outfalls.
+
+    Args:
+        coverage: The coverage matrix, per `get_coverage`.
+
+    Raises:
+        ValueError: If any observations aren't covered.
+    """
+    unvisited = coverage[coverage[Columns.WET] & ~coverage[Columns.VISITED]]
+    not_wet = coverage[coverage[Columns.QUALITATIVE] & ~coverage[Columns.WET]]
+
+    error_messages = []
+    if not unvisited.empty:
+        error_messages.append(
+            f"Quantitative observations of {len(unvisited)} sites not in site visits: "
+            f"{unvisited.index[: constants.N_FAILURE_CASES].tolist()}"
+        )
+    if not not_wet.empty:
+        error_messages.append(
+            f"Qualitative observations of {len(not_wet)} dry outfalls or unobserved sites: "
+            f"{not_wet.index[: constants.N_FAILURE_CASES].tolist()}"
+        )
+    if error_messages:
+        raise ValueError("; ".join(error_messages))
@@ -0,0 +1,192 @@
+"""Compiled validation: schemas and argument validators built once per process.
+
+Out of the box, pandera builds a model's `DataFrameSchema` on first use in each thread,
+resolving its dtypes (e.g., the `Annotated[pd.CategoricalDtype, tuple(enum), ...]`
+categories) and binding its checks. And, `pa.check_types(with_pydantic=True)` builds a
+pydantic model of the decorated function's signature on every call. That's a few
+milliseconds per call, paid per chunk or per form in streaming, and again in every worker
+thread in watch mode.
+
+Here, instead:
+
+- `shared_schema` marks a model hierarchy so that each model's schema is built once per
+  process, on first use or eagerly with `compile_schemas`, and shared by all lookups,
+  including pandera's own. Pandera mutates a schema's components while validating, and
+  restores them after, so a schema can't be validated against in two threads at once.
+  Each thread gets its own copy of the built schema, on its first lookup, which is a
+  fraction of the cost of building it. Shared schemas must not otherwise be modified in
+  place. Their composite keys are checked on factorized codes, per `keys`, and their rows
+  per their forms' versions, per `versions`.
+- `validate_arguments` builds a function's pydantic argument validator once, at decoration,
+  and `check_return` validates its return against the shared schemas. `check_types` puts
+  them together, in place of `pa.check_types(with_pydantic=True)`, raising the same errors.
+"""
+
+import copy
+import threading
+import warnings
+from collections.abc import Callable, Iterator
+from functools import wraps
+from inspect import getattr_static
+from typing import Any, Final, TypeVar, cast
+
+import pandera.pandas as pa
+import pydantic
+from pydantic.warnings import PydanticDeprecatedSince20
+
+from stormwater_monitoring_datasheet_extraction.lib.schema import keys, versions
+
+F = TypeVar("F", bound=Callable[..., Any])
+M = TypeVar("M", bound=type[pa.DataFrameModel])
+
+# Pandera's per-thread schema descriptor, to build with.
+_BUILD_SCHEMA: Final[Any] = getattr_static(pa.DataFrameModel, "__schema__")
+# Reentrant, as building a model's schema may look up its parent's.
+_LOCK: Final[threading.RLock] = threading.RLock()
+# Each model's schema, as built, to copy per thread. Never validated against.
+_SCHEMAS: Final[dict[type[pa.DataFrameModel], pa.DataFrameSchema]] = {}
+# Each thread's copies of the built schemas, in `schemas`.
+_THREAD_SCHEMAS: Final[threading.local] = threading.local()
+_ROOT_MODELS: Final[list[type[pa.DataFrameModel]]] = []
+
+
+class _SharedSchemaDescriptor:
+    """Gets a model's shared schema, in place of pandera's per-thread descriptor."""
+
+    def __get__(self, obj: Any, cls: type[pa.DataFrameModel]) -> pa.DataFrameSchema:
+        return get_schema(model=cls)
+
+
+def shared_schema(model: M) -> M:
+    """Build the model's schema, and its subclasses' schemas, once for all threads.
+
+    Decorate the root model of a hierarchy.
+
+    Args:
+        model: The root model.
+
+    Returns:
+        The model.
+    """
+    model.__schema__ = _SharedSchemaDescriptor()
+    _ROOT_MODELS.append(model)
+
+    return model
+
+
+def get_schema(model: type[pa.DataFrameModel]) -> pa.DataFrameSchema:
+    """Get this thread's copy of the model's schema.
+
+    Builds the schema if not yet built in this process, and copies it if not yet copied in
+    this thread.
+
+    Args:
+        model: The model.
+
+    Returns:
+        The shared schema, for this thread.
+    """
+    thread_schemas = getattr(_THREAD_SCHEMAS, "schemas", None)
+    if thread_schemas is None:
+        thread_schemas = _THREAD_SCHEMAS.schemas = {}
+    schema = thread_schemas.get(model)
+    if schema is None:
+        schema = copy.deepcopy(_build_schema(model=model))
+        thread_schemas[model] = schema
+
+    return schema
+
+
+def compile_schemas() -> int:
+    """Build the schemas of all shared models now, rather than on first use.
+
+    Returns:
+        The number of models.
+    """
+    models = list(dict.fromkeys(_iter_models(models=_ROOT_MODELS)))
+    for model in models:
+        _build_schema(model=model)
+
+    return len(models)
+
+
+def validate_arguments(fx: F) -> F:
+    """Validate a function's annotated arguments with pydantic.
+
+    As `pa.check_types(with_pydantic=True)` does, but with the validator built once.
+
+    Args:
+        fx: The function to decorate.
+
+    Returns:
+        The decorated function.
+    """
+    # Pandera uses the same (deprecated) decorator, so the errors are the same.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=PydanticDeprecatedSince20)
+        validated_fx = pydantic.validate_arguments(fx)
+
+    return cast("F", wraps(fx)(validated_fx))
+
+
+def check_return(fx: F, lazy: bool) -> F:
+    """Validate a function's annotated return with pandera.
+
+    Args:
+        fx: The function to decorate.
+        lazy: Whether to collect all failure cases before raising.
+
+    Returns:
+        The decorated function.
+    """
+
+    def return_only(*args: Any, **kwargs: Any) -> Any:
+        return fx(*args, **kwargs)
+
+    # So pandera checks only the return, not the arguments again.
+    return_only.__annotations__ = {
+        key: value for key, value in fx.__annotations__.items() if key == "return"
+    }
+
+    return cast("F", wraps(fx)(pa.check_types(return_only, lazy=lazy)))
+
+
+def check_types(lazy: bool = True) -> Callable[[F], F]:
+    """Validate a function's annotated inputs and outputs.
+
+    Stands in for `pa.check_types(with_pydantic=True, lazy=lazy)`.
+
+    Args:
+        lazy: Whether to collect all failure cases of the output before raising.
+
+    Returns:
+        The decorator.
+    """
+
+    def decorator(fx: F) -> F:
+        return check_return(fx=validate_arguments(fx=fx), lazy=lazy)
+
+    return decorator
+
+
+def _build_schema(model: type[pa.DataFrameModel]) -> pa.DataFrameSchema:
+    """Get the model's schema as built, building it if not yet built in this process."""
+    schema = _SCHEMAS.get(model)
+    if schema is None:
+        with _LOCK:
+            schema = _SCHEMAS.get(model)
+            if schema is None:
+                schema = keys.use_factorized_keys(schema=_BUILD_SCHEMA.__get__(None, model))
+                schema = versions.use_versions(schema=schema, model=model)
+                _SCHEMAS[model] = schema
+
+    return schema
+
+
+def _iter_models(
+    models: list[type[pa.DataFrameModel]],
+) -> Iterator[type[pa.DataFrameModel]]:
+    """Iterate over the models and their subclasses, depth first."""
+    for model in models:
+        yield model
+        yield from _iter_models(models=model.__subclasses__())
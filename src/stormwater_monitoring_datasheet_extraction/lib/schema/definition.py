@@ -0,0 +1,378 @@
+"""The data definition, compiled once for the schemas, precleaning, and thresholds.
+
+`constants.FIELD_DATA_DEFINITION` is the source of truth for each field's data type,
+options, units, format, absolute limits, and normal thresholds by site type. It's nested to
+mirror the extraction documents, which is handy to read but slow to look things up in
+repeatedly. So, it's compiled once, on first use, to:
+
+- `FieldDefinition`s by column, from which the schemas take their options (for categorical
+  dtypes), limits (as pandera `Field` kwargs), and formats.
+- A threshold table, one row per bound by site type, for `relational.flag_thresholds`.
+- Normalizers by column, for precleaning.
+
+The stage schemas themselves remain hand-written: keys, nullability, and strictness by stage
+aren't part of the data definition.
+"""
+
+from collections.abc import Callable
+from enum import Enum
+from functools import cache
+from typing import Any, Final, NamedTuple
+
+import pandas as pd
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    FIELD_DATA_DEFINITION,
+    Columns,
+)
+
+#: The threshold table's columns.
+THRESHOLD_COLUMNS: Final[list[str]] = [
+    Columns.COLUMN,
+    Columns.OUTFALL_TYPE,
+    Columns.CREEK_TYPE,
+    Columns.BOUND,
+    Columns.VALUE,
+    Columns.REFERENCE_VALUE,
+    Columns.INCLUSIVE,
+]
+
+
+class Bound(NamedTuple):
+    """A lower or upper bound on a field."""
+
+    #: The bound, if fixed.
+    value: float | None
+    #: The column holding the bound, if relative to another field.
+    reference_value: str | None
+    #: Whether values equal to the bound are within it.
+    inclusive: bool
+
+
+class FieldDefinition(NamedTuple):
+    """A field, as defined by the data definition."""
+
+    #: The column name.
+    name: str
+    #: The data type, e.g. `str`, `float`, or an enum.
+    data_type: type
+    #: The options, if an enumerated field.
+    options: tuple[Any, ...] | None
+    #: The units, if any.
+    units: str | None
+    #: The format, if any.
+    format: str | None
+    #: The absolute lower limit, if any.
+    lower: Bound | None
+    #: The absolute upper limit, if any.
+    upper: Bound | None
+
+
+@cache
+@typechecked
+def get_field_definitions() -> dict[str, FieldDefinition]:
+    """Get every field's definition.
+
+    Compiled once, on first use.
+
+    Returns:
+        Field definitions by column name.
+    """
+    return compile_fields(metadata=FIELD_DATA_DEFINITION[Columns.METADATA])
+
+
+@typechecked
+def compile_fields(metadata: dict[str, Any]) -> dict[str, FieldDefinition]:
+    """Compile field definitions, e.g. of a versioned definition.
+
+    Args:
+        metadata: The definition's metadata, shaped like `FIELD_DATA_DEFINITION[METADATA]`.
+
+    Returns:
+        Field definitions by column name.
+    """
+    form = FIELD_DATA_DEFINITION[Columns.FORMS][Columns.FORM_ID]
+    observation = form[Columns.OBSERVATIONS][0]
+    observation_types = tuple(
+        key for key, value in observation.items() if isinstance(value, dict)
+    )
+
+    data_types = {
+        Columns.FORM_ID: metadata[Columns.FORM_ID][Columns.DATA_TYPE],
+        **{
+            column: data_type
+            for column, data_type in form.items()
+            if column not in (Columns.INVESTIGATORS, Columns.OBSERVATIONS)
+        },
+        Columns.INVESTIGATOR: metadata[Columns.INVESTIGATORS][Columns.INVESTIGATOR],
+        **form[Columns.INVESTIGATORS][Columns.INVESTIGATOR],
+        **{
+            column: data_type
+            for column, data_type in observation.items()
+            if column not in observation_types
+        },
+        Columns.OBSERVATION_TYPE: type(observation_types[0]),
+        **observation[observation_types[0]],
+    }
+    field_metadata = {
+        **{
+            column: field
+            for column, field in metadata.items()
+            if column not in (Columns.INVESTIGATORS, Columns.OBSERVATIONS)
+        },
+        **{
+            column: field
+            for column, field in metadata[Columns.INVESTIGATORS].items()
+            if isinstance(field, dict)
+        },
+        **{
+            column: field
+            for column, field in metadata[Columns.OBSERVATIONS].items()
+            if column not in observation_types
+        },
+        Columns.OBSERVATION_TYPE: {Columns.OPTIONS: list(observation_types)},
+        **metadata[Columns.OBSERVATIONS][observation_types[0]],
+    }
+    # Fields not in the form structure, e.g. added by a form version, give their types.
+    data_types.update(
+        {
+            column: field[Columns.DATA_TYPE]
+            for column, field in field_metadata.items()
+            if column not in data_types
+            and isinstance(field, dict)
+            and Columns.DATA_TYPE in field
+        }
+    )
+
+    return {
+        column: _compile_field(
+            name=column, data_type=data_type, field=field_metadata.get(column, {})
+        )
+        for column, data_type in data_types.items()
+    }
+
+
+@typechecked
+def get_field(column: str) -> FieldDefinition:
+    """Get a field's definition.
+
+    Args:
+        column: The column name.
+
+    Returns:
+        The field definition.
+    """
+    return get_field_definitions()[column]
+
+
+@typechecked
+def get_options(column: str) -> tuple[Any, ...]:
+    """Get an enumerated field's options, e.g. for a categorical dtype.
+
+    Args:
+        column: The column name.
+
+    Returns:
+        The options.
+
+    Raises:
+        ValueError: If the field isn't enumerated.
+    """
+    options = get_field(column=column).options
+    if options is None:
+        raise ValueError(f"{column} has no options.")
+
+    return options
+
+
+@typechecked
+def get_limits(column: str) -> dict[str, float]:
+    """Get a field's absolute limits, as pandera `Field` kwargs.
+
+    Args:
+        column: The column name.
+
+    Returns:
+        `ge` or `gt`, and `le` or `lt`, per each limit's inclusivity. Empty if unlimited.
+    """
+    return get_field_limits(field=get_field(column=column))
+
+
+@typechecked
+def get_field_limits(field: FieldDefinition) -> dict[str, float]:
+    """Get a field definition's absolute limits, as pandera `Field` kwargs.
+
+    Args:
+        field: The field definition.
+
+    Returns:
+        Per `get_limits`.
+    """
+    limits = {}
+    if field.lower is not None and field.lower.value is not None:
+        limits["ge" if field.lower.inclusive else "gt"] = field.lower.value
+    if field.upper is not None and field.upper.value is not None:
+        limits["le" if field.upper.inclusive else "lt"] = field.upper.value
+
+    return limits
+
+
+@cache
+@typechecked
+def get_thresholds() -> pd.DataFrame:
+    """Get the normal thresholds by site type.
+
+    Compiled once, on first use. Shared, so don't modify it.
+
+    Returns:
+        The thresholds, per `compile_thresholds`.
+    """
+    return compile_thresholds(metadata=FIELD_DATA_DEFINITION[Columns.METADATA])
+
+
+@typechecked
+def compile_thresholds(metadata: dict[str, Any]) -> pd.DataFrame:
+    """Compile the normal thresholds by site type, e.g. of a versioned definition.
+
+    Descriptive thresholds, e.g. for qualitative observations, are left out.
+
+    Args:
+        metadata: The definition's metadata, shaped like `FIELD_DATA_DEFINITION[METADATA]`.
+
+    Returns:
+        One row per bound: the column, outfall type, creek type (null if for all creek
+        types), "lower" or "upper", and the fixed value or reference column, and
+        inclusivity. Columns per `THRESHOLD_COLUMNS`.
+    """
+    rows = []
+    observations = metadata[Columns.OBSERVATIONS]
+    for column, field in observations.items():
+        for outfall_type, thresholds in field.get(Columns.THRESHOLDS, {}).items():
+            if not isinstance(thresholds, dict):
+                continue
+            by_creek_type = (
+                {None: thresholds}
+                if thresholds.keys() <= {Columns.LOWER, Columns.UPPER}
+                else thresholds
+            )
+            for creek_type, bounds in by_creek_type.items():
+                for bound_name in (Columns.LOWER, Columns.UPPER):
+                    if bound_name in bounds:
+                        bound = _compile_bound(bound=bounds[bound_name])
+                        rows.append((column, outfall_type, creek_type, bound_name, *bound))
+
+    return pd.DataFrame(rows, columns=THRESHOLD_COLUMNS)
+
+
+@cache
+@typechecked
+def get_normalizers() -> dict[str, Callable[[pd.Series], pd.Series]]:
+    """Get precleaning normalizers for the text fields.
+
+    Compiled once, on first use. Text is stripped of surrounding whitespace, and options
+    are matched case-insensitively to their defined values. Non-text values are left as
+    they are, for the schemas to flag.
+
+    Returns:
+        Normalizers by column name.
+    """
+    return compile_normalizers(fields=get_field_definitions())
+
+
+@typechecked
+def compile_normalizers(
+    fields: dict[str, FieldDefinition],
+) -> dict[str, Callable[[pd.Series], pd.Series]]:
+    """Compile precleaning normalizers, e.g. of a versioned definition.
+
+    Args:
+        fields: Field definitions by column name.
+
+    Returns:
+        Normalizers by column name, per `get_normalizers`.
+    """
+    normalizers = {}
+    for column, field in fields.items():
+        if field.options is not None and all(
+            isinstance(option, str) for option in field.options
+        ):
+            normalizers[column] = _OptionsNormalizer(options=field.options)
+        elif field.data_type is str:
+            normalizers[column] = _strip
+
+    return normalizers
+
+
+@typechecked
+def normalize(
+    df: pd.DataFrame, normalizers: dict[str, Callable[[pd.Series], pd.Series]] | None = None
+) -> pd.DataFrame:
+    """Normalize a table's text fields, including its index levels.
+
+    Args:
+        df: The table.
+        normalizers: Normalizers by column name. If None, `get_normalizers()`.
+
+    Returns:
+        A normalized copy of the table.
+    """
+    if normalizers is None:
+        normalizers = get_normalizers()
+    index_names = [name for name in df.index.names if name is not None]
+    normalized = df.reset_index() if index_names else df.copy()
+    for column in normalized.columns:
+        if column in normalizers:
+            normalized[column] = normalizers[column](normalized[column])
+
+    return normalized.set_index(index_names) if index_names else normalized
+
+
+class _OptionsNormalizer:
+    """Strips text, and matches it case-insensitively to the options."""
+
+    def __init__(self, options: tuple[Any, ...]) -> None:
+        self._options = {str(option).casefold(): option for option in options}
+
+    def __call__(self, series: pd.Series) -> pd.Series:
+        stripped = _strip(series=series)
+        if not pd.api.types.is_object_dtype(stripped):
+            return stripped
+        matched = stripped.str.casefold().map(self._options)
+
+        return matched.where(matched.notna(), stripped)
+
+
+def _strip(series: pd.Series) -> pd.Series:
+    """Strip text of surrounding whitespace, leaving other values as they are."""
+    if not pd.api.types.is_object_dtype(series):
+        return series
+    stripped = series.str.strip()
+
+    return stripped.where(stripped.notna(), series)
+
+
+def _compile_field(name: str, data_type: type, field: dict[str, Any]) -> FieldDefinition:
+    """Compile a field's definition."""
+    options = field.get(Columns.OPTIONS)
+    if options is None and isinstance(data_type, type) and issubclass(data_type, Enum):
+        options = list(data_type)
+
+    return FieldDefinition(
+        name=name,
+        data_type=data_type,
+        options=None if options is None else tuple(options),
+        units=field.get(Columns.UNITS),
+        format=field.get(Columns.FORMAT),
+        lower=_compile_bound(bound=field[Columns.LOWER]) if Columns.LOWER in field else None,
+        upper=_compile_bound(bound=field[Columns.UPPER]) if Columns.UPPER in field else None,
+    )
+
+
+def _compile_bound(bound: dict[str, Any]) -> Bound:
+    """Compile a bound."""
+    return Bound(
+        value=bound.get(Columns.VALUE),
+        reference_value=bound.get(Columns.REFERENCE_VALUE),
+        inclusive=bound[Columns.INCLUSIVE],
+    )
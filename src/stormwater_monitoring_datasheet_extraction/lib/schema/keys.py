@@ -0,0 +1,226 @@
+"""Composite-key uniqueness on integer codes.
+
+The stage schemas' primary keys are composite, e.g. `[form_id, site_id]`, and pandera checks
+their uniqueness by rebuilding a MultiIndex of the key levels and hashing its tuples. The
+`bottle_no_unique_by_form_id` check did the same after `reset_index()`, copying the whole
+frame. At scale, that's most of the cost of checking keys.
+
+Here, instead, each key level is factorized to integer codes once (a MultiIndex already
+holds its levels' codes, so index levels are free), the codes are combined into a single
+int64 key, and duplicates are found by sorting the keys with NumPy. `KeyEncoder` does the
+same across a table's batches, e.g. read out of core.
+
+`use_factorized_keys` has a schema's `multiindex_unique` checked this way, raising the same
+errors as pandera. `compiled.get_schema` applies it to every shared schema.
+"""
+
+from collections.abc import Sequence
+from typing import Final
+
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+from pandera.api.base.error_handler import ErrorHandler
+from pandera.backends.pandas.components import MultiIndexBackend
+from pandera.backends.pandas.error_formatters import reshape_failure_cases
+from pandera.errors import SchemaError, SchemaErrorReason
+
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+
+# The largest number of distinct combined keys that fits in an int64.
+_MAX_KEYS: Final[int] = np.iinfo(np.int64).max
+
+
+def get_codes(df: pd.DataFrame | pd.Index, key: str) -> tuple[np.ndarray, int]:
+    """Get a key level's integer codes.
+
+    Args:
+        df: The table, or its index.
+        key: The index level or column.
+
+    Returns:
+        The codes, from 0, with -1 for nulls, and the number of distinct codes, at most.
+    """
+    index = df if isinstance(df, pd.Index) else df.index
+    if isinstance(index, pd.MultiIndex) and key in index.names:
+        level = index.names.index(key)
+        return np.asarray(index.codes[level]), len(index.levels[level])
+
+    values = index if key in index.names else df[key]
+    codes, uniques = pd.factorize(values)
+
+    return codes, len(uniques)
+
+
+def get_key(df: pd.DataFrame | pd.Index, keys: Sequence[str]) -> np.ndarray:
+    """Get each row's composite key, as a single int64.
+
+    Args:
+        df: The table, or its index.
+        keys: The index levels and columns of the key.
+
+    Returns:
+        The keys, equal where the rows' key values are, with nulls equal to each other.
+    """
+    key = np.zeros(len(df), dtype=np.int64)
+    n_keys = 1
+    for level in keys:
+        codes, n_codes = get_codes(df=df, key=level)
+        # Nulls (-1) are shifted to 0.
+        n_codes += 1
+        if n_keys * n_codes > _MAX_KEYS:
+            # Renumber the keys so far, densely, to make room.
+            key, uniques = pd.factorize(key)
+            key = key.astype(np.int64)
+            n_keys = len(uniques)
+        key = key * n_codes + codes + 1
+        n_keys *= n_codes
+
+    return key
+
+
+def duplicated(df: pd.DataFrame | pd.Index, keys: Sequence[str]) -> np.ndarray:
+    """Flag rows repeating an earlier row's composite key.
+
+    As `df.reset_index().duplicated(subset=keys, keep="first")` does.
+
+    Args:
+        df: The table, or its index.
+        keys: The index levels and columns of the key.
+
+    Returns:
+        Whether each row's key is a repeat.
+    """
+    key = get_key(df=df, keys=keys)
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+    is_duplicated = np.zeros(len(key), dtype=bool)
+    is_duplicated[order[1:]] = sorted_key[1:] == sorted_key[:-1]
+
+    return is_duplicated
+
+
+class KeyEncoder:
+    """Encodes composite keys as int64s, consistently across a table's batches.
+
+    As `get_key`, but each key level's values keep their codes from batch to batch, so the
+    keys of different batches compare. Each level gets an equal share of the int64's bits.
+    """
+
+    def __init__(self, keys: Sequence[str]) -> None:
+        """Initialize the encoder.
+
+        Args:
+            keys: The index levels and columns of the key.
+        """
+        self._keys = tuple(keys)
+        self._bits = _MAX_KEYS.bit_length() // max(1, len(self._keys))
+        #: Each level's values seen so far, by code.
+        self._uniques = [pd.Index([], dtype=object) for _ in self._keys]
+
+    def encode(self, df: pd.DataFrame | pd.Index) -> np.ndarray:
+        """Get each row's composite key, as a single int64.
+
+        Args:
+            df: The batch, or its index.
+
+        Returns:
+            The keys, equal where the rows' key values are, in this batch or any other
+            encoded, with nulls equal to each other.
+
+        Raises:
+            ValueError: If a key level has more distinct values than its bits can code.
+        """
+        index = df if isinstance(df, pd.Index) else df.index
+        key = np.zeros(len(df), dtype=np.int64)
+        for i, level in enumerate(self._keys):
+            values = index.get_level_values(level) if level in index.names else df[level]
+            codes, batch_uniques = pd.factorize(values)
+            batch_uniques = pd.Index(batch_uniques, dtype=object)
+            level_codes = self._uniques[i].get_indexer(batch_uniques)
+            is_new = level_codes == -1
+            if is_new.any():
+                level_codes[is_new] = len(self._uniques[i]) + np.arange(is_new.sum())
+                self._uniques[i] = self._uniques[i].append(batch_uniques[is_new])
+                # Nulls are coded 0, so values from 1.
+                if len(self._uniques[i]) >= 1 << self._bits:
+                    raise ValueError(
+                        f"Too many distinct values of key level {level} to encode: "
+                        f"{len(self._uniques[i])}."
+                    )
+            # Nulls (-1) index the appended -1, and are shifted to 0.
+            level_codes = np.append(level_codes, -1)[codes] + 1
+            key = (key << self._bits) | level_codes
+
+        return key
+
+
+class MultiIndex(pa.MultiIndex):
+    """A MultiIndex schema checking `multiindex_unique` on factorized keys.
+
+    Named as pandera's, as errors report the schema's class name.
+    """
+
+
+class _FactorizedKeysMultiIndexBackend(schema_utils.CompactErrorsMixin, MultiIndexBackend):
+    """Pandera's MultiIndex backend, checking `multiindex_unique` on factorized keys.
+
+    Its lazy errors are compact within `schema_utils.schema_error_handler`.
+    """
+
+    def _check_unique(
+        self,
+        check_obj: pd.MultiIndex,
+        schema: pa.MultiIndex,
+        error_handler: ErrorHandler,
+    ) -> None:
+        """Check the key levels are unique together, raising pandera's error if not."""
+        if not isinstance(schema.unique, list) or not all(
+            level in check_obj.names for level in schema.unique
+        ):
+            super()._check_unique(
+                check_obj=check_obj, schema=schema, error_handler=error_handler
+            )
+            return
+
+        is_duplicated = duplicated(df=check_obj, keys=schema.unique)
+        if not is_duplicated.any():
+            return
+
+        failure_cases_df = pd.DataFrame(
+            {
+                level: check_obj.get_level_values(level)[is_duplicated]
+                for level in schema.unique
+            }
+        )
+        self._collect_or_raise(
+            error_handler,
+            SchemaError(
+                schema=schema,
+                data=check_obj,
+                message=f"levels '{(*schema.unique,)}' not unique:\n{failure_cases_df}",
+                failure_cases=reshape_failure_cases(failure_cases_df),
+                check="multiindex_unique",
+                reason_code=SchemaErrorReason.SCHEMA_COMPONENT_CHECK,
+            ),
+            schema,
+        )
+
+
+for _type in (pd.DataFrame, pd.Series, pd.MultiIndex):
+    MultiIndex.register_backend(_type, _FactorizedKeysMultiIndexBackend)
+
+
+def use_factorized_keys(schema: pa.DataFrameSchema) -> pa.DataFrameSchema:
+    """Check a schema's `multiindex_unique` on factorized keys.
+
+    Args:
+        schema: The schema, modified in place.
+
+    Returns:
+        The schema.
+    """
+    if isinstance(schema.index, pa.MultiIndex) and schema.index.unique:
+        schema.index.__class__ = MultiIndex
+
+    return schema
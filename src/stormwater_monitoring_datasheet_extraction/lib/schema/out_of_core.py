@@ -0,0 +1,399 @@
+"""Out-of-core validation of large tables, from Parquet, in bounded memory.
+
+Reprocessing years of archived sheets can make tables too large to validate as whole
+in-memory frames. Here, a table is read from Parquet in batches (requires `pyarrow`, the
+`parquet` extra), and validated against its stage schema in two parts:
+
+- Row-local checks (dtypes, ranges, formats, options, `str_length`, and the like) run
+  batch by batch, against the stage schema less its cross-row checks.
+- Cross-row checks run over the stream: key uniqueness (e.g. the primary key's
+  `multiindex_unique`) and the dataframe checks listed in `UNIQUE_CHECKS` (e.g.
+  `bottle_no_unique_by_form_id`) encode each batch's keys as int64s (see
+  `keys.KeyEncoder`), and look them up in a sorted array of the keys seen so far.
+
+So, memory is bounded by the batch size, plus the keys seen, at 16 bytes each. Lazily,
+every batch's and every cross-row check's failure cases are collected into one
+`SchemaErrors`, with as many failure cases per check and column as validating the table in
+memory would find. Otherwise, the first error is raised.
+
+Row-local failure cases are indexed by row label, as in memory. Cross-row failure cases are
+indexed by row number in the file, unlike in memory, as the rows a later batch repeats are
+no longer at hand to label. Under `ValidationProfile.FAST`, the dataframe checks in
+`UNIQUE_CHECKS`, being expensive, are skipped, as in memory.
+"""
+
+import copy
+import logging
+from collections.abc import Iterator
+from functools import cache
+from pathlib import Path
+from typing import Final, NamedTuple
+
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+from pandera.errors import SchemaError, SchemaErrorReason, SchemaErrors
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    ValidationProfile,
+)
+from stormwater_monitoring_datasheet_extraction.lib.schema import compiled, keys
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pq = None
+    logger.debug("`pyarrow` not installed. Tables can't be validated from Parquet.")
+
+#: Dataframe checks that only flag rows repeating earlier rows' keys, by name, with the
+#: key columns, as `duplicated(subset=keys, keep="first")` would.
+UNIQUE_CHECKS: Final[dict[str, tuple[str, ...]]] = {
+    "bottle_no_unique_by_form_id": (Columns.FORM_ID, Columns.BACTERIA_BOTTLE_NO),
+}
+
+
+class _UniqueConstraint(NamedTuple):
+    """A cross-row uniqueness constraint, checked over the stream."""
+
+    #: The check name, as pandera reports it.
+    name: str
+    #: The key columns, or index levels.
+    keys: tuple[str, ...]
+    #: Whether to flag every row of a duplicated key, as pandera's column and dataframe
+    #: `unique` do, or only the repeats, as its `multiindex_unique` and `UNIQUE_CHECKS` do.
+    report_all: bool
+    #: Whether the keys are index levels, reported per level, as pandera does.
+    is_index: bool
+
+
+class _SeenKeys:
+    """A constraint's keys seen so far, sorted, with each one's first row number."""
+
+    def __init__(self, constraint: _UniqueConstraint) -> None:
+        """Initialize with no keys seen.
+
+        Args:
+            constraint: The constraint.
+        """
+        self.encoder = keys.KeyEncoder(keys=constraint.keys)
+        #: The keys seen, sorted.
+        self.keys = np.empty(0, dtype=np.int64)
+        #: The row number of each key's first row, or -1 once it's flagged.
+        self.first_rows = np.empty(0, dtype=np.int64)
+
+
+@typechecked
+def validate_parquet(
+    path: Path,
+    model: type[pa.DataFrameModel],
+    batch_size: int = constants.PARQUET_BATCH_SIZE,
+) -> int:
+    """Validate a table in a Parquet file against a stage model, batch by batch.
+
+    Per the active validation profile.
+
+    Args:
+        path: The Parquet file, e.g. as written by `pd.DataFrame.to_parquet`, with the
+            model's index levels as columns or as the pandas index.
+        model: The stage model.
+        batch_size: The number of rows to read and validate at a time.
+
+    Returns:
+        The number of rows.
+
+    Raises:
+        ValueError: If `pyarrow` isn't installed.
+        SchemaError: If the table is invalid, under `ValidationProfile.FAST`.
+        SchemaErrors: If the table is invalid, under `ValidationProfile.FULL`.
+    """
+    if pq is None:
+        raise ValueError(
+            "Validating Parquet requires `pyarrow`. Install the `parquet` extra."
+        )
+
+    profile = validation.get_validation_profile()
+    lazy = profile == ValidationProfile.FULL
+    schema = compiled.get_schema(model=model)
+    row_local_schema = get_row_local_schema(model=model)
+    constraints = [
+        constraint
+        for constraint in get_unique_constraints(model=model)
+        if constraint.name not in UNIQUE_CHECKS or profile != ValidationProfile.FAST
+    ]
+    seen_keys = [_SeenKeys(constraint=constraint) for constraint in constraints]
+
+    batch_errors: list[SchemaErrors] = []
+    flagged: list[list[tuple[int, tuple]]] = [[] for _ in constraints]
+    n_rows = 0
+    for batch in _iter_batches(path=path, schema=schema, batch_size=batch_size):
+        if profile != ValidationProfile.OFF:
+            try:
+                row_local_schema.validate(batch, lazy=lazy)
+            except SchemaErrors as e:
+                batch_errors.append(e)
+
+            for i, constraint in enumerate(constraints):
+                batch_flagged = _flag_duplicates(
+                    batch=batch,
+                    constraint=constraint,
+                    seen_keys=seen_keys[i],
+                    offset=n_rows,
+                )
+                if batch_flagged and not lazy:
+                    raise _get_unique_error(
+                        schema=schema, constraint=constraint, flagged=batch_flagged[:1]
+                    )
+                flagged[i].extend(batch_flagged)
+        n_rows += len(batch)
+
+    unique_errors = [
+        _get_unique_error(schema=schema, constraint=constraint, flagged=constraint_flagged)
+        for constraint, constraint_flagged in zip(constraints, flagged, strict=True)
+        if constraint_flagged
+    ]
+    if batch_errors or unique_errors:
+        data = pd.DataFrame()
+        schema_errors = (
+            schema_utils.merge_schema_errors(
+                schema=schema, errors=batch_errors, data=data
+            ).schema_errors
+            if batch_errors
+            else []
+        )
+        raise SchemaErrors(
+            schema=schema, schema_errors=schema_errors + unique_errors, data=data
+        )
+
+    return n_rows
+
+
+@cache
+def get_row_local_schema(model: type[pa.DataFrameModel]) -> pa.DataFrameSchema:
+    """Get a stage schema less its cross-row checks, to validate batch by batch.
+
+    Built once per process.
+
+    Args:
+        model: The stage model.
+
+    Returns:
+        The schema, less key uniqueness and the dataframe checks in `UNIQUE_CHECKS`.
+    """
+    row_local_schema = copy.deepcopy(compiled.get_schema(model=model))
+    row_local_schema.unique = None
+    if row_local_schema.index is not None:
+        row_local_schema.index.unique = None if _is_multiindex(row_local_schema) else False
+    for column in row_local_schema.columns.values():
+        column.unique = False
+    row_local_schema.checks = [
+        check for check in row_local_schema.checks if check.name not in UNIQUE_CHECKS
+    ]
+
+    return row_local_schema
+
+
+@cache
+def get_unique_constraints(model: type[pa.DataFrameModel]) -> list[_UniqueConstraint]:
+    """Get a stage schema's cross-row uniqueness constraints.
+
+    Args:
+        model: The stage model.
+
+    Returns:
+        Key uniqueness of the index, columns, and column sets, and the dataframe checks in
+        `UNIQUE_CHECKS`.
+    """
+    schema = compiled.get_schema(model=model)
+    constraints = []
+    if schema.index is not None and schema.index.unique:
+        if _is_multiindex(schema):
+            constraints.append(
+                _UniqueConstraint(
+                    name="multiindex_unique",
+                    keys=tuple(schema.index.unique),
+                    # Like pandera, flag only repeats of a key, not its first row.
+                    report_all=False,
+                    is_index=True,
+                )
+            )
+        else:
+            constraints.append(
+                _UniqueConstraint(
+                    name="field_uniqueness",
+                    keys=(schema.index.name,),
+                    report_all=True,
+                    is_index=True,
+                )
+            )
+    if schema.unique:
+        keys = (schema.unique,) if isinstance(schema.unique, str) else tuple(schema.unique)
+        constraints.append(
+            _UniqueConstraint(name="unique", keys=keys, report_all=True, is_index=False)
+        )
+    constraints.extend(
+        _UniqueConstraint(
+            name="field_uniqueness", keys=(column_name,), report_all=True, is_index=False
+        )
+        for column_name, column in schema.columns.items()
+        if column.unique
+    )
+    constraints.extend(
+        _UniqueConstraint(
+            name=str(check.name),
+            keys=UNIQUE_CHECKS[str(check.name)],
+            report_all=False,
+            is_index=False,
+        )
+        for check in schema.checks
+        if check.name in UNIQUE_CHECKS
+    )
+
+    return constraints
+
+
+def _iter_batches(
+    path: Path, schema: pa.DataFrameSchema, batch_size: int
+) -> Iterator[pd.DataFrame]:
+    """Read a Parquet file in batches, indexed per the schema."""
+    index_names = (
+        [index.name for index in schema.index.indexes]
+        if _is_multiindex(schema)
+        else [schema.index.name] if schema.index is not None else []
+    )
+    parquet_file = pq.ParquetFile(path)
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        batch = record_batch.to_pandas()
+        if index_names and list(batch.index.names) != index_names:
+            batch = batch.reset_index(drop=batch.index.names == [None]).set_index(index_names)
+        yield batch
+
+
+def _flag_duplicates(
+    batch: pd.DataFrame,
+    constraint: _UniqueConstraint,
+    seen_keys: _SeenKeys,
+    offset: int,
+) -> list[tuple[int, tuple]]:
+    """Flag a batch's rows duplicating keys, updating the keys seen.
+
+    Args:
+        batch: The batch.
+        constraint: The constraint.
+        seen_keys: The keys of earlier batches, updated with the batch's.
+        offset: The batch's first row number.
+
+    Returns:
+        The flagged row numbers and keys, in row order. Under `report_all`, a key's first
+        row is flagged with its first repeat, even if in an earlier batch.
+    """
+    key = seen_keys.encoder.encode(df=batch)
+    batch_keys, first_positions, inverse, counts = np.unique(
+        key, return_index=True, return_inverse=True, return_counts=True
+    )
+    seen_positions = np.searchsorted(seen_keys.keys, batch_keys)
+    is_seen = np.zeros(len(batch_keys), dtype=bool)
+    in_range = seen_positions < len(seen_keys.keys)
+    is_seen[in_range] = seen_keys.keys[seen_positions[in_range]] == batch_keys[in_range]
+
+    # Rows repeating a row of an earlier batch, or an earlier row of the batch.
+    is_flagged = is_seen[inverse]
+    is_flagged[np.setdiff1d(np.arange(len(key)), first_positions)] = True
+    earlier_rows = np.empty(0, dtype=np.int64)
+    earlier_positions = np.empty(0, dtype=np.int64)
+    is_repeated_new = ~is_seen & (counts > 1)
+    if constraint.report_all:
+        # Keys' first rows, not yet flagged, of earlier batches.
+        seen_first_rows = seen_keys.first_rows[seen_positions[is_seen]]
+        is_unflagged = seen_first_rows >= 0
+        earlier_rows = seen_first_rows[is_unflagged]
+        earlier_positions = first_positions[is_seen][is_unflagged]
+        seen_keys.first_rows[seen_positions[is_seen][is_unflagged]] = -1
+        # Keys' first rows of the batch, if repeated in it.
+        is_flagged[first_positions[is_repeated_new]] = True
+
+    new_first_rows = offset + first_positions[~is_seen]
+    if constraint.report_all:
+        new_first_rows[is_repeated_new[~is_seen]] = -1
+    seen_keys.keys = np.insert(seen_keys.keys, seen_positions[~is_seen], batch_keys[~is_seen])
+    seen_keys.first_rows = np.insert(
+        seen_keys.first_rows, seen_positions[~is_seen], new_first_rows
+    )
+
+    batch_positions = np.flatnonzero(is_flagged)
+    positions = np.concatenate([earlier_positions, batch_positions])
+    rows = np.concatenate([earlier_rows, offset + batch_positions])
+    key_values = _get_key_values(batch=batch, keys=constraint.keys, positions=positions)
+    order = np.argsort(rows, kind="stable")
+
+    return [(int(rows[i]), key_values[i]) for i in order]
+
+
+def _get_key_values(
+    batch: pd.DataFrame, keys: tuple[str, ...], positions: np.ndarray
+) -> list[tuple]:
+    """Get the key values of a batch's rows, with None for nulls."""
+    levels = []
+    for key in keys:
+        values = batch.index.get_level_values(key) if key in batch.index.names else batch[key]
+        values = pd.Series(np.asarray(values, dtype=object)[positions], dtype=object)
+        levels.append(values.where(values.notna(), None).tolist())
+
+    return list(zip(*levels, strict=True)) if levels else [()] * len(positions)
+
+
+def _get_unique_error(
+    schema: pa.DataFrameSchema,
+    constraint: _UniqueConstraint,
+    flagged: list[tuple[int, tuple]],
+) -> SchemaError:
+    """Get the schema error of a constraint's flagged rows."""
+    rows = [row for row, _ in flagged]
+    if constraint.is_index:
+        # One failure case per key level, as pandera reports index uniqueness.
+        failure_cases = pd.DataFrame(
+            [
+                (level, row, key[i])
+                for i, level in enumerate(constraint.keys)
+                for row, key in flagged
+            ],
+            columns=[Columns.COLUMN, Columns.INDEX, Columns.FAILURE_CASE],
+        )
+        reason_code = SchemaErrorReason.SCHEMA_COMPONENT_CHECK
+    else:
+        failure_cases = pd.DataFrame(
+            {Columns.INDEX: rows, Columns.FAILURE_CASE: [key for _, key in flagged]}
+        )
+        reason_code = (
+            SchemaErrorReason.DATAFRAME_CHECK
+            if constraint.name in UNIQUE_CHECKS
+            else SchemaErrorReason.SERIES_CONTAINS_DUPLICATES
+        )
+
+    return SchemaError(
+        schema=schema.index if constraint.is_index else schema,
+        data=None,
+        message=(
+            f"{schema.name} failed {constraint.name} on {list(constraint.keys)}: "
+            f"{len(rows)} rows."
+        ),
+        failure_cases=failure_cases,
+        check=constraint.name,
+        reason_code=reason_code,
+        column_name=(
+            constraint.keys[0]
+            if not constraint.is_index and constraint.name == "field_uniqueness"
+            else None
+        ),
+    )
+
+
+def _is_multiindex(schema: pa.DataFrameSchema) -> bool:
+    """Whether the schema's index is a MultiIndex."""
+    return isinstance(schema.index, pa.MultiIndex)
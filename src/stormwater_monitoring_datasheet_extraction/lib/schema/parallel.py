@@ -0,0 +1,268 @@
+"""Parallel validation of a stage's tables, and of chunks of large tables.
+
+Each stage returns five relational tables, which pandera validates one after another. Their
+checks are independent, and pandas and NumPy release the GIL for much of their work, so
+they can run at the same time in threads. Under `validation.validation_workers`, the
+checked stages validate their tables in a thread pool, and tables longer than the chunk size
+in chunks.
+
+Chunks are cut on form boundaries: all of a form's rows are in the same chunk. Each key and
+cross-row check in the stage schemas is within a form (e.g., each `multiindex_unique`
+includes `form_id`, and bottle numbers are unique by form), so validating a table in chunks
+finds what validating it whole would. Tables without a `form_id` level, e.g. the site type
+map, aren't chunked. Validated chunks are put back in the table's order.
+
+The tables returned, and the errors raised, are those of validating serially, with
+`pa.check_types`: a tuple's tables are returned as the function returned them, and a single
+table as validated (e.g. coerced). Lazily, a table's chunks' `SchemaErrors` are merged into
+the table's. The first failed table's errors are raised, lazily or not, though all tables
+are validated.
+
+A table's form versions are partitions of it, validated in the same way (see `versions`). In
+a worker, e.g. for a chunk of a table validated in parallel, tables are validated serially
+in the worker, rather than in a pool of the worker's own.
+
+Threads, not processes: the schemas' custom checks are the models' class methods, and the
+tables would be pickled to and from the workers, costing about as much as validating them.
+Pandera mutates a schema's components while validating, and restores them after, so each
+chunk after a table's first is validated against its own copy of the shared schema, copied
+before any chunk is validated.
+"""
+
+import contextvars
+import copy
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Final, TypeVar, cast, get_args, get_origin
+
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+import pandera.typing as pt
+from pandera.errors import SchemaErrors
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.schema import compiled, keys
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Whether in a validation worker, where tables are validated serially.
+_IN_WORKER: Final[ContextVar[bool]] = ContextVar("in_validation_worker", default=False)
+
+
+def get_return_models(fx: Callable[..., Any]) -> list[type[pa.DataFrameModel] | None]:
+    """Get the models a function's return is annotated with.
+
+    Args:
+        fx: The function.
+
+    Returns:
+        The model of each returned table, in order, or None for returns that aren't
+        `pt.DataFrame`s. Empty if the return isn't annotated as a `pt.DataFrame`, or a tuple
+        of them.
+    """
+    annotation = fx.__annotations__.get("return")
+    annotations = get_args(annotation) if get_origin(annotation) is tuple else (annotation,)
+    models = [
+        get_args(annotation)[0] if get_origin(annotation) is pt.DataFrame else None
+        for annotation in annotations
+    ]
+
+    return models if any(model is not None for model in models) else []
+
+
+@typechecked
+def chunk(df: pd.DataFrame, chunk_size: int) -> list[np.ndarray] | None:
+    """Chunk a table's rows on form boundaries.
+
+    Args:
+        df: The table.
+        chunk_size: The number of rows per chunk, give or take a form.
+
+    Returns:
+        The positions of each chunk's rows. None if the table fits in one chunk, or has no
+        `form_id` level to chunk on.
+    """
+    if len(df) <= chunk_size or Columns.FORM_ID not in df.index.names:
+        return None
+
+    codes, _ = keys.get_codes(df=df, key=Columns.FORM_ID)
+    # Null form IDs (-1) are a form of their own.
+    codes = codes + 1
+    counts = np.bincount(codes)
+    # Each form's chunk is the number of rows before it, by chunk size.
+    form_chunks = (np.cumsum(counts) - counts) // chunk_size
+    row_chunks = form_chunks[codes]
+
+    return list(pd.Series(row_chunks).groupby(row_chunks).indices.values())
+
+
+@typechecked
+def validate_tables(
+    tables: list[tuple[pa.DataFrameSchema, pd.DataFrame]],
+    lazy: bool,
+    max_workers: int,
+    chunk_size: int,
+    return_exceptions: bool = False,
+) -> list[pd.DataFrame | BaseException]:
+    """Validate tables, and chunks of large tables, in a thread pool.
+
+    In the caller's context, e.g. for its validation profile. Serially, in the calling
+    thread, if `max_workers` is 1 or the caller is itself a validation worker.
+
+    Args:
+        tables: Each table's schema and data.
+        lazy: Whether to collect all failure cases before raising.
+        max_workers: The most threads to validate in at once.
+        chunk_size: The number of rows per chunk of a large table. See `chunk`.
+        return_exceptions: Whether to return each failed table's error in its place, rather
+            than raise the first.
+
+    Returns:
+        The validated tables, as validating each serially would return them, or their
+        errors, if `return_exceptions`.
+
+    Raises:
+        SchemaError: The first failed table's first error, if not lazy.
+        SchemaErrors: The first failed table's errors, if lazy.
+    """
+    in_pool = max_workers > 1 and not _IN_WORKER.get()
+    chunked = [
+        (df, chunk(df=df, chunk_size=chunk_size) if in_pool else None) for _, df in tables
+    ]
+    # Each task's schema is copied before any task starts, as pandera mutates a schema while
+    # validating: a copy made while the original is validated can capture its mutations.
+    copied_schemas: set[int] = set()
+    tasks: list[list[tuple[pa.DataFrameSchema, pd.DataFrame]]] = []
+    for (schema, _), (df, positions) in zip(tables, chunked, strict=True):
+        table_tasks = []
+        for chunk_df in [df] if positions is None else [df.iloc[p] for p in positions]:
+            is_copied = in_pool and id(schema) in copied_schemas
+            table_tasks.append((copy.deepcopy(schema) if is_copied else schema, chunk_df))
+            copied_schemas.add(id(schema))
+        tasks.append(table_tasks)
+
+    if in_pool:
+        n_tasks = sum(len(table_tasks) for table_tasks in tasks)
+        with ThreadPoolExecutor(max_workers=max(1, min(n_tasks, max_workers))) as executor:
+            futures = [
+                [
+                    executor.submit(
+                        contextvars.copy_context().run, _validate, schema, df, lazy
+                    )
+                    for schema, df in table_tasks
+                ]
+                for table_tasks in tasks
+            ]
+    else:
+        futures = [
+            [_validate_now(schema=schema, df=df, lazy=lazy) for schema, df in table_tasks]
+            for table_tasks in tasks
+        ]
+
+    validated: list[pd.DataFrame | BaseException] = []
+    for (schema, df), (_, positions), chunk_futures in zip(
+        tables, chunked, futures, strict=True
+    ):
+        chunk_errors = [
+            error for error in (future.exception() for future in chunk_futures) if error
+        ]
+        if chunk_errors:
+            error = (
+                chunk_errors[0]
+                if not lazy
+                or positions is None
+                or not all(isinstance(error, SchemaErrors) for error in chunk_errors)
+                else schema_utils.merge_schema_errors(
+                    schema=schema, errors=chunk_errors, data=df
+                )
+            )
+            if not return_exceptions:
+                raise error
+            validated.append(error)
+            continue
+
+        if positions is None:
+            validated.append(chunk_futures[0].result())
+        else:
+            validated_df = pd.concat([future.result() for future in chunk_futures])
+            validated_df = validated_df.iloc[np.argsort(np.concatenate(positions))]
+            validated_df.pandera.add_schema(schema)
+            validated.append(validated_df)
+
+    return validated
+
+
+def _validate(schema: pa.DataFrameSchema, df: pd.DataFrame, lazy: bool) -> pd.DataFrame:
+    """Validate a table as a worker, in the worker's copy of the caller's context."""
+    _IN_WORKER.set(True)
+
+    return schema.validate(df, lazy=lazy)
+
+
+def _validate_now(schema: pa.DataFrameSchema, df: pd.DataFrame, lazy: bool) -> Future:
+    """Validate a table in the calling thread, as a done future."""
+    future: Future = Future()
+    try:
+        future.set_result(schema.validate(df, lazy=lazy))
+    except Exception as error:
+        future.set_exception(error)
+
+    return future
+
+
+def check_return(
+    fx: F,
+    models: list[type[pa.DataFrameModel] | None],
+    lazy: bool,
+    max_workers: int,
+    chunk_size: int,
+) -> F:
+    """Validate a function's returned tables in parallel, as `compiled.check_return` would.
+
+    Args:
+        fx: The function to decorate.
+        models: The models of the returned tables, per `get_return_models`.
+        lazy: Whether to collect all failure cases before raising.
+        max_workers: The most threads to validate in at once.
+        chunk_size: The number of rows per chunk of a large table.
+
+    Returns:
+        The decorated function.
+    """
+
+    @wraps(fx)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        out = fx(*args, **kwargs)
+        is_tuple = isinstance(out, tuple)
+        outs = list(out) if is_tuple else [out]
+        to_validate = [
+            (i, compiled.get_schema(model=model))
+            for i, model in enumerate(models)
+            if model is not None and isinstance(outs[i], pd.DataFrame)
+        ]
+        # As pandera does, tables already validated against their schemas are skipped.
+        to_validate = [
+            (i, schema)
+            for i, schema in to_validate
+            if outs[i].pandera.schema is None or outs[i].pandera.schema != schema
+        ]
+        validated = validate_tables(
+            tables=[(schema, outs[i]) for i, schema in to_validate],
+            lazy=lazy,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+        )
+        # As pandera does, a tuple's tables are returned as is, and a single table validated.
+        if is_tuple:
+            return out
+        for (i, _), validated_df in zip(to_validate, validated, strict=True):
+            outs[i] = cast("pd.DataFrame", validated_df)
+
+        return outs[0]
+
+    return cast("F", wrapper)
@@ -10,25 +10,22 @@ import pandera.pandas as papd
 from pandera.typing import Index, Series
 
 from stormwater_monitoring_datasheet_extraction.lib import constants
-from stormwater_monitoring_datasheet_extraction.lib.constants import (
-    FIELD_DATA_DEFINITION,
-    Columns,
-)
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.schema import compiled, definition, keys
 from stormwater_monitoring_datasheet_extraction.lib.schema.checks import (
     dataframe_checks,
     field_checks,
 )
+from stormwater_monitoring_datasheet_extraction.lib.schema.validation import expensive_check
 
 # TODO: Are null descriptions allowed for non-zero, non-null ranks (1-3)?
 # Are non-null descriptions allowed for 0 ranks?
 
-# TODO: Use `schema_error_handler` decorator.
-# Helps catch/handle schema errors more gracefully.
-# 0. Copy `schema_error_handler` from `bfb_delivery`.
+# NOTE: Schema errors are caught and summarized by `utils.schema_error_handler`, adapted from
+# `bfb_delivery`.
 # https://github.com/crickets-and-comb/bfb_delivery/blob/main/src/bfb_delivery/lib/schema/utils.py#L8
-# https://github.com/crickets-and-comb/bfb_delivery/blob/main/src/bfb_delivery/lib/dispatch/write_to_circuit.py#L111
-# 1. Move from `bfb_delivery` to `comb_utils` and replace with imports.
-# 2. Add feature to pass in custom error handler function,
+# TODO: Move `schema_error_handler` to `comb_utils` and replace with imports.
+# Add feature to pass in custom error handler function,
 # with default that uses generally useful DataFrameModel error features.
 
 # NOTE: Including outfall_type in Site and Creek to use referential integrity to enforce that
@@ -40,8 +37,13 @@ from stormwater_monitoring_datasheet_extraction.lib.schema.checks import (
 # key. Otherwise, we'd use bottle_no as the PK, and either keep form_id:site_id as FK or
 # include bottle_no in SiteVisit as a nullable FK to QuantitativeObservations.
 
+# NOTE: Field options, limits, and formats come from the data definition, compiled once by
+# `definition`. Keys, nullability, and strictness by stage are set here.
+
 # NOTE: Validations should be lax for extraction, stricter after cleaning,
 # stricter after user verification, and strictest after final cleaning.
+# How those validations are enforced at runtime (lazily, fail-fast, or not at all) is set by
+# the validation profile. See `validation.check_types`.
 
 _LAX_KWARGS: Final[dict] = {
     "coerce": False,
@@ -181,6 +183,7 @@ _DESCRIPTION_FIELD: Final[Callable] = partial(
 )
 
 
+@compiled.shared_schema
 class Site(papd.DataFrameModel):
     """Site metadata.
 
@@ -195,7 +198,7 @@ class Site(papd.DataFrameModel):
     site_id: Index[str] = SITE_ID_FIELD()
     #: The outfall type. `constants.OutfallType`.
     outfall_type: Series[
-        Annotated[pd.CategoricalDtype, tuple(constants.OutfallType), False]
+        Annotated[pd.CategoricalDtype, definition.get_options(Columns.OUTFALL_TYPE), False]
     ] = OUTFALL_TYPE_FIELD()
     #: If a creek, `site_id`, else null.
     creek_site_id: Series[str] = CREEK_SITE_ID_FIELD()
@@ -224,6 +227,7 @@ class Site(papd.DataFrameModel):
         strict = True
 
 
+@compiled.shared_schema
 class Creek(papd.DataFrameModel):
     """Creek metadata.
 
@@ -237,9 +241,9 @@ class Creek(papd.DataFrameModel):
     #: The site ID.
     site_id: Index[str] = SITE_ID_FIELD()
     #: The creek type. `constants.CreekType`.
-    creek_type: Series[Annotated[pd.CategoricalDtype, tuple(constants.CreekType), False]] = (
-        CREEK_TYPE_FIELD()
-    )
+    creek_type: Series[
+        Annotated[pd.CategoricalDtype, definition.get_options(Columns.CREEK_TYPE), False]
+    ] = CREEK_TYPE_FIELD()
 
     class Config:
         """The configuration for the schema.
@@ -252,6 +256,7 @@ class Creek(papd.DataFrameModel):
         strict = True
 
 
+@compiled.shared_schema
 class FormExtracted(papd.DataFrameModel):
     """Form metadata extracted from the datasheets.
 
@@ -292,6 +297,7 @@ class FormExtracted(papd.DataFrameModel):
         strict = False
 
 
+@compiled.shared_schema
 class FormInvestigatorExtracted(papd.DataFrameModel):
     """Investigators on each form extracted from the datasheets.
 
@@ -319,6 +325,7 @@ class FormInvestigatorExtracted(papd.DataFrameModel):
         strict = False
 
 
+@compiled.shared_schema
 class SiteVisitExtracted(papd.DataFrameModel):
     """Site visit extracted.
 
@@ -347,6 +354,7 @@ class SiteVisitExtracted(papd.DataFrameModel):
         strict = False
 
 
+@compiled.shared_schema
 class QuantitativeObservationsExtracted(papd.DataFrameModel):
     """Quantitative observations extracted.
 
@@ -391,6 +399,7 @@ class QuantitativeObservationsExtracted(papd.DataFrameModel):
         strict = False
 
 
+@compiled.shared_schema
 class QualitativeObservationsExtracted(papd.DataFrameModel):
     """Qualitative site observations extracted from the datasheets.
 
@@ -532,9 +541,9 @@ class FormVerified(FormPrecleaned):
     """
 
     #: The form type.
-    form_type: Series[Annotated[pd.CategoricalDtype, tuple(constants.FormType), False]] = (
-        _FORM_TYPE_FIELD(coerce=True)
-    )
+    form_type: Series[
+        Annotated[pd.CategoricalDtype, definition.get_options(Columns.FORM_TYPE), False]
+    ] = _FORM_TYPE_FIELD(coerce=True)
     #: The form version.
     form_version: Series[str] = _FORM_VERSION_FIELD(coerce=True)
     # TODO: Maybe we might as well cast to datetime at this step.
@@ -544,28 +553,24 @@ class FormVerified(FormPrecleaned):
     #: `date` and `tide_time` must be on or before now.
     date: Series[str] = _DATE_FIELD(coerce=True)
     #: The city of observations.
-    city: Series[Annotated[pd.CategoricalDtype, tuple(constants.City), False]] = _CITY_FIELD(
-        coerce=True
-    )
+    city: Series[
+        Annotated[pd.CategoricalDtype, definition.get_options(Columns.CITY), False]
+    ] = _CITY_FIELD(coerce=True)
     #: The tide height at the time of observations.
     tide_height: Series[float] = _TIDE_HEIGHT_FIELD(coerce=True)
     #: The tide time at the time of observations. Must be "HH:MM".
     #: `date` and `tide_time` must be before now.
     tide_time: Series[str] = _TIDE_TIME_FIELD(coerce=True)
     #: The past 24-hour rainfall.
-    # TODO: Make equality check subject to inclusive rule in data definition.
-    # - Use helper to set kwargs as constant.
     past_24hr_rainfall: Series[float] = _PAST_24HR_RAINFALL_FIELD(
         coerce=True,
-        ge=FIELD_DATA_DEFINITION[Columns.METADATA][Columns.PAST_24HR_RAINFALL][Columns.LOWER][
-            Columns.VALUE
-        ],
+        **definition.get_limits(Columns.PAST_24HR_RAINFALL),
     )
     #: The weather at the time of observations.
     # TODO: Are we going to make weather ordered?
-    weather: Series[Annotated[pd.CategoricalDtype, tuple(constants.Weather), True]] = (
-        _WEATHER_FIELD(coerce=True)
-    )
+    weather: Series[
+        Annotated[pd.CategoricalDtype, definition.get_options(Columns.WEATHER), True]
+    ] = _WEATHER_FIELD(coerce=True)
     #: Investigator notes.
     notes: Series[str] = _NOTES_FIELD(
         **_NULLABLE_KWARGS, str_length={"max_value": constants.CharLimits.NOTES}
@@ -576,25 +581,32 @@ class FormVerified(FormPrecleaned):
         cls, date: Series  # noqa: B902 (pa.check makes it a class method)
     ) -> Series[bool]:
         """Every date is on or before today."""
-        return field_checks.date_le_today(series=date)
+        return field_checks.date_le_today(
+            series=date, date_format=definition.get_field(Columns.DATE).format
+        )
 
     @pa.check(Columns.DATE, name="is_valid_date")
     def is_valid_date(
         cls, date: Series  # noqa: B902 (pa.check makes it a class method)
     ) -> Series[bool]:
         """Every date parses with the given format."""
-        return field_checks.is_valid_date(series=date, date_format=constants.DATE_FORMAT)
+        return field_checks.is_valid_date(
+            series=date, date_format=definition.get_field(Columns.DATE).format
+        )
 
     @pa.check(Columns.TIDE_TIME, name="is_valid_time")
     def is_valid_time(
         cls, tide_time: Series  # noqa: B902 (pa.check makes it a class method)
     ) -> Series[bool]:
         """Every value parses with the given format."""
-        return field_checks.is_valid_time(series=tide_time, format=constants.TIME_FORMAT)
+        return field_checks.is_valid_time(
+            series=tide_time, format=definition.get_field(Columns.TIDE_TIME).format
+        )
 
     @pa.dataframe_check(
         name="tide_datetime_le_now", ignore_na=False  # Since irrelevant fields are nullable.
     )
+    @expensive_check
     def tide_datetime_le_now(
         cls, df: pd.DataFrame  # noqa: B902 (pa.check makes it a class method)
     ) -> Series[bool]:
@@ -603,8 +615,8 @@ class FormVerified(FormPrecleaned):
             df=df,
             date_col=Columns.DATE,
             time_col=Columns.TIDE_TIME,
-            date_format=constants.DATE_FORMAT,
-            time_format=constants.TIME_FORMAT,
+            date_format=definition.get_field(Columns.DATE).format,
+            time_format=definition.get_field(Columns.TIDE_TIME).format,
         )
 
     class Config:
@@ -641,25 +653,34 @@ class FormInvestigatorVerified(FormInvestigatorPrecleaned):
         cls, start_time: Series  # noqa: B902 (pa.check makes it a class method)
     ) -> Series[bool]:
         """Every `start_time` parses with the given format."""
-        return field_checks.is_valid_time(series=start_time, format=constants.TIME_FORMAT)
+        return field_checks.is_valid_time(
+            series=start_time, format=definition.get_field(Columns.START_TIME).format
+        )
 
     @pa.check(Columns.END_TIME, name="end_time_is_valid_time")
     def end_time_is_valid_time(
         cls, end_time: Series  # noqa: B902 (pa.check makes it a class method)
     ) -> Series[bool]:
         """Every `end_time` parses with the given format."""
-        return field_checks.is_valid_time(series=end_time, format=constants.TIME_FORMAT)
+        return field_checks.is_valid_time(
+            series=end_time, format=definition.get_field(Columns.END_TIME).format
+        )
 
     @pa.dataframe_check(name="start_time_before_end_time")
+    @expensive_check
     def start_time_before_end_time(
         cls, df: pd.DataFrame  # noqa: B902 (pa.check makes it a class method)
     ) -> Series[bool]:
         """Every start_time is before end_time."""
         # TODO: Make this robust to midnight observations.
         is_valid = pd.to_datetime(
-            df[Columns.START_TIME], format=constants.TIME_FORMAT, errors="coerce"
+            df[Columns.START_TIME],
+            format=definition.get_field(Columns.START_TIME).format,
+            errors="coerce",
         ) < pd.to_datetime(
-            df[Columns.END_TIME], format=constants.TIME_FORMAT, errors="coerce"
+            df[Columns.END_TIME],
+            format=definition.get_field(Columns.END_TIME).format,
+            errors="coerce",
         )
         is_valid = cast("Series[bool]", is_valid)
 
@@ -698,7 +719,9 @@ class SiteVisitVerified(SiteVisitPrecleaned):
         cls, arrival_time: Series  # noqa: B902 (pa.check makes it a class method)
     ) -> Series[bool]:
         """Every `arrival_time` parses with the given format."""
-        return field_checks.is_valid_time(series=arrival_time, format=constants.TIME_FORMAT)
+        return field_checks.is_valid_time(
+            series=arrival_time, format=definition.get_field(Columns.ARRIVAL_TIME).format
+        )
 
     class Config:
         """The configuration for the schema.
@@ -729,34 +752,45 @@ class QuantitativeObservationsVerified(QuantitativeObservationsPrecleaned):
     #: Must be unique within each `form_id`.
     bottle_no: Series[str] = _BOTTLE_NO_FIELD(coerce=True)
     #: The flow.
-    flow: Series[Annotated[pd.CategoricalDtype, tuple(constants.Flow), True]] = _FLOW_FIELD(
-        coerce=True
-    )
+    flow: Series[
+        Annotated[pd.CategoricalDtype, definition.get_options(Columns.FLOW), True]
+    ] = _FLOW_FIELD(coerce=True)
     #: The flow compared to expected.
     flow_compared_to_expected: Series[
-        Annotated[pd.CategoricalDtype, tuple(constants.FlowComparedToExpected), True]
+        Annotated[
+            pd.CategoricalDtype,
+            definition.get_options(Columns.FLOW_COMPARED_TO_EXPECTED),
+            True,
+        ]
     ] = _FLOW_COMPARED_TO_EXPECTED_FIELD(coerce=True)
     #: The air temperature.
     air_temp: Series[float] = _AIR_TEMP_FIELD(coerce=True)
     #: The water temperature.
     water_temp: Series[float] = _WATER_TEMP_FIELD(coerce=True)
     #: The dissolved oxygen.
-    DO_mg_per_l: Series[float] = _DO_MG_PER_L_FIELD(coerce=True, ge=0)
+    DO_mg_per_l: Series[float] = _DO_MG_PER_L_FIELD(
+        coerce=True, **definition.get_limits(Columns.DO_MG_PER_L)
+    )
     #: The specific conductance.
-    SPS_micro_S_per_cm: Series[float] = _SPS_MICRO_S_PER_CM_FIELD(coerce=True, ge=0)
+    SPS_micro_S_per_cm: Series[float] = _SPS_MICRO_S_PER_CM_FIELD(
+        coerce=True, **definition.get_limits(Columns.SPS_MICRO_S_PER_CM)
+    )
     #: The salinity.
-    salinity_ppt: Series[float] = _SALINITY_PPT_FIELD(coerce=True, ge=0)
+    salinity_ppt: Series[float] = _SALINITY_PPT_FIELD(
+        coerce=True, **definition.get_limits(Columns.SALINITY_PPT)
+    )
     #: The pH.
-    pH: Series[float] = _PH_FIELD(coerce=True, ge=0, le=14)
+    pH: Series[float] = _PH_FIELD(coerce=True, **definition.get_limits(Columns.PH))
 
     @pa.dataframe_check(name="bottle_no_unique_by_form_id")
+    @expensive_check
     def bottle_no_unique_by_form_id(
         cls, df: pd.DataFrame  # noqa: B902 (pa.check makes it a class method)
     ) -> Series[bool]:
         """Every `bottle_no` is unique within each `form_id`."""
-        unindexed_df = df.reset_index()
-        is_valid = ~unindexed_df.duplicated(
-            subset=[Columns.FORM_ID, Columns.BACTERIA_BOTTLE_NO], keep="first"
+        # Positionally indexed, as `df.reset_index().duplicated()` was.
+        is_valid = pd.Series(
+            ~keys.duplicated(df=df, keys=[Columns.FORM_ID, Columns.BACTERIA_BOTTLE_NO])
         )
         is_valid = cast("Series[bool]", is_valid)
 
@@ -789,13 +823,13 @@ class QualitativeObservationsVerified(QualitativeObservationsPrecleaned):
     #: The observation type.
     observation_type: Index[
         Annotated[
-            pd.CategoricalDtype, tuple(constants.QualitativeSiteObservationTypes), False
+            pd.CategoricalDtype, definition.get_options(Columns.OBSERVATION_TYPE), False
         ]
     ] = _OBSERVATION_TYPE_FIELD(coerce=True)
     #: The rank of the observation.
-    rank: Series[Annotated[pd.CategoricalDtype, tuple(constants.Rank), True]] = _RANK_FIELD(
-        coerce=True
-    )
+    rank: Series[
+        Annotated[pd.CategoricalDtype, definition.get_options(Columns.RANK), True]
+    ] = _RANK_FIELD(coerce=True)
     #: The description of the observation.
     description: Series[str] = _DESCRIPTION_FIELD(
         coerce=True,
@@ -0,0 +1,465 @@
+"""Schema utilities, e.g. handling schema errors."""
+
+import gzip
+import logging
+import reprlib
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import IO, Any, Final, TypeVar, cast
+
+import pandas as pd
+import pandera.pandas as pa
+from pandera.api.base.error_handler import ErrorHandler
+from pandera.backends.pandas.container import DataFrameSchemaBackend
+from pandera.errors import FailureCaseMetadata, SchemaError, SchemaErrors
+from pydantic import ValidationError
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.errors import SchemaValidationError
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_FAILURE_CASES_PATH: Final[ContextVar[Path | None]] = ContextVar(
+    "failure_cases_path", default=None
+)
+# Whether lazy schema errors are raised compact, as within `schema_error_handler`.
+_COMPACT_ERRORS: Final[ContextVar[bool]] = ContextVar("compact_errors", default=False)
+_SUMMARY_COLUMNS: Final[list[str]] = [
+    Columns.SCHEMA,
+    Columns.CHECK,
+    Columns.COLUMN,
+    Columns.N_FAILURE_CASES,
+    Columns.SAMPLE,
+]
+_DETAIL_COLUMNS: Final[list[str]] = [
+    Columns.SCHEMA,
+    Columns.CHECK,
+    Columns.COLUMN,
+    Columns.FAILURE_CASE,
+    Columns.INDEX,
+]
+
+
+class CompactErrorsMixin:
+    """Raises a schema backend's lazy errors compact within `schema_error_handler`.
+
+    Pandera's `SchemaErrors` consolidates every failure case into one frame, and formats
+    every error into its message, as it's raised. Within the handler, which summarizes the
+    schema errors themselves, neither is built: the errors are collected with pandera's
+    `ErrorHandler` for their counts by reason, `failure_cases` is None, and the message is
+    the counts.
+
+    Mix into a pandas schema backend, before it.
+    """
+
+    def failure_cases_metadata(
+        self, schema_name: str, schema_errors: list[SchemaError]
+    ) -> FailureCaseMetadata:
+        """Get the metadata of `SchemaErrors`: compact, within `schema_error_handler`."""
+        if not _COMPACT_ERRORS.get():
+            return cast("Any", super()).failure_cases_metadata(schema_name, schema_errors)
+
+        error_handler = ErrorHandler(lazy=True)
+        error_handler.collect_errors(schema_errors)
+        error_counts: dict[str, int] = defaultdict(int)
+        for error in error_handler.collected_errors:
+            error_counts[error["reason_code"].name] += 1
+
+        return FailureCaseMetadata(
+            failure_cases=None, message=dict(error_counts), error_counts=error_counts
+        )
+
+
+class CompactErrorsBackend(CompactErrorsMixin, DataFrameSchemaBackend):
+    """Pandera's dataframe schema backend, raising compact lazy errors in the handler."""
+
+
+class DataFrameSchema(pa.DataFrameSchema):
+    """A dataframe schema raising compact lazy errors within `schema_error_handler`.
+
+    See `CompactErrorsMixin`. Named as pandera's, as errors report the schema's class name.
+    """
+
+
+for _type in (pd.DataFrame, pd.Series):
+    DataFrameSchema.register_backend(_type, CompactErrorsBackend)
+
+
+@contextmanager
+@typechecked
+def failure_cases_detail(path: Path | None) -> Iterator[None]:
+    """Set where `schema_error_handler` writes full failure case detail.
+
+    Args:
+        path: Path to write the gzip-compressed CSV of all failure cases to.
+            If None, the detail is not written.
+
+    Yields:
+        None.
+    """
+    token = _FAILURE_CASES_PATH.set(path)
+    try:
+        yield
+    finally:
+        _FAILURE_CASES_PATH.reset(token)
+
+
+def schema_error_handler(fx: F) -> F:
+    """Reraise schema errors as a compact `SchemaValidationError`.
+
+    Catches pandera `SchemaError` and `SchemaErrors`, and pydantic `ValidationError`s
+    wrapping them, and aggregates their failure cases with `summarize_schema_errors`.
+    The full failure case detail is written to the path set by `failure_cases_detail`,
+    if any. The original error is released rather than chained, so its failure case
+    frames and message are not kept alive with the new error.
+
+    Within the handler, the stage schemas' lazy `SchemaErrors` are raised without
+    pandera's consolidated failure cases and message (see `CompactErrorsMixin`), and
+    only each check's failure case count and sample are taken, unless the detail is
+    written. So, no frame or message of all the failure cases is built. Columns' own
+    errors, raised within a schema's validation, are pandera's, of each column's
+    retained failure cases.
+
+    Args:
+        fx: The function to decorate.
+
+    Returns:
+        The decorated function.
+    """
+
+    @wraps(fx)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        detail_path = _FAILURE_CASES_PATH.get()
+        token = _COMPACT_ERRORS.set(True)
+        try:
+            return fx(*args, **kwargs)
+        except (SchemaError, SchemaErrors, ValidationError) as e:
+            if not _get_schema_errors(error=e):
+                raise
+            summary = summarize_schema_errors(error=e, detail_path=detail_path)
+        finally:
+            _COMPACT_ERRORS.reset(token)
+
+        message = _format_summary(summary=summary, detail_path=detail_path)
+        logger.error(message)
+
+        raise SchemaValidationError(message=message, summary=summary, detail_path=detail_path)
+
+    return cast("F", wrapper)
+
+
+@typechecked
+def summarize_schema_errors(
+    error: SchemaError | SchemaErrors | ValidationError,
+    n_samples: int = constants.N_FAILURE_CASES,
+    detail_path: Path | None = None,
+) -> pd.DataFrame:
+    """Aggregate failure cases into counts per schema, check, and column.
+
+    Takes each error's failure case count, and a sample of its retained failure cases,
+    rather than consolidating them into a single frame or formatting them into a message.
+    Only if writing the detail are each error's failure cases all recovered, one error at
+    a time.
+
+    Args:
+        error: The schema error(s) to summarize.
+        n_samples: The maximum number of failure cases to sample per group.
+        detail_path: If not None, path to write the gzip-compressed CSV of all failure
+            cases to, one error at a time.
+
+    Returns:
+        One row per schema, check, and column, with the number of failure cases and a
+        sample of them, sorted by descending count.
+    """
+    counts: dict[tuple[str, str, str], int] = defaultdict(int)
+    samples: dict[tuple[str, str, str], list] = defaultdict(list)
+
+    detail_context = (
+        gzip.open(detail_path, mode="wt", newline="")
+        if detail_path is not None
+        else nullcontext()
+    )
+    with detail_context as detail_file:
+        for i, (schema_name, schema_error) in enumerate(_get_schema_errors(error=error)):
+            key = (
+                schema_name,
+                _get_check_name(schema_error=schema_error),
+                _get_column_name(schema_error=schema_error),
+            )
+            failure_cases = (
+                _get_retained_failure_cases(schema_error=schema_error)
+                if detail_file is None
+                else _get_failure_cases(schema_error=schema_error)
+            )
+
+            counts[key] += max(len(failure_cases), _count_failures(schema_error=schema_error))
+            n_to_sample = n_samples - len(samples[key])
+            if n_to_sample > 0:
+                samples[key].extend(
+                    failure_cases[Columns.FAILURE_CASE].dropna().head(n_to_sample).tolist()
+                )
+
+            if detail_file is not None:
+                _write_detail(
+                    detail_file=cast("IO[str]", detail_file),
+                    failure_cases=failure_cases,
+                    key=key,
+                    header=i == 0,
+                )
+
+    summary = pd.DataFrame(
+        [(*key, count, samples[key]) for key, count in counts.items()],
+        columns=_SUMMARY_COLUMNS,
+    )
+    summary = summary.sort_values(
+        by=Columns.N_FAILURE_CASES, ascending=False, kind="stable"
+    ).reset_index(drop=True)
+
+    return summary
+
+
+@typechecked
+def count_failure_cases_by_form(
+    error: SchemaError | SchemaErrors | ValidationError,
+) -> pd.Series:
+    """Count failure cases per form, e.g. for the run report.
+
+    Args:
+        error: The schema error(s) to count.
+
+    Returns:
+        The number of failure cases of each form's rows, by form ID. Failure cases not of
+        rows indexed by form ID, e.g. of a table's columns or a positional dataframe check,
+        are counted by their rows' first index level, if any, or not at all.
+    """
+    form_ids = [
+        form_id
+        for _, schema_error in _get_schema_errors(error=error)
+        for form_id in _get_failing_form_ids(schema_error=schema_error)
+    ]
+
+    return (
+        pd.Series(form_ids, dtype=object)
+        .value_counts(sort=False)
+        .rename_axis(Columns.FORM_ID)
+        .rename(Columns.N_FAILURE_CASES)
+    )
+
+
+def merge_schema_errors(
+    schema: pa.DataFrameSchema, errors: list[SchemaErrors], data: pd.DataFrame
+) -> SchemaErrors:
+    """Merge the lazy errors of a table's chunks into the table's.
+
+    Each check's failure cases, and check output, are concatenated across the chunks, in
+    chunk order. Errors not of rows, e.g. a missing column, are kept once.
+
+    Args:
+        schema: The table's schema.
+        errors: The chunks' errors, in chunk order.
+        data: The table.
+
+    Returns:
+        The table's errors.
+    """
+    grouped: dict[tuple[str, str, Any], list[SchemaError]] = defaultdict(list)
+    for error in errors:
+        for schema_error in error.schema_errors:
+            key = (
+                _get_check_name(schema_error=schema_error),
+                _get_column_name(schema_error=schema_error),
+                schema_error.reason_code,
+            )
+            grouped[key].append(schema_error)
+
+    schema_errors = []
+    for group in grouped.values():
+        schema_error = group[0]
+        if len(group) > 1 and all(
+            isinstance(chunk_error.failure_cases, pd.DataFrame) for chunk_error in group
+        ):
+            check_outputs = [chunk_error.check_output for chunk_error in group]
+            # Not `copy.copy`: pandera pickles schema errors' attributes as strings.
+            schema_error = SchemaError(
+                schema=schema_error.schema,
+                data=data,
+                message=str(schema_error),
+                failure_cases=pd.concat(
+                    [chunk_error.failure_cases for chunk_error in group], ignore_index=True
+                ),
+                check=schema_error.check,
+                check_index=schema_error.check_index,
+                check_output=(
+                    pd.concat(check_outputs)
+                    if all(isinstance(output, pd.Series) for output in check_outputs)
+                    else schema_error.check_output
+                ),
+                reason_code=schema_error.reason_code,
+                column_name=schema_error.column_name,
+            )
+        schema_errors.append(schema_error)
+
+    return SchemaErrors(schema=schema, schema_errors=schema_errors, data=data)
+
+
+def _get_schema_errors(
+    error: BaseException, schema_name: str = ""
+) -> list[tuple[str, SchemaError]]:
+    """Flatten an error into its schema errors, each paired with its schema name."""
+    schema_errors: list[tuple[str, SchemaError]] = []
+    if isinstance(error, SchemaErrors):
+        name = getattr(error.schema, "name", None) or schema_name
+        schema_errors = [(name, schema_error) for schema_error in error.schema_errors]
+    elif isinstance(error, SchemaError):
+        name = (
+            error.schema.name
+            if isinstance(error.schema, pa.DataFrameSchema) and error.schema.name
+            else schema_name
+        )
+        schema_errors = [(name, error)]
+    elif isinstance(error, ValidationError):
+        for line_error in error.errors():
+            cause = line_error.get("ctx", {}).get("error")
+            if isinstance(cause, (SchemaError, SchemaErrors)):
+                arg_name = ".".join(str(loc) for loc in line_error["loc"])
+                schema_errors.extend(_get_schema_errors(error=cause, schema_name=arg_name))
+
+    return schema_errors
+
+
+def _get_check_name(schema_error: SchemaError) -> str:
+    """Get the name of the failed check."""
+    check = schema_error.check
+    if isinstance(check, pa.Check):
+        check_name = str(check.name)
+    elif check is not None:
+        check_name = str(check)
+    elif schema_error.reason_code is not None:
+        check_name = schema_error.reason_code.value
+    else:
+        check_name = ""
+
+    return check_name
+
+
+def _get_column_name(schema_error: SchemaError) -> str:
+    """Get the name of the column that failed, if any."""
+    column_name = schema_error.column_name
+    if column_name is None and not isinstance(schema_error.schema, pa.DataFrameSchema):
+        column_name = getattr(schema_error.schema, "name", None)
+
+    return "" if column_name is None else str(column_name)
+
+
+def _get_retained_failure_cases(schema_error: SchemaError) -> pd.DataFrame:
+    """Get the failure cases pandera retained, as a frame of `failure_case` and `index`."""
+    failure_cases = schema_error.failure_cases
+    if isinstance(failure_cases, pd.DataFrame):
+        return failure_cases.reindex(columns=[Columns.FAILURE_CASE, Columns.INDEX])
+
+    return pd.DataFrame({Columns.FAILURE_CASE: [failure_cases], Columns.INDEX: [None]})
+
+
+def _count_failures(schema_error: SchemaError) -> int:
+    """Count the failing rows of a check's output, if a boolean series, else 0."""
+    check_output = schema_error.check_output
+    if isinstance(check_output, pd.Series) and pd.api.types.is_bool_dtype(check_output):
+        return int((~check_output.to_numpy()).sum())
+
+    return 0
+
+
+def _get_failure_cases(schema_error: SchemaError) -> pd.DataFrame:
+    """Get every failure case as a frame of `failure_case` and `index`.
+
+    Pandera retains at most `n_failure_cases` failure values per check, so the remaining
+    failures are recovered by index from the check output, with null values.
+    """
+    failure_cases = _get_retained_failure_cases(schema_error=schema_error)
+
+    check_output = schema_error.check_output
+    if isinstance(check_output, pd.Series) and pd.api.types.is_bool_dtype(check_output):
+        failing_index = check_output.index[~check_output.to_numpy()].map(str)
+        if len(failing_index) > len(failure_cases):
+            retained_values = pd.Series(
+                failure_cases[Columns.FAILURE_CASE].to_numpy(),
+                index=failure_cases[Columns.INDEX].astype(str),
+            )
+            retained_values = retained_values[~retained_values.index.duplicated()]
+            failure_cases = pd.DataFrame(
+                {
+                    Columns.FAILURE_CASE: retained_values.reindex(failing_index).to_numpy(),
+                    Columns.INDEX: failing_index,
+                }
+            )
+
+    return failure_cases
+
+
+def _get_failing_form_ids(schema_error: SchemaError) -> list:
+    """Get the form ID of each failure case's row, as far as its index tells."""
+    check_output = schema_error.check_output
+    if isinstance(check_output, pd.Series) and pd.api.types.is_bool_dtype(check_output):
+        failing_index = check_output.index[~check_output.to_numpy()]
+    elif (
+        isinstance(schema_error.failure_cases, pd.DataFrame)
+        and Columns.INDEX in schema_error.failure_cases
+    ):
+        failing_index = pd.Index(schema_error.failure_cases[Columns.INDEX].dropna().tolist())
+    else:
+        return []
+
+    if Columns.FORM_ID in failing_index.names:
+        return failing_index.get_level_values(Columns.FORM_ID).tolist()
+
+    return [label[0] if isinstance(label, tuple) else label for label in failing_index]
+
+
+def _write_detail(
+    detail_file: IO[str],
+    failure_cases: pd.DataFrame,
+    key: tuple[str, str, str],
+    header: bool,
+) -> None:
+    """Append one error's failure cases to the detail file."""
+    schema_name, check_name, column_name = key
+    failure_cases.assign(
+        **{
+            Columns.SCHEMA: schema_name,
+            Columns.CHECK: check_name,
+            Columns.COLUMN: column_name,
+        }
+    )[_DETAIL_COLUMNS].to_csv(detail_file, header=header, index=False)
+
+
+def _format_summary(summary: pd.DataFrame, detail_path: Path | None) -> str:
+    """Format the summary as a bounded error message."""
+    sample_repr = reprlib.Repr()
+    sample_repr.maxlist = constants.N_FAILURE_CASES
+    sample_repr.maxstring = 50
+    sample_repr.maxother = 50
+
+    lines = [
+        f"Schema validation failed with {summary[Columns.N_FAILURE_CASES].sum()} failure "
+        f"cases in {len(summary)} checks:"
+    ]
+    for row in summary.itertuples(index=False):
+        row_dict = row._asdict()
+        column = f".{row_dict[Columns.COLUMN]}" if row_dict[Columns.COLUMN] else ""
+        lines.append(
+            f"  {row_dict[Columns.SCHEMA]}{column} {row_dict[Columns.CHECK]}: "
+            f"{row_dict[Columns.N_FAILURE_CASES]} failure cases, "
+            f"e.g. {sample_repr.repr(row_dict[Columns.SAMPLE])}"
+        )
+    if detail_path is not None:
+        lines.append(f"All failure cases written to {detail_path}")
+
+    return "\n".join(lines)
@@ -0,0 +1,240 @@
+"""Validation profiles for stage schema enforcement.
+
+The active profile is held in a context variable so that it can be set once per run
+(see `validation_profile`) rather than threaded through every stage signature. As are the
+validation workers (see `validation_workers`), and the reference time that checks of dates
+and times compare against (see `reference_time`).
+"""
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from typing import Any, Final, NamedTuple, TypeVar, cast
+
+import pandas as pd
+from pandera.typing import Series
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import ValidationProfile
+from stormwater_monitoring_datasheet_extraction.lib.schema import (
+    compiled,
+    parallel,
+    versions,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class ValidationWorkers(NamedTuple):
+    """How to validate a stage's tables in parallel."""
+
+    #: The most threads to validate in at once. 1 to validate serially.
+    max_workers: int
+    #: The number of rows per chunk of a large table.
+    chunk_size: int
+
+
+_VALIDATION_PROFILE: Final[ContextVar[ValidationProfile]] = ContextVar(
+    "validation_profile", default=ValidationProfile.FULL
+)
+_REFERENCE_TIME: Final[ContextVar[pd.Timestamp | None]] = ContextVar(
+    "reference_time", default=None
+)
+_VALIDATION_WORKERS: Final[ContextVar[ValidationWorkers]] = ContextVar(
+    "validation_workers",
+    default=ValidationWorkers(
+        max_workers=constants.VALIDATION_WORKERS, chunk_size=constants.VALIDATION_CHUNK_SIZE
+    ),
+)
+
+
+@typechecked
+def get_validation_profile() -> ValidationProfile:
+    """Get the active validation profile.
+
+    Returns:
+        The validation profile set by the innermost `validation_profile` context,
+        else `ValidationProfile.FULL`.
+    """
+    return _VALIDATION_PROFILE.get()
+
+
+@contextmanager
+@typechecked
+def validation_profile(profile: ValidationProfile | str) -> Iterator[None]:
+    """Set the validation profile within the context.
+
+    Args:
+        profile: The validation profile to apply to checked functions in the context.
+
+    Yields:
+        None.
+    """
+    token = _VALIDATION_PROFILE.set(ValidationProfile(profile))
+    try:
+        yield
+    finally:
+        _VALIDATION_PROFILE.reset(token)
+
+
+@typechecked
+def get_validation_workers() -> ValidationWorkers:
+    """Get the active validation workers.
+
+    Returns:
+        The validation workers set by the innermost `validation_workers` context, else
+        serial validation.
+    """
+    return _VALIDATION_WORKERS.get()
+
+
+@contextmanager
+@typechecked
+def validation_workers(
+    max_workers: int, chunk_size: int = constants.VALIDATION_CHUNK_SIZE
+) -> Iterator[None]:
+    """Validate each checked function's returned tables in parallel within the context.
+
+    See `parallel`. The tables returned, and the errors raised, are the same as validating
+    serially.
+
+    Args:
+        max_workers: The most threads to validate in at once. 1 to validate serially.
+        chunk_size: The number of rows per chunk of a large table.
+
+    Yields:
+        None.
+
+    Raises:
+        ValueError: If `max_workers` or `chunk_size` isn't positive.
+    """
+    if max_workers < 1 or chunk_size < 1:
+        raise ValueError(
+            f"max_workers and chunk_size must be positive. Got {max_workers}, {chunk_size}."
+        )
+    token = _VALIDATION_WORKERS.set(
+        ValidationWorkers(max_workers=max_workers, chunk_size=chunk_size)
+    )
+    try:
+        yield
+    finally:
+        _VALIDATION_WORKERS.reset(token)
+
+
+@typechecked
+def get_reference_time() -> pd.Timestamp:
+    """Get the time that checks of dates and times compare against, e.g. not in the future.
+
+    Returns:
+        The naive, local reference time frozen by the innermost `reference_time` context,
+        else now.
+    """
+    timestamp = _REFERENCE_TIME.get()
+
+    return pd.Timestamp.now() if timestamp is None else timestamp
+
+
+@contextmanager
+@typechecked
+def reference_time(timestamp: datetime | None = None) -> Iterator[None]:
+    """Freeze the reference time within the context.
+
+    So every check in a run compares against the same "now", and a reprocessing run can be
+    reproduced by passing the original run's time.
+
+    Args:
+        timestamp: The reference time. Timezone-aware times are converted to naive local
+            time, as datasheet dates and times are. If None, now.
+
+    Yields:
+        None.
+    """
+    frozen = pd.Timestamp.now() if timestamp is None else pd.Timestamp(timestamp)
+    if frozen.tzinfo is not None:
+        frozen = frozen.tz_convert(datetime.now().astimezone().tzinfo).tz_localize(None)
+    token = _REFERENCE_TIME.set(frozen)
+    try:
+        yield
+    finally:
+        _REFERENCE_TIME.reset(token)
+
+
+def check_types(fx: F) -> F:
+    """Validate a function's annotated inputs and outputs per the active profile.
+
+    Stands in for `pa.check_types(with_pydantic=True, lazy=True)`:
+
+    - `ValidationProfile.FULL`: Lazily collects all failure cases before raising.
+    - `ValidationProfile.FAST`: Raises on the first failure, and skips dataframe checks
+      decorated with `expensive_check`.
+    - `ValidationProfile.OFF`: Calls the undecorated function.
+
+    The argument validator and the schemas are built once, and shared by the profiles.
+    See `compiled`. Under `validation_workers`, the returned tables are validated in
+    parallel. See `parallel`. The returned tables are validated per their forms' versions,
+    of the form metadata among the arguments, if any. See `versions`.
+
+    Args:
+        fx: The function to decorate.
+
+    Returns:
+        The decorated function.
+    """
+    validated_fx = compiled.validate_arguments(fx=fx)
+    checked_fxs = {
+        ValidationProfile.FULL: compiled.check_return(fx=validated_fx, lazy=True),
+        ValidationProfile.FAST: compiled.check_return(fx=validated_fx, lazy=False),
+    }
+
+    return_models = parallel.get_return_models(fx=fx)
+
+    @wraps(fx)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        profile = _VALIDATION_PROFILE.get()
+        if profile == ValidationProfile.OFF:
+            return fx(*args, **kwargs)
+
+        form_metadata = versions.find_form_metadata(tables=(*args, *kwargs.values()))
+        with (
+            nullcontext()
+            if form_metadata is None
+            else versions.form_versions(form_metadata=form_metadata)
+        ):
+            workers = _VALIDATION_WORKERS.get()
+            if workers.max_workers > 1 and return_models:
+                return parallel.check_return(
+                    fx=validated_fx,
+                    models=return_models,
+                    lazy=profile == ValidationProfile.FULL,
+                    max_workers=workers.max_workers,
+                    chunk_size=workers.chunk_size,
+                )(*args, **kwargs)
+
+            return checked_fxs[profile](*args, **kwargs)
+
+    return cast("F", wrapper)
+
+
+def expensive_check(check_fx: F) -> F:
+    """Mark a dataframe check as skippable under `ValidationProfile.FAST`.
+
+    Decorate the check method beneath `pa.dataframe_check`.
+
+    Args:
+        check_fx: The dataframe check method.
+
+    Returns:
+        The decorated check method.
+    """
+
+    @wraps(check_fx)
+    def wrapper(cls: Any, df: pd.DataFrame, *args: Any, **kwargs: Any) -> Series[bool]:
+        if _VALIDATION_PROFILE.get() == ValidationProfile.FAST:
+            return cast("Series[bool]", pd.Series(True, index=df.index))
+
+        return check_fx(cls, df, *args, **kwargs)
+
+    return cast("F", wrapper)
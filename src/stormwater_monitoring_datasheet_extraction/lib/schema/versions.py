@@ -0,0 +1,721 @@
+"""Versioned data definitions, by form type and version.
+
+A batch can mix sheets of different form versions, with different options, limits,
+thresholds, or fields. Each version's definition is a JSON file in `form_definitions/`,
+named `<form_type>_<form_version>.json`, giving its `form_type`, `form_version`, and
+`metadata` overrides of `FIELD_DATA_DEFINITION[METADATA]`: nested objects are merged, other
+values replace the base's, and nulls remove them. A field set to null is dropped from the
+version. A field the base doesn't define is added, with its `data_type` ("str", "float",
+or "int"), to the table of its level: the form metadata, the investigators, or the
+quantitative observations. The current version's overrides are empty.
+
+Definitions are loaded and compiled once per process (see `definition`), as are the
+versioned schemas derived from the stage schemas. Each thread validates against its own
+copies of them, as with the stage schemas (see `compiled`). A batch is partitioned by
+version once, as row positions per version, without looking up definitions per form.
+Forms of unknown versions, or with no version, fall back to the base definition.
+
+The stage schemas validate each version's rows against that version's schema (see
+`DataFrameSchema`), so a version can widen the base definition as well as narrow it. A
+table's versions are its own, if it's the form metadata, else those of the form metadata
+the checked function was called with (see `form_versions`). The partitions are validated
+as tables of their own, per the active validation workers (see `parallel`), e.g. in
+parallel. Validated partitions are put back in the table's order, with each categorical
+column's categories unioned across versions, and with the columns of fields only some
+versions have null in the others' rows. When no packaged version differs from the base,
+tables aren't partitioned at all.
+"""
+
+import copy
+import json
+import logging
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from importlib import resources
+from typing import Any, Final, NamedTuple, cast
+
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+from pandera.errors import SchemaErrors
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    FIELD_DATA_DEFINITION,
+    Columns,
+)
+from stormwater_monitoring_datasheet_extraction.lib.schema import definition
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+from stormwater_monitoring_datasheet_extraction.lib.schema.definition import (
+    FieldDefinition,
+)
+
+logger = logging.getLogger(__name__)
+
+_DEFINITIONS_DIR: Final[str] = "form_definitions"
+# Pandera's names for the checks `pa.Field`'s `ge`, `gt`, `le`, and `lt` kwargs add.
+_LIMIT_CHECK_NAMES: Final[frozenset[str]] = frozenset(
+    {
+        "greater_than_or_equal_to",
+        "greater_than",
+        "less_than_or_equal_to",
+        "less_than",
+    }
+)
+# The data types added fields can have, by their names in definition files.
+_DATA_TYPES: Final[dict[str, type]] = {"str": str, "float": float, "int": int}
+# A column only the table of each field level has, to add the level's new fields beside.
+_LEVEL_COLUMNS: Final[dict[str | None, str]] = {
+    None: Columns.FORM_TYPE,
+    Columns.INVESTIGATORS: Columns.START_TIME,
+    Columns.OBSERVATIONS: Columns.BACTERIA_BOTTLE_NO,
+}
+
+#: A form type and version. Either may be None, e.g. if not extracted.
+VersionKey = tuple[str | None, str | None]
+
+# The form type and version of each form the checked function was called with.
+_FORM_VERSIONS: Final[ContextVar[pd.DataFrame | None]] = ContextVar(
+    "form_versions", default=None
+)
+# Each thread's copies of the versioned schemas, in `schemas`.
+_THREAD_SCHEMAS: Final[threading.local] = threading.local()
+
+
+class VersionedDefinition(NamedTuple):
+    """A form type and version's data definition, compiled."""
+
+    #: The form type.
+    form_type: str | None
+    #: The form version.
+    form_version: str | None
+    #: Field definitions by column name.
+    fields: dict[str, FieldDefinition]
+    #: The normal thresholds by site type. See `definition.compile_thresholds`.
+    thresholds: pd.DataFrame
+    #: Precleaning normalizers by column name.
+    normalizers: dict[str, Callable[[pd.Series], pd.Series]]
+    #: Whether it's the base definition, `FIELD_DATA_DEFINITION`, unmodified.
+    is_base: bool
+    #: Fields added, by the column only their level's table has. See `_LEVEL_COLUMNS`.
+    added_fields: dict[str, tuple[str, ...]] = {}
+    #: Fields of the base definition dropped.
+    dropped_fields: frozenset[str] = frozenset()
+
+
+class DataFrameSchema(schema_utils.DataFrameSchema):
+    """A stage schema, validating each form version's rows against the version's schema.
+
+    `use_versions` makes a stage's schema one. Named as pandera's, as errors report the
+    schema's class name.
+    """
+
+    #: The stage model, to get versioned schemas of.
+    stage_model: type[pa.DataFrameModel]
+
+    def validate(
+        self,
+        check_obj: pd.DataFrame,
+        head: int | None = None,
+        tail: int | None = None,
+        sample: int | None = None,
+        random_state: int | None = None,
+        lazy: bool = False,
+        inplace: bool = False,
+    ) -> pd.DataFrame:
+        """Validate a table, each form version's rows against the version's schema.
+
+        As `pa.DataFrameSchema.validate`, if the table's forms are all of versions that
+        change nothing the stage enforces. Otherwise, the partitions are validated whole,
+        per the active validation workers, e.g. in parallel (see `parallel`).
+
+        Returns:
+            The validated table, in its order.
+
+        Raises:
+            SchemaError: The first failed partition's first error, if not lazy.
+            SchemaErrors: The failed partitions' errors, merged, if lazy.
+        """
+        # Imported here, as they import this module.
+        from stormwater_monitoring_datasheet_extraction.lib.schema import (
+            parallel,
+            validation,
+        )
+
+        positions = _get_partitions(df=check_obj)
+        schemas = {
+            key: _get_versioned_schema(model=self.stage_model, key=key) for key in positions
+        }
+        if all(schema is None for schema in schemas.values()):
+            return super().validate(
+                check_obj, head, tail, sample, random_state, lazy, inplace
+            )
+
+        # The rows of versions that change nothing, validated together against the stage's.
+        base_positions = [
+            key_positions for key, key_positions in positions.items() if schemas[key] is None
+        ]
+        partitions = [
+            (schema, positions[key]) for key, schema in schemas.items() if schema is not None
+        ]
+        if base_positions:
+            base_schema = copy.copy(self)
+            base_schema.__class__ = schema_utils.DataFrameSchema
+            partitions.append((base_schema, np.concatenate(base_positions)))
+
+        workers = validation.get_validation_workers()
+        validated = parallel.validate_tables(
+            tables=[
+                (
+                    schema,
+                    _drop_empty_undefined(df=check_obj.iloc[key_positions], schema=schema),
+                )
+                for schema, key_positions in partitions
+            ],
+            lazy=lazy,
+            max_workers=workers.max_workers,
+            chunk_size=workers.chunk_size,
+            return_exceptions=True,
+        )
+        errors = [error for error in validated if isinstance(error, BaseException)]
+        if errors:
+            if not lazy or not all(isinstance(error, SchemaErrors) for error in errors):
+                raise errors[0]
+            raise schema_utils.merge_schema_errors(schema=self, errors=errors, data=check_obj)
+
+        validated_df = _concat(
+            dfs=cast("list[pd.DataFrame]", validated),
+            positions=[key_positions for _, key_positions in partitions],
+            columns=check_obj.columns,
+        )
+        validated_df.pandera.add_schema(self)
+
+        return validated_df
+
+
+for _type in (pd.DataFrame, pd.Series):
+    DataFrameSchema.register_backend(_type, schema_utils.CompactErrorsBackend)
+
+
+def use_versions(
+    schema: pa.DataFrameSchema, model: type[pa.DataFrameModel]
+) -> pa.DataFrameSchema:
+    """Validate a stage schema's rows per their forms' versions.
+
+    Args:
+        schema: The stage model's schema, modified in place.
+        model: The stage model.
+
+    Returns:
+        The schema.
+    """
+    schema.__class__ = DataFrameSchema
+    schema.stage_model = model
+
+    return schema
+
+
+@contextmanager
+@typechecked
+def form_versions(form_metadata: pd.DataFrame | None) -> Iterator[None]:
+    """Partition the tables validated within the context by these forms' versions.
+
+    Args:
+        form_metadata: The form metadata, indexed by `form_id`, with `form_type` and
+            `form_version`, as extracted or after. If None, tables are validated against
+            the base definition, but for form metadata itself.
+
+    Yields:
+        None.
+    """
+    token = _FORM_VERSIONS.set(
+        None
+        if form_metadata is None or not has_versions()
+        else _get_form_versions(form_metadata=form_metadata)
+    )
+    try:
+        yield
+    finally:
+        _FORM_VERSIONS.reset(token)
+
+
+def find_form_metadata(tables: Iterable[Any]) -> pd.DataFrame | None:
+    """Find the form metadata among a function's arguments.
+
+    Args:
+        tables: The arguments.
+
+    Returns:
+        The first table with `form_type` and `form_version` columns, if any.
+    """
+    return next((table for table in tables if _has_form_versions(df=table)), None)
+
+
+@typechecked
+def has_versions() -> bool:
+    """Check whether any registered version differs from the base definition.
+
+    Returns:
+        Whether tables need partitioning by version.
+    """
+    return any(
+        not versioned_definition.is_base for versioned_definition in get_registry().values()
+    )
+
+
+@cache
+def get_registry() -> dict[VersionKey, VersionedDefinition]:
+    """Load all versioned definitions, once per process.
+
+    Returns:
+        Versioned definitions by form type and version.
+
+    Raises:
+        ValueError: If two files define the same form type and version.
+    """
+    registry = {}
+    definition_files = sorted(
+        (
+            definition_file
+            for definition_file in resources.files(__package__)
+            .joinpath(_DEFINITIONS_DIR)
+            .iterdir()
+            if definition_file.name.endswith(".json")
+        ),
+        key=lambda definition_file: definition_file.name,
+    )
+    for definition_file in definition_files:
+        versioned_definition = parse_definition(
+            definition_doc=json.loads(definition_file.read_text())
+        )
+        key = (versioned_definition.form_type, versioned_definition.form_version)
+        if key in registry:
+            raise ValueError(f"Duplicate definition for {key} in {definition_file.name}.")
+        registry[key] = versioned_definition
+        logger.debug(f"Loaded the data definition for {key}.")
+
+    return registry
+
+
+@typechecked
+def parse_definition(definition_doc: dict[str, Any]) -> VersionedDefinition:
+    """Parse and compile a versioned definition document.
+
+    Args:
+        definition_doc: The definition document, as loaded from JSON.
+
+    Returns:
+        The compiled definition.
+
+    Raises:
+        ValueError: If an added field has no known `data_type`.
+    """
+    overrides = definition_doc.get(Columns.METADATA, {})
+    if not overrides:
+        return _get_base_definition(
+            form_type=definition_doc[Columns.FORM_TYPE],
+            form_version=definition_doc[Columns.FORM_VERSION],
+        )
+
+    base_fields = definition.get_field_definitions()
+    added_fields: dict[str, list[str]] = {}
+    dropped_fields = set()
+    for level, level_overrides in _iter_field_levels(metadata=overrides):
+        for column, field in level_overrides.items():
+            if field is None:
+                dropped_fields.add(column)
+            elif column not in base_fields:
+                data_type = _DATA_TYPES.get(field.get(Columns.DATA_TYPE))
+                if data_type is None:
+                    raise ValueError(
+                        f"Added field {column} needs a data_type of {list(_DATA_TYPES)}."
+                    )
+                field[Columns.DATA_TYPE] = data_type
+                added_fields.setdefault(_LEVEL_COLUMNS[level], []).append(column)
+
+    metadata = _merge(base=FIELD_DATA_DEFINITION[Columns.METADATA], overrides=overrides)
+    fields = {
+        column: field
+        for column, field in definition.compile_fields(metadata=metadata).items()
+        if column not in dropped_fields
+    }
+
+    return VersionedDefinition(
+        form_type=definition_doc[Columns.FORM_TYPE],
+        form_version=definition_doc[Columns.FORM_VERSION],
+        fields=fields,
+        thresholds=definition.compile_thresholds(metadata=metadata),
+        normalizers=definition.compile_normalizers(fields=fields),
+        is_base=False,
+        added_fields={column: tuple(added) for column, added in added_fields.items()},
+        dropped_fields=frozenset(dropped_fields),
+    )
+
+
+@typechecked
+def get_definition(form_type: str | None, form_version: str | None) -> VersionedDefinition:
+    """Get a form type and version's definition.
+
+    Args:
+        form_type: The form type.
+        form_version: The form version.
+
+    Returns:
+        The versioned definition, else the base definition.
+    """
+    versioned_definition = get_registry().get((form_type, form_version))
+    if versioned_definition is None:
+        return _get_base_definition(form_type=form_type, form_version=form_version)
+
+    return versioned_definition
+
+
+def get_schema(
+    model: type[pa.DataFrameModel], form_type: str | None, form_version: str | None
+) -> pa.DataFrameSchema:
+    """Get this thread's copy of a stage schema, per a form type and version's definition.
+
+    Built once per process, and copied once per thread.
+
+    Args:
+        model: The stage model.
+        form_type: The form type.
+        form_version: The form version.
+
+    Returns:
+        The versioned schema. The stage's schema itself if the version changes nothing it
+        enforces.
+    """
+    versioned_schema = _get_versioned_schema(model=model, key=(form_type, form_version))
+
+    return model.to_schema() if versioned_schema is None else versioned_schema
+
+
+@typechecked
+def partition(df: pd.DataFrame, form_metadata: pd.DataFrame) -> dict[VersionKey, np.ndarray]:
+    """Partition a table's rows by their forms' types and versions.
+
+    Args:
+        df: The table, indexed by `form_id`, among other levels.
+        form_metadata: The form metadata, indexed by `form_id`, with `form_type` and
+            `form_version`.
+
+    Returns:
+        The positions of each version's rows, in order. Rows of forms missing from the
+        form metadata are under `(None, None)`.
+    """
+    versions = form_metadata[[Columns.FORM_TYPE, Columns.FORM_VERSION]].astype(object)
+    versions = versions.where(versions.notna(), None)
+    # Once per form, not per row. Missing forms are coded as unversioned.
+    key_codes: dict[VersionKey, int] = {(None, None): 0}
+    form_codes = np.array(
+        [
+            key_codes.setdefault(key, len(key_codes))
+            for key in zip(
+                versions[Columns.FORM_TYPE], versions[Columns.FORM_VERSION], strict=True
+            )
+        ],
+        dtype=np.int64,
+    )
+    keys = list(key_codes)
+
+    form_positions = form_metadata.index.get_indexer(
+        df.index.get_level_values(Columns.FORM_ID)
+    )
+    row_codes = np.where(
+        form_positions >= 0, form_codes[form_positions] if len(form_codes) else 0, 0
+    )
+
+    positions = {
+        keys[code]: code_positions
+        for code, code_positions in pd.Series(row_codes).groupby(row_codes).indices.items()
+    }
+
+    registry = get_registry()
+    for key in positions:
+        if key not in registry:
+            _warn_unknown_version(key=key)
+
+    return positions
+
+
+@typechecked
+def normalize(df: pd.DataFrame, form_metadata: pd.DataFrame) -> pd.DataFrame:
+    """Normalize a table's text fields per each form's version.
+
+    Args:
+        df: The table, indexed by `form_id`, among other levels.
+        form_metadata: The form metadata, indexed by `form_id`, with `form_type` and
+            `form_version`.
+
+    Returns:
+        A normalized copy of the table, in the same order.
+    """
+    positions = partition(df=df, form_metadata=form_metadata)
+    if len(positions) <= 1:
+        key = next(iter(positions), (None, None))
+        return definition.normalize(df=df, normalizers=get_definition(*key).normalizers)
+
+    normalized = pd.concat(
+        [
+            definition.normalize(
+                df=df.iloc[key_positions], normalizers=get_definition(*key).normalizers
+            )
+            for key, key_positions in positions.items()
+        ]
+    )
+
+    return normalized.iloc[np.argsort(np.concatenate(list(positions.values())))]
+
+
+@cache
+def _get_base_definition(
+    form_type: str | None, form_version: str | None
+) -> VersionedDefinition:
+    """Get the base definition, under a form type and version."""
+    return VersionedDefinition(
+        form_type=form_type,
+        form_version=form_version,
+        fields=definition.get_field_definitions(),
+        thresholds=definition.get_thresholds(),
+        normalizers=definition.get_normalizers(),
+        is_base=True,
+    )
+
+
+def _get_versioned_schema(
+    model: type[pa.DataFrameModel], key: VersionKey
+) -> pa.DataFrameSchema | None:
+    """Get this thread's copy of a versioned schema, or None if it'd be the stage's."""
+    versioned_schema = _build_schema(model, *key)
+    if versioned_schema is None:
+        return None
+
+    thread_schemas = getattr(_THREAD_SCHEMAS, "schemas", None)
+    if thread_schemas is None:
+        thread_schemas = _THREAD_SCHEMAS.schemas = {}
+    built_schema, schema = thread_schemas.get((model, key), (None, None))
+    # Copied anew if rebuilt, e.g. from a reloaded registry.
+    if built_schema is not versioned_schema:
+        schema = copy.deepcopy(versioned_schema)
+        thread_schemas[model, key] = (versioned_schema, schema)
+
+    return schema
+
+
+@cache
+def _build_schema(
+    model: type[pa.DataFrameModel], form_type: str | None, form_version: str | None
+) -> pa.DataFrameSchema | None:
+    """Build a versioned schema, once per process. None if it'd be the stage's."""
+    versioned_definition = get_definition(form_type=form_type, form_version=form_version)
+    if versioned_definition.is_base:
+        return None
+
+    base_schema = model.to_schema()
+    base_fields = definition.get_field_definitions()
+    updates = {}
+    for column_name, column in base_schema.columns.items():
+        field = versioned_definition.fields.get(column_name)
+        if not column.coerce or field is None or field == base_fields.get(column_name):
+            continue
+
+        update: dict[str, Any] = {}
+        limits = definition.get_field_limits(field=field)
+        if limits != definition.get_field_limits(field=base_fields[column_name]):
+            update["checks"] = [
+                check for check in column.checks if check.name not in _LIMIT_CHECK_NAMES
+            ] + _get_limit_checks(field=field)
+        if field.options is not None and isinstance(column.dtype.type, pd.CategoricalDtype):
+            # The base's options as they are, e.g. enums, so categories union across versions.
+            base_options = {option: option for option in column.dtype.type.categories}
+            update["dtype"] = pd.CategoricalDtype(
+                categories=[base_options.get(option, option) for option in field.options],
+                ordered=column.dtype.type.ordered,
+            )
+        if update:
+            updates[column_name] = update
+
+    dropped = [
+        column_name
+        for column_name in versioned_definition.dropped_fields
+        if column_name in base_schema.columns
+    ]
+    added = {
+        column_name: _get_added_column(
+            field=versioned_definition.fields[column_name],
+            level_column=base_schema.columns[level_column],
+        )
+        for level_column, column_names in versioned_definition.added_fields.items()
+        if level_column in base_schema.columns
+        for column_name in column_names
+    }
+    if not (updates or dropped or added):
+        return None
+
+    versioned_schema = base_schema.update_columns(updates).remove_columns(dropped)
+    versioned_schema = versioned_schema.add_columns(added)
+    # Validated as is, not partitioned again.
+    versioned_schema.__class__ = schema_utils.DataFrameSchema
+    versioned_schema.__dict__.pop("stage_model", None)
+
+    return versioned_schema
+
+
+def _get_added_column(field: FieldDefinition, level_column: pa.Column) -> pa.Column:
+    """Get the column of an added field, enforced as its level's column is by the stage."""
+    if not level_column.coerce:
+        # Unenforced, as the stage's other fields are.
+        return pa.Column(nullable=True, name=field.name)
+
+    dtype: Any = field.data_type
+    if field.options is not None:
+        dtype = pd.CategoricalDtype(categories=field.options, ordered=False)
+
+    return pa.Column(
+        dtype,
+        checks=_get_limit_checks(field=field),
+        nullable=True,
+        coerce=True,
+        name=field.name,
+    )
+
+
+def _get_limit_checks(field: FieldDefinition) -> list[pa.Check]:
+    """Get a field's limits as checks, as `pa.Field`'s kwargs would add them."""
+    return [
+        getattr(pa.Check, name)(value)
+        for name, value in definition.get_field_limits(field=field).items()
+    ]
+
+
+def _get_partitions(df: pd.DataFrame) -> dict[VersionKey, np.ndarray]:
+    """Partition a table by its versions, or the active form versions. Empty if neither."""
+    if not has_versions() or Columns.FORM_ID not in df.index.names:
+        return {}
+
+    form_metadata = (
+        _get_form_versions(form_metadata=df)
+        if _has_form_versions(df=df)
+        else _FORM_VERSIONS.get()
+    )
+    if form_metadata is None:
+        return {}
+
+    return partition(df=df, form_metadata=form_metadata)
+
+
+def _get_form_versions(form_metadata: pd.DataFrame) -> pd.DataFrame:
+    """Get each form's type and version, normalized, once per form."""
+    versions = form_metadata[[Columns.FORM_TYPE, Columns.FORM_VERSION]]
+    versions = versions[~versions.index.duplicated()]
+
+    return definition.normalize(df=versions)
+
+
+def _has_form_versions(df: Any) -> bool:
+    """Check whether a table is form metadata, with form types and versions."""
+    return (
+        isinstance(df, pd.DataFrame)
+        and Columns.FORM_TYPE in df.columns
+        and Columns.FORM_VERSION in df.columns
+        and Columns.FORM_ID in df.index.names
+    )
+
+
+def _drop_empty_undefined(df: pd.DataFrame, schema: pa.DataFrameSchema) -> pd.DataFrame:
+    """Drop the empty columns of other versions' fields, for a strict schema."""
+    if schema.strict is not True:
+        return df
+
+    empty_undefined = [
+        column
+        for column in df.columns
+        if column not in schema.columns and df[column].isna().all()
+    ]
+
+    return df.drop(columns=empty_undefined) if empty_undefined else df
+
+
+def _concat(
+    dfs: list[pd.DataFrame], positions: list[np.ndarray], columns: pd.Index
+) -> pd.DataFrame:
+    """Put validated partitions back in their table's order, unioning categories."""
+    categoricals: dict[str, list[pd.CategoricalDtype]] = {}
+    for df in dfs:
+        for column, dtype in df.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                categoricals.setdefault(column, []).append(dtype)
+    unioned = {}
+    for column, dtypes in categoricals.items():
+        if len(dtypes) == len(dfs) and all(dtype == dtypes[0] for dtype in dtypes):
+            continue
+        unioned[column] = pd.CategoricalDtype(
+            categories=list(
+                dict.fromkeys(category for dtype in dtypes for category in dtype.categories)
+            ),
+            ordered=dtypes[0].ordered,
+        )
+
+    concatenated = pd.concat(
+        [df.astype({c: d for c, d in unioned.items() if c in df.columns}) for df in dfs]
+    )
+    concatenated = concatenated.iloc[np.argsort(np.concatenate(positions))]
+    ordered_columns = [column for column in columns if column in concatenated.columns]
+
+    return concatenated[
+        ordered_columns
+        + [column for column in concatenated.columns if column not in ordered_columns]
+    ]
+
+
+def _iter_field_levels(
+    metadata: dict[str, Any],
+) -> Iterator[tuple[str | None, dict[str, Any]]]:
+    """Iterate over the field-level overrides of each level: form, investigators, sites."""
+    observation = FIELD_DATA_DEFINITION[Columns.FORMS][Columns.FORM_ID][Columns.OBSERVATIONS][
+        0
+    ]
+    observation_types = {key for key, value in observation.items() if isinstance(value, dict)}
+    levels = {
+        None: {
+            column: field
+            for column, field in metadata.items()
+            if column not in (Columns.INVESTIGATORS, Columns.OBSERVATIONS)
+        },
+        Columns.INVESTIGATORS: metadata.get(Columns.INVESTIGATORS) or {},
+        Columns.OBSERVATIONS: {
+            column: field
+            for column, field in (metadata.get(Columns.OBSERVATIONS) or {}).items()
+            if column not in observation_types
+        },
+    }
+    for level, level_metadata in levels.items():
+        yield level, {
+            column: field
+            for column, field in level_metadata.items()
+            if field is None or isinstance(field, dict)
+        }
+
+
+@cache
+def _warn_unknown_version(key: VersionKey) -> None:
+    """Warn, once per process, that a form version has no definition."""
+    logger.warning(f"No definition for form version {key}. Using the base.")
+
+
+def _merge(base: dict[str, Any], overrides: dict[str, Any]) -> dict[str, Any]:
+    """Merge overrides into a copy of a nested definition."""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(base=merged[key], overrides=value)
+        else:
+            merged[key] = value
+
+    return merged
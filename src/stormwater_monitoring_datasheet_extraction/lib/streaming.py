@@ -0,0 +1,378 @@
+"""Streaming ETL: overlaps extraction with precleaning and verification.
+
+`load_datasheets.run_etl` runs each stage over the whole extraction before starting the
+next. `stream_etl` instead streams forms through the per-form stages as they're extracted:
+
+1. Extraction runs in an executor thread, and puts each extracted form onto a bounded queue
+   as soon as its batch is extracted.
+2. Precleaning takes forms as they arrive, flattens them, and validates them against the
+   stage schemas, then puts the precleaned chunk onto a second bounded queue.
+3. Verification takes precleaned chunks as they arrive, so the user can verify the first
+   form while later forms are still being extracted.
+4. Once the stream drains, the verified chunks are concatenated, and the whole-extraction
+   stages run: `clean`, with its cross-form checks, then `restructure_extraction` and
+   `load`.
+
+Precleaning and verification run in executor threads too, in the pipeline's context, so
+the event loop keeps moving forms between the stages, e.g. extraction keeps putting forms
+onto the queue while the user verifies a chunk.
+
+The bounded queues apply backpressure: if precleaning or verification falls behind,
+extraction blocks rather than buffering forms without limit. Each stage takes whatever is
+queued, up to `constants.STREAM_CHUNK_SIZE` forms, so chunks stay small, for low latency,
+while extraction is the bottleneck, and grow, amortizing per-call validation, when a stage
+falls behind.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+from collections.abc import Callable
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Final, cast
+
+import pandas as pd
+import pandera.typing as pt
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, load_datasheets, schema
+from stormwater_monitoring_datasheet_extraction.lib.documents.flatten import flatten_forms
+from stormwater_monitoring_datasheet_extraction.lib.extraction import discovery, extractors
+from stormwater_monitoring_datasheet_extraction.lib.output import ledger, report, write
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stream.
+_END: Final[object] = object()
+# Seconds between checks for a stop while extraction waits on a full queue.
+_POLL_SECONDS: Final[float] = 0.1
+# The number of relational tables, of the verified tables, followed by the type maps.
+_N_TABLES: Final[int] = 5
+
+
+@typechecked
+def stream_etl(  # noqa: D103
+    input_dir: Path,
+    output_dir: Path,
+    validation_profile: constants.ValidationProfile = constants.ValidationProfile.FULL,
+    validation_workers: int = constants.VALIDATION_WORKERS,
+    reference_time: datetime | None = None,
+    failure_cases_path: Path | None = None,
+    extractor: str | None = None,
+    incremental: bool = False,
+) -> Path:
+    logger.info(f"Starting streaming ETL process with {validation_profile} validation...")
+
+    with validation.validation_profile(
+        profile=validation_profile
+    ), validation.validation_workers(
+        max_workers=validation_workers
+    ), validation.reference_time(
+        timestamp=reference_time
+    ), schema_utils.failure_cases_detail(
+        path=failure_cases_path
+    ), ledger.incremental(
+        path=output_dir / ledger.LEDGER_NAME if incremental else None
+    ), load_datasheets.warm_site_creek_maps(), report.reporting(
+        output_dir=write.get_output_dir(output_dir=output_dir)
+    ):
+        final_output_path = _stream_etl(
+            input_dir=input_dir, output_dir=output_dir, extractor=extractor
+        )
+
+    return final_output_path
+
+
+stream_etl.__doc__ = constants.DocStrings.STREAM_ETL.api_docstring
+
+
+@schema_utils.schema_error_handler
+@typechecked
+def _stream_etl(input_dir: Path, output_dir: Path, extractor: str | None) -> Path:
+    """Run the streaming stages under the active validation profile."""
+    # The event loop runs in a copy of this context, to see the settings above.
+    verified_chunks = asyncio.run(_stream_forms(input_dir=input_dir, extractor=extractor))
+
+    if verified_chunks:
+        verified_tables = [
+            pd.concat([chunk[table_number] for chunk in verified_chunks])
+            for table_number in range(_N_TABLES)
+        ]
+        # The maps are the same warm maps for each chunk.
+        verified_site_type_map, verified_creek_type_map = verified_chunks[-1][_N_TABLES:]
+    else:
+        *verified_tables, verified_site_type_map, verified_creek_type_map = _verify_forms(
+            forms={}
+        )
+    (
+        verified_form_metadata,
+        verified_investigators,
+        verified_site_visits,
+        verified_quantitative_observations,
+        verified_qualitative_observations,
+    ) = verified_tables
+
+    (
+        cleaned_form_metadata,
+        cleaned_investigators,
+        cleaned_site_visits,
+        cleaned_quantitative_observations,
+        cleaned_qualitative_observations,
+        cleaned_site_type_map,
+        cleaned_creek_type_map,
+    ) = load_datasheets.clean(
+        verified_form_metadata=verified_form_metadata,
+        verified_investigators=verified_investigators,
+        verified_site_visits=verified_site_visits,
+        verified_quantitative_observations=verified_quantitative_observations,
+        verified_qualitative_observations=verified_qualitative_observations,
+        verified_site_type_map=verified_site_type_map,
+        verified_creek_type_map=verified_creek_type_map,
+    )
+
+    restructured_json = load_datasheets.restructure_extraction(
+        cleaned_form_metadata=cleaned_form_metadata,
+        cleaned_investigators=cleaned_investigators,
+        cleaned_site_visits=cleaned_site_visits,
+        cleaned_quantitative_observations=cleaned_quantitative_observations,
+        cleaned_qualitative_observations=cleaned_qualitative_observations,
+        cleaned_site_type_map=cleaned_site_type_map,
+        cleaned_creek_type_map=cleaned_creek_type_map,
+    )
+
+    return load_datasheets.load(restructured_json=restructured_json, output_dir=output_dir)
+
+
+async def _stream_forms(input_dir: Path, extractor: str | None) -> list[tuple]:
+    """Stream forms through extraction, precleaning, and verification.
+
+    Returns:
+        The verified chunks, in extraction order.
+    """
+    loop = asyncio.get_running_loop()
+    extracted_queue: asyncio.Queue = asyncio.Queue(maxsize=constants.STREAM_QUEUE_SIZE)
+    precleaned_queue: asyncio.Queue = asyncio.Queue(maxsize=constants.STREAM_QUEUE_SIZE)
+    stop = threading.Event()
+
+    # Executor threads don't inherit the context, e.g. the active ledger.
+    extraction = loop.run_in_executor(
+        None,
+        partial(
+            contextvars.copy_context().run,
+            _extract_forms,
+            input_dir,
+            extractor,
+            extracted_queue,
+            loop,
+            stop,
+        ),
+    )
+    precleaning = asyncio.create_task(
+        _preclean_forms(extracted_queue=extracted_queue, precleaned_queue=precleaned_queue)
+    )
+    verification = asyncio.create_task(_verify_chunks(precleaned_queue=precleaned_queue))
+    try:
+        _, _, verified_chunks = await asyncio.gather(extraction, precleaning, verification)
+    finally:
+        # On failure, stop the other stages rather than wait on queues no one will drain.
+        stop.set()
+        precleaning.cancel()
+        verification.cancel()
+
+    return verified_chunks
+
+
+def _extract_forms(
+    input_dir: Path,
+    extractor: str | None,
+    extracted_queue: asyncio.Queue,
+    loop: asyncio.AbstractEventLoop,
+    stop: threading.Event,
+) -> None:
+    """Extract forms in this thread, putting each onto the queue, then the end."""
+    logger.info(f"Extracting data from images in {input_dir} ...")
+    n_forms = 0
+    if extractor is None:
+        logger.warning("No extractor selected. Nothing will be extracted.")
+    else:
+        for forms in load_datasheets.iter_extracted_forms(
+            # Images are discovered in the background while earlier images are extracted.
+            images=discovery.prefetch_images(input_dir=input_dir),
+            extractor=extractors.get_extractor(extractor),
+        ):
+            for form in forms.items():
+                if not _put_threadsafe(
+                    item_queue=extracted_queue, item=form, loop=loop, stop=stop
+                ):
+                    return
+                n_forms += 1
+    logger.info(f"Extracted {n_forms} forms.")
+
+    _put_threadsafe(item_queue=extracted_queue, item=_END, loop=loop, stop=stop)
+
+
+async def _preclean_forms(
+    extracted_queue: asyncio.Queue, precleaned_queue: asyncio.Queue
+) -> None:
+    """Preclean forms as they arrive, putting each chunk onto the queue, then the end."""
+    ended = False
+    while not ended:
+        forms, ended = await _get_chunk(item_queue=extracted_queue)
+        if forms:
+            await precleaned_queue.put(await _run_in_thread(_preclean, forms=dict(forms)))
+
+    await precleaned_queue.put(_END)
+
+
+async def _verify_chunks(precleaned_queue: asyncio.Queue) -> list[tuple]:
+    """Verify precleaned chunks as they arrive, until the end.
+
+    Returns:
+        The verified chunks.
+    """
+    verified_chunks = []
+    while (precleaned_tables := await precleaned_queue.get()) is not _END:
+        (
+            precleaned_form_metadata,
+            precleaned_investigators,
+            precleaned_site_visits,
+            precleaned_quantitative_observations,
+            precleaned_qualitative_observations,
+        ) = precleaned_tables
+        verified_chunks.append(
+            await _run_in_thread(
+                load_datasheets.verify,
+                precleaned_form_metadata=precleaned_form_metadata,
+                precleaned_investigators=precleaned_investigators,
+                precleaned_site_visits=precleaned_site_visits,
+                precleaned_quantitative_observations=precleaned_quantitative_observations,
+                precleaned_qualitative_observations=precleaned_qualitative_observations,
+            )
+        )
+
+    return verified_chunks
+
+
+@validation.check_types
+def _flatten(
+    forms: dict[str, Any],
+) -> tuple[
+    pt.DataFrame[schema.FormExtracted],
+    pt.DataFrame[schema.FormInvestigatorExtracted],
+    pt.DataFrame[schema.SiteVisitExtracted],
+    pt.DataFrame[schema.QuantitativeObservationsExtracted],
+    pt.DataFrame[schema.QualitativeObservationsExtracted],
+]:
+    """Flatten extracted forms into the raw tables, validated like `extract`'s."""
+    raw_tables = flatten_forms(forms=forms)
+
+    return (
+        cast("pt.DataFrame[schema.FormExtracted]", raw_tables.form_metadata),
+        cast("pt.DataFrame[schema.FormInvestigatorExtracted]", raw_tables.investigators),
+        cast("pt.DataFrame[schema.SiteVisitExtracted]", raw_tables.site_visits),
+        cast(
+            "pt.DataFrame[schema.QuantitativeObservationsExtracted]",
+            raw_tables.quantitative_observations,
+        ),
+        cast(
+            "pt.DataFrame[schema.QualitativeObservationsExtracted]",
+            raw_tables.qualitative_observations,
+        ),
+    )
+
+
+def _preclean(forms: dict[str, Any]) -> tuple:
+    """Flatten and preclean extracted forms."""
+    (
+        raw_form_metadata,
+        raw_investigators,
+        raw_site_visits,
+        raw_quantitative_observations,
+        raw_qualitative_observations,
+    ) = _flatten(forms=forms)
+
+    return load_datasheets.preclean(
+        raw_form_metadata=raw_form_metadata,
+        raw_investigators=raw_investigators,
+        raw_site_visits=raw_site_visits,
+        raw_quantitative_observations=raw_quantitative_observations,
+        raw_qualitative_observations=raw_qualitative_observations,
+    )
+
+
+def _verify_forms(forms: dict[str, Any]) -> tuple:
+    """Preclean and verify forms in one go, e.g. none, for empty tables."""
+    (
+        precleaned_form_metadata,
+        precleaned_investigators,
+        precleaned_site_visits,
+        precleaned_quantitative_observations,
+        precleaned_qualitative_observations,
+    ) = _preclean(forms=forms)
+
+    return load_datasheets.verify(
+        precleaned_form_metadata=precleaned_form_metadata,
+        precleaned_investigators=precleaned_investigators,
+        precleaned_site_visits=precleaned_site_visits,
+        precleaned_quantitative_observations=precleaned_quantitative_observations,
+        precleaned_qualitative_observations=precleaned_qualitative_observations,
+    )
+
+
+async def _run_in_thread(fx: Callable[..., Any], **kwargs: Any) -> Any:
+    """Run a blocking call in an executor thread, in this context, without blocking the loop.
+
+    Returns:
+        The call's return.
+    """
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(
+        None, partial(contextvars.copy_context().run, fx, **kwargs)
+    )
+
+
+async def _get_chunk(item_queue: asyncio.Queue) -> tuple[list, bool]:
+    """Wait for an item, then take whatever else is queued, up to the chunk size.
+
+    Returns:
+        The items, and whether the stream ended.
+    """
+    items = [await item_queue.get()]
+    while len(items) < constants.STREAM_CHUNK_SIZE and items[-1] is not _END:
+        try:
+            items.append(item_queue.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+
+    ended = items[-1] is _END
+
+    return (items[:-1] if ended else items), ended
+
+
+def _put_threadsafe(
+    item_queue: asyncio.Queue,
+    item: Any,
+    loop: asyncio.AbstractEventLoop,
+    stop: threading.Event,
+) -> bool:
+    """Put an item onto the event loop's queue from another thread, waiting for room.
+
+    Returns:
+        Whether the item was put, rather than stopped.
+    """
+    future = asyncio.run_coroutine_threadsafe(item_queue.put(item), loop)
+    while not stop.is_set():
+        try:
+            future.result(timeout=_POLL_SECONDS)
+            return True
+        except TimeoutError:
+            continue
+    future.cancel()
+
+    return False
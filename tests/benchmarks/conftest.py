@@ -0,0 +1,18 @@
+"""Benchmarks conftest."""
+
+from typing import Any
+
+import pytest
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+
+
+@pytest.fixture(scope="session")
+def many_forms() -> dict[str, dict[str, Any]]:
+    """Get 100,000 forms, replaying the example extraction document's forms."""
+    example_forms = list(
+        constants.FIELD_DATA_DEFINITION["example_extraction_document"][Columns.FORMS].values()
+    )
+
+    return {f"IMG_{i}.jpg": example_forms[i % len(example_forms)] for i in range(100_000)}
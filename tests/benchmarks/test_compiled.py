@@ -0,0 +1,75 @@
+"""Benchmark the compiled schemas and argument validators."""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Final
+
+import pandera.pandas as pa
+import pandera.typing as pt
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import schema
+from stormwater_monitoring_datasheet_extraction.lib.db import tables
+from stormwater_monitoring_datasheet_extraction.lib.schema import compiled
+
+_N_CALLS: Final[int] = 100
+_N_THREADS: Final[int] = 10
+
+
+def _get_site_creek_maps(
+    site_type_map: pt.DataFrame[schema.Site], creek_type_map: pt.DataFrame[schema.Creek]
+) -> tuple[pt.DataFrame[schema.Site], pt.DataFrame[schema.Creek]]:
+    """Pass the site and creek type maps through, to validate on the way in and out."""
+    return site_type_map, creek_type_map
+
+
+def _time_calls(fx: Callable[..., Any]) -> float:
+    """Time calls to a checked function, in milliseconds per call."""
+    fx(site_type_map=tables.SITES, creek_type_map=tables.CREEKS)
+    start = time.perf_counter()
+    for _ in range(_N_CALLS):
+        fx(site_type_map=tables.SITES.copy(), creek_type_map=tables.CREEKS.copy())
+
+    return (time.perf_counter() - start) / _N_CALLS * 1e3
+
+
+def _time_threads(get_schema: Callable[[type[pa.DataFrameModel]], Any]) -> float:
+    """Time getting all the schemas in new threads, in milliseconds per thread."""
+    models = list(dict.fromkeys(compiled._iter_models(models=compiled._ROOT_MODELS)))
+
+    def _get_schemas() -> None:
+        for model in models:
+            get_schema(model)
+
+    start = time.perf_counter()
+    for _ in range(_N_THREADS):
+        thread = threading.Thread(target=_get_schemas)
+        thread.start()
+        thread.join()
+
+    return (time.perf_counter() - start) / _N_THREADS * 1e3
+
+
+@typechecked
+def test_check_types_overhead() -> None:
+    """Benchmarks compiled checks against `pa.check_types`, per call and per thread."""
+    n_models = compiled.compile_schemas()
+    pandera_ms = _time_calls(
+        fx=pa.check_types(_get_site_creek_maps, with_pydantic=True, lazy=True)
+    )
+    compiled_ms = _time_calls(fx=compiled.check_types(lazy=True)(_get_site_creek_maps))
+
+    per_thread_ms = _time_threads(
+        get_schema=lambda model: compiled._BUILD_SCHEMA.__get__(None, model)
+    )
+    shared_ms = _time_threads(get_schema=lambda model: model.to_schema())
+
+    print(
+        f"\nChecked types in {compiled_ms:.2f}ms per call compiled, {pandera_ms:.2f}ms with "
+        f"pa.check_types: {pandera_ms - compiled_ms:.2f}ms saved per call. Got {n_models} "
+        f"schemas in {shared_ms:.2f}ms per new thread shared, {per_thread_ms:.2f}ms built "
+        "per thread."
+    )
+    assert compiled_ms < pandera_ms
+    assert shared_ms < per_thread_ms
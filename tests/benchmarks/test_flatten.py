@@ -0,0 +1,40 @@
+"""Benchmark flattening extraction documents."""
+
+import time
+from typing import Any
+
+import pandas as pd
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.documents import flatten
+
+
+def _flatten_per_form(forms: dict[str, dict[str, Any]]) -> pd.DataFrame:
+    """Flatten naively, a frame per form then concatenating, for comparison.
+
+    Only the form metadata table, which is the cheapest to flatten.
+    """
+    return pd.concat(
+        [pd.DataFrame([form], index=pd.Index([form_id])) for form_id, form in forms.items()]
+    )
+
+
+@typechecked
+def test_flatten_100k_forms(many_forms: dict[str, dict[str, Any]]) -> None:
+    """Benchmarks flattening 100,000 forms, against the naive approach on 1% of them."""
+    start = time.perf_counter()
+    tables = flatten.flatten_forms(forms=many_forms)
+    columnar_seconds = time.perf_counter() - start
+
+    some_forms = dict(list(many_forms.items())[: len(many_forms) // 100])
+    start = time.perf_counter()
+    _flatten_per_form(forms=some_forms)
+    naive_seconds = (time.perf_counter() - start) * 100
+
+    print(
+        f"\nFlattened {len(many_forms)} forms into {sum(len(table) for table in tables)} "
+        f"rows in {columnar_seconds:.2f}s ({len(many_forms) / columnar_seconds:,.0f} "
+        f"forms/s). Naive, extrapolated: {naive_seconds:.2f}s."
+    )
+    assert len(tables.form_metadata) == len(many_forms)
+    assert columnar_seconds < naive_seconds
@@ -0,0 +1,53 @@
+"""Benchmark composite-key uniqueness on integer codes."""
+
+import time
+from typing import Final
+
+import numpy as np
+import pandas as pd
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.schema import keys
+
+_N_FORMS: Final[int] = 400_000
+_SITE_IDS: Final[list[str]] = ["C ST", "BROADWAY", "PADDEN"]
+
+
+def _get_observations() -> pd.DataFrame:
+    """Get 1.2M quantitative observations' keys, three per form."""
+    return pd.DataFrame(
+        {
+            Columns.FORM_ID: np.repeat([f"IMG_{i}.jpg" for i in range(_N_FORMS)], 3),
+            Columns.SITE_ID: _SITE_IDS * _N_FORMS,
+            Columns.BACTERIA_BOTTLE_NO: ["B1", "B2", "B3"] * _N_FORMS,
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID])
+
+
+@typechecked
+def test_duplicated() -> None:
+    """Benchmarks the primary key and bottle number checks, on codes and on objects."""
+    observations = _get_observations()
+    primary_key = [Columns.FORM_ID, Columns.SITE_ID]
+    bottle_key = [Columns.FORM_ID, Columns.BACTERIA_BOTTLE_NO]
+
+    start = time.perf_counter()
+    object_primary = pd.MultiIndex.from_arrays(
+        [observations.index.get_level_values(level) for level in primary_key]
+    ).duplicated(keep="first")
+    object_bottle = observations.reset_index().duplicated(subset=bottle_key, keep="first")
+    object_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    codes_primary = keys.duplicated(df=observations.index, keys=primary_key)
+    codes_bottle = keys.duplicated(df=observations, keys=bottle_key)
+    codes_seconds = time.perf_counter() - start
+
+    print(
+        f"\nChecked {len(observations):,} rows' keys in {object_seconds:.2f}s on objects, "
+        f"{codes_seconds:.2f}s on codes."
+    )
+    np.testing.assert_array_equal(codes_primary, object_primary)
+    np.testing.assert_array_equal(codes_bottle, object_bottle.to_numpy())
+    assert codes_seconds < object_seconds
@@ -0,0 +1,72 @@
+"""Benchmark out-of-core validation from Parquet."""
+
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+import pandas as pd
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.schema import out_of_core
+
+pytest.importorskip("pyarrow")
+
+_N_FORMS: Final[int] = 200_000
+_SITE_IDS: Final[list[str]] = ["C ST", "BROADWAY", "PADDEN"]
+_BATCH_SIZE: Final[int] = 50_000
+
+
+def _write_observations(path: Path) -> int:
+    """Write 600,000 quantitative observations to Parquet."""
+    n_rows = _N_FORMS * len(_SITE_IDS)
+    pd.DataFrame(
+        {
+            Columns.FORM_ID: np.repeat([f"IMG_{i}.jpg" for i in range(_N_FORMS)], 3),
+            Columns.SITE_ID: _SITE_IDS * _N_FORMS,
+            Columns.BACTERIA_BOTTLE_NO: ["B1", "B2", "B3"] * _N_FORMS,
+            Columns.FLOW: ["M"] * n_rows,
+            Columns.FLOW_COMPARED_TO_EXPECTED: ["Normal"] * n_rows,
+            Columns.AIR_TEMP: np.linspace(10, 20, n_rows),
+            Columns.WATER_TEMP: np.linspace(8, 12, n_rows),
+            Columns.DO_MG_PER_L: np.linspace(9, 11, n_rows),
+            Columns.SPS_MICRO_S_PER_CM: np.linspace(300, 400, n_rows),
+            Columns.SALINITY_PPT: np.linspace(0.1, 0.2, n_rows),
+            Columns.PH: np.linspace(6, 8, n_rows),
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID]).to_parquet(path)
+
+    return n_rows
+
+
+@typechecked
+def test_out_of_core_memory(tmp_path: Path) -> None:
+    """Benchmarks peak memory validating from Parquet in batches, against in memory."""
+    path = tmp_path / "observations.parquet"
+    n_rows = _write_observations(path=path)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    out_of_core.validate_parquet(
+        path=path, model=schema.QuantitativeObservationsVerified, batch_size=_BATCH_SIZE
+    )
+    out_of_core_seconds = time.perf_counter() - start
+    _, out_of_core_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    schema.QuantitativeObservationsVerified.validate(pd.read_parquet(path), lazy=True)
+    in_memory_seconds = time.perf_counter() - start
+    _, in_memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"\nValidated {n_rows:,} rows from Parquet in {out_of_core_seconds:.2f}s, peaking at "
+        f"{out_of_core_peak / 2**20:.0f}MiB in batches of {_BATCH_SIZE:,}. In memory: "
+        f"{in_memory_seconds:.2f}s, {in_memory_peak / 2**20:.0f}MiB."
+    )
+    assert out_of_core_peak < in_memory_peak
@@ -0,0 +1,75 @@
+"""Benchmark parallel validation."""
+
+import os
+import time
+from typing import Any, Final, cast
+
+import numpy as np
+import pandas as pd
+import pandera.typing as pt
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation
+
+_N_FORMS: Final[int] = 400_000
+_SITE_IDS: Final[list[str]] = ["C ST", "BROADWAY", "PADDEN"]
+_MAX_WORKERS: Final[int] = 4
+
+
+def _get_observations() -> pd.DataFrame:
+    """Get 1.2M quantitative observations, three per form."""
+    n_rows = _N_FORMS * len(_SITE_IDS)
+    columns = schema.QuantitativeObservationsVerified.to_schema().columns
+
+    return pd.DataFrame(
+        {
+            Columns.FORM_ID: np.repeat([f"IMG_{i}.jpg" for i in range(_N_FORMS)], 3),
+            Columns.SITE_ID: _SITE_IDS * _N_FORMS,
+            Columns.BACTERIA_BOTTLE_NO: ["B1", "B2", "B3"] * _N_FORMS,
+            Columns.FLOW: pd.Categorical(
+                ["M"] * n_rows, dtype=columns[Columns.FLOW].dtype.type
+            ),
+            Columns.FLOW_COMPARED_TO_EXPECTED: pd.Categorical(
+                ["Normal"] * n_rows,
+                dtype=columns[Columns.FLOW_COMPARED_TO_EXPECTED].dtype.type,
+            ),
+            Columns.AIR_TEMP: np.linspace(10, 20, n_rows),
+            Columns.WATER_TEMP: np.linspace(8, 12, n_rows),
+            Columns.DO_MG_PER_L: np.linspace(9, 11, n_rows),
+            Columns.SPS_MICRO_S_PER_CM: np.linspace(300, 400, n_rows),
+            Columns.SALINITY_PPT: np.linspace(0.1, 0.2, n_rows),
+            Columns.PH: np.linspace(6, 8, n_rows),
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID])
+
+
+@validation.check_types
+def _check_observations(
+    observations: Any,
+) -> pt.DataFrame[schema.QuantitativeObservationsVerified]:
+    return cast("pt.DataFrame[schema.QuantitativeObservationsVerified]", observations)
+
+
+@typechecked
+def test_parallel_validation() -> None:
+    """Benchmarks validating 1.2M observations serially, and in chunks in parallel."""
+    observations = _get_observations()
+
+    start = time.perf_counter()
+    serial = _check_observations(observations=observations)
+    serial_seconds = time.perf_counter() - start
+
+    with validation.validation_workers(max_workers=_MAX_WORKERS):
+        start = time.perf_counter()
+        parallel = _check_observations(observations=observations)
+        parallel_seconds = time.perf_counter() - start
+
+    print(
+        f"\nValidated {len(observations):,} rows in {serial_seconds:.2f}s serially, "
+        f"{parallel_seconds:.2f}s with {_MAX_WORKERS} workers on {os.cpu_count()} CPUs."
+    )
+    pd.testing.assert_frame_equal(parallel, serial)
+    if (os.cpu_count() or 1) >= _MAX_WORKERS:
+        assert parallel_seconds < serial_seconds
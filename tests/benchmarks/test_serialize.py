@@ -0,0 +1,42 @@
+"""Benchmark serializing output documents."""
+
+import json
+import time
+from typing import Any
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.db import tables
+from stormwater_monitoring_datasheet_extraction.lib.documents import flatten, restructure
+from stormwater_monitoring_datasheet_extraction.lib.output import serialize
+
+
+@typechecked
+def test_serialize_100k_forms(
+    many_forms: dict[str, dict[str, Any]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Benchmarks serializing 100,000 restructured forms, against the standard library."""
+    if serialize.orjson is None:
+        pytest.skip("`orjson` not installed.")
+    document = restructure.restructure_tables(
+        *flatten.flatten_forms(forms=many_forms),
+        site_type_map=tables.SITES,
+        creek_type_map=tables.CREEKS,
+    )
+
+    start = time.perf_counter()
+    serialized = serialize.serialize(document=document)
+    fast_seconds = time.perf_counter() - start
+
+    monkeypatch.setattr(serialize, "orjson", None)
+    start = time.perf_counter()
+    serialize.serialize(document=document)
+    standard_seconds = time.perf_counter() - start
+
+    print(
+        f"\nSerialized {len(many_forms)} forms ({len(serialized) / 1e6:.0f} MB) in "
+        f"{fast_seconds:.2f}s with orjson, {standard_seconds:.2f}s with json."
+    )
+    assert json.loads(serialized).keys() == document.keys()
+    assert fast_seconds < standard_seconds
@@ -5,11 +5,28 @@ import os
 import pytest
 
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add test options."""
+    parser.addoption(
+        "--run_benchmarks",
+        action="store_true",
+        default=False,
+        help="Run the benchmarks in tests/benchmarks, which are skipped by default.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register markers."""
+    config.addinivalue_line("markers", "benchmark: performance benchmarks, opt-in.")
+
+
 def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
     """Mark test types."""
     unit_tests_dir = os.path.join(str(config.rootpath), "tests/unit")
     integration_tests_dir = os.path.join(str(config.rootpath), "tests/integration")
     e2e_tests_dir = os.path.join(str(config.rootpath), "tests/e2e")
+    benchmarks_dir = os.path.join(str(config.rootpath), "tests/benchmarks")
+    skip_benchmark = pytest.mark.skip(reason="Benchmarks run only with --run_benchmarks.")
 
     for item in items:
         test_path = str(item.fspath)
@@ -19,3 +36,7 @@ def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item
             item.add_marker("integration")
         elif test_path.startswith(e2e_tests_dir):
             item.add_marker("e2e")
+        elif test_path.startswith(benchmarks_dir):
+            item.add_marker("benchmark")
+            if not config.getoption("--run_benchmarks"):
+                item.add_marker(skip_benchmark)
@@ -0,0 +1,173 @@
+"""Test the batched recognition module."""
+
+from typing import Final
+
+import numpy as np
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.extraction import batching
+from stormwater_monitoring_datasheet_extraction.lib.extraction.templates import FieldKey
+
+_CITY: Final[FieldKey] = FieldKey(table=Columns.FORMS, row=0, field=(Columns.CITY,))
+_INVESTIGATOR: Final[FieldKey] = FieldKey(
+    table=Columns.INVESTIGATORS, row=0, field=(Columns.INVESTIGATOR,)
+)
+_START_TIME: Final[FieldKey] = FieldKey(
+    table=Columns.INVESTIGATORS, row=0, field=(Columns.START_TIME,)
+)
+_SITE_ID: Final[FieldKey] = FieldKey(
+    table=Columns.OBSERVATIONS, row=1, field=(Columns.SITE_ID,)
+)
+_COLOR_RANK: Final[FieldKey] = FieldKey(
+    table=Columns.OBSERVATIONS, row=1, field=(Columns.COLOR, Columns.RANK)
+)
+_BLANK: Final[FieldKey] = FieldKey(table=Columns.OBSERVATIONS, row=2, field=(Columns.PH,))
+
+
+def _crop(value: int) -> np.ndarray:
+    """Get a crop that the stub recognizes as `value`."""
+    return np.full((4, 8), value, dtype=np.uint8)
+
+
+class _Clock:
+    """A manually advanced clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at 0."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the time."""
+        return self.now
+
+
+@typechecked
+def test_scatters_to_form_documents() -> None:
+    """Tests that recognized text is assembled into each form's extraction document."""
+    recognizer = batching.StubRecognizer()
+    with batching.RecognitionScheduler(recognizer=recognizer, batch_size=3) as scheduler:
+        scheduler.submit(
+            form_id="a.jpg",
+            crops={
+                _CITY: _crop(1),
+                _INVESTIGATOR: _crop(2),
+                _START_TIME: _crop(3),
+                _SITE_ID: _crop(4),
+                _COLOR_RANK: _crop(5),
+            },
+        )
+        scheduler.submit(form_id="b.jpg", crops={_CITY: _crop(6), _BLANK: _crop(0)[:0]})
+
+    assert recognizer.batch_sizes == [3, 3, 1]
+    assert scheduler.pop_forms() == {
+        "a.jpg": {
+            Columns.CITY: "1",
+            Columns.INVESTIGATORS: {"2": {Columns.START_TIME: "3"}},
+            Columns.OBSERVATIONS: [
+                {Columns.SITE_ID: "4", Columns.COLOR: {Columns.RANK: "5"}}
+            ],
+        },
+        "b.jpg": {Columns.CITY: "6"},
+    }
+    assert scheduler.pop_forms() == {}
+
+
+@typechecked
+def test_copies_crops() -> None:
+    """Tests that crops are copied, so callers can reuse their buffers."""
+    buffer = _crop(1)
+    scheduler = batching.RecognitionScheduler(recognizer=batching.StubRecognizer())
+
+    scheduler.submit(form_id="a.jpg", crops={_CITY: buffer})
+    buffer[:] = 9
+    scheduler.flush()
+
+    assert scheduler.pop_forms() == {"a.jpg": {Columns.CITY: "1"}}
+
+
+@typechecked
+def test_max_latency_flush() -> None:
+    """Tests that a partial batch is recognized once it has waited too long."""
+    clock = _Clock()
+    recognizer = batching.StubRecognizer()
+    scheduler = batching.RecognitionScheduler(
+        recognizer=recognizer, batch_size=10, max_latency_seconds=1.0, clock=clock
+    )
+
+    scheduler.submit(form_id="a.jpg", crops={_CITY: _crop(1)})
+    clock.now = 0.5
+    scheduler.submit(form_id="b.jpg", crops={_CITY: _crop(2)})
+    assert recognizer.batch_sizes == []
+
+    clock.now = 1.0
+    scheduler.submit(form_id="c.jpg", crops={_CITY: _crop(3)})
+    assert recognizer.batch_sizes == [3]
+
+
+@typechecked
+def test_max_latency_poll() -> None:
+    """Tests that polling recognizes a partial batch that has waited too long."""
+    clock = _Clock()
+    recognizer = batching.StubRecognizer()
+    scheduler = batching.RecognitionScheduler(
+        recognizer=recognizer, batch_size=10, max_latency_seconds=1.0, clock=clock
+    )
+    assert not scheduler.poll()
+
+    scheduler.submit(form_id="a.jpg", crops={_CITY: _crop(1)})
+    clock.now = 0.9
+    assert not scheduler.poll()
+    assert recognizer.batch_sizes == []
+
+    clock.now = 1.0
+    assert scheduler.poll()
+    assert recognizer.batch_sizes == [1]
+    assert scheduler.pop_forms() == {"a.jpg": {Columns.CITY: "1"}}
+
+
+@typechecked
+def test_max_latency_after_full_batch() -> None:
+    """Tests that crops left after a full batch wait from when they were submitted."""
+    clock = _Clock()
+    recognizer = batching.StubRecognizer()
+    scheduler = batching.RecognitionScheduler(
+        recognizer=recognizer, batch_size=4, max_latency_seconds=1.0, clock=clock
+    )
+
+    scheduler.submit(
+        form_id="a.jpg",
+        crops={
+            _CITY: _crop(1),
+            _INVESTIGATOR: _crop(2),
+            _START_TIME: _crop(3),
+            _SITE_ID: _crop(4),
+            _COLOR_RANK: _crop(5),
+        },
+    )
+    assert recognizer.batch_sizes == [4]
+    clock.now = 0.9
+    scheduler.submit(form_id="b.jpg", crops={_CITY: _crop(6)})
+    assert recognizer.batch_sizes == [4]
+
+    # a.jpg's last crop has waited since 0, b.jpg's since 0.9.
+    clock.now = 1.0
+    assert scheduler.poll()
+    assert recognizer.batch_sizes == [4, 2]
+
+
+@typechecked
+def test_recognizer_result_count_mismatch() -> None:
+    """Tests that a recognizer returning the wrong number of results raises."""
+
+    class _BadRecognizer:
+        def recognize(self, crops: list, fields: list) -> list[str]:
+            """Recognize nothing."""
+            return []
+
+    scheduler = batching.RecognitionScheduler(recognizer=_BadRecognizer())
+    scheduler.submit(form_id="a.jpg", crops={_CITY: _crop(1)})
+
+    with pytest.raises(ValueError, match="returned 0 results for a batch of 1 crops"):
+        scheduler.flush()
@@ -0,0 +1,101 @@
+"""Test the compiled schemas and argument validators."""
+
+import threading
+from typing import Final
+
+import pandas as pd
+import pandera.typing as pt
+import pytest
+from pandera.errors import SchemaErrors
+from pydantic import ValidationError
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.db import tables
+from stormwater_monitoring_datasheet_extraction.lib.schema import compiled
+
+_N_MODELS: Final[int] = 22
+_N_THREADS: Final[int] = 2
+_N_VALIDATIONS: Final[int] = 200
+_INVALID_CREEKS: Final[pd.DataFrame] = pd.DataFrame(
+    {Columns.SITE_ID: ["Padden"], Columns.CREEK_TYPE: ["not a creek type"]}
+).set_index(Columns.SITE_ID)
+
+
+@compiled.check_types(lazy=True)
+def _get_creeks(creek_type_map: pt.DataFrame[schema.Creek]) -> pt.DataFrame[schema.Creek]:
+    return creek_type_map
+
+
+def _get_invalid_creeks() -> pt.DataFrame[schema.Creek]:
+    return _INVALID_CREEKS
+
+
+@typechecked
+def test_schemas_shared_across_threads() -> None:
+    """Tests that each model's schema is built once, and copied once per thread."""
+    assert compiled.compile_schemas() == _N_MODELS
+
+    thread_schemas = []
+    thread = threading.Thread(
+        target=lambda: thread_schemas.extend(
+            [schema.Site.to_schema(), schema.FormCleaned.to_schema(), schema.Site.to_schema()]
+        )
+    )
+    thread.start()
+    thread.join()
+
+    assert thread_schemas[0] is thread_schemas[2]
+    assert thread_schemas[0] is not schema.Site.to_schema()
+    assert thread_schemas[0] == schema.Site.to_schema()
+    assert thread_schemas[1] == schema.FormCleaned.to_schema()
+    assert schema.Site.to_schema() is schema.Site.to_schema()
+    # Subclasses get their own schemas.
+    assert schema.FormCleaned.to_schema() is not schema.FormExtracted.to_schema()
+    assert schema.FormCleaned.to_schema().name == "FormCleaned"
+
+
+@typechecked
+def test_concurrent_validation() -> None:
+    """Tests that a model validated in two threads at once is validated as in one."""
+    expected = schema.Creek.validate(tables.CREEKS)
+    barrier = threading.Barrier(_N_THREADS)
+    errors: list[BaseException] = []
+
+    def validate() -> None:
+        try:
+            barrier.wait()
+            for _ in range(_N_VALIDATIONS):
+                pd.testing.assert_frame_equal(schema.Creek.validate(tables.CREEKS), expected)
+                with pytest.raises(SchemaErrors, match="not a creek type"):
+                    schema.Creek.validate(_INVALID_CREEKS, lazy=True)
+        except BaseException as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=validate) for _ in range(_N_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    # Pandera's temporary changes to the components were all restored.
+    assert (
+        all(column.coerce for column in schema.Creek.to_schema().columns.values())
+        and schema.Creek.to_schema() == compiled._SCHEMAS[schema.Creek]
+    )
+
+
+@typechecked
+def test_check_types() -> None:
+    """Tests that inputs are validated with pydantic, and outputs with pandera."""
+    pd.testing.assert_frame_equal(
+        _get_creeks(creek_type_map=tables.CREEKS), schema.Creek.validate(tables.CREEKS)
+    )
+
+    with pytest.raises(ValidationError, match="not a creek type"):
+        _get_creeks(creek_type_map=_INVALID_CREEKS)
+
+    with pytest.raises(SchemaErrors, match="not a creek type"):
+        compiled.check_return(fx=_get_invalid_creeks, lazy=True)()
@@ -0,0 +1,105 @@
+"""Test the compiled data definition."""
+
+from typing import Final
+
+import pandas as pd
+import pytest
+from pandera.errors import SchemaError
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.schema import definition
+
+_N_THRESHOLDS: Final[int] = 13
+
+
+@typechecked
+def test_field_definitions() -> None:
+    """Tests that fields are compiled from the types, options, and limits defined."""
+    weather = definition.get_field(column=Columns.WEATHER)
+    assert weather.data_type is constants.Weather
+    assert weather.options == tuple(constants.Weather)
+    assert definition.get_options(column=Columns.OBSERVATION_TYPE) == tuple(
+        constants.QualitativeSiteObservationTypes
+    )
+    assert definition.get_field(column=Columns.TIDE_TIME).format == constants.TIME_FORMAT
+    assert definition.get_field(column=Columns.PH).units == constants.Units.PH
+
+    assert definition.get_limits(column=Columns.PH) == {"ge": 0, "le": 14}
+    assert definition.get_limits(column=Columns.PAST_24HR_RAINFALL) == {"ge": 0}
+    assert definition.get_limits(column=Columns.AIR_TEMP) == {}
+    with pytest.raises(ValueError, match="has no options"):
+        definition.get_options(column=Columns.NOTES)
+
+    # Compiled once.
+    assert definition.get_field_definitions() is definition.get_field_definitions()
+
+
+@typechecked
+def test_schema_limits_from_definition() -> None:
+    """Tests that the schemas enforce the defined limits."""
+    ph_check_names = {
+        check.name
+        for check in schema.QuantitativeObservationsVerified.to_schema()
+        .columns[Columns.PH]
+        .checks
+    }
+    assert ph_check_names == {"greater_than_or_equal_to", "less_than_or_equal_to"}
+
+    observations = pd.DataFrame(
+        {
+            Columns.FORM_ID: ["IMG_1.jpg"],
+            Columns.SITE_ID: ["Broadway"],
+            Columns.BACTERIA_BOTTLE_NO: ["B1"],
+            Columns.FLOW: ["M"],
+            Columns.FLOW_COMPARED_TO_EXPECTED: ["Normal"],
+            Columns.AIR_TEMP: [20.0],
+            Columns.WATER_TEMP: [10.0],
+            Columns.DO_MG_PER_L: [8.0],
+            Columns.SPS_MICRO_S_PER_CM: [100.0],
+            Columns.SALINITY_PPT: [0.1],
+            Columns.PH: [14.5],
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID])
+    with pytest.raises(SchemaError, match="less_than_or_equal_to"):
+        schema.QuantitativeObservationsVerified.validate(observations)
+
+
+@typechecked
+def test_thresholds() -> None:
+    """Tests that the threshold table has a row per bound by site type."""
+    thresholds = definition.get_thresholds()
+
+    assert thresholds.columns.tolist() == definition.THRESHOLD_COLUMNS
+    assert len(thresholds) == _N_THRESHOLDS
+    water_temp = thresholds[thresholds[Columns.COLUMN] == Columns.WATER_TEMP]
+    assert water_temp[Columns.REFERENCE_VALUE].tolist() == [Columns.AIR_TEMP] + [None] * 4
+    assert water_temp[Columns.CREEK_TYPE].tolist()[1:] == list(constants.CreekType)
+    assert set(thresholds[Columns.BOUND]) == {Columns.LOWER, Columns.UPPER}
+
+
+@typechecked
+def test_normalize() -> None:
+    """Tests that text is stripped and options matched, including in the index."""
+    raw = pd.DataFrame(
+        {
+            Columns.FORM_ID: ["IMG_1.jpg", "IMG_1.jpg", "IMG_1.jpg"],
+            Columns.SITE_ID: [" Broadway ", "Cedar", None],
+            Columns.FLOW: [" m", "Not a flow", 3],
+            Columns.AIR_TEMP: [20.0, 21.0, 22.0],
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID])
+
+    normalized = definition.normalize(df=raw)
+
+    assert normalized.index.names == raw.index.names
+    assert normalized.index.get_level_values(Columns.SITE_ID).tolist()[:2] == [
+        "Broadway",
+        "Cedar",
+    ]
+    assert normalized[Columns.FLOW].tolist() == [constants.Flow.M, "Not a flow", 3]
+    pd.testing.assert_series_equal(
+        normalized[Columns.AIR_TEMP].reset_index(drop=True),
+        raw[Columns.AIR_TEMP].reset_index(drop=True),
+    )
@@ -0,0 +1,94 @@
+"""Test the image discovery module."""
+
+from pathlib import Path
+from typing import Final
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.constants import ImageType
+from stormwater_monitoring_datasheet_extraction.lib.extraction import discovery
+
+_PADDING: Final[bytes] = b"\x00" * 64
+_FILE_CONTENTS: Final[dict[str, bytes]] = {
+    "IMG_9527.jpg": b"\xff\xd8\xff\xe0" + _PADDING + b"\xff\xd9",
+    "sheet1.JPEG": b"\xff\xd8\xff\xe1" + _PADDING + b"\xff\xd9",
+    "scan.png": b"\x89PNG\r\n\x1a\n" + _PADDING + b"IEND\xaeB`\x82",
+    "scan.pdf": b"%PDF-1.7" + _PADDING + b"%%EOF\n",
+    "photo.heic": b"\x00\x00\x00\x18ftypheic" + _PADDING,
+    "b/nested.jpg": b"\xff\xd8\xff\xe0" + _PADDING + b"\xff\xd9",
+    "a/nested.jpg": b"\xff\xd8\xff\xe0" + _PADDING + b"\xff\xd9",
+    # Skipped.
+    "empty.jpg": b"",
+    "partial.jpg": b"\xff\xd8\xff\xe0" + _PADDING,
+    "not_an_image.jpg": b"GIF89a" + _PADDING,
+    "sidecar.xmp": b"<x:xmpmeta>" + _PADDING,
+    ".hidden.jpg": b"\xff\xd8\xff\xe0" + _PADDING + b"\xff\xd9",
+    ".thumbnails/IMG_9527.jpg": b"\xff\xd8\xff\xe0" + _PADDING + b"\xff\xd9",
+}
+_EXPECTED_IMAGES: Final[list[tuple[str, ImageType]]] = [
+    ("IMG_9527.jpg", ImageType.JPEG),
+    ("photo.heic", ImageType.HEIC),
+    ("scan.pdf", ImageType.PDF),
+    ("scan.png", ImageType.PNG),
+    ("sheet1.JPEG", ImageType.JPEG),
+    ("a/nested.jpg", ImageType.JPEG),
+    ("b/nested.jpg", ImageType.JPEG),
+]
+
+
+@pytest.fixture()
+def input_dir(tmp_path: Path) -> Path:
+    """Get an input directory of mixed files."""
+    for name, contents in _FILE_CONTENTS.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(contents)
+
+    return tmp_path
+
+
+@pytest.mark.parametrize("fx", [discovery.iter_images, discovery.prefetch_images])
+@typechecked
+def test_discovers_images_in_order(input_dir: Path, fx: object) -> None:
+    """Tests that only complete images are found, in deterministic order."""
+    images = list(fx(input_dir=input_dir, min_bytes=0))  # type: ignore[operator]
+
+    assert [(image.form_id, image.image_type) for image in images] == _EXPECTED_IMAGES
+    assert all(image.path == input_dir / image.form_id for image in images)
+
+
+@typechecked
+def test_not_recursive(input_dir: Path) -> None:
+    """Tests that subdirectories can be skipped."""
+    images = discovery.iter_images(input_dir=input_dir, recursive=False, min_bytes=0)
+
+    assert [image.form_id for image in images] == [
+        form_id for form_id, _ in _EXPECTED_IMAGES if "/" not in form_id
+    ]
+
+
+@typechecked
+def test_skips_thumbnails(input_dir: Path) -> None:
+    """Tests that files smaller than `min_bytes` are skipped."""
+    (input_dir / "large.jpg").write_bytes(b"\xff\xd8\xff\xe0" + b"\x00" * 1024 + b"\xff\xd9")
+
+    images = discovery.iter_images(input_dir=input_dir, min_bytes=1024)
+
+    assert [image.form_id for image in images] == ["large.jpg"]
+
+
+@typechecked
+def test_prefetch_reraises(tmp_path: Path) -> None:
+    """Tests that discovery errors are reraised to the consumer."""
+    with pytest.raises(FileNotFoundError):
+        list(discovery.prefetch_images(input_dir=tmp_path / "missing"))
+
+
+@typechecked
+def test_prefetch_stops_early(input_dir: Path) -> None:
+    """Tests that the consumer can stop before discovery finishes."""
+    images = discovery.prefetch_images(input_dir=input_dir, maxsize=1, min_bytes=0)
+
+    assert next(images).form_id == _EXPECTED_IMAGES[0][0]
+    images.close()
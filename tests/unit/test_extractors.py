@@ -0,0 +1,123 @@
+"""Test the extractor backends module."""
+
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any, Final
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, load_datasheets
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns, ImageType
+from stormwater_monitoring_datasheet_extraction.lib.documents.flatten import (
+    ExtractedTablesBuilder,
+)
+from stormwater_monitoring_datasheet_extraction.lib.extraction import discovery, extractors
+from stormwater_monitoring_datasheet_extraction.lib.extraction.discovery import (
+    DiscoveredImage,
+)
+
+_EXAMPLE_FORMS: Final[dict[str, Any]] = constants.FIELD_DATA_DEFINITION[
+    "example_extraction_document"
+][Columns.FORMS]
+
+
+def _image(form_id: str) -> DiscoveredImage:
+    """Get a discovered image, without a file."""
+    return DiscoveredImage(
+        form_id=form_id, path=Path(form_id), image_type=ImageType.JPEG, size=0
+    )
+
+
+class _CountingExtractor(extractors.Extractor):
+    """Counts lifecycle calls."""
+
+    n_loads = 0
+    n_closes = 0
+
+    def load(self) -> None:
+        """Count the load."""
+        type(self).n_loads += 1
+
+    def extract_batch(self, images: Sequence[DiscoveredImage]) -> dict[str, dict[str, Any]]:
+        """Extract empty forms."""
+        return {image.form_id: {} for image in images}
+
+    def close(self) -> None:
+        """Count the close."""
+        type(self).n_closes += 1
+
+
+@pytest.fixture()
+def counting_extractor(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Register the counting extractor, and forget warm extractors after the test."""
+    monkeypatch.setitem(extractors._BUILTIN_EXTRACTORS, "counting", _CountingExtractor)
+    _CountingExtractor.n_loads = 0
+    _CountingExtractor.n_closes = 0
+    yield
+    extractors.close_extractors()
+
+
+@typechecked
+def test_fake_extractor_replays_example() -> None:
+    """Tests that the fake extractor replays example forms, deterministically."""
+    extractor = extractors.FakeExtractor()
+    extractor.load()
+
+    forms = extractor.extract_batch([_image("IMG_9527.jpg"), _image("other.jpg")])
+    forms_again = extractor.extract_batch([_image("other.jpg")])
+
+    assert forms["IMG_9527.jpg"] == _EXAMPLE_FORMS["IMG_9527.jpg"]
+    assert forms["IMG_9527.jpg"] is not _EXAMPLE_FORMS["IMG_9527.jpg"]
+    assert forms["other.jpg"] in _EXAMPLE_FORMS.values()
+    assert forms_again["other.jpg"] == forms["other.jpg"]
+
+
+@pytest.mark.usefixtures("counting_extractor")
+@typechecked
+def test_get_extractor_keeps_warm_instance() -> None:
+    """Tests that each extractor is loaded once per process, and closed at the end."""
+    extractor = extractors.get_extractor(name="counting")
+
+    assert extractors.get_extractor(name="counting") is extractor
+    assert _CountingExtractor.n_loads == 1
+
+    extractors.close_extractors()
+    assert _CountingExtractor.n_closes == 1
+    assert extractors.get_extractor(name="counting") is not extractor
+
+
+@typechecked
+def test_get_extractor_unknown() -> None:
+    """Tests that unknown extractor names raise, listing registered extractors."""
+    assert "fake" in extractors.get_extractor_names()
+    with pytest.raises(ValueError, match=r"No extractor named nope.*'fake'"):
+        extractors.get_extractor(name="nope")
+
+
+@pytest.mark.usefixtures("counting_extractor")
+@typechecked
+def test_extract_forms_in_batches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that all discovered images are extracted, in batches."""
+    monkeypatch.setattr(constants, "EXTRACTION_BATCH_SIZE", 2)
+    jpeg = b"\xff\xd8\xff\xe0" + b"\x00" * constants.MIN_IMAGE_BYTES + b"\xff\xd9"
+    for i in range(5):
+        (tmp_path / f"IMG_{i}.jpg").write_bytes(jpeg)
+    extractor = extractors.get_extractor(name="counting")
+    batch_sizes = []
+    extract_batch = extractor.extract_batch
+
+    def _extract_batch(images: Sequence[DiscoveredImage]) -> dict[str, dict[str, Any]]:
+        batch_sizes.append(len(images))
+        return extract_batch(images)
+
+    monkeypatch.setattr(extractor, "extract_batch", _extract_batch)
+
+    builder = ExtractedTablesBuilder()
+
+    load_datasheets._extract_images(
+        images=discovery.iter_images(input_dir=tmp_path), extractor=extractor, builder=builder
+    )
+
+    assert builder.build().form_metadata.index.tolist() == [f"IMG_{i}.jpg" for i in range(5)]
+    assert batch_sizes == [2, 2, 1]
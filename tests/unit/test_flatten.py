@@ -0,0 +1,82 @@
+"""Test the extraction document flattener."""
+
+import warnings
+from typing import Any, Final
+
+import pandas as pd
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.documents import flatten
+
+_EXAMPLE_FORMS: Final[dict[str, Any]] = constants.FIELD_DATA_DEFINITION[
+    "example_extraction_document"
+][Columns.FORMS]
+
+
+@typechecked
+def test_flatten_example() -> None:
+    """Tests that the example document flattens into valid `*Extracted` tables."""
+    tables = flatten.flatten_forms(forms=_EXAMPLE_FORMS)
+
+    assert tables.form_metadata.index.tolist() == ["IMG_9527.jpg", "sheet1.jpg"]
+    assert tables.investigators.index.names == [Columns.FORM_ID, Columns.INVESTIGATOR]
+    assert len(tables.investigators) == 6
+    # Dry outfalls are site visits, but have no observations.
+    dry_outfall = ("sheet1.jpg", "Some dry outfall somewhere")
+    assert tables.site_visits.index.isin([dry_outfall]).any()
+    assert not tables.quantitative_observations.index.isin([dry_outfall]).any()
+    assert len(tables.site_visits) == 6
+    assert len(tables.quantitative_observations) == 5
+    # Rows are in document order, so sorted to look up by key.
+    assert tables.site_visits.index.get_level_values(Columns.SITE_ID).tolist() == [
+        "C ST",
+        "C ST",
+        "BROADWAY",
+        "PADDEN",
+        "BENASFASDF",
+        "Some dry outfall somewhere",
+    ]
+    # Index isn't unique: IMG_9527.jpg visits C ST twice, as a creek and as an outfall.
+    padden_qualitative = tables.qualitative_observations.sort_index().loc[
+        ("sheet1.jpg", "PADDEN")
+    ]
+    assert padden_qualitative.loc[Columns.COLOR, Columns.DESCRIPTION] == "TAN"
+    assert pd.isna(padden_qualitative.loc[Columns.ODOR, Columns.DESCRIPTION])
+    assert tables.quantitative_observations[Columns.PH].dtype == "float64"
+
+    # Lax checks only warn, so fail on warnings.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        schema.FormExtracted.validate(tables.form_metadata)
+        schema.FormInvestigatorExtracted.validate(tables.investigators)
+        schema.SiteVisitExtracted.validate(tables.site_visits)
+        schema.QuantitativeObservationsExtracted.validate(tables.quantitative_observations)
+        schema.QualitativeObservationsExtracted.validate(tables.qualitative_observations)
+
+
+@typechecked
+def test_flatten_keeps_raw_values() -> None:
+    """Tests that raw text, e.g. from OCR, is kept for precleaning, and missing is null."""
+    tables = flatten.flatten_forms(
+        forms=[
+            (
+                "a.jpg",
+                {
+                    Columns.CITY: "BELLINGHAM",
+                    Columns.OBSERVATIONS: [{Columns.SITE_ID: "C ST", Columns.PH: "7.4O"}],
+                },
+            ),
+            ("b.jpg", {}),
+        ]
+    )
+
+    assert tables.form_metadata[Columns.CITY].tolist() == ["BELLINGHAM", None]
+    assert tables.quantitative_observations[Columns.PH].tolist() == ["7.4O"]
+    assert tables.investigators.empty
+    assert tables.qualitative_observations.index.names == [
+        Columns.FORM_ID,
+        Columns.SITE_ID,
+        Columns.OBSERVATION_TYPE,
+    ]
@@ -0,0 +1,117 @@
+"""Test the image loading module."""
+
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+import pytest
+from PIL import Image
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.extraction import images
+
+_PAGE_SIZE: Final[tuple[int, int]] = (1600, 1200)
+_REGIONS: Final[dict[str, images.BoundingBox]] = {
+    "metadata": images.BoundingBox(left=0.0, top=0.0, right=0.5, bottom=0.25),
+    "observations": images.BoundingBox(left=0.0, top=0.5, right=1.0, bottom=1.0),
+}
+_EXIF_ORIENTATION: Final[int] = 0x0112
+
+
+@pytest.fixture(params=["JPEG", "PNG"])
+def image_path(tmp_path: Path, request: pytest.FixtureRequest) -> Path:
+    """Get a page image: white, with the top-left quadrant black."""
+    page = Image.new("RGB", _PAGE_SIZE, color="white")
+    page.paste("black", (0, 0, _PAGE_SIZE[0] // 2, _PAGE_SIZE[1] // 2))
+    path = tmp_path / f"page.{request.param.lower()}"
+    page.save(path, format=request.param)
+
+    return path
+
+
+@typechecked
+def test_load_page_downscales(image_path: Path) -> None:
+    """Tests that pages are loaded within the pixel bound, keeping aspect ratio."""
+    page = images.ImageLoader().load_page(path=image_path, max_pixels=120_000)
+
+    assert page.width * page.height <= 120_000 * 1.01
+    assert page.width / page.height == pytest.approx(_PAGE_SIZE[0] / _PAGE_SIZE[1], rel=0.01)
+    assert page.mode == "L"
+    assert page.getpixel((0, 0)) < 50
+    assert page.getpixel((page.width - 1, page.height - 1)) > 200
+
+
+@typechecked
+def test_load_page_no_upscale(image_path: Path) -> None:
+    """Tests that small pages are not upscaled."""
+    page = images.ImageLoader().load_page(path=image_path)
+
+    assert page.size == _PAGE_SIZE
+
+
+@typechecked
+def test_load_page_max_decode_pixels(image_path: Path) -> None:
+    """Tests that images over the decode bound are rejected, unless JPEG drafts them under."""
+    loader = images.ImageLoader(max_decode_pixels=500_000)
+
+    if image_path.suffix == ".jpeg":
+        page = loader.load_page(path=image_path, max_pixels=120_000)
+        assert page.width * page.height <= 120_000 * 1.01
+    else:
+        with pytest.raises(ValueError, match="over 500000 pixels"):
+            loader.load_page(path=image_path, max_pixels=120_000)
+
+
+@typechecked
+def test_load_regions(image_path: Path) -> None:
+    """Tests that regions are cropped from the page scaled to `page_width`."""
+    loader = images.ImageLoader()
+
+    crops = loader.load_regions(path=image_path, regions=_REGIONS, page_width=400)
+
+    assert crops["metadata"].shape == (75, 200)
+    assert crops["observations"].shape == (150, 400)
+    assert crops["metadata"].mean() < 50
+    assert crops["observations"].mean() > 200
+
+
+@typechecked
+def test_load_regions_reuses_buffer(image_path: Path) -> None:
+    """Tests that crops are views into a buffer reused across images."""
+    loader = images.ImageLoader()
+
+    first_crops = loader.load_regions(path=image_path, regions=_REGIONS, page_width=400)
+    buffer = loader._buffer
+    second_crops = loader.load_regions(path=image_path, regions=_REGIONS, page_width=200)
+
+    assert loader._buffer is buffer
+    assert all(np.shares_memory(crop, buffer) for crop in first_crops.values())
+    assert all(np.shares_memory(crop, buffer) for crop in second_crops.values())
+
+
+@typechecked
+def test_load_regions_upright(tmp_path: Path) -> None:
+    """Tests that regions are cropped from the page rotated per its EXIF orientation."""
+    # Stored sideways: the upright top-left quadrant is stored at the bottom left.
+    page = Image.new("RGB", (_PAGE_SIZE[1], _PAGE_SIZE[0]), color="white")
+    page.paste("black", (0, _PAGE_SIZE[0] // 2, _PAGE_SIZE[1] // 2, _PAGE_SIZE[0]))
+    exif = page.getexif()
+    exif[_EXIF_ORIENTATION] = 6
+    path = tmp_path / "sideways.jpg"
+    page.save(path, exif=exif)
+
+    crops = images.ImageLoader().load_regions(path=path, regions=_REGIONS, page_width=400)
+
+    assert crops["metadata"].shape == (75, 200)
+    assert crops["metadata"].mean() < 50
+    assert crops["observations"].mean() > 200
+
+
+@typechecked
+def test_pdf_not_supported(tmp_path: Path) -> None:
+    """Tests that PDFs raise a clear error."""
+    path = tmp_path / "scan.pdf"
+    path.write_bytes(b"%PDF-1.7\n%%EOF\n")
+
+    with pytest.raises(ValueError, match="PDF datasheets are not yet supported"):
+        images.ImageLoader().load_page(path=path)
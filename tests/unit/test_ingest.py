@@ -0,0 +1,64 @@
+"""Test ingesting extraction documents."""
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Final
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, load_datasheets
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.documents import ingest
+
+_EXAMPLE_FORMS: Final[dict[str, Any]] = constants.FIELD_DATA_DEFINITION[
+    "example_extraction_document"
+][Columns.FORMS]
+
+
+@pytest.fixture()
+def input_dir(tmp_path: Path) -> Path:
+    """Get a directory of extraction documents, one per example form, one gzipped."""
+    (first_id, first_form), (second_id, second_form) = _EXAMPLE_FORMS.items()
+    (tmp_path / "a.json").write_text(
+        json.dumps({Columns.METADATA: {}, Columns.FORMS: {first_id: first_form}})
+    )
+    with gzip.open(tmp_path / "b.json.gz", "wt") as document_file:
+        json.dump({Columns.FORMS: {second_id: second_form}}, document_file)
+    (tmp_path / "notes.txt").write_text("Not a document.")
+
+    return tmp_path
+
+
+@pytest.mark.parametrize("incremental", [True, False])
+@typechecked
+def test_iter_forms(
+    input_dir: Path, incremental: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests that forms are streamed from all documents, with or without `ijson`."""
+    if not incremental:
+        monkeypatch.setattr(ingest, "ijson", None)
+    elif ingest.ijson is None:
+        pytest.skip("`ijson` not installed.")
+
+    paths = ingest.find_documents(input_dir=input_dir)
+    forms = dict(ingest.iter_forms(paths=paths))
+
+    assert [path.name for path in paths] == ["a.json", "b.json.gz"]
+    assert forms == json.loads(json.dumps(_EXAMPLE_FORMS))
+    assert isinstance(forms["IMG_9527.jpg"][Columns.TIDE_HEIGHT], float)
+
+
+@typechecked
+def test_ingest_stage(input_dir: Path) -> None:
+    """Tests that the ingest stage returns the validated `*Extracted` tables."""
+    form_metadata, investigators, site_visits, quantitative, qualitative = (
+        load_datasheets.ingest(input_dir=input_dir)
+    )
+
+    assert form_metadata.index.tolist() == list(_EXAMPLE_FORMS)
+    assert len(investigators) == 6
+    assert len(site_visits) == 6
+    assert len(quantitative) == 5
+    assert len(qualitative) == 10
@@ -0,0 +1,103 @@
+"""Test composite-key uniqueness on integer codes."""
+
+import copy
+from typing import Final
+
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+import pytest
+from pandera.errors import SchemaErrors
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.schema import keys
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+
+_RNG: Final[np.random.Generator] = np.random.default_rng(seed=0)
+
+
+def _get_keys_df(n_rows: int, n_values: int) -> pd.DataFrame:
+    """Get random keys, with nulls, two in the index and one as a column."""
+    values = [f"v{i}" for i in range(n_values)] + [None]
+
+    return pd.DataFrame(
+        {
+            level: _RNG.choice(np.array(values, dtype=object), size=n_rows)
+            for level in ("a", "b", "c")
+        }
+    ).set_index(["a", "b"])
+
+
+@pytest.mark.parametrize("key_columns", [["a"], ["a", "b"], ["a", "c"], ["c", "b", "a"]])
+@typechecked
+def test_duplicated(key_columns: list[str]) -> None:
+    """Tests that duplicates are flagged as `duplicated(keep="first")` flags them."""
+    df = _get_keys_df(n_rows=1_000, n_values=8)
+
+    expected = df.reset_index().duplicated(subset=key_columns, keep="first").to_numpy()
+
+    np.testing.assert_array_equal(keys.duplicated(df=df, keys=key_columns), expected)
+    if all(key in df.index.names for key in key_columns):
+        np.testing.assert_array_equal(
+            keys.duplicated(df=df.index, keys=key_columns), expected
+        )
+
+
+@typechecked
+def test_duplicated_overflow() -> None:
+    """Tests that keys too many to combine in an int64 are renumbered, not overflowed."""
+    n_rows = 2**16
+    df = pd.DataFrame(
+        {level: _RNG.permutation(n_rows) % (n_rows // 2) for level in "abcde"}
+    ).set_index(["a", "b"])
+    key_columns = list("abcde")
+
+    expected = df.reset_index().duplicated(subset=key_columns, keep="first").to_numpy()
+
+    np.testing.assert_array_equal(keys.duplicated(df=df, keys=key_columns), expected)
+
+
+@pytest.mark.parametrize("key_columns", [["a"], ["a", "c"], ["c", "b", "a"]])
+@typechecked
+def test_key_encoder(key_columns: list[str]) -> None:
+    """Tests that keys are encoded consistently across batches."""
+    df = _get_keys_df(n_rows=1_000, n_values=8)
+    encoder = keys.KeyEncoder(keys=key_columns)
+
+    key = np.concatenate(
+        [encoder.encode(df=df.iloc[i : i + 64]) for i in range(0, 1_000, 64)]
+    )
+
+    expected = df.reset_index().duplicated(subset=key_columns, keep="first").to_numpy()
+    np.testing.assert_array_equal(pd.Series(key).duplicated().to_numpy(), expected)
+
+
+@typechecked
+def test_multiindex_unique_errors() -> None:
+    """Tests that the shared schemas raise pandera's `multiindex_unique` errors."""
+    site_visits = pd.DataFrame(
+        {
+            Columns.FORM_ID: ["IMG_1.jpg", "IMG_1.jpg", "IMG_2.jpg", "IMG_1.jpg"],
+            Columns.SITE_ID: ["C ST", "PADDEN", "C ST", "C ST"],
+            Columns.ARRIVAL_TIME: ["12:00"] * 4,
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID])
+    shared_schema = schema.SiteVisitVerified.to_schema()
+    # The same schema, checked by pandera's own backend.
+    pandera_schema = copy.deepcopy(shared_schema)
+    pandera_schema.index.__class__ = pa.MultiIndex
+
+    errors = []
+    for validation_schema in (shared_schema, pandera_schema):
+        with pytest.raises(SchemaErrors) as error:
+            validation_schema.validate(site_visits, lazy=True)
+        errors.append(error.value)
+
+    shared_error, pandera_error = errors
+    pd.testing.assert_frame_equal(
+        schema_utils.summarize_schema_errors(error=shared_error),
+        schema_utils.summarize_schema_errors(error=pandera_error),
+    )
+    pd.testing.assert_frame_equal(shared_error.failure_cases, pandera_error.failure_cases)
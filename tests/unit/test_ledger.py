@@ -0,0 +1,109 @@
+"""Test the incremental-run ledger."""
+
+import os
+from pathlib import Path
+from typing import Final
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, load_datasheets
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.documents.flatten import (
+    ExtractedTablesBuilder,
+)
+from stormwater_monitoring_datasheet_extraction.lib.extraction import discovery, extractors
+from stormwater_monitoring_datasheet_extraction.lib.output import ledger
+
+_JPEG: Final[bytes] = b"\xff\xd8\xff\xe0" + b"\x00" * constants.MIN_IMAGE_BYTES + b"\xff\xd9"
+
+
+@pytest.fixture()
+def input_dir(tmp_path: Path) -> Path:
+    """Get an intake directory of three images."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(3):
+        (input_dir / f"IMG_{i}.jpg").write_bytes(_JPEG)
+
+    return input_dir
+
+
+@typechecked
+def test_ledger(input_dir: Path, tmp_path: Path) -> None:
+    """Tests that loaded images are skipped until changed, across runs."""
+    ledger_path = tmp_path / "output" / ledger.LEDGER_NAME
+    output_path = tmp_path / "output" / "run" / "extraction.json"
+    images = {image.form_id: image for image in discovery.iter_images(input_dir=input_dir)}
+
+    with ledger.incremental(path=ledger_path) as first_ledger:
+        assert first_ledger is not None
+        assert not any(first_ledger.is_loaded(image=image) for image in images.values())
+        n_recorded = first_ledger.record(
+            form_ids=["IMG_0.jpg", "IMG_1.jpg", "unchecked.jpg"], output_path=output_path
+        )
+    assert n_recorded == 2
+
+    # Touched but unchanged, and changed.
+    os.utime(images["IMG_0.jpg"].path, ns=(0, 0))
+    images["IMG_1.jpg"].path.write_bytes(_JPEG + b"\x00")
+
+    with ledger.incremental(path=ledger_path) as second_ledger:
+        assert second_ledger is not None
+        assert {
+            form_id: second_ledger.is_loaded(image=image) for form_id, image in images.items()
+        } == {"IMG_0.jpg": True, "IMG_1.jpg": False, "IMG_2.jpg": False}
+        assert second_ledger.get_outputs() == {
+            "IMG_0.jpg": output_path,
+            "IMG_1.jpg": output_path,
+        }
+    assert ledger.get_ledger() is None
+
+
+@typechecked
+def test_vanished_image(input_dir: Path, tmp_path: Path) -> None:
+    """Tests that an image deleted since it was discovered is skipped, not raised."""
+    images = list(discovery.iter_images(input_dir=input_dir))
+    images[1].path.unlink()
+
+    with ledger.incremental(path=tmp_path / ledger.LEDGER_NAME):
+        form_ids = [
+            form_id
+            for forms in load_datasheets.iter_extracted_forms(
+                images=images, extractor=extractors.get_extractor(name="fake")
+            )
+            for form_id in forms
+        ]
+
+    assert form_ids == ["IMG_0.jpg", "IMG_2.jpg"]
+
+
+@typechecked
+def test_incremental_run(input_dir: Path, tmp_path: Path) -> None:
+    """Tests that each run extracts and loads only new images."""
+    output_dir = tmp_path / "output"
+
+    def _run() -> dict[str, Path]:
+        builder = ExtractedTablesBuilder()
+        with ledger.incremental(path=output_dir / ledger.LEDGER_NAME) as run_ledger:
+            load_datasheets._extract_images(
+                images=discovery.iter_images(input_dir=input_dir),
+                extractor=extractors.get_extractor("fake"),
+                builder=builder,
+            )
+            form_ids = builder.build().form_metadata.index.tolist()
+            load_datasheets.load(
+                restructured_json={Columns.FORMS: {form_id: {} for form_id in form_ids}},
+                output_dir=output_dir,
+            )
+            assert run_ledger is not None
+            return run_ledger.get_outputs()
+
+    first_outputs = _run()
+    (input_dir / "IMG_3.jpg").write_bytes(_JPEG)
+    second_outputs = _run()
+
+    assert list(first_outputs) == ["IMG_0.jpg", "IMG_1.jpg", "IMG_2.jpg"]
+    assert list(second_outputs) == ["IMG_0.jpg", "IMG_1.jpg", "IMG_2.jpg", "IMG_3.jpg"]
+    assert second_outputs["IMG_3.jpg"] != first_outputs["IMG_0.jpg"]
+    assert second_outputs["IMG_0.jpg"] == first_outputs["IMG_0.jpg"]
@@ -1,8 +1,11 @@
 """Test the load_datasheets module."""
 
 # TODO: Test that returns correct path, using pytest.mark.parametrize.
+import json
 from collections.abc import Callable
 from contextlib import AbstractContextManager
+from datetime import date
+from pathlib import Path
 from typing import Final
 from unittest.mock import patch
 
@@ -13,6 +16,7 @@ from typeguard import typechecked
 
 from stormwater_monitoring_datasheet_extraction.lib import constants, load_datasheets
 from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.output import write
 
 # TODO: Test that returns correct path, using pytest.mark.parametrize.
 
@@ -132,6 +136,7 @@ def test_validate_site_creek_maps_in_verify(
             load_datasheets._validate_thresholds,
             {
                 "observations": _EMPTY_QUAN_OBS,
+                "form_metadata": _EMPTY_FORM_METADATA,
             },
         ),
         (
@@ -174,6 +179,27 @@ def test_validate_site_creek_maps_in_clean(
             pd.testing.assert_frame_equal(site_creek_merged, returned_site_creek_merged)
 
 
+@pytest.mark.parametrize("output_dir", ["output", ""])
+@typechecked
+def test_load(output_dir: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that the document is committed to a run directory, by default a dated one."""
+    monkeypatch.chdir(tmp_path)
+    document = {
+        Columns.FORMS: {"IMG_9527.jpg": {Columns.WEATHER: constants.Weather.CLOUD_CLEAR}}
+    }
+
+    output_path = load_datasheets.load(
+        restructured_json=document, output_dir=Path(output_dir)
+    )
+
+    expected_output_dir = tmp_path / (output_dir or date.today().isoformat())
+    assert output_path.parent.parent.resolve() == expected_output_dir
+    assert json.loads(output_path.read_bytes()) == document
+    assert list(write.read_manifest(run_dir=output_path.parent)["artifacts"]) == [
+        output_path.name
+    ]
+
+
 def _merge_site_creek(
     site_type_map: pd.DataFrame, creek_type_map: pd.DataFrame
 ) -> pd.DataFrame:
@@ -0,0 +1,163 @@
+"""Test out-of-core validation from Parquet."""
+
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandera.errors import SchemaError, SchemaErrors
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    ValidationProfile,
+)
+from stormwater_monitoring_datasheet_extraction.lib.schema import out_of_core
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation
+
+pytest.importorskip("pyarrow")
+
+_N_FORMS: Final[int] = 30
+_BATCH_SIZE: Final[int] = 7
+_SITE_IDS: Final[list[str]] = ["C ST", "BROADWAY", "PADDEN"]
+_SUMMARY_KEY: Final[list[str]] = [Columns.SCHEMA, Columns.CHECK, Columns.COLUMN]
+
+
+def _get_observations() -> pd.DataFrame:
+    """Get quantitative observations of many forms, shuffled so forms span batches."""
+    n_rows = _N_FORMS * len(_SITE_IDS)
+    columns = schema.QuantitativeObservationsVerified.to_schema().columns
+
+    return (
+        pd.DataFrame(
+            {
+                Columns.FORM_ID: np.repeat([f"IMG_{i}.jpg" for i in range(_N_FORMS)], 3),
+                Columns.SITE_ID: _SITE_IDS * _N_FORMS,
+                Columns.BACTERIA_BOTTLE_NO: ["B1", "B2", "B3"] * _N_FORMS,
+                Columns.FLOW: pd.Categorical(
+                    ["M"] * n_rows, dtype=columns[Columns.FLOW].dtype.type
+                ),
+                Columns.FLOW_COMPARED_TO_EXPECTED: pd.Categorical(
+                    ["Normal"] * n_rows,
+                    dtype=columns[Columns.FLOW_COMPARED_TO_EXPECTED].dtype.type,
+                ),
+                Columns.AIR_TEMP: np.linspace(10, 20, n_rows),
+                Columns.WATER_TEMP: np.linspace(8, 12, n_rows),
+                Columns.DO_MG_PER_L: np.linspace(9, 11, n_rows),
+                Columns.SPS_MICRO_S_PER_CM: np.linspace(300, 400, n_rows),
+                Columns.SALINITY_PPT: np.linspace(0.1, 0.2, n_rows),
+                Columns.PH: np.linspace(6, 8, n_rows),
+            }
+        )
+        .set_index([Columns.FORM_ID, Columns.SITE_ID])
+        .sample(frac=1, random_state=0)
+    )
+
+
+def _get_summary(error: SchemaErrors) -> pd.Series:
+    """Get the failure case counts per schema, check, and column."""
+    return (
+        schema_utils.summarize_schema_errors(error=error)
+        .set_index(_SUMMARY_KEY)[Columns.N_FAILURE_CASES]
+        .sort_index()
+    )
+
+
+@typechecked
+def test_validate_parquet(tmp_path: Path) -> None:
+    """Tests that a valid table validates batch by batch."""
+    path = tmp_path / "observations.parquet"
+    _get_observations().to_parquet(path)
+
+    n_rows = out_of_core.validate_parquet(
+        path=path, model=schema.QuantitativeObservationsVerified, batch_size=_BATCH_SIZE
+    )
+
+    assert n_rows == _N_FORMS * len(_SITE_IDS)
+
+
+@typechecked
+def test_failure_cases_match_in_memory(tmp_path: Path) -> None:
+    """Tests that row-local and cross-row failure cases match validating in memory."""
+    observations = _get_observations()
+    observations.iloc[::10, observations.columns.get_loc(Columns.PH)] = 15.0
+    form_rows = observations.index.get_level_values(Columns.FORM_ID) == "IMG_3.jpg"
+    observations.loc[form_rows, Columns.BACTERIA_BOTTLE_NO] = "B1"
+    path = tmp_path / "observations.parquet"
+    observations.to_parquet(path)
+
+    with pytest.raises(SchemaErrors) as in_memory_error:
+        schema.QuantitativeObservationsVerified.validate(observations, lazy=True)
+    with pytest.raises(SchemaErrors) as out_of_core_error:
+        out_of_core.validate_parquet(
+            path=path, model=schema.QuantitativeObservationsVerified, batch_size=_BATCH_SIZE
+        )
+
+    pd.testing.assert_series_equal(
+        _get_summary(error=out_of_core_error.value), _get_summary(error=in_memory_error.value)
+    )
+
+
+@typechecked
+def test_primary_key_across_batches(tmp_path: Path) -> None:
+    """Tests that a key repeated in a later batch flags the repeat, per key level."""
+    observations = _get_observations()
+    observations = pd.concat([observations, observations.iloc[[0]]])
+    path = tmp_path / "observations.parquet"
+    observations.to_parquet(path)
+
+    with pytest.raises(SchemaErrors) as error:
+        out_of_core.validate_parquet(
+            path=path, model=schema.QuantitativeObservationsVerified, batch_size=_BATCH_SIZE
+        )
+
+    summary = _get_summary(error=error.value)
+    # And the repeated bottle number.
+    assert summary.to_dict() == {
+        ("QuantitativeObservationsVerified", "bottle_no_unique_by_form_id", ""): 1,
+        ("QuantitativeObservationsVerified", "multiindex_unique", ""): 2,
+    }
+    # Indexed by row number in the file.
+    failure_cases = error.value.failure_cases
+    key_failure_cases = failure_cases[failure_cases[Columns.CHECK] == "multiindex_unique"]
+    assert key_failure_cases[Columns.INDEX].tolist() == [len(observations) - 1] * 2
+    assert set(key_failure_cases[Columns.FAILURE_CASE]) == set(observations.index[0])
+
+
+@typechecked
+def test_duplicate_keys_match_in_memory(tmp_path: Path) -> None:
+    """Tests that duplicated primary keys are counted per check as validating in memory."""
+    observations = _get_observations()
+    observations = pd.concat([observations, observations.iloc[[0, 10, 20]]])
+    path = tmp_path / "observations.parquet"
+    observations.to_parquet(path)
+
+    with pytest.raises(SchemaErrors) as in_memory_error:
+        schema.QuantitativeObservationsVerified.validate(observations, lazy=True)
+    with pytest.raises(SchemaErrors) as out_of_core_error:
+        out_of_core.validate_parquet(
+            path=path, model=schema.QuantitativeObservationsVerified, batch_size=_BATCH_SIZE
+        )
+
+    summary = _get_summary(error=out_of_core_error.value)
+    pd.testing.assert_series_equal(summary, _get_summary(error=in_memory_error.value))
+    assert summary[("QuantitativeObservationsVerified", "multiindex_unique", "")] == 6
+
+
+@typechecked
+def test_fast_raises_first(tmp_path: Path) -> None:
+    """Tests that the first error is raised under the fast profile."""
+    observations = _get_observations()
+    observations.iloc[-1, observations.columns.get_loc(Columns.PH)] = 15.0
+    path = tmp_path / "observations.parquet"
+    observations.to_parquet(path)
+
+    with validation.validation_profile(profile=ValidationProfile.FAST), pytest.raises(
+        SchemaError, match="less_than_or_equal_to"
+    ):
+        out_of_core.validate_parquet(
+            path=path, model=schema.QuantitativeObservationsVerified, batch_size=_BATCH_SIZE
+        )
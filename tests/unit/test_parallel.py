@@ -0,0 +1,223 @@
+"""Test parallel validation."""
+
+from typing import Any, Final, cast
+
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+import pandera.typing as pt
+import pytest
+from pandera.errors import SchemaError, SchemaErrors
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    ValidationProfile,
+)
+from stormwater_monitoring_datasheet_extraction.lib.db import tables
+from stormwater_monitoring_datasheet_extraction.lib.schema import (
+    parallel,
+)
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils as schema_utils
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation
+
+_N_FORMS: Final[int] = 30
+_CHUNK_SIZE: Final[int] = 7
+_SITE_IDS: Final[list[str]] = ["C ST", "BROADWAY", "PADDEN"]
+_INVALID_CREEKS: Final[pd.DataFrame] = pd.DataFrame(
+    {Columns.SITE_ID: ["Padden"], Columns.CREEK_TYPE: ["not a creek type"]}
+).set_index(Columns.SITE_ID)
+
+
+def _get_observations(n_forms: int = _N_FORMS, coerced: bool = True) -> pd.DataFrame:
+    """Get quantitative observations of many forms, shuffled so forms are interleaved.
+
+    If not `coerced`, the categorical columns are left as strings, for the schema to coerce.
+    """
+    n_rows = n_forms * len(_SITE_IDS)
+    observations = pd.DataFrame(
+        {
+            Columns.FORM_ID: np.repeat([f"IMG_{i}.jpg" for i in range(n_forms)], 3),
+            Columns.SITE_ID: _SITE_IDS * n_forms,
+            Columns.BACTERIA_BOTTLE_NO: ["B1", "B2", "B3"] * n_forms,
+            Columns.FLOW: ["M"] * n_rows,
+            Columns.FLOW_COMPARED_TO_EXPECTED: ["Normal"] * n_rows,
+            Columns.AIR_TEMP: np.linspace(10, 20, n_rows),
+            Columns.WATER_TEMP: np.linspace(8, 12, n_rows),
+            Columns.DO_MG_PER_L: np.linspace(9, 11, n_rows),
+            Columns.SPS_MICRO_S_PER_CM: np.linspace(300, 400, n_rows),
+            Columns.SALINITY_PPT: np.linspace(0.1, 0.2, n_rows),
+            Columns.PH: np.linspace(6, 8, n_rows),
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID])
+    if coerced:
+        columns = schema.QuantitativeObservationsVerified.to_schema().columns
+        observations = observations.astype(
+            {
+                column: columns[column].dtype.type
+                for column in (Columns.FLOW, Columns.FLOW_COMPARED_TO_EXPECTED)
+            }
+        )
+
+    return observations.sample(frac=1, random_state=0)
+
+
+def _get_invalid_observations() -> pd.DataFrame:
+    """Get observations with invalid pH across chunks, and a duplicate bottle in a form."""
+    observations = _get_observations()
+    observations.iloc[::10, observations.columns.get_loc(Columns.PH)] = 15.0
+    form_rows = observations.index.get_level_values(Columns.FORM_ID) == "IMG_3.jpg"
+    observations.loc[form_rows, Columns.BACTERIA_BOTTLE_NO] = "B1"
+
+    return observations
+
+
+@validation.check_types
+def _get_tables(
+    observations: Any, creeks: Any
+) -> tuple[pt.DataFrame[schema.QuantitativeObservationsVerified], pt.DataFrame[schema.Creek]]:
+    return (
+        cast("pt.DataFrame[schema.QuantitativeObservationsVerified]", observations),
+        cast("pt.DataFrame[schema.Creek]", creeks),
+    )
+
+
+@validation.check_types
+def _get_observations_table(
+    observations: Any,
+) -> pt.DataFrame[schema.QuantitativeObservationsVerified]:
+    return cast("pt.DataFrame[schema.QuantitativeObservationsVerified]", observations)
+
+
+@typechecked
+def test_chunk() -> None:
+    """Tests that tables are chunked on form boundaries."""
+    observations = _get_observations()
+
+    positions = parallel.chunk(df=observations, chunk_size=_CHUNK_SIZE)
+
+    assert positions is not None
+    assert len(positions) > 1
+    assert sorted(np.concatenate(positions).tolist()) == list(range(len(observations)))
+    form_ids = observations.index.get_level_values(Columns.FORM_ID)
+    chunk_form_ids = [set(form_ids[chunk_positions]) for chunk_positions in positions]
+    assert sum(len(chunk) for chunk in chunk_form_ids) == _N_FORMS
+    assert all(len(chunk_positions) < 2 * _CHUNK_SIZE for chunk_positions in positions)
+
+    assert parallel.chunk(df=observations, chunk_size=len(observations)) is None
+    assert parallel.chunk(df=tables.CREEKS, chunk_size=1) is None
+
+
+@pytest.mark.parametrize("coerced", [True, False])
+@typechecked
+def test_check_types_in_parallel(coerced: bool) -> None:
+    """Tests that validating in parallel returns what validating serially does.
+
+    As `pa.check_types` does, a tuple's tables are returned as is, and a single table as
+    validated, e.g. coerced.
+    """
+    observations = _get_observations(coerced=coerced)
+
+    serial = _get_tables(observations=observations, creeks=tables.CREEKS)
+    serial_observations = _get_observations_table(observations=observations)
+    with validation.validation_workers(max_workers=4, chunk_size=_CHUNK_SIZE):
+        parallel_tables = _get_tables(observations=observations, creeks=tables.CREEKS)
+        parallel_observations = _get_observations_table(observations=observations)
+
+    for serial_table, parallel_table in zip(serial, parallel_tables, strict=True):
+        pd.testing.assert_frame_equal(parallel_table, serial_table)
+    assert parallel_tables[0] is observations
+    pd.testing.assert_frame_equal(parallel_observations, serial_observations)
+    assert isinstance(parallel_observations[Columns.FLOW].dtype, pd.CategoricalDtype)
+
+
+@typechecked
+def test_uncoerced_chunks_stress() -> None:
+    """Tests that chunks coerce against their own schemas, however the threads interleave.
+
+    A chunk's schema copied while another chunk is validated against the original could
+    capture coercion switched off, and fail on dtype.
+    """
+    observations = _get_observations(n_forms=3_000, coerced=False)
+
+    with validation.validation_workers(max_workers=4, chunk_size=500):
+        for _ in range(10):
+            validated = _get_observations_table(observations=observations)
+
+            assert isinstance(validated[Columns.FLOW].dtype, pd.CategoricalDtype)
+
+
+@typechecked
+def test_chunks_own_schemas(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that a table's chunks are validated against distinct copies of its schema.
+
+    Pandera mutates a schema's components while validating, so concurrent chunks sharing a
+    schema could leave it corrupted.
+    """
+    observations = _get_observations()
+    validated_schemas = []
+    validate = pa.DataFrameSchema.validate
+
+    def _validate(self: pa.DataFrameSchema, *args: Any, **kwargs: Any) -> pd.DataFrame:
+        validated_schemas.append(self)
+        return validate(self, *args, **kwargs)
+
+    monkeypatch.setattr(pa.DataFrameSchema, "validate", _validate)
+    with validation.validation_workers(max_workers=4, chunk_size=_CHUNK_SIZE):
+        _get_tables(observations=observations, creeks=tables.CREEKS)
+
+    positions = parallel.chunk(df=observations, chunk_size=_CHUNK_SIZE)
+    assert positions is not None
+    observations_schemas = [
+        validated_schema
+        for validated_schema in validated_schemas
+        if validated_schema.name == "QuantitativeObservationsVerified"
+    ]
+    assert len({id(schema) for schema in observations_schemas}) == len(positions)
+
+
+@typechecked
+def test_errors_merged() -> None:
+    """Tests that the first failed table's chunks' failure cases are raised, as serially."""
+    observations = _get_invalid_observations()
+
+    with pytest.raises(SchemaErrors) as serial_error:
+        _get_tables(observations=observations, creeks=_INVALID_CREEKS)
+    with pytest.raises(SchemaErrors) as parallel_error, validation.validation_workers(
+        max_workers=4, chunk_size=_CHUNK_SIZE
+    ):
+        _get_tables(observations=observations, creeks=_INVALID_CREEKS)
+
+    assert type(parallel_error.value) is type(serial_error.value)
+    assert parallel_error.value.schema.name == serial_error.value.schema.name
+    assert parallel_error.value.data is observations
+    serial_summary = schema_utils.summarize_schema_errors(error=serial_error.value)
+    parallel_summary = schema_utils.summarize_schema_errors(error=parallel_error.value)
+
+    key = [Columns.SCHEMA, Columns.CHECK, Columns.COLUMN]
+    pd.testing.assert_series_equal(
+        parallel_summary.set_index(key)[Columns.N_FAILURE_CASES].sort_index(),
+        serial_summary.set_index(key)[Columns.N_FAILURE_CASES].sort_index(),
+    )
+
+
+@typechecked
+def test_first_error_when_fast() -> None:
+    """Tests that the first failed table's error is raised when not lazy."""
+    with validation.validation_profile(
+        profile=ValidationProfile.FAST
+    ), validation.validation_workers(max_workers=4, chunk_size=_CHUNK_SIZE), pytest.raises(
+        SchemaError, match="not a creek type"
+    ):
+        _get_tables(observations=_get_observations(), creeks=_INVALID_CREEKS)
+
+
+@typechecked
+def test_validation_workers_positive() -> None:
+    """Tests that the validation workers must be positive."""
+    with pytest.raises(ValueError, match="must be positive"):
+        with validation.validation_workers(max_workers=0):
+            pass
+
+    assert validation.get_validation_workers().max_workers == 1
@@ -0,0 +1,66 @@
+"""Test profiling by stage."""
+
+import pstats
+import time
+from pathlib import Path
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.api.public import profile
+from stormwater_monitoring_datasheet_extraction.lib import profiling
+
+
+def _spin(seconds: float) -> None:
+    """Keep the CPU busy, to be sampled."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@profiling.stage
+def extract() -> None:
+    """Stand in for extraction."""
+    _spin(seconds=0.1)
+    clean()
+
+
+@profiling.stage
+def clean() -> None:
+    """Stand in for cleaning."""
+    _spin(seconds=0.1)
+
+
+@typechecked
+def test_profile(tmp_path: Path) -> None:
+    """Tests that the profiles are written, with a section per stage."""
+    path = tmp_path / "profiles" / "batch"
+
+    with profile(path=path):
+        extract()
+
+    stats = pstats.Stats(str(tmp_path / "profiles" / "batch.pstats"))
+    assert any(function == "_spin" for _, _, function in stats.stats)  # type: ignore
+
+    stacks = {}
+    for line in (tmp_path / "profiles" / "batch.collapsed").read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        stacks[stack] = int(count)
+    extract_stacks = [stack for stack in stacks if stack.startswith("extract;")]
+    assert any(stack.endswith("._spin") for stack in extract_stacks)
+    assert any(
+        stack.startswith("extract;clean;") and stack.endswith("._spin") for stack in stacks
+    )
+    assert not profiling._STAGES
+
+
+@typechecked
+def test_profile_not_nested(tmp_path: Path) -> None:
+    """Tests that profiles can't be nested, and stages run unprofiled outside them."""
+    with profile(path=tmp_path / "outer"), pytest.raises(ValueError, match="nested"):
+        with profile(path=tmp_path / "inner"):
+            pass
+
+    clean()
+    assert not profiling._STAGES
+    assert not (tmp_path / "inner.pstats").exists()
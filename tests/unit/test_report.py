@@ -0,0 +1,154 @@
+"""Test run reports."""
+
+import json
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+import pandas as pd
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, load_datasheets
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    FormStatus,
+    ValidationProfile,
+)
+from stormwater_monitoring_datasheet_extraction.lib.output import report, write
+
+_JPEG: Final[bytes] = b"\xff\xd8\xff\xe0" + b"\x00" * constants.MIN_IMAGE_BYTES + b"\xff\xd9"
+_N_IMAGES: Final[int] = 6
+
+
+@pytest.fixture()
+def input_dir(tmp_path: Path) -> Path:
+    """Get an input directory of images."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(_N_IMAGES):
+        (input_dir / f"IMG_{i:02}.jpg").write_bytes(_JPEG)
+
+    return input_dir
+
+
+@typechecked
+def test_run_report(input_dir: Path, tmp_path: Path) -> None:
+    """Tests that the run report is saved with the output, per form and in aggregate."""
+    output_path = load_datasheets.run_etl(
+        input_dir=input_dir,
+        output_dir=tmp_path / "output",
+        validation_profile=ValidationProfile.OFF,
+        extractor="fake",
+    )
+
+    report_path = output_path.with_name(f"{constants.REPORT_FILE_STEM}.json")
+    assert report_path.name in write.read_manifest(run_dir=output_path.parent)["artifacts"]
+    run_report = json.loads(report_path.read_bytes())
+    summary = run_report["summary"]
+    assert summary[Columns.RUN_ID] == output_path.parent.name
+    assert summary["n_forms_by_status"][FormStatus.LOADED] == _N_IMAGES
+    assert list(summary["stages"]) == [
+        "extract",
+        "preclean",
+        "verify",
+        "clean",
+        "restructure_extraction",
+    ]
+
+    forms = pd.DataFrame(run_report[Columns.FORMS]).set_index(Columns.FORM_ID)
+    assert len(forms) == _N_IMAGES
+    assert (forms[Columns.STATUS] == FormStatus.LOADED).all()
+    assert (forms[Columns.EXTRACTION_SECONDS] > 0).all()
+    assert (forms["clean_errors"] == 0).all()
+    assert (forms[Columns.VERIFICATION_EDITS] == 0).all()
+
+    parquet_path = report_path.with_suffix(".parquet")
+    if report.pyarrow is not None:
+        pd.testing.assert_frame_equal(pd.read_parquet(parquet_path), forms)
+
+
+@typechecked
+def test_failed_run_report(tmp_path: Path) -> None:
+    """Tests that a failed run's report is committed alone, with its forms failed."""
+
+    @report.stage
+    def clean() -> None:
+        raise ValueError("Not clean.")
+
+    with pytest.raises(ValueError, match="Not clean"), report.reporting(
+        output_dir=tmp_path
+    ) as run_report:
+        run_report.add_forms(form_ids=["IMG_1.jpg", "IMG_2.jpg"])
+        run_report.set_status(form_ids=["IMG_2.jpg"], status=FormStatus.SKIPPED)
+        clean()
+
+    assert report.get_report() is None
+    assert run_report.path is not None
+    saved_report = json.loads(run_report.path.read_bytes())
+    assert saved_report["summary"]["stages"]["clean"][report._ERRORS] == 1
+    assert [form[Columns.STATUS] for form in saved_report[Columns.FORMS]] == [
+        FormStatus.FAILED,
+        FormStatus.SKIPPED,
+    ]
+
+
+@typechecked
+def test_stage_warnings() -> None:
+    """Tests that warnings are counted toward the stage they're logged in."""
+
+    @report.stage
+    def verify() -> None:
+        load_datasheets.logger.warning("Check this.")
+        load_datasheets.logger.error("Counted as a failure, if raised.")
+
+    with report.reporting(output_dir=Path()) as run_report:
+        verify()
+        run_report.add_exceedances(counts=pd.Series({"IMG_1.jpg": 2}))
+        run_report.add_forms(form_ids=["IMG_1.jpg"])
+        run_report.add_exceedances(counts=pd.Series({"IMG_1.jpg": 3}))
+
+    summary = run_report.get_summary()
+    assert summary["stages"]["verify"][report._WARNINGS] == 1
+    assert summary["stages"]["verify"][report._ERRORS] == 0
+    forms = run_report.get_forms()
+    # Only forms added are reported.
+    assert forms.loc["IMG_1.jpg", Columns.THRESHOLD_EXCEEDANCES] == 3
+    assert forms.loc["IMG_1.jpg", f"{report._NO_STAGE}_{report._WARNINGS}"] == 3
+
+
+@typechecked
+def test_count_edits() -> None:
+    """Tests that changed cells, and added and removed rows, are counted per form."""
+    before = pd.DataFrame(
+        {
+            Columns.FORM_ID: ["IMG_1.jpg", "IMG_1.jpg", "IMG_2.jpg", "IMG_3.jpg"],
+            Columns.SITE_ID: ["C ST", "PADDEN", "C ST", "C ST"],
+            Columns.PH: [7.0, np.nan, 7.0, 7.0],
+            Columns.NOTES: ["a", None, "b", "c"],
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID])
+    after = before.copy()
+    after.loc[("IMG_1.jpg", "C ST"), [Columns.PH, Columns.NOTES]] = [8.0, "edited"]
+    after = after.drop(index=("IMG_2.jpg", "C ST"))
+    after.loc[("IMG_3.jpg", "PADDEN"), :] = [7.0, None]
+
+    assert report.count_edits(before=before, after=before.copy()).empty
+    pd.testing.assert_series_equal(
+        report.count_edits(before=before, after=after),
+        pd.Series(
+            [2, 1, 1],
+            index=pd.Index(["IMG_1.jpg", "IMG_2.jpg", "IMG_3.jpg"], name=Columns.FORM_ID),
+        ),
+        check_dtype=False,
+    )
+
+    # Duplicate keys are compared in order.
+    duplicated = pd.concat([before, before.iloc[[0]]])
+    edited_duplicate = duplicated.copy()
+    edited_duplicate.iloc[-1, 0] = 9.0
+    pd.testing.assert_series_equal(
+        report.count_edits(before=duplicated, after=edited_duplicate),
+        pd.Series([1], index=pd.Index(["IMG_1.jpg"], name=Columns.FORM_ID)),
+        check_dtype=False,
+    )
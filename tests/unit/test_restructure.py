@@ -0,0 +1,126 @@
+"""Test restructuring relational tables into extraction documents."""
+
+from typing import Any, Final
+
+import pandas as pd
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    CreekType,
+    OutfallType,
+)
+from stormwater_monitoring_datasheet_extraction.lib.db import tables
+from stormwater_monitoring_datasheet_extraction.lib.documents import flatten, restructure
+
+_EXAMPLE_FORMS: Final[dict[str, Any]] = constants.FIELD_DATA_DEFINITION[
+    "example_extraction_document"
+][Columns.FORMS]
+_NO_SITES: Final[pd.DataFrame] = tables.SITES.iloc[:0]
+_NO_CREEKS: Final[pd.DataFrame] = tables.CREEKS.iloc[:0]
+
+
+@typechecked
+def test_restructure_round_trip() -> None:
+    """Tests that restructuring the flattened example gives back the example forms."""
+    document = restructure.restructure_tables(
+        *flatten.flatten_forms(forms=_EXAMPLE_FORMS),
+        site_type_map=_NO_SITES,
+        creek_type_map=_NO_CREEKS,
+    )
+
+    # Outfall and creek types aren't flattened, but come from the site and creek maps.
+    expected_forms = {
+        form_id: {
+            **form,
+            Columns.OBSERVATIONS: [
+                {
+                    field: value
+                    for field, value in observation.items()
+                    if field not in (Columns.OUTFALL_TYPE, Columns.CREEK_TYPE)
+                }
+                for observation in form[Columns.OBSERVATIONS]
+            ],
+        }
+        for form_id, form in _EXAMPLE_FORMS.items()
+    }
+    assert document[Columns.FORMS] == expected_forms
+    assert list(document[Columns.FORMS]) == list(_EXAMPLE_FORMS)
+    assert document[Columns.METADATA] == constants.FIELD_DATA_DEFINITION[Columns.METADATA]
+
+
+@typechecked
+def test_restructure_site_types() -> None:
+    """Tests that each observation gets its site's outfall and creek types."""
+    forms = {
+        "a.jpg": {
+            Columns.OBSERVATIONS: [
+                {Columns.SITE_ID: "Padden", Columns.PH: 7.0},
+                {Columns.SITE_ID: "Broadway", Columns.PH: 7.1},
+                {Columns.SITE_ID: "Nowhere", Columns.PH: 7.2},
+            ]
+        }
+    }
+
+    document = restructure.restructure_tables(
+        *flatten.flatten_forms(forms=forms),
+        site_type_map=tables.SITES,
+        creek_type_map=tables.CREEKS,
+    )
+
+    assert document[Columns.FORMS]["a.jpg"][Columns.OBSERVATIONS] == [
+        {
+            Columns.SITE_ID: "Padden",
+            Columns.OUTFALL_TYPE: OutfallType.CREEK,
+            Columns.CREEK_TYPE: CreekType.SPAWN,
+            Columns.PH: 7.0,
+        },
+        {
+            Columns.SITE_ID: "Broadway",
+            Columns.OUTFALL_TYPE: OutfallType.OUTFALL,
+            Columns.PH: 7.1,
+        },
+        {Columns.SITE_ID: "Nowhere", Columns.PH: 7.2},
+    ]
+
+
+@typechecked
+def test_restructure_skips_orphans() -> None:
+    """Tests that child rows of unknown forms and sites are skipped, and forms kept."""
+    tables_ = flatten.flatten_forms(
+        forms={
+            "a.jpg": {
+                Columns.OBSERVATIONS: [
+                    {
+                        Columns.SITE_ID: "Padden",
+                        Columns.PH: 7.0,
+                        Columns.COLOR: {Columns.RANK: 1},
+                    }
+                ]
+            },
+            "b.jpg": {Columns.INVESTIGATORS: {"ANNA B": {Columns.START_TIME: "14:40"}}},
+        }
+    )
+    form_metadata = tables_.form_metadata.loc[["a.jpg"]]
+    quantitative_observations = tables_.quantitative_observations.rename(
+        index={"Padden": "Broadway"}
+    )
+
+    document = restructure.restructure_tables(
+        form_metadata=form_metadata,
+        investigators=tables_.investigators,
+        site_visits=tables_.site_visits,
+        quantitative_observations=quantitative_observations,
+        qualitative_observations=tables_.qualitative_observations,
+        site_type_map=_NO_SITES,
+        creek_type_map=_NO_CREEKS,
+    )
+
+    assert document[Columns.FORMS] == {
+        "a.jpg": {
+            Columns.OBSERVATIONS: [
+                {Columns.SITE_ID: "Padden", Columns.COLOR: {Columns.RANK: 1}}
+            ]
+        }
+    }
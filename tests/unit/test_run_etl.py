@@ -3,8 +3,214 @@
 # TODO: Test that CLI returns correct path, using pytest.mark.parametrize.
 # TODO: Add more mocked tests for CLI (e.g., creates a file at the expected location.)
 
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.cli.run_etl import main
+from stormwater_monitoring_datasheet_extraction.lib.constants import ValidationProfile
+
 
 # TODO: This is a placeholder; replace with actual tests.
 def test_dummy() -> None:
     """Dummy test to ensure the test suite runs."""
     assert True
+
+
+@pytest.mark.parametrize(
+    "cli_args, expected_profile",
+    [
+        ([], ValidationProfile.FULL),
+        (["--validation_profile", "fast"], ValidationProfile.FAST),
+        (["--validation_profile", "off"], ValidationProfile.OFF),
+    ],
+)
+@typechecked
+def test_cli_validation_profile(
+    cli_runner: CliRunner, cli_args: list[str], expected_profile: ValidationProfile
+) -> None:
+    """Tests that the CLI passes the validation profile to the API."""
+    with patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.run_etl",
+        return_value=Path("output.json"),
+    ) as mock_run_etl:
+        result = cli_runner.invoke(main, ["--input_dir", "input"] + cli_args)
+
+    assert result.exit_code == 0, result.output
+    assert mock_run_etl.call_args.kwargs["validation_profile"] == expected_profile
+    assert "Run report saved to: run_report.json" in result.output
+
+
+@typechecked
+def test_cli_invalid_validation_profile(cli_runner: CliRunner) -> None:
+    """Tests that the CLI rejects unknown validation profiles."""
+    result = cli_runner.invoke(
+        main, ["--input_dir", "input", "--validation_profile", "sometimes"]
+    )
+    assert result.exit_code != 0
+
+
+@pytest.mark.parametrize(
+    "cli_args, expected_extractor",
+    [([], None), (["--extractor", "fake"], "fake")],
+)
+@typechecked
+def test_cli_extractor(
+    cli_runner: CliRunner, cli_args: list[str], expected_extractor: str | None
+) -> None:
+    """Tests that the CLI passes the extractor name to the API."""
+    with patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.run_etl",
+        return_value=Path("output.json"),
+    ) as mock_run_etl:
+        result = cli_runner.invoke(main, ["--input_dir", "input"] + cli_args)
+
+    assert result.exit_code == 0, result.output
+    assert mock_run_etl.call_args.kwargs["extractor"] == expected_extractor
+
+
+@pytest.mark.parametrize(
+    "cli_args, expected_from_documents", [([], False), (["--from_documents"], True)]
+)
+@typechecked
+def test_cli_from_documents(
+    cli_runner: CliRunner, cli_args: list[str], expected_from_documents: bool
+) -> None:
+    """Tests that the CLI passes the document ingest flag to the API."""
+    with patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.run_etl",
+        return_value=Path("output.json"),
+    ) as mock_run_etl:
+        result = cli_runner.invoke(main, ["--input_dir", "input"] + cli_args)
+
+    assert result.exit_code == 0, result.output
+    assert mock_run_etl.call_args.kwargs["from_documents"] == expected_from_documents
+
+
+@pytest.mark.parametrize(
+    "cli_args, expected_incremental", [([], False), (["--incremental"], True)]
+)
+@typechecked
+def test_cli_incremental(
+    cli_runner: CliRunner, cli_args: list[str], expected_incremental: bool
+) -> None:
+    """Tests that the CLI passes the incremental flag to the API."""
+    with patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.run_etl",
+        return_value=Path("output.json"),
+    ) as mock_run_etl:
+        result = cli_runner.invoke(main, ["--input_dir", "input"] + cli_args)
+
+    assert result.exit_code == 0, result.output
+    assert mock_run_etl.call_args.kwargs["incremental"] == expected_incremental
+
+
+@pytest.mark.parametrize(
+    "cli_args, expected_workers", [([], 1), (["--validation_workers", "4"], 4)]
+)
+@typechecked
+def test_cli_validation_workers(
+    cli_runner: CliRunner, cli_args: list[str], expected_workers: int
+) -> None:
+    """Tests that the CLI passes the validation workers to the API."""
+    with patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.run_etl",
+        return_value=Path("output.json"),
+    ) as mock_run_etl:
+        result = cli_runner.invoke(main, ["--input_dir", "input"] + cli_args)
+
+    assert result.exit_code == 0, result.output
+    assert mock_run_etl.call_args.kwargs["validation_workers"] == expected_workers
+
+
+@typechecked
+def test_cli_invalid_validation_workers(cli_runner: CliRunner) -> None:
+    """Tests that the CLI rejects fewer than one validation worker."""
+    result = cli_runner.invoke(main, ["--input_dir", "input", "--validation_workers", "0"])
+    assert result.exit_code != 0
+
+
+@pytest.mark.parametrize(
+    "cli_args, expected_reference_time",
+    [
+        ([], None),
+        (["--reference_time", "2025-07-22 14:41:00"], datetime(2025, 7, 22, 14, 41)),
+    ],
+)
+@typechecked
+def test_cli_reference_time(
+    cli_runner: CliRunner, cli_args: list[str], expected_reference_time: datetime | None
+) -> None:
+    """Tests that the CLI passes the reference time to the API."""
+    with patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.run_etl",
+        return_value=Path("output.json"),
+    ) as mock_run_etl:
+        result = cli_runner.invoke(main, ["--input_dir", "input"] + cli_args)
+
+    assert result.exit_code == 0, result.output
+    assert mock_run_etl.call_args.kwargs["reference_time"] == expected_reference_time
+
+
+@typechecked
+def test_cli_profile(cli_runner: CliRunner, tmp_path: Path) -> None:
+    """Tests that the CLI profiles the run to the given path."""
+    with patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.run_etl",
+        return_value=Path("output.json"),
+    ):
+        result = cli_runner.invoke(
+            main, ["--input_dir", "input", "--profile", str(tmp_path / "batch")]
+        )
+
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "batch.pstats").exists()
+    assert (tmp_path / "batch.collapsed").exists()
+
+
+@typechecked
+def test_cli_watch(cli_runner: CliRunner) -> None:
+    """Tests that the CLI watches instead of running once, with the same settings."""
+    with patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.watch_etl",
+        return_value=[Path("output.json")],
+    ) as mock_watch_etl, patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.run_etl"
+    ) as mock_run_etl:
+        result = cli_runner.invoke(
+            main, ["--input_dir", "input", "--watch", "--extractor", "fake"]
+        )
+
+    assert result.exit_code == 0, result.output
+    mock_run_etl.assert_not_called()
+    assert mock_watch_etl.call_args.kwargs["extractor"] == "fake"
+    assert "Loaded 1 batches" in result.output
+
+
+@typechecked
+def test_cli_watch_from_documents(cli_runner: CliRunner) -> None:
+    """Tests that the CLI rejects watching for extraction documents."""
+    result = cli_runner.invoke(main, ["--input_dir", "input", "--watch", "--from_documents"])
+    assert result.exit_code != 0
+
+
+@typechecked
+def test_cli_stream(cli_runner: CliRunner) -> None:
+    """Tests that the CLI streams instead of running stage by stage."""
+    with patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.stream_etl",
+        return_value=Path("output.json"),
+    ) as mock_stream_etl, patch(
+        "stormwater_monitoring_datasheet_extraction.cli.run_etl.run_etl"
+    ) as mock_run_etl:
+        result = cli_runner.invoke(
+            main, ["--input_dir", "input", "--stream", "--incremental"]
+        )
+
+    assert result.exit_code == 0, result.output
+    mock_run_etl.assert_not_called()
+    assert mock_stream_etl.call_args.kwargs["incremental"]
@@ -5,10 +5,13 @@ from typing import cast
 
 import pandas as pd
 import pandera.typing as pt
+import pytest
 from tests.unit.conftest import site_creek_type_parametrize
 from typeguard import typechecked
 
 from stormwater_monitoring_datasheet_extraction.lib import schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.db import tables
 from stormwater_monitoring_datasheet_extraction.lib.schema.checks import relational
 
 # TODO: Test that returns correct path, using pytest.mark.parametrize.
@@ -27,3 +30,79 @@ def test_validate_site_creek_map(
             site_type_map=cast(pt.DataFrame[schema.Site], site_type_map),
             creek_type_map=cast(pt.DataFrame[schema.Creek], creek_type_map),
         )
+
+
+@typechecked
+def test_flag_thresholds() -> None:
+    """Tests that observations are flagged per their sites' types."""
+    observations = pd.DataFrame(
+        {
+            Columns.FORM_ID: ["IMG_1.jpg"] * 4,
+            Columns.SITE_ID: ["Broadway", "Cedar", "Padden", "Unknown"],
+            Columns.AIR_TEMP: [20.0, 20.0, 20.0, 20.0],
+            # Outfalls: No warmer than the air. Spawning creeks: No warmer than 17.5.
+            Columns.WATER_TEMP: [20.0, 20.5, 17.6, 99.0],
+            # Outfalls: 5 to 9. Creeks: 6.5 to 8.5.
+            Columns.PH: [5.0, None, 6.0, 99.0],
+            Columns.DO_MG_PER_L: [6.0, 6.0, 10.0, 0.0],
+            Columns.SPS_MICRO_S_PER_CM: [500.0, 501.0, 0.0, 999.0],
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID])
+
+    flags = relational.flag_thresholds(
+        observations=observations, site_type_map=tables.SITES, creek_type_map=tables.CREEKS
+    )
+
+    assert flags.index.equals(observations.index)
+    assert flags[Columns.WATER_TEMP].tolist() == [False, True, True, False]
+    assert flags[Columns.PH].tolist() == [False, False, True, False]
+    assert flags[Columns.DO_MG_PER_L].tolist() == [False, False, False, False]
+    assert flags[Columns.SPS_MICRO_S_PER_CM].tolist() == [False, True, False, False]
+
+
+@typechecked
+def test_coverage() -> None:
+    """Tests that each form's site coverage is found, and checked, across tables."""
+    site_visits = pd.DataFrame(
+        index=pd.MultiIndex.from_tuples(
+            [("IMG_1.jpg", "C ST"), ("IMG_1.jpg", "PADDEN"), ("IMG_2.jpg", "C ST")],
+            names=[Columns.FORM_ID, Columns.SITE_ID],
+        )
+    )
+    quantitative_observations = pd.DataFrame(
+        index=pd.MultiIndex.from_tuples(
+            [("IMG_1.jpg", "C ST"), ("IMG_2.jpg", "BROADWAY")],
+            names=[Columns.FORM_ID, Columns.SITE_ID],
+        )
+    )
+    qualitative_observations = pd.DataFrame(
+        index=pd.MultiIndex.from_tuples(
+            [
+                ("IMG_1.jpg", "C ST", "color"),
+                ("IMG_1.jpg", "C ST", "odor"),
+                ("IMG_1.jpg", "PADDEN", "color"),
+            ],
+            names=[Columns.FORM_ID, Columns.SITE_ID, Columns.OBSERVATION_TYPE],
+        )
+    )
+
+    coverage = relational.get_coverage(
+        site_visits=site_visits,
+        quantitative_observations=quantitative_observations,
+        qualitative_observations=qualitative_observations,
+    )
+
+    assert coverage.index.tolist() == [
+        ("IMG_1.jpg", "C ST"),
+        ("IMG_1.jpg", "PADDEN"),
+        ("IMG_2.jpg", "C ST"),
+        ("IMG_2.jpg", "BROADWAY"),
+    ]
+    assert coverage[Columns.VISITED].tolist() == [True, True, True, False]
+    assert coverage[Columns.WET].tolist() == [True, False, False, True]
+    assert coverage[Columns.DRY].tolist() == [False, True, True, False]
+    assert coverage[Columns.QUALITATIVE].tolist() == [True, True, False, False]
+
+    relational.validate_coverage(coverage=coverage.iloc[[0, 2]])
+    with pytest.raises(ValueError, match=r"1 sites not in site visits.*1 dry outfalls"):
+        relational.validate_coverage(coverage=coverage)
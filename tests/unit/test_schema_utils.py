@@ -0,0 +1,151 @@
+"""Test the schema utilities."""
+
+import gzip
+from pathlib import Path
+from typing import Final, cast
+
+import pandas as pd
+import pandera.typing as pt
+import pytest
+from pandera.errors import SchemaErrors
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns
+from stormwater_monitoring_datasheet_extraction.lib.errors import SchemaValidationError
+from stormwater_monitoring_datasheet_extraction.lib.schema import utils, validation
+
+_N_ROWS: Final[int] = 1000
+
+
+def _get_invalid_quan_obs(n_rows: int = _N_ROWS) -> pd.DataFrame:
+    """Get quantitative observations with whole columns out of range."""
+    return pd.DataFrame(
+        {
+            Columns.FORM_ID: [f"IMG_{i}.jpg" for i in range(n_rows)],
+            Columns.SITE_ID: ["C ST"] * n_rows,
+            Columns.BACTERIA_BOTTLE_NO: ["B1"] * n_rows,
+            Columns.FLOW: ["M"] * n_rows,
+            Columns.FLOW_COMPARED_TO_EXPECTED: ["Normal"] * n_rows,
+            Columns.AIR_TEMP: [21.0] * n_rows,
+            Columns.WATER_TEMP: [11.6] * n_rows,
+            Columns.DO_MG_PER_L: [-1.0] * n_rows,
+            Columns.SPS_MICRO_S_PER_CM: [414.1] * n_rows,
+            Columns.SALINITY_PPT: [0.2] * n_rows,
+            Columns.PH: [15.0] * n_rows,
+        }
+    ).set_index([Columns.FORM_ID, Columns.SITE_ID])
+
+
+@validation.check_types
+def _get_invalid_quan_obs_checked() -> pt.DataFrame[schema.QuantitativeObservationsVerified]:
+    return cast(
+        "pt.DataFrame[schema.QuantitativeObservationsVerified]", _get_invalid_quan_obs()
+    )
+
+
+@typechecked
+def test_summarize_schema_errors(tmp_path: Path) -> None:
+    """Tests that failure cases are counted and sampled per schema, check, and column."""
+    detail_path = tmp_path / "failure_cases.csv.gz"
+    with pytest.raises(SchemaErrors) as exc_info:
+        _get_invalid_quan_obs_checked()
+
+    summary = utils.summarize_schema_errors(error=exc_info.value, detail_path=detail_path)
+
+    assert summary.columns.tolist() == [
+        Columns.SCHEMA,
+        Columns.CHECK,
+        Columns.COLUMN,
+        Columns.N_FAILURE_CASES,
+        Columns.SAMPLE,
+    ]
+    assert set(summary[Columns.SCHEMA]) == {"QuantitativeObservationsVerified"}
+    assert set(summary[Columns.COLUMN]) == {Columns.DO_MG_PER_L, Columns.PH}
+    assert (summary[Columns.N_FAILURE_CASES] == _N_ROWS).all()
+    assert (summary[Columns.SAMPLE].apply(len) == constants.N_FAILURE_CASES).all()
+
+    with gzip.open(detail_path, mode="rt") as detail_file:
+        detail = pd.read_csv(detail_file)
+    assert len(detail) == 2 * _N_ROWS
+    assert set(detail[Columns.COLUMN]) == {Columns.DO_MG_PER_L, Columns.PH}
+
+
+@pytest.mark.parametrize("detail", [True, False])
+@typechecked
+def test_schema_error_handler(tmp_path: Path, detail: bool) -> None:
+    """Tests that the handler reraises a bounded `SchemaValidationError`."""
+    detail_path = tmp_path / "failure_cases.csv.gz" if detail else None
+
+    @utils.schema_error_handler
+    def _run() -> None:
+        _get_invalid_quan_obs_checked()
+
+    with utils.failure_cases_detail(path=detail_path), pytest.raises(
+        SchemaValidationError, match="Schema validation failed with 2000 failure cases"
+    ) as exc_info:
+        _run()
+
+    error = exc_info.value
+    assert error.__cause__ is None
+    assert error.__context__ is None
+    assert error.detail_path == detail_path
+    assert len(error.summary) == 2
+    assert len(str(error)) < 1000
+    if detail_path is not None:
+        assert detail_path.exists()
+
+
+@typechecked
+def test_schema_error_handler_compact() -> None:
+    """Tests that within the handler, pandera's errors consolidate no failure cases."""
+    raised = []
+
+    @utils.schema_error_handler
+    def _run() -> None:
+        try:
+            _get_invalid_quan_obs_checked()
+        except SchemaErrors as e:
+            raised.append(e)
+            raise
+
+    with pytest.raises(SchemaValidationError) as exc_info:
+        _run()
+
+    assert raised[0].failure_cases is None
+    assert raised[0].error_counts == {"DATAFRAME_CHECK": 2}
+    assert len(str(raised[0])) < 100
+    assert exc_info.value.summary[Columns.N_FAILURE_CASES].tolist() == [_N_ROWS] * 2
+
+    # Outside the handler, pandera's.
+    with pytest.raises(SchemaErrors) as pandera_exc_info:
+        _get_invalid_quan_obs_checked()
+    assert len(pandera_exc_info.value.failure_cases) == 2 * constants.N_FAILURE_CASES
+
+
+@typechecked
+def test_schema_error_handler_fast(tmp_path: Path) -> None:
+    """Tests that the handler summarizes a single fail-fast `SchemaError`."""
+
+    @utils.schema_error_handler
+    def _run() -> None:
+        _get_invalid_quan_obs_checked()
+
+    with validation.validation_profile(
+        profile=constants.ValidationProfile.FAST
+    ), pytest.raises(SchemaValidationError) as exc_info:
+        _run()
+
+    assert exc_info.value.summary[Columns.N_FAILURE_CASES].tolist() == [_N_ROWS]
+
+
+@typechecked
+def test_schema_error_handler_passes_other_errors() -> None:
+    """Tests that the handler leaves non-schema errors alone."""
+
+    @utils.schema_error_handler
+    def _run() -> None:
+        raise ValueError("Not a schema error.")
+
+    with pytest.raises(ValueError, match="Not a schema error."):
+        _run()
@@ -0,0 +1,138 @@
+"""Test serializing output documents."""
+
+import gzip
+import json
+from typing import Any, Final
+
+import numpy as np
+import pandas as pd
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    Compression,
+    OutfallType,
+    Rank,
+)
+from stormwater_monitoring_datasheet_extraction.lib.output import serialize
+
+_DOCUMENT: Final[dict[str, Any]] = {
+    Columns.METADATA: {Columns.FORM_ID: {Columns.DATA_TYPE: str}},
+    Columns.FORMS: {
+        "IMG_9527.jpg": {
+            Columns.TIDE_HEIGHT: np.float64(-0.7),
+            Columns.NOTES: pd.NA,
+            Columns.OBSERVATIONS: [
+                {
+                    Columns.SITE_ID: "C ST",
+                    Columns.OUTFALL_TYPE: OutfallType.CREEK,
+                    Columns.AIR_TEMP: np.float32(21.0),
+                    Columns.COLOR: {Columns.RANK: Rank.ONE, "bottles": np.int64(2)},
+                    "readings": np.array([1.5, 2.5]),
+                }
+            ],
+        }
+    },
+}
+_EXPECTED: Final[dict[str, Any]] = {
+    Columns.METADATA: {Columns.FORM_ID: {Columns.DATA_TYPE: "str"}},
+    Columns.FORMS: {
+        "IMG_9527.jpg": {
+            Columns.TIDE_HEIGHT: -0.7,
+            Columns.NOTES: None,
+            Columns.OBSERVATIONS: [
+                {
+                    Columns.SITE_ID: "C ST",
+                    Columns.OUTFALL_TYPE: "creek",
+                    Columns.AIR_TEMP: 21.0,
+                    Columns.COLOR: {Columns.RANK: 1, "bottles": 2},
+                    "readings": [1.5, 2.5],
+                }
+            ],
+        }
+    },
+}
+
+
+@pytest.mark.parametrize("fast", [True, False])
+@pytest.mark.parametrize("pretty", [True, False])
+@typechecked
+def test_serialize(fast: bool, pretty: bool, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that enums, NumPy values, and nulls serialize, with or without `orjson`."""
+    if not fast:
+        monkeypatch.setattr(serialize, "orjson", None)
+    elif serialize.orjson is None:
+        pytest.skip("`orjson` not installed.")
+
+    serialized = serialize.serialize(document=_DOCUMENT, pretty=pretty)
+
+    assert json.loads(serialized) == _EXPECTED
+    assert (b"\n  " in serialized) == pretty
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        constants.FIELD_DATA_DEFINITION["example_extraction_document"],
+        {
+            "nan": float("nan"),
+            "numpy_nan": np.float64("nan"),
+            "numpy_float32_nan": np.float32("nan"),
+            "infinities": [float("inf"), (-np.inf,)],
+            "readings": np.array([1.5, np.nan]),
+        },
+    ],
+)
+@typechecked
+def test_serialize_backends_agree(
+    document: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests that `orjson` and the standard library give the same, valid, output."""
+    if serialize.orjson is None:
+        pytest.skip("`orjson` not installed.")
+    fast = serialize.serialize(document=document, pretty=True)
+
+    monkeypatch.setattr(serialize, "orjson", None)
+
+    assert serialize.serialize(document=document, pretty=True) == fast
+    json.loads(fast, parse_constant=lambda constant: pytest.fail(f"Not JSON: {constant}"))
+
+
+@typechecked
+def test_serialize_non_finite(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that the standard library writes NaN and infinities as null, as `orjson` does."""
+    monkeypatch.setattr(serialize, "orjson", None)
+    document = {"a": float("nan"), "b": [np.float64("nan"), np.inf], "c": np.array([np.nan])}
+
+    assert serialize.serialize(document=document) == b'{"a":null,"b":[null,null],"c":[null]}'
+
+
+@typechecked
+def test_serialize_unserializable() -> None:
+    """Tests that unknown types raise."""
+    with pytest.raises(TypeError, match="object"):
+        serialize.serialize(document={"a": object()})
+
+
+@pytest.mark.parametrize(
+    "compression, decompress",
+    [(Compression.NONE, lambda data: data), (Compression.GZIP, gzip.decompress)],
+)
+@typechecked
+def test_compress(compression: Compression, decompress: Any) -> None:
+    """Tests that compressed data decompresses, and its suffix."""
+    data = serialize.serialize(document=_EXPECTED)
+
+    assert decompress(serialize.compress(data=data, compression=compression)) == data
+    assert serialize.get_suffix(compression=compression).startswith(".json")
+
+
+@typechecked
+def test_compress_zstd(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that zstd compression needs `zstandard`."""
+    monkeypatch.setattr(serialize, "zstandard", None)
+
+    with pytest.raises(ValueError, match="requires `zstandard`"):
+        serialize.compress(data=b"{}", compression=Compression.ZSTD)
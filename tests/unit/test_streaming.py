@@ -0,0 +1,173 @@
+"""Test the streaming ETL pipeline."""
+
+import json
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Final
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import (
+    constants,
+    load_datasheets,
+    streaming,
+)
+from stormwater_monitoring_datasheet_extraction.lib.constants import ValidationProfile
+from stormwater_monitoring_datasheet_extraction.lib.errors import SchemaValidationError
+from stormwater_monitoring_datasheet_extraction.lib.extraction import extractors
+from stormwater_monitoring_datasheet_extraction.lib.extraction.discovery import (
+    DiscoveredImage,
+)
+
+_JPEG: Final[bytes] = b"\xff\xd8\xff\xe0" + b"\x00" * constants.MIN_IMAGE_BYTES + b"\xff\xd9"
+_N_IMAGES: Final[int] = 40
+_WAIT_SECONDS: Final[float] = 5
+
+
+@pytest.fixture()
+def input_dir(tmp_path: Path) -> Path:
+    """Get an input directory of images."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(_N_IMAGES):
+        (input_dir / f"IMG_{i:02}.jpg").write_bytes(_JPEG)
+
+    return input_dir
+
+
+@typechecked
+def test_stream_etl_matches_run_etl(input_dir: Path, tmp_path: Path) -> None:
+    """Tests that streaming loads the same document as running stage by stage."""
+    streamed_path = streaming.stream_etl(
+        input_dir=input_dir,
+        output_dir=tmp_path / "streamed",
+        validation_profile=ValidationProfile.OFF,
+        extractor="fake",
+    )
+    run_path = load_datasheets.run_etl(
+        input_dir=input_dir,
+        output_dir=tmp_path / "run",
+        validation_profile=ValidationProfile.OFF,
+        extractor="fake",
+    )
+
+    streamed_document = json.loads(streamed_path.read_bytes())
+    assert len(streamed_document[constants.Columns.FORMS]) == _N_IMAGES
+    assert streamed_document == json.loads(run_path.read_bytes())
+
+
+@typechecked
+def test_stream_etl_verifies_while_extracting(
+    input_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests that verification starts before extraction ends, under backpressure."""
+    monkeypatch.setattr(constants, "EXTRACTION_BATCH_SIZE", 4)
+    monkeypatch.setattr(constants, "STREAM_QUEUE_SIZE", 2)
+    monkeypatch.setattr(constants, "STREAM_CHUNK_SIZE", 2)
+    events = []
+    extractor = extractors.get_extractor(name="fake")
+    extract_batch = extractor.extract_batch
+    verify = load_datasheets.verify
+
+    def _extract_batch(images: Sequence[DiscoveredImage]) -> dict[str, dict[str, Any]]:
+        events.append("extract")
+        return extract_batch(images)
+
+    def _verify(**kwargs: Any) -> tuple:
+        events.append("verify")
+        return verify(**kwargs)
+
+    monkeypatch.setattr(extractor, "extract_batch", _extract_batch)
+    monkeypatch.setattr(load_datasheets, "verify", _verify)
+
+    streaming.stream_etl(
+        input_dir=input_dir,
+        output_dir=tmp_path / "output",
+        validation_profile=ValidationProfile.OFF,
+        extractor="fake",
+    )
+
+    assert events.count("extract") == _N_IMAGES // 4
+    # The queues hold only a few forms, so extraction waits on verification.
+    last_extract = len(events) - 1 - events[::-1].index("extract")
+    assert events.index("verify") < last_extract
+
+
+@typechecked
+def test_stream_etl_extracts_while_verifying(
+    input_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests that extraction keeps going while the user verifies a chunk."""
+    monkeypatch.setattr(constants, "EXTRACTION_BATCH_SIZE", 4)
+    monkeypatch.setattr(constants, "STREAM_QUEUE_SIZE", _N_IMAGES)
+    extracted = threading.Event()
+    extracted_while_verifying = []
+    extractor = extractors.get_extractor(name="fake")
+    extract_batch = extractor.extract_batch
+    batch_sizes = []
+    verify = load_datasheets.verify
+
+    def _extract_batch(images: Sequence[DiscoveredImage]) -> dict[str, dict[str, Any]]:
+        forms = extract_batch(images)
+        batch_sizes.append(len(forms))
+        if len(batch_sizes) == _N_IMAGES // 4:
+            extracted.set()
+        return forms
+
+    def _verify(**kwargs: Any) -> tuple:
+        if not extracted_while_verifying:
+            # The first chunk's verification blocks until all forms are extracted.
+            extracted_while_verifying.append(extracted.wait(timeout=_WAIT_SECONDS))
+        return verify(**kwargs)
+
+    monkeypatch.setattr(extractor, "extract_batch", _extract_batch)
+    monkeypatch.setattr(load_datasheets, "verify", _verify)
+
+    output_path = streaming.stream_etl(
+        input_dir=input_dir,
+        output_dir=tmp_path / "output",
+        validation_profile=ValidationProfile.OFF,
+        extractor="fake",
+    )
+
+    assert extracted_while_verifying == [True]
+    assert len(json.loads(output_path.read_bytes())[constants.Columns.FORMS]) == _N_IMAGES
+
+
+@typechecked
+def test_stream_etl_validation_error(input_dir: Path, tmp_path: Path) -> None:
+    """Tests that a per-form validation failure stops the stream, and nothing is loaded.
+
+    Only the run report is committed, with the forms failed.
+    """
+    output_dir = tmp_path / "output"
+    # The example extraction doesn't pass full validation.
+    with pytest.raises(SchemaValidationError):
+        streaming.stream_etl(
+            input_dir=input_dir,
+            output_dir=output_dir,
+            validation_profile=ValidationProfile.FULL,
+            extractor="fake",
+        )
+
+    (run_dir,) = output_dir.iterdir()
+    assert not list(run_dir.glob(f"{constants.OUTPUT_FILE_STEM}*"))
+    run_report = json.loads((run_dir / f"{constants.REPORT_FILE_STEM}.json").read_bytes())
+    assert run_report[constants.Columns.FORMS]
+    assert {
+        form[constants.Columns.STATUS] for form in run_report[constants.Columns.FORMS]
+    } == {constants.FormStatus.FAILED}
+
+
+@typechecked
+def test_stream_etl_no_extractor(input_dir: Path, tmp_path: Path) -> None:
+    """Tests that an empty stream still loads an empty document."""
+    output_path = streaming.stream_etl(
+        input_dir=input_dir,
+        output_dir=tmp_path / "output",
+        validation_profile=ValidationProfile.OFF,
+    )
+
+    assert json.loads(output_path.read_bytes())[constants.Columns.FORMS] == {}
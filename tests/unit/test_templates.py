@@ -0,0 +1,113 @@
+"""Test the form templates module."""
+
+from typing import Any
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants
+from stormwater_monitoring_datasheet_extraction.lib.constants import Columns, FormType
+from stormwater_monitoring_datasheet_extraction.lib.extraction import templates
+
+
+def _get_template_doc() -> dict[str, Any]:
+    """Get a minimal valid template document."""
+    template = templates.get_template(
+        form_type=FormType.FIELD_DATASHEET_FOSS, form_version="4.4-1-29-2025"
+    )
+    fields = {
+        key.field[0]: list(box)
+        for key, box in template.regions.items()
+        if key.table == Columns.FORMS
+    }
+    observation_columns: dict[str, Any] = {}
+    for key, box in template.regions.items():
+        if key.table == Columns.OBSERVATIONS and key.row == 0:
+            columns = observation_columns
+            for name in key.field[:-1]:
+                columns = columns.setdefault(name, {})
+            columns[key.field[-1]] = [box.left, box.right]
+
+    return {
+        Columns.FORM_TYPE: FormType.FIELD_DATASHEET_FOSS.value,
+        Columns.FORM_VERSION: "test",
+        "page_width": 1000,
+        "fields": fields,
+        Columns.INVESTIGATORS: {
+            "rows": [[0.0, 0.5]],
+            "columns": {
+                Columns.INVESTIGATOR: [0.0, 0.5],
+                Columns.START_TIME: [0.5, 0.75],
+                Columns.END_TIME: [0.75, 1.0],
+            },
+        },
+        Columns.OBSERVATIONS: {"rows": [[0.5, 1.0]], "columns": observation_columns},
+    }
+
+
+@typechecked
+def test_templates_cover_data_definition() -> None:
+    """Tests that every template has a region for every field of every row."""
+    observation_definition = constants.FIELD_DATA_DEFINITION[Columns.FORMS][Columns.FORM_ID][
+        Columns.OBSERVATIONS
+    ][0]
+
+    for template in templates.get_templates().values():
+        observation_fields = {
+            key.field
+            for key in template.regions
+            if key.table == Columns.OBSERVATIONS and key.row == 0
+        }
+        assert {field[0] for field in observation_fields} == set(observation_definition)
+        assert (Columns.OBSERVATIONS, 0, ("color", "rank")) in template.regions
+        assert (Columns.FORMS, 0, (Columns.FORM_VERSION,)) in template.regions
+        assert (Columns.FORMS, 0, (Columns.FORM_TYPE,)) not in template.regions
+
+
+@typechecked
+def test_templates_loaded_once() -> None:
+    """Tests that templates are loaded once per process."""
+    assert templates.get_templates() is templates.get_templates()
+    assert templates.get_template(
+        form_type="field_datasheet_FOSS", form_version="4.4-1-29-2025"
+    ) is templates.get_template(
+        form_type=FormType.FIELD_DATASHEET_FOSS, form_version="4.4-1-29-2025"
+    )
+
+
+@typechecked
+def test_unknown_version() -> None:
+    """Tests that an unknown form version raises."""
+    with pytest.raises(ValueError, match="No template for form type"):
+        templates.get_template(form_type=FormType.FIELD_DATASHEET_FOSS, form_version="0.0")
+
+
+@typechecked
+def test_parse_template() -> None:
+    """Tests that table cells are the intersections of rows and columns."""
+    template = templates.parse_template(template_doc=_get_template_doc())
+
+    assert template.form_version == "test"
+    assert template.regions[
+        templates.FieldKey(table=Columns.INVESTIGATORS, row=0, field=(Columns.START_TIME,))
+    ] == (0.5, 0.0, 0.75, 0.5)
+
+
+@typechecked
+def test_parse_template_missing_field() -> None:
+    """Tests that a template missing a data definition field raises."""
+    template_doc = _get_template_doc()
+    del template_doc[Columns.OBSERVATIONS]["columns"][Columns.PH]
+
+    with pytest.raises(ValueError, match=r"Missing: \[\('pH',\)\]"):
+        templates.parse_template(template_doc=template_doc)
+
+
+@typechecked
+def test_parse_template_invalid_box() -> None:
+    """Tests that boxes off the page raise."""
+    template_doc = _get_template_doc()
+    template_doc["fields"][Columns.CITY] = [0.5, 0.0, 1.5, 0.1]
+
+    with pytest.raises(ValueError, match="Invalid template box"):
+        templates.parse_template(template_doc=template_doc)
@@ -0,0 +1,128 @@
+"""Test the validation profiles."""
+
+import time
+from contextlib import AbstractContextManager, nullcontext
+from datetime import datetime
+from typing import Final, cast
+
+import pandas as pd
+import pandera.typing as pt
+import pytest
+from pandera.errors import SchemaError, SchemaErrors
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, schema
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    ValidationProfile,
+)
+from stormwater_monitoring_datasheet_extraction.lib.schema import validation
+from stormwater_monitoring_datasheet_extraction.lib.schema.checks import (
+    dataframe_checks,
+    field_checks,
+)
+
+_INVALID_CREEKS: Final[pd.DataFrame] = pd.DataFrame(
+    {Columns.SITE_ID: ["Padden", None], Columns.CREEK_TYPE: ["spawn", "not a creek type"]}
+).set_index(Columns.SITE_ID)
+_QUAN_OBS_DUPLICATE_BOTTLE_NO: Final[pd.DataFrame] = pd.DataFrame(
+    {
+        Columns.FORM_ID: ["IMG_9527.jpg", "IMG_9527.jpg"],
+        Columns.SITE_ID: ["C ST", "BROADWAY"],
+        Columns.BACTERIA_BOTTLE_NO: ["B1", "B1"],
+        Columns.FLOW: ["M", "M"],
+        Columns.FLOW_COMPARED_TO_EXPECTED: ["Normal", "Normal"],
+        Columns.AIR_TEMP: [21.0, 22.0],
+        Columns.WATER_TEMP: [11.6, 11.1],
+        Columns.DO_MG_PER_L: [10.35, 10.73],
+        Columns.SPS_MICRO_S_PER_CM: [414.1, 314.1],
+        Columns.SALINITY_PPT: [0.2, 0.15],
+        Columns.PH: [5.91, 7.4],
+    }
+).set_index([Columns.FORM_ID, Columns.SITE_ID])
+
+
+@validation.check_types
+def _get_invalid_creeks() -> pt.DataFrame[schema.Creek]:
+    return cast("pt.DataFrame[schema.Creek]", _INVALID_CREEKS)
+
+
+@pytest.mark.parametrize(
+    "profile, error_context",
+    [
+        (ValidationProfile.FULL, pytest.raises(SchemaErrors)),
+        (ValidationProfile.FAST, pytest.raises(SchemaError)),
+        (ValidationProfile.OFF, nullcontext()),
+    ],
+)
+@typechecked
+def test_check_types_by_profile(
+    profile: ValidationProfile, error_context: AbstractContextManager
+) -> None:
+    """Tests that `full` collects all errors, `fast` raises the first, `off` skips."""
+    with validation.validation_profile(profile=profile), error_context:
+        creeks = _get_invalid_creeks()
+        pd.testing.assert_frame_equal(creeks, _INVALID_CREEKS)
+
+
+@pytest.mark.parametrize(
+    "profile, error_context",
+    [
+        (
+            ValidationProfile.FULL,
+            pytest.raises(SchemaError, match="bottle_no_unique_by_form_id"),
+        ),
+        (ValidationProfile.FAST, nullcontext()),
+    ],
+)
+@typechecked
+def test_expensive_check_skipped_when_fast(
+    profile: ValidationProfile, error_context: AbstractContextManager
+) -> None:
+    """Tests that expensive dataframe checks are skipped under the `fast` profile."""
+    with validation.validation_profile(profile=profile), error_context:
+        schema.QuantitativeObservationsVerified.validate(_QUAN_OBS_DUPLICATE_BOTTLE_NO)
+
+
+@typechecked
+def test_validation_profile_resets() -> None:
+    """Tests that the profile context restores the outer profile."""
+    assert validation.get_validation_profile() == ValidationProfile.FULL
+    with validation.validation_profile(profile="off"):
+        assert validation.get_validation_profile() == ValidationProfile.OFF
+        with validation.validation_profile(profile=ValidationProfile.FAST):
+            assert validation.get_validation_profile() == ValidationProfile.FAST
+        assert validation.get_validation_profile() == ValidationProfile.OFF
+    assert validation.get_validation_profile() == ValidationProfile.FULL
+
+
+@typechecked
+def test_reference_time() -> None:
+    """Tests that date and time checks compare against the frozen reference time."""
+    dates = pd.DataFrame(
+        {
+            Columns.DATE: ["2025-07-22", "2025-07-23", "2025-07-21", None, "7/22/2025"],
+            Columns.TIDE_TIME: ["14:40", "09:00", "23:59", "09:00", "09:00"],
+        }
+    )
+
+    with validation.reference_time(timestamp=datetime(2025, 7, 22, 14, 41)):
+        first_reference = validation.get_reference_time()
+        time.sleep(0.01)
+        assert validation.get_reference_time() == first_reference
+        assert field_checks.date_le_today(
+            series=dates[Columns.DATE], date_format=constants.DATE_FORMAT
+        ).tolist() == [True, False, True, False, False]
+        assert dataframe_checks.datetime_lt_now(
+            df=dates,
+            date_col=Columns.DATE,
+            time_col=Columns.TIDE_TIME,
+            date_format=constants.DATE_FORMAT,
+            time_format=constants.TIME_FORMAT,
+        ).tolist() == [True, False, True, False, False]
+
+    with validation.reference_time():
+        frozen = validation.get_reference_time()
+        time.sleep(0.01)
+        assert validation.get_reference_time() == frozen
+    assert validation.get_reference_time() > frozen
@@ -0,0 +1,304 @@
+"""Test the versioned data definitions."""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Final, cast
+
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+import pandera.typing as pt
+import pytest
+from pandera.errors import SchemaError, SchemaErrors
+from pandera.typing import Index, Series
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    OutfallType,
+)
+from stormwater_monitoring_datasheet_extraction.lib.schema import (
+    compiled,
+    definition,
+    schema,
+    validation,
+    versions,
+)
+
+_FORM_TYPE: Final[str] = "field_datasheet_FOSS"
+_CURRENT_VERSION: Final[str] = "4.4-1-29-2025"
+_NARROW_VERSION: Final[str] = "test-narrow"
+# Adds a weather option, drops the rainfall limit, adds turbidity, and drops salinity.
+_WIDE_VERSION: Final[str] = "test-wide"
+_WIDE_FILE: Final[Path] = (
+    Path(__file__).parent / "data" / "form_definitions" / f"{_FORM_TYPE}_{_WIDE_VERSION}.json"
+)
+_TURBIDITY: Final[str] = "turbidity_ntu"
+# pH limited to 2 to 12, with no creek thresholds, and no salinity limit.
+_NARROW_DOC: Final[dict] = {
+    Columns.FORM_TYPE: _FORM_TYPE,
+    Columns.FORM_VERSION: _NARROW_VERSION,
+    Columns.METADATA: {
+        Columns.OBSERVATIONS: {
+            Columns.PH: {
+                Columns.LOWER: {Columns.VALUE: 2, Columns.INCLUSIVE: True},
+                Columns.UPPER: {Columns.VALUE: 12, Columns.INCLUSIVE: True},
+                Columns.THRESHOLDS: {OutfallType.CREEK: None},
+            },
+            Columns.SALINITY_PPT: {Columns.LOWER: None},
+        }
+    },
+}
+_FORM_METADATA: Final[pd.DataFrame] = pd.DataFrame(
+    {
+        Columns.FORM_ID: ["IMG_1.jpg", "IMG_2.jpg", "IMG_3.jpg"],
+        Columns.FORM_TYPE: [_FORM_TYPE, _FORM_TYPE, None],
+        Columns.FORM_VERSION: [_NARROW_VERSION, _CURRENT_VERSION, None],
+    }
+).set_index(Columns.FORM_ID)
+
+
+class _Observations(pa.DataFrameModel):
+    """A stage-like model, coercing pH."""
+
+    form_id: Index[str] = pa.Field(coerce=True)
+    pH: Series[float] = pa.Field(coerce=True, nullable=True, ge=0, le=14)
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Register a narrower and a wider test version alongside the packaged ones."""
+    registry = {
+        **versions.get_registry(),
+        (_FORM_TYPE, _NARROW_VERSION): versions.parse_definition(definition_doc=_NARROW_DOC),
+        (_FORM_TYPE, _WIDE_VERSION): versions.parse_definition(
+            definition_doc=json.loads(_WIDE_FILE.read_text())
+        ),
+    }
+    monkeypatch.setattr(versions, "get_registry", lambda: registry)
+    versions._build_schema.cache_clear()
+    yield
+    versions._build_schema.cache_clear()
+
+
+def _get_form_metadata(past_24hr_rainfall: float, weather: str) -> pd.DataFrame:
+    """Get verified-stage metadata of a wide form between two current forms."""
+    form_metadata = pd.DataFrame(
+        {
+            Columns.FORM_ID: ["IMG_1.jpg", "IMG_2.jpg", "IMG_3.jpg"],
+            Columns.FORM_TYPE: [_FORM_TYPE] * 3,
+            Columns.FORM_VERSION: [_CURRENT_VERSION, _WIDE_VERSION, _CURRENT_VERSION],
+            Columns.DATE: ["2025-01-01"] * 3,
+            Columns.CITY: ["Bellingham"] * 3,
+            Columns.TIDE_HEIGHT: [1.0] * 3,
+            Columns.TIDE_TIME: ["10:00"] * 3,
+            Columns.PAST_24HR_RAINFALL: [0.5, past_24hr_rainfall, 0.0],
+            Columns.WEATHER: ["cloud_clear", weather, "cloud_over"],
+            Columns.NOTES: [""] * 3,
+        }
+    )
+
+    return form_metadata.set_index(Columns.FORM_ID)
+
+
+def _get_observations(turbidity: list[float | None]) -> pd.DataFrame:
+    """Get verified-stage observations, of the current forms with salinity, else turbidity.
+
+    Args:
+        turbidity: The turbidity of each form's observation.
+    """
+    is_wide = np.array([False, True, False])
+    observations = pd.DataFrame(
+        {
+            Columns.FORM_ID: ["IMG_1.jpg", "IMG_2.jpg", "IMG_3.jpg"],
+            Columns.SITE_ID: ["C1", "C1", "C1"],
+            Columns.BACTERIA_BOTTLE_NO: ["B1", "B1", "B1"],
+            Columns.FLOW: ["M"] * 3,
+            Columns.FLOW_COMPARED_TO_EXPECTED: ["Normal"] * 3,
+            Columns.AIR_TEMP: [10.0] * 3,
+            Columns.WATER_TEMP: [9.0] * 3,
+            Columns.DO_MG_PER_L: [10.0] * 3,
+            Columns.SPS_MICRO_S_PER_CM: [300.0] * 3,
+            Columns.SALINITY_PPT: np.where(is_wide, np.nan, 0.1),
+            Columns.PH: [7.0] * 3,
+            _TURBIDITY: np.array(turbidity, dtype=float),
+        }
+    )
+
+    return observations.set_index([Columns.FORM_ID, Columns.SITE_ID])
+
+
+@validation.check_types
+def _verify_observations(
+    form_metadata: Any, observations: Any
+) -> pt.DataFrame[schema.QuantitativeObservationsVerified]:
+    """Return the observations, checked per the forms' versions."""
+    return cast("pt.DataFrame[schema.QuantitativeObservationsVerified]", observations)
+
+
+@typechecked
+def test_registry() -> None:
+    """Tests that packaged definitions load, and overrides merge onto the base."""
+    current = versions.get_definition(form_type=_FORM_TYPE, form_version=_CURRENT_VERSION)
+    assert current.is_base
+    assert current.fields is definition.get_field_definitions()
+
+    unknown = versions.get_definition(form_type=_FORM_TYPE, form_version="0.0")
+    assert unknown.is_base
+    assert unknown.form_version == "0.0"
+
+    narrow = versions.get_definition(form_type=_FORM_TYPE, form_version=_NARROW_VERSION)
+    assert not narrow.is_base
+    assert definition.get_field_limits(field=narrow.fields[Columns.PH]) == {"ge": 2, "le": 12}
+    assert definition.get_field_limits(field=narrow.fields[Columns.SALINITY_PPT]) == {}
+    assert narrow.fields[Columns.PH].units == definition.get_field(column=Columns.PH).units
+    ph_thresholds = narrow.thresholds[narrow.thresholds[Columns.COLUMN] == Columns.PH]
+    assert set(ph_thresholds[Columns.OUTFALL_TYPE]) == {OutfallType.OUTFALL}
+    # The base is untouched.
+    assert definition.get_limits(column=Columns.PH) == {"ge": 0, "le": 14}
+
+    wide = versions.get_definition(form_type=_FORM_TYPE, form_version=_WIDE_VERSION)
+    assert not wide.is_base
+    assert "smoke" in wide.fields[Columns.WEATHER].options
+    assert definition.get_field_limits(field=wide.fields[Columns.PAST_24HR_RAINFALL]) == {}
+    assert wide.added_fields == {Columns.BACTERIA_BOTTLE_NO: (_TURBIDITY,)}
+    assert wide.fields[_TURBIDITY].data_type is float
+    assert wide.dropped_fields == {Columns.SALINITY_PPT}
+    assert Columns.SALINITY_PPT not in wide.fields
+
+
+@typechecked
+def test_get_schema() -> None:
+    """Tests that versioned schemas replace limits, and are copied once per thread."""
+    base_schema = _Observations.to_schema()
+    assert versions.get_schema(_Observations, _FORM_TYPE, _CURRENT_VERSION) is base_schema
+
+    narrow_schema = versions.get_schema(_Observations, _FORM_TYPE, _NARROW_VERSION)
+    assert narrow_schema is not base_schema
+    assert narrow_schema is versions.get_schema(_Observations, _FORM_TYPE, _NARROW_VERSION)
+    ph = pd.DataFrame({Columns.FORM_ID: ["IMG_1.jpg"], Columns.PH: [13.0]}).set_index(
+        Columns.FORM_ID
+    )
+    base_schema.validate(ph)
+    with pytest.raises(SchemaError, match="less_than_or_equal_to"):
+        narrow_schema.validate(ph)
+
+    wide_schema = versions.get_schema(
+        schema.QuantitativeObservationsVerified, _FORM_TYPE, _WIDE_VERSION
+    )
+    assert _TURBIDITY in wide_schema.columns
+    assert Columns.SALINITY_PPT not in wide_schema.columns
+    assert wide_schema.columns[_TURBIDITY].coerce
+
+
+@typechecked
+def test_partition() -> None:
+    """Tests that rows are partitioned by their forms' versions, missing forms to base."""
+    df = pd.DataFrame(
+        {Columns.FORM_ID: ["IMG_2.jpg", "IMG_1.jpg", "IMG_9.jpg", "IMG_1.jpg", "IMG_3.jpg"]}
+    ).set_index(Columns.FORM_ID)
+
+    positions = versions.partition(df=df, form_metadata=_FORM_METADATA)
+
+    assert {key: value.tolist() for key, value in positions.items()} == {
+        (_FORM_TYPE, _NARROW_VERSION): [1, 3],
+        (_FORM_TYPE, _CURRENT_VERSION): [0],
+        (None, None): [2, 4],
+    }
+
+
+@typechecked
+def test_normalize() -> None:
+    """Tests that mixed batches are normalized in place, in their original order."""
+    df = pd.DataFrame(
+        {
+            Columns.FORM_ID: ["IMG_2.jpg", "IMG_1.jpg", "IMG_3.jpg"],
+            Columns.NOTES: [" a ", " b", "c "],
+        }
+    ).set_index(Columns.FORM_ID)
+
+    normalized = versions.normalize(df=df, form_metadata=_FORM_METADATA)
+
+    assert normalized.index.equals(df.index)
+    assert normalized[Columns.NOTES].tolist() == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+@pytest.mark.parametrize(
+    "lazy, error", [(True, SchemaErrors), (False, SchemaError)], ids=["lazy", "eager"]
+)
+@typechecked
+def test_validate_narrowed(lazy: bool, error: type[Exception], max_workers: int) -> None:
+    """Tests that each version's rows are validated against its own schema, narrower."""
+    df = pd.DataFrame(
+        {
+            Columns.FORM_ID: ["IMG_1.jpg", "IMG_2.jpg", "IMG_3.jpg"],
+            Columns.PH: [7.0, 13.0, 13.0],
+        }
+    ).set_index(Columns.FORM_ID)
+    observations_schema = compiled.get_schema(model=_Observations)
+
+    with versions.form_versions(form_metadata=_FORM_METADATA), validation.validation_workers(
+        max_workers=max_workers
+    ):
+        # pH 13 is only out of the narrow version's limits.
+        validated = observations_schema.validate(df, lazy=lazy)
+        pd.testing.assert_frame_equal(validated, df)
+
+        df[Columns.PH] = np.array([13.0, 7.0, 7.0])
+        with pytest.raises(error, match="less_than_or_equal_to"):
+            observations_schema.validate(df, lazy=lazy)
+
+    # Without the forms' versions, the base.
+    observations_schema.validate(df, lazy=lazy)
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+@typechecked
+def test_validate_widened(max_workers: int) -> None:
+    """Tests that a version's rows are validated against its own schema, wider."""
+    form_schema = schema.FormVerified.to_schema()
+    form_metadata = _get_form_metadata(past_24hr_rainfall=-0.1, weather="smoke")
+
+    with validation.validation_workers(max_workers=max_workers):
+        validated = form_schema.validate(form_metadata, lazy=True)
+
+    assert validated.index.equals(form_metadata.index)
+    assert list(validated.columns) == list(form_metadata.columns)
+    assert validated[Columns.WEATHER].tolist() == ["cloud_clear", "smoke", "cloud_over"]
+    assert "smoke" in validated[Columns.WEATHER].cat.categories
+
+    base_form_metadata = form_metadata.assign(**{Columns.FORM_VERSION: _CURRENT_VERSION})
+    with pytest.raises(SchemaErrors) as exc_info:
+        form_schema.validate(base_form_metadata, lazy=True)
+    failure_cases = exc_info.value.failure_cases
+    assert set(failure_cases["column"]) == {Columns.PAST_24HR_RAINFALL, Columns.WEATHER}
+
+
+@pytest.mark.parametrize(
+    "turbidity, is_valid",
+    [
+        ([None, 1.5, None], True),
+        ([None, -1.0, None], False),
+        ([1.5, 1.5, None], False),
+    ],
+    ids=["added", "below_limit", "not_in_base"],
+)
+@typechecked
+def test_validate_added_field(turbidity: list[float | None], is_valid: bool) -> None:
+    """Tests that fields added by a version are checked, and only allowed, in its rows."""
+    form_metadata = _get_form_metadata(past_24hr_rainfall=0.0, weather="cloud_part")
+    observations = _get_observations(turbidity=turbidity)
+
+    if not is_valid:
+        with pytest.raises(SchemaErrors, match=_TURBIDITY):
+            _verify_observations(form_metadata=form_metadata, observations=observations)
+        return
+
+    validated = _verify_observations(form_metadata=form_metadata, observations=observations)
+
+    assert validated.index.equals(observations.index)
+    assert validated[_TURBIDITY].tolist()[1] == 1.5
+    assert validated[Columns.SALINITY_PPT].isna().tolist() == [False, True, False]
+    assert isinstance(validated[Columns.FLOW].dtype, pd.CategoricalDtype)
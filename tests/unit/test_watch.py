@@ -0,0 +1,161 @@
+"""Test watch mode."""
+
+import json
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Final
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib import constants, load_datasheets
+from stormwater_monitoring_datasheet_extraction.lib.constants import (
+    Columns,
+    ValidationProfile,
+)
+from stormwater_monitoring_datasheet_extraction.lib.extraction import discovery, watch
+from stormwater_monitoring_datasheet_extraction.lib.output import ledger
+
+_JPEG: Final[bytes] = b"\xff\xd8\xff\xe0" + b"\x00" * constants.MIN_IMAGE_BYTES + b"\xff\xd9"
+_NOW: Final[float] = 1_000_000_000.0
+
+
+class _Clock:
+    """A clock to advance by hand."""
+
+    def __init__(self) -> None:
+        self.now = _NOW
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _write_image(path: Path, contents: bytes = _JPEG, mtime: float = _NOW) -> None:
+    """Write an image with the given modification time."""
+    path.write_bytes(contents)
+    os.utime(path, (mtime, mtime))
+
+
+@typechecked
+def test_watcher_debounces_uploads(tmp_path: Path) -> None:
+    """Tests that images are batched once settled, and each version only once."""
+    _write_image(path=tmp_path / "IMG_0.jpg", mtime=_NOW - 60)
+    _write_image(path=tmp_path / "IMG_1.jpg", mtime=_NOW - 60)
+    _write_image(path=tmp_path / "IMG_2.jpg", mtime=_NOW - 60)
+    clock = _Clock()
+    stop = threading.Event()
+
+    with watch.FolderWatcher(
+        input_dir=tmp_path,
+        debounce_seconds=5,
+        poll_seconds=0,
+        batch_size=2,
+        use_events=False,
+        clock=clock,
+    ) as watcher:
+        # Already there, and settled: batched right away.
+        assert [image.form_id for image in watcher.next_batch(stop=stop)] == [
+            "IMG_0.jpg",
+            "IMG_1.jpg",
+        ]
+        assert [image.form_id for image in watcher.next_batch(stop=stop)] == ["IMG_2.jpg"]
+
+        # New, and mid-upload: not yet read.
+        _write_image(path=tmp_path / "IMG_3.jpg", contents=_JPEG[:-2])
+        assert watcher._scan() == []
+        # Still uploading.
+        clock.now += 4
+        _write_image(path=tmp_path / "IMG_3.jpg", mtime=clock.now)
+        assert watcher._scan() == []
+        clock.now += 4
+        assert watcher._scan() == []
+        # Settled.
+        clock.now += 1
+        assert [image.form_id for image in watcher._scan()] == ["IMG_3.jpg"]
+
+        # Changed.
+        _write_image(path=tmp_path / "IMG_0.jpg", contents=_JPEG + b"\x00", mtime=clock.now)
+        clock.now += 5
+        assert watcher._scan() == []
+        clock.now += 5
+        assert [image.form_id for image in watcher._scan()] == ["IMG_0.jpg"]
+        assert watcher._scan() == []
+
+        stop.set()
+        assert watcher.next_batch(stop=stop) == []
+
+
+@typechecked
+def test_watcher_skips_vanished_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tests that files deleted mid-scan are skipped, and picked up if they reappear."""
+    for i in range(3):
+        _write_image(path=tmp_path / f"IMG_{i}.jpg", mtime=_NOW - 60)
+    iter_image_files = discovery.iter_image_files
+
+    def _iter_image_files(input_dir: Path, recursive: bool = True) -> Iterator[os.DirEntry]:
+        entries = list(iter_image_files(input_dir=input_dir, recursive=recursive))
+        # Deleted after it's listed, before it's statted.
+        (tmp_path / "IMG_1.jpg").unlink(missing_ok=True)
+        yield from entries
+
+    with watch.FolderWatcher(
+        input_dir=tmp_path, debounce_seconds=0, use_events=False, clock=_Clock()
+    ) as watcher:
+        monkeypatch.setattr(discovery, "iter_image_files", _iter_image_files)
+        assert [image.form_id for image in watcher._scan()] == ["IMG_0.jpg", "IMG_2.jpg"]
+
+        monkeypatch.undo()
+        _write_image(path=tmp_path / "IMG_1.jpg")
+        assert [image.form_id for image in watcher._scan()] == ["IMG_1.jpg"]
+
+
+@pytest.mark.parametrize(
+    "validation_profile, expected_n_outputs",
+    # The fake extraction doesn't pass full validation, so its batch is skipped.
+    [(ValidationProfile.OFF, 1), (ValidationProfile.FULL, 0)],
+)
+@typechecked
+def test_watch_etl(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    validation_profile: ValidationProfile,
+    expected_n_outputs: int,
+) -> None:
+    """Tests that micro-batches are loaded and recorded, and bad batches skipped."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(3):
+        _write_image(path=input_dir / f"IMG_{i}.jpg", mtime=0)
+    output_dir = tmp_path / "output"
+    stop = threading.Event()
+
+    original_next_batch = watch.FolderWatcher.next_batch
+
+    def _next_batch_once(self: watch.FolderWatcher, stop: threading.Event) -> list:
+        batch = original_next_batch(self, stop=stop)
+        # Stop after the first batch.
+        stop.set()
+        return batch
+
+    monkeypatch.setattr(watch.FolderWatcher, "next_batch", _next_batch_once)
+    monkeypatch.setattr(watch, "Observer", None)
+
+    output_paths = load_datasheets.watch_etl(
+        input_dir=input_dir,
+        output_dir=output_dir,
+        validation_profile=validation_profile,
+        extractor="fake",
+        stop=stop,
+    )
+
+    assert len(output_paths) == expected_n_outputs
+    if output_paths:
+        document = json.loads(output_paths[0].read_bytes())
+        assert sorted(document[Columns.FORMS]) == ["IMG_0.jpg", "IMG_1.jpg", "IMG_2.jpg"]
+        with ledger.incremental(path=output_dir / ledger.LEDGER_NAME) as active_ledger:
+            assert active_ledger is not None
+            assert set(active_ledger.get_outputs()) == set(document[Columns.FORMS])
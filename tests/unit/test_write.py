@@ -0,0 +1,84 @@
+"""Test crash-safe output writes."""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+from typeguard import typechecked
+
+from stormwater_monitoring_datasheet_extraction.lib.output import write
+
+
+@typechecked
+def test_atomic_write(tmp_path: Path) -> None:
+    """Tests that a file is replaced whole, and left untouched on error."""
+    path = tmp_path / "a" / "doc.json"
+    with write.atomic_write(path=path) as file:
+        file.write(b"first")
+    assert path.read_bytes() == b"first"
+
+    with pytest.raises(RuntimeError), write.atomic_write(path=path) as file:
+        file.write(b"half")
+        raise RuntimeError
+
+    assert path.read_bytes() == b"first"
+    assert [child.name for child in path.parent.iterdir()] == ["doc.json"]
+
+
+@typechecked
+def test_artifact_set(tmp_path: Path) -> None:
+    """Tests that artifacts are hidden until committed together, with a manifest."""
+    with write.ArtifactSet(output_dir=tmp_path, run_id="run") as artifacts:
+        document_path = artifacts.write_bytes(name="doc.json", data=b"{}")
+        with artifacts.open(name="report.json") as report_file:
+            report_file.write(b"[]")
+        # Only the hidden staging directory exists until committed.
+        assert [child.name.startswith(".staging-") for child in tmp_path.iterdir()] == [True]
+
+    assert document_path == tmp_path / "run" / "doc.json"
+    assert document_path.read_bytes() == b"{}"
+    manifest = write.read_manifest(run_dir=tmp_path / "run")
+    assert manifest["run_id"] == "run"
+    assert manifest["artifacts"]["report.json"] == {
+        "bytes": 2,
+        "sha256": hashlib.sha256(b"[]").hexdigest(),
+    }
+    assert [child.name for child in tmp_path.iterdir()] == ["run"]
+
+
+@typechecked
+def test_artifact_set_discards_on_error(tmp_path: Path) -> None:
+    """Tests that a failed run leaves nothing behind."""
+    with pytest.raises(RuntimeError), write.ArtifactSet(output_dir=tmp_path) as artifacts:
+        artifacts.write_bytes(name="doc.json", data=b"{}")
+        raise RuntimeError
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@typechecked
+def test_artifact_sets_dont_collide(tmp_path: Path) -> None:
+    """Tests that concurrent runs under the same root get their own run directories."""
+    first, second = write.ArtifactSet(output_dir=tmp_path), write.ArtifactSet(
+        output_dir=tmp_path
+    )
+    first.write_bytes(name="doc.json", data=b"1")
+    second.write_bytes(name="doc.json", data=b"2")
+
+    assert first.commit() != second.commit()
+    assert (first.run_dir / "doc.json").read_bytes() == b"1"
+    assert (second.run_dir / "doc.json").read_bytes() == b"2"
+    with pytest.raises(FileExistsError):
+        write.ArtifactSet(output_dir=tmp_path, run_id=first.run_id)
+
+
+@pytest.mark.parametrize("name", ["manifest.json", "a/doc.json", "doc.json"])
+@typechecked
+def test_artifact_set_invalid_names(name: str, tmp_path: Path) -> None:
+    """Tests that the manifest name, paths, and duplicate names are rejected."""
+    artifacts = write.ArtifactSet(output_dir=tmp_path)
+    artifacts.write_bytes(name="doc.json", data=b"{}")
+
+    with pytest.raises(ValueError, match="Invalid or duplicate artifact name"):
+        artifacts.write_bytes(name=name, data=b"{}")
+    artifacts.discard()